@@ -38,6 +38,8 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 from dotenv import load_dotenv
 
+from core.config.config_index import FlatConfigIndex, ConfigSnapshot
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
@@ -90,6 +92,9 @@ class UnifiedConfigManager:
         self.last_reload = None
         self.config_hierarchy = []
         
+        # Índice plano (ruta -> valor) compilado tras cada carga
+        self._index = FlatConfigIndex()
+        
         logger.info(f"🔧 Inicializando UnifiedConfigManager v2 - Entorno: {environment}")
         
         # Inicializar sistema
@@ -405,6 +410,15 @@ class UnifiedConfigManager:
             ("features", self.feature_configs),
             ("core", self.core_configs)
         ]
+        self._compile_index()
+    
+    def _compile_index(self):
+        """Compila la jerarquía en el índice plano de rutas"""
+        self._index.compile([
+            (config_type, config_data)
+            for config_type, config_data in self.config_hierarchy
+            if isinstance(config_data, dict)
+        ])
     
     # ==========================================
     # API PÚBLICA - MÉTODOS DE ACCESO
@@ -692,25 +706,41 @@ class UnifiedConfigManager:
             Valor encontrado o default
         """
         try:
-            # Buscar en jerarquía de configuración (environment > user > features > core)
-            for config_type, config_data in self.config_hierarchy:
-                if isinstance(config_data, dict):
-                    value = self._get_nested_value(config_data, key_path)
-                    if value is not None:
-                        return value
-                elif isinstance(config_data, dict):
-                    # Para features que es un dict de configs
-                    for feature_config in config_data.values():
-                        value = self._get_nested_value(feature_config, key_path)
-                        if value is not None:
-                            return value
-            
-            return default
+            # Jerarquía (environment > user > features > core) precompilada en el índice
+            if not self._index.is_compiled:
+                self._compile_index()
+            return self._index.get(key_path, default)
             
         except Exception as e:
             logger.error(f"❌ Error obteniendo valor para {key_path}: {e}")
             return default
     
+    def snapshot(self, snapshot_cls):
+        """
+        Snapshot tipado e inmutable de un grupo de claves
+        
+        Pensado para bucles calientes: se construye una vez por versión de la
+        configuración y se invalida al recargar (ver is_snapshot_current).
+        
+        Args:
+            snapshot_cls: Dataclass frozen derivada de ConfigSnapshot
+            
+        Returns:
+            Instancia de snapshot_cls con los valores actuales
+        """
+        if not self._index.is_compiled:
+            self._compile_index()
+        return self._index.snapshot(snapshot_cls)
+    
+    def is_snapshot_current(self, snapshot: ConfigSnapshot) -> bool:
+        """Indica si un snapshot sigue correspondiendo a la configuración cargada"""
+        return self._index.is_current(snapshot)
+    
+    @property
+    def config_version(self) -> int:
+        """Versión del índice; se incrementa en cada recarga"""
+        return self._index.version
+    
     def _get_nested_value(self, config: Dict[str, Any], key_path: str) -> Any:
         """
         Obtiene valor anidado usando notación de puntos
@@ -751,6 +781,7 @@ class UnifiedConfigManager:
             
             # Limpiar cache
             self._cache.clear()
+            self._index.invalidate()
             self.configs.clear()
             self.validation_results.clear()
             
@@ -1014,6 +1045,7 @@ class UnifiedConfigManager:
                 current = current[key]
             
             current[keys[-1]] = value
+            self._index.invalidate()
             
             # Guardar archivo
             user_file = self.config_dir / "user_settings.yaml"
@@ -1181,6 +1213,7 @@ class UnifiedConfig:
         self.config_dir = Path(config_dir)
         self._config_cache = {}
         self._env_loaded = False
+        self._index = FlatConfigIndex()
         
         # Cargar variables de entorno
         self._load_environment()
@@ -1229,6 +1262,13 @@ class UnifiedConfig:
         
         # Configuración de seguridad
         self.security_config = self._load_yaml("security_config.yaml")
+        
+        # Orden de búsqueda de get(): user_settings > enterprise > control
+        self._index.compile(
+            [("user_settings", self.user_settings)]
+            + [(f"enterprise/{name}", config) for name, config in self.enterprise_configs.items()]
+            + [("control_config", self.control_config)]
+        )
     
     def _load_yaml(self, file_path: str) -> Dict[str, Any]:
         """Cargar archivo YAML con cache.
@@ -1259,23 +1299,15 @@ class UnifiedConfig:
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """Obtener valor usando notación de puntos (ej: 'trading.symbols')"""
-        # Buscar en user_settings primero
-        value = self._get_nested_value(self.user_settings, key_path)
-        if value is not None:
-            return value
-        
-        # Buscar en configuraciones enterprise
-        for config_name, config in self.enterprise_configs.items():
-            value = self._get_nested_value(config, key_path)
-            if value is not None:
-                return value
-        
-        # Buscar en control config
-        value = self._get_nested_value(self.control_config, key_path)
-        if value is not None:
-            return value
-        
-        return default
+        # user_settings > enterprise > control, precompilado en el índice
+        return self._index.get(key_path, default)
+    
+    def snapshot(self, snapshot_cls):
+        """Snapshot tipado e inmutable (se invalida al recargar)"""
+        return self._index.snapshot(snapshot_cls)
+    
+    def is_snapshot_current(self, snapshot: ConfigSnapshot) -> bool:
+        return self._index.is_current(snapshot)
     
     def _get_nested_value(self, config: Dict[str, Any], key_path: str) -> Any:
         """Obtener valor anidado usando notación de puntos"""
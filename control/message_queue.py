@@ -5,20 +5,35 @@ message_queue.py
 ================
 Sistema de Cola de Mensajes para Telegram
 
-Maneja el envío de mensajes con control de flood y cola inteligente.
+Maneja el envío de mensajes con control de flood y cola inteligente:
+
+- Heap de prioridad (prioridad, orden de llegada): inserción y extracción
+  O(log n), sin reordenar la cola completa
+- Coalescencia por clave: un mensaje con la misma ``key`` que otro pendiente
+  lo sustituye (p. ej. la última actualización de posición por símbolo).
+  Sin clave, los textos idénticos pendientes se deduplican
+- Presupuesto de envío con token bucket (ráfagas controladas) en lugar de
+  una espera fija entre mensajes
+- Métricas de profundidad, edad y latencia de cola
 
 Autor: Bot Trading v10 Enterprise
-Versión: 1.0.0
+Versión: 1.1.0
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Dict, Any, Hashable, Optional
+from datetime import datetime
+from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+PRIORITY_NAMES = {1: "alta", 2: "media", 3: "baja"}
+
 @dataclass
 class QueuedMessage:
     """Mensaje en cola para envío"""
@@ -27,88 +42,322 @@ class QueuedMessage:
     priority: int = 1  # 1=alta, 2=media, 3=baja
     created_at: datetime = None
     retry_count: int = 0
-    
+    key: Optional[Hashable] = None
+    seq: int = 0
+    enqueued_at: float = 0.0  # reloj monotónico
+    coalesced_count: int = 0
+    cancelled: bool = field(default=False, repr=False)
+
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
 
+class TokenBucket:
+    """
+    Token bucket para el presupuesto de envío
+
+    ``rate`` tokens por segundo con una ráfaga máxima de ``capacity``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self):
+        now = self._clock()
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def time_until_available(self) -> float:
+        """Segundos hasta que haya un token disponible"""
+        self._refill()
+        blocked = max(0.0, self._blocked_until - self._clock())
+        # Tolerancia para errores de redondeo tras una espera exacta
+        if self.tokens >= 1.0 - 1e-9 or self.rate == float('inf'):
+            return blocked
+        return max(blocked, (1.0 - self.tokens) / self.rate)
+
+    async def acquire(self) -> float:
+        """Consume un token esperando lo necesario; devuelve el tiempo esperado"""
+        waited = 0.0
+        while True:
+            wait_time = self.time_until_available()
+            if wait_time <= 0:
+                break
+            await self._sleep(wait_time)
+            waited += wait_time
+        self.tokens -= 1.0
+        return waited
+
+    def penalize(self, seconds: float):
+        """Bloquea el bucket (flood control del servidor) y vacía los tokens"""
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+        self.tokens = 0.0
+        self._updated = self._clock()
+
 class TelegramMessageQueue:
     """Cola inteligente de mensajes para Telegram con control de flood"""
-    
-    def __init__(self, bot, max_queue_size: int = 100, base_delay: float = 2.0):
+
+    def __init__(
+        self,
+        bot,
+        max_queue_size: int = 100,
+        base_delay: float = 2.0,
+        burst: int = 3,
+        rate_per_second: Optional[float] = None,
+        max_retries: int = 3,
+        dedupe_identical: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        """
+        Args:
+            bot: Objeto con ``async send_message(message, parse_mode)``
+            max_queue_size: Mensajes pendientes máximos
+            base_delay: Intervalo medio entre envíos (define la tasa por defecto)
+            burst: Envíos permitidos en ráfaga
+            rate_per_second: Tasa de envío explícita (sustituye a base_delay)
+            max_retries: Intentos máximos por mensaje
+            dedupe_identical: Deduplicar textos idénticos sin clave
+        """
         self.bot = bot
         self.max_queue_size = max_queue_size
         self.base_delay = base_delay
-        self.queue: List[QueuedMessage] = []
+        self.max_retries = max_retries
+        self.dedupe_identical = dedupe_identical
+        self._clock = clock
+        self._sleep = sleep
+
+        rate = rate_per_second if rate_per_second is not None else (
+            1.0 / base_delay if base_delay > 0 else float('inf')
+        )
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._by_key: Dict[Hashable, QueuedMessage] = {}
+        # Mensajes vivos por prioridad en orden de llegada (desalojo y métricas)
+        self._live: Dict[int, "OrderedDict[int, QueuedMessage]"] = {}
+        self._size = 0
+
         self.is_processing = False
+        self._process_task: Optional[asyncio.Task] = None
+        self._empty_event = asyncio.Event()
+        self._empty_event.set()
         self.last_send_time = datetime.now()
-        self.min_interval = timedelta(seconds=base_delay)
-        
-    async def add_message(self, message: str, parse_mode: str = "HTML", priority: int = 1):
-        """Agregar mensaje a la cola"""
-        if len(self.queue) >= self.max_queue_size:
-            # Remover mensaje más antiguo de menor prioridad
-            self.queue.sort(key=lambda x: (x.priority, x.created_at))
-            removed = self.queue.pop(0)
-            logger.warning(f"⚠️ Cola llena, removiendo mensaje: {removed.message[:50]}...")
-        
-        queued_msg = QueuedMessage(
+
+        self.stats = {
+            'enqueued': 0,
+            'sent': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'failed': 0,
+            'retries': 0,
+            'flood_waits': 0,
+            'max_depth': 0,
+            'total_queue_latency_s': 0.0,
+            'max_queue_latency_s': 0.0,
+        }
+
+    @property
+    def queue(self) -> List[QueuedMessage]:
+        """Mensajes pendientes en orden de envío (vista, no usar en caminos calientes)"""
+        return [entry[2] for entry in sorted(self._heap) if not entry[2].cancelled]
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Estructura interna
+    # ------------------------------------------------------------------
+
+    def _push(self, msg: QueuedMessage):
+        heapq.heappush(self._heap, (msg.priority, msg.seq, msg))
+        self._live.setdefault(msg.priority, OrderedDict())[msg.seq] = msg
+        if msg.key is not None:
+            self._by_key[msg.key] = msg
+        self._size += 1
+        self._empty_event.clear()
+        if self._size > self.stats['max_depth']:
+            self.stats['max_depth'] = self._size
+
+    def _discard(self, msg: QueuedMessage):
+        """Elimina un mensaje vivo (borrado perezoso en el heap)"""
+        msg.cancelled = True
+        bucket = self._live.get(msg.priority)
+        if bucket is not None:
+            bucket.pop(msg.seq, None)
+        if msg.key is not None and self._by_key.get(msg.key) is msg:
+            del self._by_key[msg.key]
+        self._size -= 1
+        if self._size == 0:
+            self._empty_event.set()
+
+    def _pop(self) -> Optional[QueuedMessage]:
+        while self._heap:
+            _, _, msg = heapq.heappop(self._heap)
+            if msg.cancelled:
+                continue
+            self._discard(msg)
+            msg.cancelled = False
+            return msg
+        return None
+
+    def _evict_victim(self, incoming_priority: int) -> bool:
+        """
+        Libera un hueco desalojando el mensaje más antiguo de menor prioridad.
+        Devuelve False si el entrante es el de menor prioridad (se descarta).
+        """
+        for priority in sorted(self._live, reverse=True):
+            bucket = self._live[priority]
+            if not bucket:
+                continue
+            if incoming_priority > priority:
+                return False
+            _, victim = next(iter(bucket.items()))
+            self._discard(victim)
+            self.stats['dropped'] += 1
+            logger.warning(f"⚠️ Cola llena, removiendo mensaje: {victim.message[:50]}...")
+            return True
+        return True
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    async def add_message(
+        self,
+        message: str,
+        parse_mode: str = "HTML",
+        priority: int = 1,
+        key: Optional[Hashable] = None
+    ) -> bool:
+        """
+        Agregar mensaje a la cola
+
+        Args:
+            message: Texto del mensaje
+            parse_mode: Modo de parseo de Telegram
+            priority: 1=alta, 2=media, 3=baja
+            key: Clave de coalescencia; un mensaje pendiente con la misma
+                clave se sustituye por este (p. ej. ``('position', 'BTCUSDT')``)
+
+        Returns:
+            True si el mensaje quedó en cola (nuevo o coalescido)
+        """
+        self.stats['enqueued'] += 1
+        if key is None and self.dedupe_identical:
+            key = ('text', message, parse_mode)
+
+        existing = self._by_key.get(key) if key is not None else None
+        if existing is not None:
+            self.stats['coalesced'] += 1
+            if priority >= existing.priority:
+                # Mismo hueco en la cola: solo se actualiza el contenido
+                existing.message = message
+                existing.parse_mode = parse_mode
+                existing.coalesced_count += 1
+                logger.debug(f"🔁 Mensaje coalescido (clave {key!r})")
+                self._ensure_processing()
+                return True
+            # Más urgente: se reencola con la nueva prioridad conservando su antigüedad
+            self._discard(existing)
+            msg = QueuedMessage(
+                message=message, parse_mode=parse_mode, priority=priority,
+                created_at=existing.created_at, key=key, seq=next(self._seq),
+                enqueued_at=existing.enqueued_at, coalesced_count=existing.coalesced_count + 1
+            )
+            self._push(msg)
+            self._ensure_processing()
+            return True
+
+        if self._size >= self.max_queue_size and not self._evict_victim(priority):
+            self.stats['dropped'] += 1
+            logger.warning(f"⚠️ Cola llena, descartando mensaje de prioridad {priority}: {message[:50]}...")
+            return False
+
+        msg = QueuedMessage(
             message=message,
             parse_mode=parse_mode,
-            priority=priority
+            priority=priority,
+            key=key,
+            seq=next(self._seq),
+            enqueued_at=self._clock()
         )
-        
-        self.queue.append(queued_msg)
+        self._push(msg)
         logger.debug(f"📝 Mensaje agregado a cola (prioridad {priority}): {message[:50]}...")
-        
+
+        self._ensure_processing()
+        return True
+
+    def _ensure_processing(self):
         # Iniciar procesamiento si no está activo
         if not self.is_processing:
-            asyncio.create_task(self._process_queue())
-    
+            self._process_task = asyncio.create_task(self._process_queue())
+
     async def _process_queue(self):
-        """Procesar cola de mensajes con control de flood"""
+        """Procesar cola de mensajes con presupuesto de token bucket"""
         if self.is_processing:
             return
-            
+
         self.is_processing = True
         logger.info("🔄 Iniciando procesamiento de cola de mensajes...")
-        
+
         try:
-            while self.queue:
-                # Ordenar por prioridad y tiempo de creación
-                self.queue.sort(key=lambda x: (x.priority, x.created_at))
-                
-                # Verificar intervalo mínimo entre mensajes
-                time_since_last = datetime.now() - self.last_send_time
-                if time_since_last < self.min_interval:
-                    wait_time = (self.min_interval - time_since_last).total_seconds()
-                    logger.debug(f"⏳ Esperando {wait_time:.1f}s para evitar flood control...")
-                    await asyncio.sleep(wait_time)
-                
-                # Tomar siguiente mensaje
-                queued_msg = self.queue.pop(0)
-                
+            while self._size:
+                # Esperar presupuesto antes de extraer: así los mensajes que
+                # llegan mientras tanto todavía pueden coalescer
+                await self.bucket.acquire()
+
+                queued_msg = self._pop()
+                if queued_msg is None:
+                    break
+
                 # Intentar enviar mensaje
                 success = await self._send_message_safe(queued_msg)
-                
-                if not success:
-                    # Reintentar si no es el último intento
-                    queued_msg.retry_count += 1
-                    if queued_msg.retry_count < 3:
-                        logger.warning(f"⚠️ Reintentando mensaje (intento {queued_msg.retry_count + 1})")
-                        self.queue.insert(0, queued_msg)  # Volver al inicio de la cola
-                        await asyncio.sleep(5)  # Esperar antes del reintento
-                    else:
-                        logger.error(f"❌ Mensaje falló después de 3 intentos: {queued_msg.message[:50]}...")
-                
                 self.last_send_time = datetime.now()
-                
+
+                if success:
+                    latency = self._clock() - queued_msg.enqueued_at
+                    self.stats['sent'] += 1
+                    self.stats['total_queue_latency_s'] += latency
+                    if latency > self.stats['max_queue_latency_s']:
+                        self.stats['max_queue_latency_s'] = latency
+                    continue
+
+                # Reintentar si no es el último intento
+                queued_msg.retry_count += 1
+                if queued_msg.retry_count < self.max_retries:
+                    self.stats['retries'] += 1
+                    logger.warning(f"⚠️ Reintentando mensaje (intento {queued_msg.retry_count + 1})")
+                    replacement = self._by_key.get(queued_msg.key) if queued_msg.key is not None else None
+                    if replacement is None:
+                        # Conserva su posición original en la cola
+                        self._push(queued_msg)
+                else:
+                    self.stats['failed'] += 1
+                    logger.error(f"❌ Mensaje falló después de {self.max_retries} intentos: {queued_msg.message[:50]}...")
+
         except Exception as e:
             logger.error(f"❌ Error procesando cola: {e}")
         finally:
             self.is_processing = False
+            if self._size == 0:
+                self._empty_event.set()
             logger.info("✅ Procesamiento de cola completado")
-    
+
     async def _send_message_safe(self, queued_msg: QueuedMessage) -> bool:
         """Enviar mensaje de forma segura con manejo de errores"""
         try:
@@ -118,46 +367,62 @@ class TelegramMessageQueue:
             )
             logger.debug(f"✅ Mensaje enviado: {queued_msg.message[:50]}...")
             return True
-            
+
         except Exception as e:
             error_msg = str(e).lower()
-            
+
             if "flood control" in error_msg or "too many requests" in error_msg:
-                # Flood control - esperar más tiempo
-                wait_time = self.base_delay * (2 ** queued_msg.retry_count)
-                logger.warning(f"⚠️ Flood control detectado, esperando {wait_time}s...")
-                await asyncio.sleep(wait_time)
+                # Flood control - bloquear el presupuesto de envío
+                wait_time = getattr(e, 'retry_after', None) or self.base_delay * (2 ** queued_msg.retry_count)
+                self.stats['flood_waits'] += 1
+                logger.warning(f"⚠️ Flood control detectado, pausando envíos {wait_time}s...")
+                self.bucket.penalize(float(wait_time))
                 return False
             else:
                 logger.warning(f"⚠️ Error enviando mensaje: {e}")
                 return False
-    
+
     def get_queue_status(self) -> Dict[str, Any]:
-        """Obtener estado de la cola"""
+        """Obtener estado de la cola: profundidad, edad y métricas de envío"""
+        now = self._clock()
+        by_priority = {}
+        oldest_age = 0.0
+        for priority, name in PRIORITY_NAMES.items():
+            bucket = self._live.get(priority)
+            count = len(bucket) if bucket else 0
+            age = now - next(iter(bucket.values())).enqueued_at if count else 0.0
+            oldest_age = max(oldest_age, age)
+            by_priority[name] = {"count": count, "oldest_age_s": round(age, 3)}
+
+        sent = self.stats['sent']
         return {
-            "queue_size": len(self.queue),
+            "queue_size": self._size,
             "is_processing": self.is_processing,
             "last_send_time": self.last_send_time.isoformat(),
-            "messages_by_priority": {
-                "alta": len([m for m in self.queue if m.priority == 1]),
-                "media": len([m for m in self.queue if m.priority == 2]),
-                "baja": len([m for m in self.queue if m.priority == 3])
-            }
+            "oldest_message_age_s": round(oldest_age, 3),
+            "messages_by_priority": {name: info["count"] for name, info in by_priority.items()},
+            "priority_detail": by_priority,
+            "tokens_available": round(self.bucket.tokens, 2),
+            "send_rate_per_s": self.bucket.rate,
+            "avg_queue_latency_s": round(self.stats['total_queue_latency_s'] / sent, 3) if sent else 0.0,
+            "stats": dict(self.stats)
         }
-    
+
     async def clear_queue(self):
         """Limpiar cola de mensajes"""
-        self.queue.clear()
+        self._heap.clear()
+        self._by_key.clear()
+        self._live.clear()
+        self._size = 0
+        self._empty_event.set()
         logger.info("🗑️ Cola de mensajes limpiada")
-    
+
     async def wait_for_empty_queue(self, timeout: int = 30):
         """Esperar a que la cola esté vacía"""
-        start_time = datetime.now()
-        
-        while self.queue and (datetime.now() - start_time).seconds < timeout:
-            await asyncio.sleep(1)
-        
-        if self.queue:
-            logger.warning(f"⚠️ Timeout esperando cola vacía, {len(self.queue)} mensajes pendientes")
-        else:
+        try:
+            await asyncio.wait_for(self._empty_event.wait(), timeout)
+            if self._process_task is not None and not self._process_task.done():
+                await asyncio.wait_for(asyncio.shield(self._process_task), timeout)
             logger.info("✅ Cola vacía")
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Timeout esperando cola vacía, {self._size} mensajes pendientes")
@@ -9,6 +9,8 @@ para trading de futuros con auditoría inmutable y reportes regulatorios.
 Componentes principales:
 - AuditLogger: Logging de auditoría inmutable con checksums
 - TradeReporting: Reportes de trades para reguladores
+- TradeLedger: Ledger de trades materializado para los reportes
+- AuditIntegrityVerifier: Verificación por rangos con raíces Merkle
 - RiskReporting: Reportes de exposición de riesgo
 - RegulatoryCompliance: Cumplimiento MiFID II/GDPR
 
@@ -18,12 +20,16 @@ Versión: 1.0.0
 
 from .audit_logger import AuditLogger
 from .trade_reporting import TradeReporting
+from .trade_ledger import TradeLedger
+from .audit_integrity import AuditIntegrityVerifier
 from .risk_reporting import RiskReporting
 from .regulatory_compliance import RegulatoryCompliance
 
 __all__ = [
     'AuditLogger',
     'TradeReporting', 
+    'TradeLedger',
+    'AuditIntegrityVerifier',
     'RiskReporting',
     'RegulatoryCompliance'
 ]
@@ -0,0 +1,497 @@
+# Ruta: core/compliance/enterprise/audit_integrity.py
+#!/usr/bin/env python3
+"""
+Integridad por Lotes del Log de Auditoría - Cadena de Raíces Merkle
+===================================================================
+
+El escritor de auditoría asigna a cada evento un número de secuencia y
+agrupa los eventos en segmentos (``segment_size`` eventos o
+``seal_interval_s`` segundos). Al sellar un segmento se calcula la raíz
+Merkle de sus hojas y se encadena con la del segmento anterior:
+
+    hoja       = SHA-256(0x00 || seq|id|timestamp|tipo|severidad|usuario|sesión|checksum)
+    nodo       = SHA-256(0x01 || izquierda || derecha)
+    chain_hash = SHA-256(chain_hash anterior || raíz || first_seq|last_seq|eventos)
+
+El checksum de la hoja es el SHA-256 del payload, así que modificar datos o
+metadatos, reordenar, borrar o insertar eventos cambia la raíz del
+segmento; borrar o reordenar segmentos rompe la cadena.
+
+Verificación (AuditIntegrityVerifier):
+- ``roots``: solo la cadena de raíces, una fila por segmento
+- ``full``: además recalcula checksums, hojas y raíces en un recorrido
+  secuencial por ``seq``; los segmentos se reparten entre procesos
+
+Los timestamps entran en la hoja como epoch en microsegundos; con
+PostgreSQL se asume que la zona horaria de la sesión es la del host (los
+timestamps se insertan sin zona).
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = '0' * 64
+
+SEGMENT_COLUMNS = (
+    "segment_id, first_seq, last_seq, event_count, first_ts, last_ts, "
+    "merkle_root, prev_hash, chain_hash, retention_until, pruned"
+)
+
+# Columnas de audit_events que entran en la verificación, en el orden de las hojas
+EVENT_COLUMNS = "seq, id, timestamp, event_type, severity, user_id, session_id, checksum, data"
+
+
+# ----------------------------- Hashes -----------------------------
+
+def timestamp_key(value: Any) -> int:
+    """Epoch en microsegundos de un datetime (o ISO 8601 de SQLite)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp()) * 1_000_000 + value.microsecond
+
+
+def payload_checksum(data: Any) -> str:
+    """SHA-256 del payload canónico (texto tal cual o JSON re-serializado)"""
+    if not isinstance(data, str):
+        data = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def leaf_hash(
+    seq: int, event_id: str, timestamp: Any, event_type: str,
+    severity: str, user_id: str, session_id: str, checksum: str
+) -> bytes:
+    content = f"{seq}|{event_id}|{timestamp_key(timestamp)}|{event_type}|{severity}|{user_id}|{session_id}|{checksum}"
+    return hashlib.sha256(b'\x00' + content.encode('utf-8')).digest()
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    """Raíz Merkle; un nodo sin pareja sube al nivel siguiente"""
+    if not leaves:
+        return hashlib.sha256(b'').digest()
+    level = list(leaves)
+    sha256 = hashlib.sha256
+    while len(level) > 1:
+        paired = [sha256(b'\x01' + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def chain_hash(prev_hash: str, root: str, first_seq: int, last_seq: int, event_count: int) -> str:
+    content = f"{prev_hash}|{root}|{first_seq}|{last_seq}|{event_count}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+# ----------------------------- Segmentos -----------------------------
+
+@dataclass
+class SegmentRoot:
+    """Raíz sellada de un segmento de eventos consecutivos"""
+    segment_id: int
+    first_seq: int
+    last_seq: int
+    event_count: int
+    first_ts: datetime
+    last_ts: datetime
+    merkle_root: str
+    prev_hash: str
+    chain_hash: str
+    retention_until: Optional[datetime] = None
+    pruned: bool = False
+
+    def expected_chain_hash(self) -> str:
+        return chain_hash(self.prev_hash, self.merkle_root, self.first_seq, self.last_seq, self.event_count)
+
+
+@dataclass
+class IntegrityReport:
+    """Resultado de una verificación por lotes"""
+    mode: str
+    segments_checked: int = 0
+    events_checked: int = 0
+    pruned_segments: int = 0
+    unsealed_events: int = 0
+    failures: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+class IntegrityChain:
+    """
+    Estado de la cadena en el escritor: secuencia, hojas del segmento
+    abierto y último chain_hash
+
+    ``assign`` se llama con cada lote antes de persistirlo y devuelve los
+    segmentos sellados, que se guardan en la misma transacción.
+    """
+
+    def __init__(
+        self,
+        segment_size: int = 4096,
+        seal_interval_s: float = 60.0,
+        next_seq: int = 1,
+        next_segment_id: int = 1,
+        last_chain_hash: str = GENESIS_HASH
+    ):
+        self.segment_size = segment_size
+        self.seal_interval_s = seal_interval_s
+        self.next_seq = next_seq
+        self.next_segment_id = next_segment_id
+        self.last_chain_hash = last_chain_hash
+
+        self._lock = Lock()
+        self._leaves: List[bytes] = []
+        self._first_seq = next_seq
+        self._first_ts: Optional[datetime] = None
+        self._last_ts: Optional[datetime] = None
+        self._retention_until: Optional[datetime] = None
+        self._opened_at = time.monotonic()
+
+    @classmethod
+    def resume(
+        cls,
+        last_segment: Optional[Tuple],
+        unsealed_rows: Iterable[Tuple],
+        segment_size: int = 4096,
+        seal_interval_s: float = 60.0
+    ) -> Tuple['IntegrityChain', Optional[SegmentRoot]]:
+        """
+        Reconstruye la cadena a partir del último segmento persistido
+
+        Args:
+            last_segment: (segment_id, last_seq, chain_hash) o None
+            unsealed_rows: Eventos con seq posterior al último segmento, en
+                el orden de EVENT_COLUMNS más retention_until
+
+        Returns:
+            La cadena y, si había eventos sin sellar, el segmento que los
+            cubre (pendiente de persistir)
+        """
+        if last_segment:
+            segment_id, last_seq, last_hash = last_segment
+            chain = cls(segment_size, seal_interval_s, last_seq + 1, segment_id + 1, last_hash)
+        else:
+            chain = cls(segment_size, seal_interval_s)
+        return chain, chain.recover(unsealed_rows)
+
+    @property
+    def open_events(self) -> int:
+        return len(self._leaves)
+
+    def checkpoint(self) -> Tuple:
+        """Estado actual, para deshacer un lote que no llegó a persistirse"""
+        return (self.next_seq, self.next_segment_id, self.last_chain_hash, self._leaves, len(self._leaves),
+                self._first_seq, self._first_ts, self._last_ts, self._retention_until, self._opened_at)
+
+    def restore(self, state: Tuple):
+        with self._lock:
+            (self.next_seq, self.next_segment_id, self.last_chain_hash, leaves, count,
+             self._first_seq, self._first_ts, self._last_ts, self._retention_until, self._opened_at) = state
+            # _seal() sustituye la lista, así que la del checkpoint solo ha crecido
+            del leaves[count:]
+            self._leaves = leaves
+
+    def _add(self, seq: int, event_id: str, timestamp: datetime, event_type: str, severity: str,
+             user_id: str, session_id: str, checksum: str, retention_until: Optional[datetime]):
+        if not self._leaves:
+            self._first_seq = seq
+            self._first_ts = timestamp
+            self._opened_at = time.monotonic()
+        self._leaves.append(leaf_hash(seq, event_id, timestamp, event_type, severity, user_id, session_id, checksum))
+        self._last_ts = timestamp
+        if retention_until is not None and (self._retention_until is None or retention_until > self._retention_until):
+            self._retention_until = retention_until
+
+    def assign(self, records: Iterable[Any]) -> List[SegmentRoot]:
+        """Numera los AuditRecord del lote y sella los segmentos completos"""
+        sealed = []
+        with self._lock:
+            for record in records:
+                record.seq = self.next_seq
+                self.next_seq += 1
+                self._add(record.seq, record.event_id, record.timestamp, record.event_type, record.severity,
+                          record.user_id, record.session_id, record.checksum, record.retention_until)
+                if len(self._leaves) >= self.segment_size:
+                    sealed.append(self._seal())
+            if self._leaves and time.monotonic() - self._opened_at >= self.seal_interval_s:
+                sealed.append(self._seal())
+        return sealed
+
+    def seal(self) -> Optional[SegmentRoot]:
+        """Sella el segmento abierto (al parar el escritor)"""
+        with self._lock:
+            return self._seal() if self._leaves else None
+
+    def recover(self, rows: Iterable[Tuple]) -> Optional[SegmentRoot]:
+        """
+        Sella los eventos persistidos tras el último segmento (parada sin
+        sellar). ``rows`` en el orden de EVENT_COLUMNS más retention_until.
+        """
+        with self._lock:
+            for row in rows:
+                seq, event_id, timestamp, event_type, severity, user_id, session_id, checksum = row[:8]
+                self._add(seq, event_id, timestamp, event_type, severity, user_id, session_id, checksum, row[9])
+                self.next_seq = max(self.next_seq, seq + 1)
+            return self._seal() if self._leaves else None
+
+    def _seal(self) -> SegmentRoot:
+        root = merkle_root(self._leaves).hex()
+        count = len(self._leaves)
+        last_seq = self._first_seq + count - 1
+        segment = SegmentRoot(
+            segment_id=self.next_segment_id,
+            first_seq=self._first_seq,
+            last_seq=last_seq,
+            event_count=count,
+            first_ts=self._first_ts,
+            last_ts=self._last_ts,
+            merkle_root=root,
+            prev_hash=self.last_chain_hash,
+            chain_hash=chain_hash(self.last_chain_hash, root, self._first_seq, last_seq, count),
+            retention_until=self._retention_until
+        )
+        self.next_segment_id += 1
+        self.last_chain_hash = segment.chain_hash
+        self._leaves = []
+        self._retention_until = None
+        return segment
+
+
+def verify_segment_rows(segment: SegmentRoot, rows: Sequence[Tuple]) -> Optional[str]:
+    """Comprueba checksums y raíz de un segmento; devuelve el motivo del fallo"""
+    if len(rows) != segment.event_count:
+        return f"eventos: {len(rows)} de {segment.event_count}"
+    leaves = []
+    for expected_seq, row in enumerate(rows, segment.first_seq):
+        seq, event_id, timestamp, event_type, severity, user_id, session_id, checksum, data = row
+        if seq != expected_seq:
+            return f"secuencia {seq} en la posición de {expected_seq}"
+        if payload_checksum(data) != checksum:
+            return f"checksum del evento {event_id}"
+        leaves.append(leaf_hash(seq, event_id, timestamp, event_type, severity, user_id, session_id, checksum))
+    if merkle_root(leaves).hex() != segment.merkle_root:
+        return "raíz Merkle"
+    return None
+
+
+# ----------------------------- Verificador -----------------------------
+
+class IntegritySource:
+    """Origen de los datos para el verificador; serializable para procesos hijo"""
+
+    def __init__(self, kind: str, target: Any):
+        if kind not in ('sqlite', 'postgres'):
+            raise ValueError(f"Origen no soportado: {kind}")
+        self.kind = kind
+        self.target = target
+
+    @property
+    def placeholder(self) -> str:
+        return '?' if self.kind == 'sqlite' else '%s'
+
+    def connect(self):
+        if self.kind == 'sqlite':
+            return sqlite3.connect(f"file:{self.target}?mode=ro", uri=True)
+        import psycopg2
+        return psycopg2.connect(**self.target)
+
+    def param(self, value: datetime) -> Any:
+        return value.isoformat() if self.kind == 'sqlite' else value
+
+
+def _segment_from_row(row: Tuple) -> SegmentRoot:
+    return SegmentRoot(*row[:10], pruned=bool(row[10]))
+
+
+def _verify_segment_group(source: IntegritySource, segments: List[SegmentRoot], fetch_size: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """Recorre secuencialmente el rango de seq de un grupo contiguo de segmentos"""
+    failures = []
+    checked = 0
+    conn = source.connect()
+    try:
+        cursor = conn.cursor()
+        ph = source.placeholder
+        cursor.execute(
+            f"SELECT {EVENT_COLUMNS} FROM audit_events WHERE seq BETWEEN {ph} AND {ph} ORDER BY seq",
+            (segments[0].first_seq, segments[-1].last_seq)
+        )
+        pending: List[Tuple] = []
+        index = 0
+        rows = cursor.fetchmany(fetch_size)
+        while index < len(segments):
+            segment = segments[index]
+            # Acumular las filas del segmento actual
+            while rows and rows[-1][0] <= segment.last_seq:
+                pending.extend(rows)
+                rows = cursor.fetchmany(fetch_size)
+            split = 0
+            while split < len(rows) and rows[split][0] <= segment.last_seq:
+                split += 1
+            pending.extend(rows[:split])
+            rows = rows[split:]
+
+            if not segment.pruned:
+                reason = verify_segment_rows(segment, pending)
+                checked += len(pending)
+                if reason:
+                    failures.append({'segment_id': segment.segment_id, 'reason': reason})
+            pending = []
+            index += 1
+        cursor.close()
+    finally:
+        conn.close()
+    return checked, failures
+
+
+class AuditIntegrityVerifier:
+    """Verificación por rangos: cadena de raíces y, en modo full, datos"""
+
+    def __init__(self, source: IntegritySource, workers: Optional[int] = None, fetch_size: int = 10000):
+        self.source = source
+        self.workers = workers or os.cpu_count() or 1
+        self.fetch_size = fetch_size
+
+    def load_segments(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[List[SegmentRoot], Optional[SegmentRoot]]:
+        """Segmentos que solapan el rango y el segmento anterior (enlace de la cadena)"""
+        ph = self.source.placeholder
+        clauses, params = [], []
+        if start_date:
+            clauses.append(f"last_ts >= {ph}")
+            params.append(self.source.param(start_date))
+        if end_date:
+            clauses.append(f"first_ts <= {ph}")
+            params.append(self.source.param(end_date))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        conn = self.source.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {SEGMENT_COLUMNS} FROM audit_segments{where} ORDER BY segment_id", params)
+            segments = [_segment_from_row(row) for row in cursor.fetchall()]
+            previous = None
+            if segments and segments[0].segment_id > 1:
+                cursor.execute(
+                    f"SELECT {SEGMENT_COLUMNS} FROM audit_segments WHERE segment_id = {ph}",
+                    (segments[0].segment_id - 1,)
+                )
+                row = cursor.fetchone()
+                previous = _segment_from_row(row) if row else None
+            cursor.close()
+        finally:
+            conn.close()
+        return segments, previous
+
+    def count_unsealed(self) -> int:
+        """Eventos sin segmento: anteriores a la cadena o posteriores al último sello"""
+        conn = self.source.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM audit_events WHERE seq IS NULL "
+                "OR seq > (SELECT COALESCE(MAX(last_seq), 0) FROM audit_segments)"
+            )
+            count = cursor.fetchone()[0]
+            cursor.close()
+            return count
+        finally:
+            conn.close()
+
+    @staticmethod
+    def check_chain(segments: Sequence[SegmentRoot], previous: Optional[SegmentRoot]) -> List[Dict[str, Any]]:
+        """Enlaces y chain_hash de una lista ordenada de segmentos"""
+        failures = []
+        prev = previous
+        for segment in segments:
+            if segment.expected_chain_hash() != segment.chain_hash:
+                failures.append({'segment_id': segment.segment_id, 'reason': "chain_hash"})
+            if prev is None:
+                if segment.segment_id == 1 and segment.prev_hash != GENESIS_HASH:
+                    failures.append({'segment_id': segment.segment_id, 'reason': "enlace con el génesis"})
+                elif segment.segment_id > 1:
+                    failures.append({'segment_id': segment.segment_id, 'reason': "segmento anterior ausente"})
+            else:
+                if segment.segment_id != prev.segment_id + 1 or segment.first_seq != prev.last_seq + 1:
+                    failures.append({'segment_id': segment.segment_id, 'reason': "hueco en la cadena"})
+                if segment.prev_hash != prev.chain_hash:
+                    failures.append({'segment_id': segment.segment_id, 'reason': "enlace con el segmento anterior"})
+            prev = segment
+        return failures
+
+    def verify(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        mode: str = 'full'
+    ) -> IntegrityReport:
+        """
+        Verifica los segmentos que solapan [start_date, end_date]
+
+        Args:
+            mode: ``roots`` (solo la cadena) o ``full`` (cadena + datos)
+        """
+        if mode not in ('roots', 'full'):
+            raise ValueError(f"Modo de verificación no soportado: {mode}")
+        start = time.perf_counter()
+        report = IntegrityReport(mode=mode)
+
+        segments, previous = self.load_segments(start_date, end_date)
+        report.segments_checked = len(segments)
+        report.pruned_segments = sum(1 for segment in segments if segment.pruned)
+        report.failures.extend(self.check_chain(segments, previous))
+
+        live = [segment for segment in segments if not segment.pruned]
+        if mode == 'full' and live:
+            groups = self._groups(live)
+            if self.workers > 1 and len(groups) > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    results = list(pool.map(
+                        _verify_segment_group, [self.source] * len(groups), groups,
+                        [self.fetch_size] * len(groups)
+                    ))
+            else:
+                results = [_verify_segment_group(self.source, group, self.fetch_size) for group in groups]
+            for checked, failures in results:
+                report.events_checked += checked
+                report.failures.extend(failures)
+        else:
+            report.events_checked = sum(segment.event_count for segment in live)
+
+        report.unsealed_events = self.count_unsealed()
+        report.elapsed_s = time.perf_counter() - start
+        return report
+
+    def _groups(self, segments: List[SegmentRoot]) -> List[List[SegmentRoot]]:
+        """Grupos de segmentos con seq contiguos, unos 4 por proceso"""
+        target = max(1, len(segments) // (self.workers * 4)) if self.workers > 1 else len(segments)
+        groups, current = [], []
+        for segment in segments:
+            if current and (len(current) >= target or segment.first_seq != current[-1].last_seq + 1):
+                groups.append(current)
+                current = []
+            current.append(segment)
+        if current:
+            groups.append(current)
+        return groups
@@ -13,6 +13,9 @@ Características:
 - Retención de datos por 7 años
 - Integridad de datos verificable
 - Cumplimiento MiFID II/GDPR
+- Escritura por lotes en segundo plano (ver audit_writer)
+- Ledger de trades materializado para los reportes (ver trade_ledger)
+- Verificación por rangos con raíces Merkle encadenadas (ver audit_integrity)
 
 Autor: Bot Trading v10 Enterprise
 Versión: 1.0.0
@@ -24,8 +27,9 @@ import json
 import hashlib
 import hmac
 import base64
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from enum import Enum
@@ -36,6 +40,13 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 from core.config.config_loader import user_config
+from .audit_writer import (
+    AuditBatchWriter, AuditRecord, AuditBackpressureError, JsonlSegmentWriter,
+    PostgresAuditSink, DurabilityMode, BackpressurePolicy
+)
+from .audit_integrity import AuditIntegrityVerifier, IntegrityChain, IntegrityReport, IntegritySource
+from .trade_ledger import trade_ledger
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +104,12 @@ class AuditLogger:
         # Configuración de base de datos
         self.db_config = self.config.get('database', {})
         self.db_connection = None
+        self.db_params: Dict[str, Any] = {}
+        
+        # Cadena de integridad (segmentos con raíz Merkle)
+        self.integrity_config = self.config.get('integrity', {})
+        self.integrity_enabled = self.integrity_config.get('enabled', True)
+        self.integrity_chain: Optional[IntegrityChain] = None
         
         # Configuración de encriptación
         self.encryption_key = None
@@ -111,6 +128,12 @@ class AuditLogger:
         # Inicializar base de datos
         self._setup_database()
         
+        # Ledger de trades (compartido entre instancias), lo alimenta el escritor
+        self.trade_ledger = trade_ledger if self.config.get('trade_ledger_enabled', True) else None
+        
+        # Escritor por lotes en segundo plano
+        self._setup_writer()
+        
         logger.info("🔐 AuditLogger enterprise inicializado")
     
     def _setup_encryption(self):
@@ -141,13 +164,14 @@ class AuditLogger:
         """Configura la conexión a la base de datos"""
         try:
             if self.db_config:
-                self.db_connection = psycopg2.connect(
-                    host=self.db_config.get('host', 'localhost'),
-                    port=self.db_config.get('port', 5432),
-                    database=self.db_config.get('database', 'audit_logs'),
-                    user=self.db_config.get('user', 'postgres'),
-                    password=self.db_config.get('password', '')
-                )
+                self.db_params = {
+                    'host': self.db_config.get('host', 'localhost'),
+                    'port': self.db_config.get('port', 5432),
+                    'database': self.db_config.get('database', 'audit_logs'),
+                    'user': self.db_config.get('user', 'postgres'),
+                    'password': self.db_config.get('password', '')
+                }
+                self.db_connection = psycopg2.connect(**self.db_params)
                 
                 # Crear tabla de auditoría si no existe
                 self._create_audit_table()
@@ -159,6 +183,70 @@ class AuditLogger:
             logger.error(f"❌ Error configurando base de datos: {e}")
             self.db_connection = None
     
+    def _setup_writer(self):
+        """Configura el escritor por lotes (group commit + segmentos JSONL)"""
+        writer_config = self.config.get('writer', {})
+        
+        self.async_writes = writer_config.get('async_enabled', True)
+        self.segment_writer = JsonlSegmentWriter(
+            directory='logs/enterprise/compliance/audit',
+            max_segment_bytes=int(writer_config.get('segment_max_mb', 64) * 1024 * 1024),
+            buffer_bytes=int(writer_config.get('buffer_kb', 1024) * 1024),
+            flush_interval_s=writer_config.get('flush_interval_s', 1.0)
+        )
+        # El sink abre su propia conexión: los commits del escritor no se
+        # mezclan con las consultas que usan self.db_connection
+        db_sink = PostgresAuditSink(self.db_params) if self.db_connection else None
+        if db_sink is not None and self.integrity_enabled:
+            self._setup_integrity(db_sink)
+        
+        self.writer = AuditBatchWriter(
+            db_sink=db_sink,
+            file_writer=self.segment_writer,
+            trade_ledger=self.trade_ledger,
+            integrity=self.integrity_chain,
+            encryptor=self.fernet.encrypt if self.encryption_enabled and self.fernet else None,
+            durability=DurabilityMode(writer_config.get('durability', 'batch')),
+            backpressure=BackpressurePolicy(writer_config.get('backpressure', 'block')),
+            queue_size=writer_config.get('queue_size', 10000),
+            max_batch_size=writer_config.get('max_batch_size', 512),
+            max_batch_delay_ms=writer_config.get('max_batch_delay_ms', 0.0),
+            enqueue_timeout_s=writer_config.get('enqueue_timeout_s', 1.0),
+            db_retries=writer_config.get('db_retries', 3),
+            retry_backoff_s=writer_config.get('retry_backoff_s', 0.05)
+        )
+        
+        # Eventos desbordados a disco en una ejecución anterior con la BD caída
+        if db_sink is not None:
+            try:
+                self.writer.replay_spill()
+            except Exception as e:
+                logger.warning(f"⚠️ Eventos de auditoría desbordados pendientes de reenvío: {e}")
+        
+        # Eventos que esperan a estar persistidos antes de devolver
+        self.durable_severities = {
+            Severity(value) for value in writer_config.get('durable_severities', ['critical'])
+        }
+    
+    def _setup_integrity(self, db_sink: PostgresAuditSink):
+        """Retoma la cadena de integridad desde el último segmento sellado"""
+        try:
+            last_segment, unsealed_rows = db_sink.load_chain_state()
+            self.integrity_chain, recovered = IntegrityChain.resume(
+                last_segment,
+                unsealed_rows,
+                segment_size=self.integrity_config.get('segment_size', 4096),
+                seal_interval_s=self.integrity_config.get('seal_interval_s', 60.0)
+            )
+            if recovered is not None:
+                # Eventos de una ejecución que terminó sin sellar su segmento
+                db_sink.write_batch([], DurabilityMode.BATCH, [recovered])
+                logger.info(f"🔗 Segmento de auditoría recuperado: {recovered.event_count} eventos")
+            logger.info(f"✅ Cadena de integridad configurada (próximo seq {self.integrity_chain.next_seq})")
+        except Exception as e:
+            logger.error(f"❌ Error configurando cadena de integridad: {e}")
+            self.integrity_chain = None
+    
     def _create_audit_table(self):
         """Crea la tabla de auditoría en la base de datos"""
         try:
@@ -187,6 +275,25 @@ class AuditLogger:
             CREATE INDEX IF NOT EXISTS idx_audit_user_id ON audit_events(user_id);
             CREATE INDEX IF NOT EXISTS idx_audit_session_id ON audit_events(session_id);
             CREATE INDEX IF NOT EXISTS idx_audit_retention ON audit_events(retention_until);
+            
+            ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS seq BIGINT;
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_seq ON audit_events(seq);
+            
+            CREATE TABLE IF NOT EXISTS audit_segments (
+                segment_id BIGINT PRIMARY KEY,
+                first_seq BIGINT NOT NULL,
+                last_seq BIGINT NOT NULL,
+                event_count INTEGER NOT NULL,
+                first_ts TIMESTAMP WITH TIME ZONE NOT NULL,
+                last_ts TIMESTAMP WITH TIME ZONE NOT NULL,
+                merkle_root VARCHAR(64) NOT NULL,
+                prev_hash VARCHAR(64) NOT NULL,
+                chain_hash VARCHAR(64) NOT NULL,
+                retention_until TIMESTAMP WITH TIME ZONE,
+                pruned BOOLEAN NOT NULL DEFAULT FALSE
+            );
+            
+            CREATE INDEX IF NOT EXISTS idx_audit_segments_ts ON audit_segments(first_ts, last_ts);
             """
             
             cursor.execute(create_table_sql)
@@ -269,9 +376,27 @@ class AuditLogger:
         event_type: EventType, 
         data: Dict[str, Any], 
         severity: Severity = Severity.INFO,
-        user_id: str = "system"
+        user_id: str = "system",
+        wait_durable: Optional[bool] = None
     ) -> str:
-        """Registra un evento de auditoría"""
+        """
+        Registra un evento de auditoría
+        
+        En el hilo de trading solo se serializa el evento y se calcula el
+        checksum; la encriptación y la escritura en BD/archivo las hace el
+        escritor por lotes en segundo plano.
+        
+        Args:
+            event_type: Tipo de evento
+            data: Datos del evento
+            severity: Severidad
+            user_id: Usuario que origina el evento
+            wait_durable: Esperar a que el evento esté persistido
+                (por defecto solo para las severidades de durable_severities)
+        
+        Raises:
+            AuditBackpressureError: Si la cola de auditoría está llena
+        """
         try:
             if not self.enabled:
                 return ""
@@ -279,99 +404,51 @@ class AuditLogger:
             # Generar ID único
             event_id = self.generate_event_id()
             
-            # Calcular checksum
-            checksum = self.calculate_checksum(data)
+            # Payload canónico: se usa para el checksum, la BD y el archivo
+            payload = json.dumps(data, sort_keys=True, separators=(',', ':'))
+            checksum = hashlib.sha256(payload.encode('utf-8')).hexdigest()
             
-            # Encriptar datos si está habilitado
-            encrypted_data = None
-            if self.encryption_enabled:
-                encrypted_data = self.encrypt_data(data)
-            
-            # Calcular fecha de retención
-            retention_until = datetime.now() + timedelta(days=365 * self.retention_years)
-            
-            # Crear evento de auditoría
-            event = AuditEvent(
-                id=event_id,
-                timestamp=datetime.now(),
-                event_type=event_type,
-                data=data,
-                severity=severity,
+            timestamp = datetime.now()
+            record = AuditRecord(
+                event_id=event_id,
+                timestamp=timestamp,
+                event_type=event_type.value,
+                severity=severity.value,
                 user_id=user_id,
                 session_id=self.session_id,
                 checksum=checksum,
-                encrypted_data=encrypted_data,
-                retention_until=retention_until
+                payload=payload,
+                retention_until=timestamp + timedelta(days=365 * self.retention_years)
             )
             
-            # Guardar en base de datos
-            await self._store_event_db(event)
+            if wait_durable is None:
+                wait_durable = severity in self.durable_severities
             
-            # Guardar en archivo local
-            await self._store_event_file(event)
+            if self.async_writes:
+                await self.writer.submit(record, wait_durable=wait_durable)
+            else:
+                await asyncio.to_thread(self.writer.write_batch, [record])
             
             logger.debug(f"📝 Evento de auditoría registrado: {event_type.value} - {event_id}")
             return event_id
             
+        except AuditBackpressureError:
+            logger.warning(f"⚠️ Cola de auditoría llena, evento {event_type.value} rechazado")
+            raise
         except Exception as e:
             logger.error(f"❌ Error registrando evento de auditoría: {e}")
             return ""
     
-    async def _store_event_db(self, event: AuditEvent):
-        """Almacena el evento en la base de datos"""
+    async def flush(self):
+        """Espera a que todos los eventos encolados estén persistidos"""
         try:
-            if not self.db_connection:
-                return
-            
-            cursor = self.db_connection.cursor()
-            
-            insert_sql = """
-            INSERT INTO audit_events (
-                id, timestamp, event_type, data, severity, user_id, 
-                session_id, checksum, encrypted_data, retention_until
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id) DO NOTHING
-            """
-            
-            cursor.execute(insert_sql, (
-                event.id,
-                event.timestamp,
-                event.event_type.value,
-                json.dumps(event.data),
-                event.severity.value,
-                event.user_id,
-                event.session_id,
-                event.checksum,
-                event.encrypted_data,
-                event.retention_until
-            ))
-            
-            self.db_connection.commit()
-            cursor.close()
-            
+            await self.writer.flush()
         except Exception as e:
-            logger.error(f"❌ Error almacenando evento en BD: {e}")
+            logger.error(f"❌ Error volcando eventos de auditoría: {e}")
     
-    async def _store_event_file(self, event: AuditEvent):
-        """Almacena el evento en archivo local"""
-        try:
-            # Archivo de auditoría diario
-            date_str = event.timestamp.strftime('%Y%m%d')
-            audit_file = Path(f"logs/enterprise/compliance/audit/audit_{date_str}.jsonl")
-            
-            # Convertir evento a diccionario
-            event_dict = asdict(event)
-            event_dict['timestamp'] = event.timestamp.isoformat()
-            event_dict['event_type'] = event.event_type.value
-            event_dict['severity'] = event.severity.value
-            event_dict['encrypted_data'] = base64.b64encode(event.encrypted_data).decode() if event.encrypted_data else None
-            
-            # Escribir en archivo JSONL
-            with open(audit_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(event_dict) + '\n')
-            
-        except Exception as e:
-            logger.error(f"❌ Error almacenando evento en archivo: {e}")
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Estadísticas del escritor por lotes (cola, lotes, latencias)"""
+        return self.writer.get_stats()
     
     async def log_trade_opened(
         self, 
@@ -408,9 +485,16 @@ class AuditLogger:
         exit_price: float,
         pnl: float,
         duration_minutes: int,
-        reason: str = "manual"
+        reason: str = "manual",
+        trade_id: Optional[str] = None
     ) -> str:
-        """Registra el cierre de una operación"""
+        """
+        Registra el cierre de una operación
+        
+        Args:
+            trade_id: ID del evento de apertura devuelto por log_trade_opened;
+                enlaza el cierre con su trade en los reportes
+        """
         data = {
             'symbol': symbol,
             'side': side,
@@ -422,6 +506,8 @@ class AuditLogger:
             'reason': reason,
             'action': 'trade_closed'
         }
+        if trade_id:
+            data['trade_id'] = trade_id
         
         return await self.log_event(
             EventType.TRADE_CLOSED,
@@ -518,6 +604,8 @@ class AuditLogger:
             if not self.db_connection:
                 return False
             
+            await self.flush()
+            
             cursor = self.db_connection.cursor()
             
             select_sql = """
@@ -532,6 +620,8 @@ class AuditLogger:
                 return False
             
             stored_data, stored_checksum = result
+            if isinstance(stored_data, str):
+                stored_data = json.loads(stored_data)
             calculated_checksum = self.calculate_checksum(stored_data)
             
             return stored_checksum == calculated_checksum
@@ -540,21 +630,94 @@ class AuditLogger:
             logger.error(f"❌ Error verificando integridad: {e}")
             return False
     
+    async def verify_range(
+        self, 
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        mode: str = 'full',
+        workers: Optional[int] = None
+    ) -> Optional[IntegrityReport]:
+        """
+        Verifica la integridad de un rango completo de eventos
+        
+        En lugar de una consulta por evento, comprueba la cadena de raíces
+        de los segmentos que solapan el rango (``roots``) y, en modo
+        ``full``, recalcula checksums y raíces Merkle en un recorrido
+        secuencial repartido entre procesos. El segmento abierto se sella
+        antes para que los eventos recientes queden cubiertos.
+        
+        Args:
+            start_date: Inicio del rango (None = desde el primer segmento)
+            end_date: Fin del rango (None = hasta el último segmento)
+            mode: ``roots`` o ``full``
+            workers: Procesos del verificador (por defecto verify_workers)
+        """
+        try:
+            if not self.db_connection or self.integrity_chain is None:
+                return None
+            
+            await self.flush()
+            await asyncio.to_thread(self.writer.seal_segment)
+            
+            verifier = AuditIntegrityVerifier(
+                IntegritySource('postgres', self.db_params),
+                workers=workers or self.integrity_config.get('verify_workers')
+            )
+            report = await asyncio.to_thread(verifier.verify, start_date, end_date, mode)
+            
+            if report.ok:
+                logger.info(
+                    f"✅ Integridad verificada ({mode}): {report.segments_checked} segmentos, "
+                    f"{report.events_checked} eventos en {report.elapsed_s:.2f}s"
+                )
+            else:
+                logger.error(f"❌ Fallos de integridad en auditoría: {report.failures[:10]}")
+            return report
+            
+        except Exception as e:
+            logger.error(f"❌ Error verificando rango de auditoría: {e}")
+            return None
+    
     async def cleanup_expired_events(self):
-        """Limpia eventos expirados según la política de retención"""
+        """
+        Limpia eventos expirados según la política de retención
+        
+        Con la cadena de integridad se borran segmentos completos: la raíz
+        se conserva marcada como ``pruned`` para que la cadena siga siendo
+        verificable. Los eventos anteriores a la cadena (sin seq) se borran
+        uno a uno como antes.
+        """
         try:
             if not self.db_connection:
                 return
             
             cursor = self.db_connection.cursor()
             
-            delete_sql = """
-            DELETE FROM audit_events 
-            WHERE retention_until < NOW()
-            """
+            deleted_count = 0
+            if self.integrity_chain is not None:
+                cursor.execute("""
+                UPDATE audit_segments SET pruned = TRUE
+                WHERE NOT pruned AND retention_until < NOW()
+                RETURNING first_seq, last_seq
+                """)
+                for first_seq, last_seq in cursor.fetchall():
+                    cursor.execute(
+                        "DELETE FROM audit_events WHERE seq BETWEEN %s AND %s",
+                        (first_seq, last_seq)
+                    )
+                    deleted_count += cursor.rowcount
+                delete_sql = """
+                DELETE FROM audit_events 
+                WHERE seq IS NULL AND retention_until < NOW()
+                """
+            else:
+                delete_sql = """
+                DELETE FROM audit_events 
+                WHERE retention_until < NOW()
+                """
             
             cursor.execute(delete_sql)
-            deleted_count = cursor.rowcount
+            deleted_count += cursor.rowcount
             self.db_connection.commit()
             cursor.close()
             
@@ -564,56 +727,91 @@ class AuditLogger:
         except Exception as e:
             logger.error(f"❌ Error limpiando eventos expirados: {e}")
     
+    @staticmethod
+    def _row_to_event(row) -> AuditEvent:
+        return AuditEvent(
+            id=row[0],
+            timestamp=row[1],
+            event_type=EventType(row[2]),
+            data=row[3],
+            severity=Severity(row[4]),
+            user_id=row[5],
+            session_id=row[6],
+            checksum=row[7],
+            encrypted_data=row[8],
+            retention_until=row[9]
+        )
+    
+    def iter_events_by_type(
+        self, 
+        event_type: Union[EventType, str], 
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunk_size: int = 10000,
+        descending: bool = False
+    ) -> Iterator[List[AuditEvent]]:
+        """
+        Recorre los eventos de un tipo por chunks con un cursor de servidor
+        
+        El cursor con nombre mantiene el resultado en PostgreSQL y solo
+        transfiere ``chunk_size`` filas por viaje, así que la memoria no
+        depende del número de eventos. Usa una conexión de solo lectura
+        propia (se cierra al terminar el recorrido), de modo que puede
+        consumirse desde otro hilo sin compartir transacción con nadie.
+        Los eventos aún en cola no se incluyen (ver flush()).
+        """
+        if not self.db_connection:
+            return
+        
+        event_type = EventType(event_type)
+        select_sql = """
+        SELECT id, timestamp, event_type, data, severity, user_id, 
+               session_id, checksum, encrypted_data, retention_until
+        FROM audit_events 
+        WHERE event_type = %s
+        """
+        params = [event_type.value]
+        
+        if start_date:
+            select_sql += " AND timestamp >= %s"
+            params.append(start_date)
+        
+        if end_date:
+            select_sql += " AND timestamp <= %s"
+            params.append(end_date)
+        
+        select_sql += " ORDER BY timestamp DESC" if descending else " ORDER BY timestamp"
+        
+        connection = psycopg2.connect(**self.db_params)
+        try:
+            connection.set_session(readonly=True)
+            with connection.cursor(name=f"audit_stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(select_sql, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [self._row_to_event(row) for row in rows]
+        finally:
+            connection.close()
+    
     async def get_events_by_type(
         self, 
         event_type: EventType, 
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> List[AuditEvent]:
-        """Obtiene eventos por tipo"""
+        """Obtiene eventos por tipo (para períodos grandes usar iter_events_by_type)"""
         try:
             if not self.db_connection:
                 return []
             
-            cursor = self.db_connection.cursor()
-            
-            select_sql = """
-            SELECT id, timestamp, event_type, data, severity, user_id, 
-                   session_id, checksum, encrypted_data, retention_until
-            FROM audit_events 
-            WHERE event_type = %s
-            """
-            params = [event_type.value]
-            
-            if start_date:
-                select_sql += " AND timestamp >= %s"
-                params.append(start_date)
-            
-            if end_date:
-                select_sql += " AND timestamp <= %s"
-                params.append(end_date)
-            
-            select_sql += " ORDER BY timestamp DESC"
-            
-            cursor.execute(select_sql, params)
-            results = cursor.fetchall()
-            cursor.close()
+            await self.flush()
             
             events = []
-            for row in results:
-                event = AuditEvent(
-                    id=row[0],
-                    timestamp=row[1],
-                    event_type=EventType(row[2]),
-                    data=row[3],
-                    severity=Severity(row[4]),
-                    user_id=row[5],
-                    session_id=row[6],
-                    checksum=row[7],
-                    encrypted_data=row[8],
-                    retention_until=row[9]
-                )
-                events.append(event)
+            for chunk in self.iter_events_by_type(event_type, start_date, end_date, descending=True):
+                events.extend(chunk)
             
             return events
             
@@ -624,6 +822,14 @@ class AuditLogger:
     async def close(self):
         """Cierra el logger de auditoría"""
         try:
+            # Drenar la cola antes de cerrar la conexión
+            await self.writer.stop()
+            if self.writer.db_sink is not None:
+                self.writer.db_sink.close()
+            
+            if self.trade_ledger is not None:
+                self.trade_ledger.flush()
+            
             if self.db_connection:
                 self.db_connection.close()
                 self.db_connection = None
@@ -634,4 +840,4 @@ class AuditLogger:
             logger.error(f"❌ Error cerrando AuditLogger: {e}")
 
 # Instancia global
-audit_logger = AuditLogger()
+audit_logger = lazy_service('audit_logger', AuditLogger)
@@ -0,0 +1,717 @@
+# Ruta: core/compliance/enterprise/audit_writer.py
+#!/usr/bin/env python3
+"""
+Audit Writer Enterprise - Escritura por Lotes (Group Commit)
+===========================================================
+
+Escritor en segundo plano para el AuditLogger. El hilo de trading solo
+serializa el evento y lo encola; una tarea de fondo agrupa los eventos
+pendientes y los persiste de una vez:
+
+- Base de datos: un INSERT multi-fila y un único COMMIT por lote
+- Archivo: segmentos JSONL append-only con buffer, rotación por fecha y
+  tamaño, y flush por tamaño/tiempo
+- Encriptación fuera del hilo de trading
+- Ledger de trades: los eventos de apertura/cierre de cada lote se aplican
+  al TradeLedger materializado, también fuera del hilo de trading
+- Integridad: con una IntegrityChain, cada evento recibe su número de
+  secuencia y las raíces Merkle de los segmentos sellados se guardan en la
+  misma transacción que el lote (ver audit_integrity)
+
+Modos de durabilidad:
+- ``event``: commit + fsync por cada evento (máxima durabilidad, más lento)
+- ``batch``: commit + fsync por lote (group commit)
+- ``none``: commit por lote, el archivo se vuelca por tamaño/tiempo sin fsync
+
+En modo ``event`` el productor siempre espera a que su evento esté persistido.
+
+Si la BD falla, el lote se reintenta con backoff exponencial; agotados los
+reintentos se vuelca con fsync a segmentos JSONL de desbordamiento
+(``<prefijo>_spill_*.jsonl``) y se reenvía a la BD en cuanto vuelve a
+aceptar escrituras. El lote solo se da por perdido si tampoco puede
+volcarse a disco.
+
+La cola es acotada. Cuando se llena, la política de backpressure decide:
+- ``block``: el productor espera hasta ``enqueue_timeout_s`` y después
+  lanza AuditBackpressureError
+- ``reject``: lanza AuditBackpressureError inmediatamente
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .audit_integrity import EVENT_COLUMNS, SEGMENT_COLUMNS, SegmentRoot
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DurabilityMode(Enum):
+    """Momento en que un evento se considera persistido"""
+    EVENT = "event"
+    BATCH = "batch"
+    NONE = "none"
+
+
+class BackpressurePolicy(Enum):
+    """Comportamiento cuando la cola de auditoría está llena"""
+    BLOCK = "block"
+    REJECT = "reject"
+
+
+class AuditBackpressureError(Exception):
+    """La cola de auditoría está llena y el evento no se aceptó"""
+
+
+@dataclass
+class AuditRecord:
+    """Evento listo para persistir: metadatos + payload JSON canónico"""
+    event_id: str
+    timestamp: datetime
+    event_type: str
+    severity: str
+    user_id: str
+    session_id: str
+    checksum: str
+    payload: str
+    retention_until: Optional[datetime] = None
+    encrypted_data: Optional[bytes] = None
+    seq: Optional[int] = None
+    future: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+    def to_json_line(self) -> str:
+        """Línea JSONL; el payload ya serializado se incrusta sin re-serializar"""
+        meta = json.dumps({
+            'seq': self.seq,
+            'id': self.event_id,
+            'timestamp': self.timestamp.isoformat(),
+            'event_type': self.event_type,
+            'severity': self.severity,
+            'user_id': self.user_id,
+            'session_id': self.session_id,
+            'checksum': self.checksum,
+            'encrypted_data': base64.b64encode(self.encrypted_data).decode() if self.encrypted_data else None,
+            'retention_until': self.retention_until.isoformat() if self.retention_until else None,
+        })
+        return f'{meta[:-1]}, "data": {self.payload}}}\n'
+
+    @classmethod
+    def from_json_line(cls, line: str) -> 'AuditRecord':
+        """Reconstruye un evento desde su línea JSONL (payload canónico)"""
+        data = json.loads(line)
+        return cls(
+            event_id=data['id'],
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            event_type=data['event_type'],
+            severity=data['severity'],
+            user_id=data['user_id'],
+            session_id=data['session_id'],
+            checksum=data['checksum'],
+            payload=json.dumps(data['data'], sort_keys=True, separators=(',', ':')),
+            retention_until=datetime.fromisoformat(data['retention_until']) if data.get('retention_until') else None,
+            encrypted_data=base64.b64decode(data['encrypted_data']) if data.get('encrypted_data') else None,
+            seq=data.get('seq')
+        )
+
+    def db_row(self) -> Tuple:
+        return (
+            self.event_id,
+            self.timestamp,
+            self.event_type,
+            self.payload,
+            self.severity,
+            self.user_id,
+            self.session_id,
+            self.checksum,
+            self.encrypted_data,
+            self.retention_until,
+            self.seq,
+        )
+
+
+class JsonlSegmentWriter:
+    """Segmentos JSONL append-only con buffer, rotación y flush por tamaño/tiempo"""
+
+    def __init__(
+        self,
+        directory: str = "logs/enterprise/compliance/audit",
+        prefix: str = "audit",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        buffer_bytes: int = 1024 * 1024,
+        flush_interval_s: float = 1.0
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval_s = flush_interval_s
+
+        self._file = None
+        self._date_str: Optional[str] = None
+        self._segment_index = 0
+        self._segment_bytes = 0
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self.segments_opened = 0
+        self.fsync_count = 0
+
+    @property
+    def current_path(self) -> Optional[Path]:
+        return Path(self._file.name) if self._file else None
+
+    def _segment_path(self, date_str: str, index: int) -> Path:
+        # El primer segmento del día conserva el nombre histórico audit_YYYYMMDD.jsonl
+        suffix = f"_{index:03d}" if index else ""
+        return self.directory / f"{self.prefix}_{date_str}{suffix}.jsonl"
+
+    def _open_segment(self, date_str: str):
+        rotating = self._file is not None and date_str == self._date_str
+        self.close()
+        if date_str != self._date_str:
+            index = 0
+        else:
+            index = self._segment_index + 1 if rotating else self._segment_index
+        path = self._segment_path(date_str, index)
+        while path.exists() and path.stat().st_size >= self.max_segment_bytes:
+            index += 1
+            path = self._segment_path(date_str, index)
+
+        self._file = open(path, 'a', encoding='utf-8', buffering=self.buffer_bytes)
+        self._date_str = date_str
+        self._segment_index = index
+        self._segment_bytes = path.stat().st_size if path.exists() else 0
+        self.segments_opened += 1
+
+    def write(self, line: str, date_str: str):
+        if self._file is None or date_str != self._date_str or self._segment_bytes >= self.max_segment_bytes:
+            self._open_segment(date_str)
+        self._file.write(line)
+        size = len(line.encode('utf-8'))
+        self._segment_bytes += size
+        self._pending_bytes += size
+
+    def flush(self, fsync: bool = False):
+        if self._file is None:
+            return
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        """Flush por tamaño de buffer o por tiempo desde el último volcado"""
+        if self._pending_bytes and (
+            self._pending_bytes >= self.buffer_bytes
+            or time.monotonic() - self._last_flush >= self.flush_interval_s
+        ):
+            self.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            self._file.close()
+            self._file = None
+
+
+_INSERT_COLUMNS = (
+    "id, timestamp, event_type, data, severity, user_id, "
+    "session_id, checksum, encrypted_data, retention_until, seq"
+)
+
+
+def _segment_row(segment: SegmentRoot, convert: Callable[[Any], Any] = lambda value: value) -> Tuple:
+    return (
+        segment.segment_id, segment.first_seq, segment.last_seq, segment.event_count,
+        convert(segment.first_ts), convert(segment.last_ts), segment.merkle_root,
+        segment.prev_hash, segment.chain_hash, convert(segment.retention_until), segment.pruned
+    )
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class PostgresAuditSink:
+    """
+    Sink PostgreSQL: INSERT multi-fila y un COMMIT por lote
+
+    Usa una conexión propia, exclusiva del hilo de escritura: los COMMIT y
+    ROLLBACK de los lotes no afectan a las consultas del AuditLogger. Si la
+    conexión se pierde se reabre en el siguiente lote.
+    """
+
+    def __init__(self, connection_params: Dict[str, Any]):
+        self.connection_params = dict(connection_params)
+        self.connection = None
+
+    def _connect(self):
+        if self.connection is None or self.connection.closed:
+            import psycopg2
+            self.connection = psycopg2.connect(**self.connection_params)
+        return self.connection
+
+    def _rollback(self):
+        try:
+            if self.connection is not None and not self.connection.closed:
+                self.connection.rollback()
+        except Exception as e:
+            logger.warning(f"⚠️ Error en rollback de auditoría, se reabrirá la conexión: {e}")
+            self.close()
+
+    def write_batch(
+        self,
+        records: List[AuditRecord],
+        durability: DurabilityMode,
+        segments: Sequence[SegmentRoot] = ()
+    ):
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            from psycopg2.extras import execute_values
+
+            if durability == DurabilityMode.EVENT:
+                sql = f"INSERT INTO audit_events ({_INSERT_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ON CONFLICT (id) DO NOTHING"
+                for record in records:
+                    cursor.execute(sql, record.db_row())
+                    connection.commit()
+            elif records:
+                execute_values(
+                    cursor,
+                    f"INSERT INTO audit_events ({_INSERT_COLUMNS}) VALUES %s ON CONFLICT (id) DO NOTHING",
+                    [record.db_row() for record in records],
+                    page_size=len(records)
+                )
+
+            if segments:
+                execute_values(
+                    cursor,
+                    f"INSERT INTO audit_segments ({SEGMENT_COLUMNS}) VALUES %s",
+                    [_segment_row(segment) for segment in segments]
+                )
+            connection.commit()
+        except Exception:
+            self._rollback()
+            raise
+        finally:
+            if not cursor.closed:
+                cursor.close()
+
+    def load_chain_state(self) -> Tuple[Optional[Tuple], List[Tuple]]:
+        """Último segmento (id, last_seq, chain_hash) y eventos posteriores sin sellar"""
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT segment_id, last_seq, chain_hash FROM audit_segments ORDER BY segment_id DESC LIMIT 1")
+            last_segment = cursor.fetchone()
+            cursor.execute(
+                f"SELECT {EVENT_COLUMNS}, retention_until FROM audit_events WHERE seq > %s ORDER BY seq",
+                (last_segment[1] if last_segment else 0,)
+            )
+            rows = cursor.fetchall()
+            connection.commit()
+            return last_segment, rows
+        except Exception:
+            self._rollback()
+            raise
+        finally:
+            if not cursor.closed:
+                cursor.close()
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+
+
+class AuditBatchWriter:
+    """Cola acotada + tarea de fondo que persiste los eventos por lotes"""
+
+    def __init__(
+        self,
+        db_sink: Optional[Any] = None,
+        file_writer: Optional[JsonlSegmentWriter] = None,
+        trade_ledger: Optional[Any] = None,
+        integrity: Optional[Any] = None,
+        encryptor: Optional[Callable[[bytes], bytes]] = None,
+        durability: DurabilityMode = DurabilityMode.BATCH,
+        backpressure: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        queue_size: int = 10000,
+        max_batch_size: int = 512,
+        max_batch_delay_ms: float = 0.0,
+        enqueue_timeout_s: float = 1.0,
+        db_retries: int = 3,
+        retry_backoff_s: float = 0.05,
+        spill_writer: Optional[JsonlSegmentWriter] = None
+    ):
+        self.db_sink = db_sink
+        self.file_writer = file_writer
+        self.trade_ledger = trade_ledger
+        self.integrity = integrity
+        self.encryptor = encryptor
+        self.durability = durability
+        self.backpressure = backpressure
+        self.queue_size = queue_size
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay_s = max_batch_delay_ms / 1000
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self.db_retries = max(0, db_retries)
+        self.retry_backoff_s = retry_backoff_s
+
+        # Lotes que la BD rechazó tras los reintentos: se vuelcan a disco y se
+        # reenvían a la BD cuando vuelve a aceptar escrituras
+        if spill_writer is None and file_writer is not None and db_sink is not None:
+            spill_writer = JsonlSegmentWriter(
+                directory=str(file_writer.directory), prefix=f"{file_writer.prefix}_spill"
+            )
+        self.spill_writer = spill_writer
+        self._spill_pending = bool(self._spill_paths())
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'events_enqueued': 0,
+            'events_written': 0,
+            'events_rejected': 0,
+            'events_failed': 0,
+            'events_spilled': 0,
+            'events_replayed': 0,
+            'db_retries': 0,
+            'batches_written': 0,
+            'segments_sealed': 0,
+            'max_batch_size': 0,
+            'max_queue_depth': 0,
+            'last_batch_ms': 0.0,
+            'total_write_ms': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Productor
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    @property
+    def is_saturated(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    async def submit(self, record: AuditRecord, wait_durable: bool = False):
+        """
+        Encola un evento
+
+        Args:
+            record: Evento a persistir
+            wait_durable: Esperar a que su lote esté persistido (siempre en
+                durabilidad ``event``)
+
+        Raises:
+            AuditBackpressureError: Si la cola está llena según la política
+        """
+        self._ensure_started()
+        if wait_durable or self.durability == DurabilityMode.EVENT:
+            record.future = asyncio.get_running_loop().create_future()
+
+        try:
+            if self.backpressure == BackpressurePolicy.REJECT:
+                self._queue.put_nowait(record)
+            else:
+                try:
+                    self._queue.put_nowait(record)
+                except asyncio.QueueFull:
+                    await asyncio.wait_for(self._queue.put(record), self.enqueue_timeout_s)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            self.stats['events_rejected'] += 1
+            raise AuditBackpressureError(
+                f"Cola de auditoría llena ({self.queue_size} eventos pendientes)"
+            )
+
+        self.stats['events_enqueued'] += 1
+        depth = self._queue.qsize()
+        if depth > self.stats['max_queue_depth']:
+            self.stats['max_queue_depth'] = depth
+
+        if record.future is not None:
+            await record.future
+
+    # ------------------------------------------------------------------
+    # Consumidor
+    # ------------------------------------------------------------------
+
+    async def _next_batch(self) -> Tuple[List[AuditRecord], bool]:
+        """Espera un evento y agrupa todos los pendientes (hasta max_batch_size)"""
+        queue = self._queue
+        idle_timeout = self.file_writer.flush_interval_s if self.file_writer else None
+        try:
+            first = await asyncio.wait_for(queue.get(), idle_timeout)
+        except asyncio.TimeoutError:
+            return [], False
+        if first is _STOP:
+            queue.task_done()
+            return [], True
+
+        batch = [first]
+        stop = False
+        deadline = time.monotonic() + self.max_batch_delay_s
+        while len(batch) < self.max_batch_size:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                queue.task_done()
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    async def _run(self):
+        while True:
+            batch, stop = await self._next_batch()
+            if batch:
+                error = None
+                try:
+                    await asyncio.to_thread(self.write_batch, batch)
+                except Exception as e:
+                    error = e
+                    self.stats['events_failed'] += len(batch)
+                    logger.error(f"❌ Error persistiendo lote de auditoría ({len(batch)} eventos): {e}")
+                for record in batch:
+                    if record.future is not None and not record.future.done():
+                        if error is None:
+                            record.future.set_result(record.event_id)
+                        else:
+                            record.future.set_exception(error)
+                    self._queue.task_done()
+            elif self.file_writer is not None and not stop:
+                # Inactividad: volcado por tiempo del segmento actual
+                await asyncio.to_thread(self.file_writer.maybe_flush)
+            if stop:
+                break
+
+    def write_batch(self, batch: List[AuditRecord]):
+        """
+        Persiste un lote (se ejecuta fuera del event loop)
+
+        Si la BD falla tras ``db_retries`` reintentos, el lote se vuelca con
+        fsync a los segmentos de desbordamiento y se reenvía a la BD en el
+        siguiente lote que se escriba con éxito. Solo si tampoco se puede
+        volcar a disco se propaga el error.
+        """
+        start = time.perf_counter()
+
+        if self.encryptor is not None:
+            for record in batch:
+                if record.encrypted_data is None:
+                    record.encrypted_data = self.encryptor(record.payload.encode('utf-8'))
+
+        if not self._persist(batch):
+            return
+        if self._spill_pending:
+            try:
+                self.replay_spill()
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudieron reenviar los eventos de auditoría desbordados: {e}")
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats['events_written'] += len(batch)
+        self.stats['batches_written'] += 1
+        self.stats['last_batch_ms'] = elapsed_ms
+        self.stats['total_write_ms'] += elapsed_ms
+        if len(batch) > self.stats['max_batch_size']:
+            self.stats['max_batch_size'] = len(batch)
+
+    def _persist(self, batch: List[AuditRecord]) -> bool:
+        """BD + archivo + ledger; False si el lote acabó en el desbordamiento"""
+        if self.db_sink is not None:
+            try:
+                segments = self._write_db(batch)
+            except Exception as e:
+                self._spill(batch, e)
+                return False
+        else:
+            segments = self.integrity.assign(batch) if self.integrity is not None else []
+        self._write_outputs(batch, segments)
+        return True
+
+    def _write_db(self, batch: List[AuditRecord]) -> List[SegmentRoot]:
+        """Escribe el lote en la BD con reintentos y backoff exponencial"""
+        for attempt in range(self.db_retries + 1):
+            checkpoint = self.integrity.checkpoint() if self.integrity is not None else None
+            segments = self.integrity.assign(batch) if self.integrity is not None else []
+            try:
+                self.db_sink.write_batch(batch, self.durability, segments)
+                return segments
+            except Exception as e:
+                # El lote no se persistió: sus seq se reasignan en el reintento
+                if self.integrity is not None:
+                    self.integrity.restore(checkpoint)
+                if attempt == self.db_retries:
+                    raise
+                self.stats['db_retries'] += 1
+                logger.warning(f"⚠️ Reintentando lote de auditoría ({attempt + 1}/{self.db_retries}): {e}")
+                time.sleep(self.retry_backoff_s * 2 ** attempt)
+
+    def _write_outputs(self, batch: List[AuditRecord], segments: Sequence[SegmentRoot]):
+        """Segmentos JSONL y ledger de trades de un lote ya persistido en BD"""
+        self.stats['segments_sealed'] += len(segments)
+
+        if self.file_writer is not None:
+            per_event = self.durability == DurabilityMode.EVENT
+            for record in batch:
+                self.file_writer.write(record.to_json_line(), record.timestamp.strftime('%Y%m%d'))
+                if per_event:
+                    self.file_writer.flush(fsync=True)
+            if self.durability == DurabilityMode.BATCH:
+                self.file_writer.flush(fsync=True)
+            elif self.durability == DurabilityMode.NONE:
+                self.file_writer.maybe_flush()
+
+        if self.trade_ledger is not None:
+            self.trade_ledger.apply_records(batch)
+
+    def _spill(self, batch: List[AuditRecord], error: Exception):
+        """Vuelca con fsync un lote que la BD no aceptó"""
+        if self.spill_writer is None:
+            raise error
+        try:
+            for record in batch:
+                record.seq = None
+                self.spill_writer.write(record.to_json_line(), record.timestamp.strftime('%Y%m%d'))
+            self.spill_writer.flush(fsync=True)
+        except Exception as spill_error:
+            logger.error(f"❌ Error volcando lote de auditoría a disco: {spill_error}")
+            raise error
+        self._spill_pending = True
+        self.stats['events_spilled'] += len(batch)
+        logger.error(f"❌ BD de auditoría no disponible, {len(batch)} eventos volcados a disco: {error}")
+
+    def _spill_paths(self) -> List[Path]:
+        if self.spill_writer is None:
+            return []
+        return sorted(self.spill_writer.directory.glob(f"{self.spill_writer.prefix}_*.jsonl"))
+
+    def replay_spill(self) -> int:
+        """
+        Reenvía a la BD los eventos desbordados (se ejecuta fuera del event loop)
+
+        Cada segmento se borra cuando todos sus eventos están en la BD; si la
+        BD vuelve a fallar, se reescribe solo con los que faltan y el error se
+        propaga.
+
+        Returns:
+            Número de eventos reenviados
+        """
+        if self.db_sink is None or self.spill_writer is None:
+            return 0
+        self.spill_writer.close()
+
+        replayed = 0
+        try:
+            for path in self._spill_paths():
+                with open(path, encoding='utf-8') as handle:
+                    records = [AuditRecord.from_json_line(line) for line in handle if line.strip()]
+                done = 0
+                try:
+                    while done < len(records):
+                        chunk = records[done:done + self.max_batch_size]
+                        self._write_outputs(chunk, self._write_db(chunk))
+                        done += len(chunk)
+                        replayed += len(chunk)
+                finally:
+                    if done < len(records):
+                        tmp_path = path.with_name(f".{path.name}.tmp")
+                        with open(tmp_path, 'w', encoding='utf-8') as handle:
+                            handle.writelines(record.to_json_line() for record in records[done:])
+                            handle.flush()
+                            os.fsync(handle.fileno())
+                        os.replace(tmp_path, path)
+                    else:
+                        path.unlink()
+        finally:
+            self.stats['events_replayed'] += replayed
+            self._spill_pending = bool(self._spill_paths())
+
+        if replayed:
+            logger.info(f"✅ {replayed} eventos de auditoría desbordados reenviados a la BD")
+        return replayed
+
+    def seal_segment(self):
+        """Sella y persiste el segmento abierto (se ejecuta fuera del event loop)"""
+        if self.integrity is None or self.db_sink is None:
+            return
+        checkpoint = self.integrity.checkpoint()
+        segment = self.integrity.seal()
+        if segment is None:
+            return
+        try:
+            self.db_sink.write_batch([], self.durability, [segment])
+        except Exception:
+            self.integrity.restore(checkpoint)
+            raise
+        self.stats['segments_sealed'] += 1
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    async def flush(self):
+        """Espera a que la cola se vacíe y vuelca el archivo"""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+        if self.file_writer is not None:
+            await asyncio.to_thread(self.file_writer.flush, self.durability != DurabilityMode.NONE)
+
+    async def stop(self):
+        """Drena la cola, detiene la tarea de fondo y cierra el archivo"""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+        try:
+            await asyncio.to_thread(self.seal_segment)
+        except Exception as e:
+            logger.error(f"❌ Error sellando el segmento de auditoría abierto: {e}")
+        if self.file_writer is not None:
+            await asyncio.to_thread(self.file_writer.flush, self.durability != DurabilityMode.NONE)
+            self.file_writer.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['queue_depth'] = self.queue_depth
+        stats['queue_size'] = self.queue_size
+        stats['durability'] = self.durability.value
+        stats['avg_batch_size'] = (
+            stats['events_written'] / stats['batches_written'] if stats['batches_written'] else 0.0
+        )
+        return stats
@@ -30,6 +30,7 @@ from enum import Enum
 
 from core.compliance.enterprise.audit_logger import AuditLogger, EventType
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -722,4 +723,4 @@ class RegulatoryCompliance:
             logger.error(f"❌ Error cerrando RegulatoryCompliance: {e}")
 
 # Instancia global
-regulatory_compliance = RegulatoryCompliance()
+regulatory_compliance = lazy_service('regulatory_compliance', RegulatoryCompliance)
@@ -0,0 +1,136 @@
+# Ruta: core/compliance/enterprise/report_writers.py
+#!/usr/bin/env python3
+"""
+Escritores de Reportes en Streaming
+===================================
+
+Escritores incrementales CSV/JSON/XLSX para los reportes de trades. Reciben
+los trades como chunks de filas del TradeLedger (tuplas en el orden de
+REPORT_COLUMNS), escriben cada chunk en cuanto llega y acumulan las
+estadísticas en la misma pasada, de modo que la memoria depende del tamaño
+del chunk y no del número de trades del período.
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import csv
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .trade_ledger import REPORT_COLUMNS, TradeStatistics
+
+logger = logging.getLogger(__name__)
+
+# Encabezados de la hoja de trades del reporte Excel
+EXCEL_HEADERS = (
+    'Trade ID', 'Timestamp', 'Symbol', 'Side', 'Size', 'Price', 'Value',
+    'Leverage', 'Fees', 'PnL', 'Strategy', 'User ID', 'Session ID',
+    'Entry Time', 'Exit Time', 'Duration (min)', 'Entry Price', 'Exit Price'
+)
+
+# Filas de datos por hoja (límite de Excel: 1.048.576 filas con el encabezado)
+EXCEL_MAX_ROWS = 1_048_575
+
+_DATE_COLUMNS = tuple(REPORT_COLUMNS.index(name) for name in ('timestamp', 'entry_time', 'exit_time'))
+_OPTIONAL_START = REPORT_COLUMNS.index('entry_time')
+
+
+def write_csv_report(chunks: Iterable[Sequence[Tuple]], file_path: Path) -> TradeStatistics:
+    """Escribe el CSV chunk a chunk; los opcionales vacíos se escriben como ''"""
+    stats = TradeStatistics()
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(REPORT_COLUMNS)
+        for rows in chunks:
+            stats.add_rows(rows)
+            writer.writerows(
+                row[:_OPTIONAL_START] + tuple(value or '' for value in row[_OPTIONAL_START:])
+                for row in rows
+            )
+    return stats
+
+
+def write_json_report(
+    chunks: Iterable[Sequence[Tuple]],
+    file_path: Path,
+    report_info: Dict[str, Any]
+) -> TradeStatistics:
+    """
+    Escribe el JSON de forma incremental
+
+    Misma estructura que el reporte en memoria (report_info, trades,
+    summary, symbol_statistics); cada trade ocupa una línea del array y el
+    resumen se escribe al final, cuando la pasada ha terminado.
+    """
+    stats = TradeStatistics()
+    dumps = json.dumps
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "report_info": ')
+        f.write(_indented(report_info))
+        f.write(',\n  "trades": [')
+        separator = '\n    '
+        for rows in chunks:
+            stats.add_rows(rows)
+            f.write(separator)
+            f.write(',\n    '.join(dumps(dict(zip(REPORT_COLUMNS, row)), ensure_ascii=False) for row in rows))
+            separator = ',\n    '
+        f.write('\n  ],\n  "summary": ')
+        f.write(_indented(stats.summary_rows()))
+        f.write(',\n  "symbol_statistics": ')
+        f.write(_indented(stats.symbol_rows()))
+        f.write('\n}\n')
+    return stats
+
+
+def _indented(value: Any) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+
+
+def write_excel_report(chunks: Iterable[Sequence[Tuple]], file_path: Path) -> TradeStatistics:
+    """
+    Escribe el XLSX con un libro openpyxl en modo write-only
+
+    Las filas se vuelcan a disco al añadirse. Si el período supera el
+    límite de filas de una hoja, los trades continúan en "Trades (2)", etc.
+    Las hojas Summary y Symbol Statistics se añaden al final.
+    """
+    from openpyxl import Workbook
+
+    stats = TradeStatistics()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Trades')
+    sheet.append(EXCEL_HEADERS)
+    sheet_rows, sheet_number = 0, 1
+    from_iso = datetime.fromisoformat
+
+    for rows in chunks:
+        stats.add_rows(rows)
+        for row in rows:
+            if sheet_rows >= EXCEL_MAX_ROWS:
+                sheet_number += 1
+                sheet = workbook.create_sheet(f'Trades ({sheet_number})')
+                sheet.append(EXCEL_HEADERS)
+                sheet_rows = 0
+            values = list(row)
+            for index in _DATE_COLUMNS:
+                if values[index]:
+                    values[index] = from_iso(values[index])
+            sheet.append(values)
+            sheet_rows += 1
+
+    _append_table(workbook.create_sheet('Summary'), stats.summary_rows(), ('Metric', 'Value'))
+    _append_table(workbook.create_sheet('Symbol Statistics'), stats.symbol_rows())
+    workbook.save(file_path)
+    return stats
+
+
+def _append_table(sheet: Any, rows: List[Dict[str, Any]], headers: Sequence[str] = ()):
+    headers = list(rows[0].keys()) if rows else list(headers)
+    if headers:
+        sheet.append(headers)
+    for row in rows:
+        sheet.append([row[key] for key in headers])
@@ -31,6 +31,7 @@ from enum import Enum
 
 from core.compliance.enterprise.audit_logger import AuditLogger, EventType
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -590,4 +591,4 @@ class RiskReporting:
             logger.error(f"❌ Error cerrando RiskReporting: {e}")
 
 # Instancia global
-risk_reporting = RiskReporting()
+risk_reporting = lazy_service('risk_reporting', RiskReporting)
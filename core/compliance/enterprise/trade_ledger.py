@@ -0,0 +1,501 @@
+# Ruta: core/compliance/enterprise/trade_ledger.py
+#!/usr/bin/env python3
+"""
+Ledger de Trades Materializado
+==============================
+
+Tabla de trades mantenida al vuelo a partir de los eventos TRADE_OPENED y
+TRADE_CLOSED del AuditLogger, para que los reportes no tengan que
+reconstruir los trades desde la tabla de auditoría en cada generación.
+El AuditBatchWriter aplica cada lote persistido con ``apply_records`` en
+su hilo de escritura, así que el ledger no añade coste al hilo de trading:
+
+- Una fila por trade (apertura + datos de cierre), indexada por fecha de
+  apertura y símbolo
+- Escritura por lotes: la apertura es un INSERT y el cierre un UPDATE,
+  agrupados en un COMMIT por lote
+- Lectura en streaming por chunks con una conexión de solo lectura propia
+  (WAL), sin bloquear a los escritores
+- Reconstrucción desde la tabla de auditoría con cursores de servidor
+  (historial anterior al ledger)
+- Estadísticas de reporte en una sola pasada sobre los chunks
+- Si un lote falla vuelve a la cola (acotada por ``max_pending``); lo que
+  se descarta por encima del límite marca su período como pendiente de
+  reconstruir desde auditoría (``needs_rebuild``)
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import atexit
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.integration.service_registry import lazy_service
+
+logger = logging.getLogger(__name__)
+
+# Columnas de reporte, en el orden de las filas que devuelve iter_chunks
+REPORT_COLUMNS = (
+    'trade_id', 'timestamp', 'symbol', 'side', 'size', 'price', 'value',
+    'leverage', 'fees', 'pnl', 'strategy', 'user_id', 'session_id',
+    'entry_time', 'exit_time', 'duration_minutes', 'entry_price', 'exit_price'
+)
+
+_SELECT_COLUMNS = (
+    "trade_id, timestamp, symbol, side, size, price, value, leverage, fees, pnl, strategy, "
+    "user_id, session_id, timestamp AS entry_time, exit_time, duration_minutes, "
+    "price AS entry_price, exit_price"
+)
+
+_TRADE_OPENED = 'trade_opened'
+_TRADE_CLOSED = 'trade_closed'
+
+
+class TradeLedger:
+    """Tabla de trades materializada en SQLite con lectura por chunks"""
+
+    def __init__(
+        self,
+        db_path: str = "data/enterprise/compliance/trade_ledger.db",
+        batch_size: int = 500,
+        flush_interval_s: float = 1.0,
+        max_pending: int = 50000
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max(batch_size, max_pending)
+
+        self._lock = RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS trades (
+                trade_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                side TEXT NOT NULL,
+                size REAL NOT NULL,
+                price REAL NOT NULL,
+                value REAL NOT NULL,
+                leverage REAL NOT NULL,
+                fees REAL NOT NULL,
+                pnl REAL NOT NULL DEFAULT 0,
+                strategy TEXT NOT NULL,
+                user_id TEXT,
+                session_id TEXT,
+                exit_time TEXT,
+                duration_minutes INTEGER,
+                exit_price REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp ON trades(symbol, timestamp);
+            """
+        )
+        self._conn.commit()
+
+        self._pending_opens: List[Tuple] = []
+        self._pending_closes: List[Tuple] = []
+        self._last_flush = time.monotonic()
+        self._retry_after = 0.0
+        # Ventana [desde, hasta] con eventos descartados tras fallos de escritura
+        self._dirty: Optional[Tuple[datetime, datetime]] = None
+        self.stats = {'trades_opened': 0, 'trades_closed': 0, 'closes_unmatched': 0, 'batches_written': 0,
+                      'flush_errors': 0, 'events_dropped': 0}
+
+        atexit.register(self.close)
+
+        logger.info(f"📒 TradeLedger inicializado en {self.db_path}")
+
+    # ----------------------------- Escritura -----------------------------
+
+    def record_open(
+        self,
+        trade_id: str,
+        timestamp: datetime,
+        data: Dict[str, Any],
+        user_id: str = "system",
+        session_id: str = ""
+    ):
+        """Registra la apertura de un trade (datos del evento TRADE_OPENED)"""
+        with self._lock:
+            self._pending_opens.append(self._open_row(trade_id, timestamp, data, user_id, session_id))
+            self._maybe_flush()
+
+    def record_close(self, trade_id: str, timestamp: datetime, data: Dict[str, Any]):
+        """Completa un trade con los datos del evento TRADE_CLOSED"""
+        with self._lock:
+            self._pending_closes.append(self._close_row(trade_id, timestamp, data))
+            self._maybe_flush()
+
+    @staticmethod
+    def _open_row(trade_id: str, timestamp: datetime, data: Dict[str, Any], user_id: str, session_id: str) -> Tuple:
+        size = data.get('size', 0)
+        price = data.get('price', 0)
+        return (
+            trade_id, timestamp.isoformat(), data.get('symbol', ''), data.get('side', ''),
+            size, price, size * price, data.get('leverage', 1), data.get('fees', 0),
+            data.get('strategy', 'unknown'), user_id, session_id
+        )
+
+    @staticmethod
+    def _close_row(trade_id: str, timestamp: datetime, data: Dict[str, Any]) -> Tuple:
+        return (
+            data.get('pnl', 0), timestamp.isoformat(), data.get('duration_minutes'),
+            data.get('exit_price', 0), trade_id
+        )
+
+    def record_event(
+        self,
+        event_type: str,
+        event_id: str,
+        timestamp: datetime,
+        data: Dict[str, Any],
+        user_id: str = "system",
+        session_id: str = ""
+    ):
+        """
+        Aplica un evento de auditoría de trade
+
+        El trade se identifica por el ID del evento de apertura; el cierre
+        lo referencia con ``data['trade_id']``.
+        """
+        if event_type == _TRADE_OPENED:
+            self.record_open(event_id, timestamp, data, user_id, session_id)
+        elif event_type == _TRADE_CLOSED:
+            self.record_close(data.get('trade_id', event_id), timestamp, data)
+
+    def apply_records(self, records: Sequence[Any]):
+        """
+        Aplica un lote de AuditRecord persistidos en un único COMMIT
+
+        Ignora los eventos que no son de trades.
+        """
+        opens, closes = [], []
+        for record in records:
+            if record.event_type == _TRADE_OPENED:
+                opens.append(self._open_row(
+                    record.event_id, record.timestamp, json.loads(record.payload), record.user_id, record.session_id
+                ))
+            elif record.event_type == _TRADE_CLOSED:
+                data = json.loads(record.payload)
+                closes.append(self._close_row(data.get('trade_id', record.event_id), record.timestamp, data))
+        if opens or closes:
+            with self._lock:
+                self._pending_opens.extend(opens)
+                self._pending_closes.extend(closes)
+                self.flush()
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if now < self._retry_after:
+            return
+        pending = len(self._pending_opens) + len(self._pending_closes)
+        if pending >= self.batch_size or now - self._last_flush >= self.flush_interval_s:
+            self.flush()
+
+    def _requeue(self, opens: List[Tuple], closes: List[Tuple]):
+        """
+        Devuelve un lote fallido a la cola, por delante de lo nuevo
+
+        Por encima de ``max_pending`` se descartan los eventos más antiguos y
+        su período queda marcado para reconstruirse desde auditoría.
+        """
+        self._pending_opens = opens + self._pending_opens
+        self._pending_closes = closes + self._pending_closes
+        overflow = len(self._pending_opens) + len(self._pending_closes) - self.max_pending
+        if overflow <= 0:
+            return
+        dropped_closes = self._pending_closes[:overflow]
+        del self._pending_closes[:overflow]
+        dropped_opens = self._pending_opens[:overflow - len(dropped_closes)]
+        del self._pending_opens[:len(dropped_opens)]
+
+        # Un cierre descartado afecta a un trade abierto antes en cualquier
+        # momento: la ventana empieza en datetime.min
+        times = [datetime.fromisoformat(row[1]) for row in dropped_opens + dropped_closes]
+        until = max(times)
+        since = datetime.min.replace(tzinfo=until.tzinfo) if dropped_closes else min(times)
+        if self._dirty is not None:
+            since, until = min(since, self._dirty[0]), max(until, self._dirty[1])
+        self._dirty = (since, until)
+        self.stats['events_dropped'] += len(dropped_opens) + len(dropped_closes)
+        logger.warning(
+            f"⚠️ Cola del ledger llena: {len(dropped_opens) + len(dropped_closes)} eventos descartados, "
+            f"período pendiente de reconstruir desde auditoría"
+        )
+
+    def needs_rebuild(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+        """Indica si el período contiene trades descartados tras fallos de escritura"""
+        with self._lock:
+            if self._dirty is None:
+                return False
+            since, until = self._dirty
+            return (start_date is None or start_date <= until) and (end_date is None or end_date >= since)
+
+    def flush(self):
+        """Persiste las aperturas y cierres pendientes en un único COMMIT"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if self._conn is None or not (self._pending_opens or self._pending_closes):
+                return
+            opens, self._pending_opens = self._pending_opens, []
+            closes, self._pending_closes = self._pending_closes, []
+            try:
+                # Aperturas antes que cierres: un cierre puede referirse a una apertura del mismo lote
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO trades (trade_id, timestamp, symbol, side, size, price, value, "
+                    "leverage, fees, strategy, user_id, session_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    opens
+                )
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "UPDATE trades SET pnl = ?, exit_time = ?, duration_minutes = ?, exit_price = ? "
+                    "WHERE trade_id = ?",
+                    closes
+                )
+                matched = self._conn.total_changes - before
+                self._conn.commit()
+                self._retry_after = 0.0
+            except Exception as e:
+                self._conn.rollback()
+                # El lote no se pierde: vuelve a la cola y se reintenta pasado flush_interval_s
+                self._requeue(opens, closes)
+                self._retry_after = time.monotonic() + self.flush_interval_s
+                self.stats['flush_errors'] += 1
+                logger.error(f"❌ Error escribiendo trades en el ledger: {e}")
+                return
+
+            self.stats['trades_opened'] += len(opens)
+            self.stats['trades_closed'] += matched
+            self.stats['closes_unmatched'] += len(closes) - matched
+            self.stats['batches_written'] += 1
+
+    def rebuild_from_audit(
+        self,
+        audit_logger: Any,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunk_size: int = 10000
+    ) -> int:
+        """
+        Materializa los trades de un período desde la tabla de auditoría
+
+        Recorre los eventos con cursores de servidor, chunk a chunk. Los
+        cierres se leen sin límite superior para completar los trades del
+        período cerrados después. Devuelve el número de aperturas leídas.
+        """
+        with self._lock:
+            dirty = self._dirty
+        opened = 0
+        for chunk in audit_logger.iter_events_by_type(_TRADE_OPENED, start_date, end_date, chunk_size):
+            for event in chunk:
+                self.record_open(event.id, event.timestamp, event.data, event.user_id, event.session_id)
+            opened += len(chunk)
+        self.flush()
+        for chunk in audit_logger.iter_events_by_type(_TRADE_CLOSED, start_date, None, chunk_size):
+            for event in chunk:
+                self.record_close(event.data.get('trade_id', event.id), event.timestamp, event.data)
+        self.flush()
+        with self._lock:
+            # La ventana pendiente queda resuelta si el período la cubre y no hubo descartes nuevos
+            if (
+                self._dirty is not None and self._dirty == dirty
+                and (start_date is None or start_date <= dirty[0])
+                and (end_date is None or end_date >= dirty[1])
+                and not (self._pending_opens or self._pending_closes)
+            ):
+                self._dirty = None
+        logger.info(f"📒 Ledger reconstruido desde auditoría: {opened} trades")
+        return opened
+
+    # ----------------------------- Lectura -----------------------------
+
+    @staticmethod
+    def _where(
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        symbols: Optional[Sequence[str]]
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if start_date:
+            clauses.append("timestamp >= ?")
+            params.append(start_date.isoformat())
+        if end_date:
+            clauses.append("timestamp <= ?")
+            params.append(end_date.isoformat())
+        if symbols:
+            clauses.append(f"symbol IN ({', '.join('?' * len(symbols))})")
+            params.extend(symbols)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        symbols: Optional[Sequence[str]] = None
+    ) -> int:
+        """Número de trades abiertos en el período"""
+        with self._lock:
+            self.flush()
+            where, params = self._where(start_date, end_date, symbols)
+            return self._conn.execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
+
+    def iter_chunks(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        symbols: Optional[Sequence[str]] = None,
+        chunk_size: int = 10000
+    ) -> Iterator[List[Tuple]]:
+        """
+        Trades abiertos en el período, por chunks y en orden cronológico
+
+        Cada fila es una tupla en el orden de REPORT_COLUMNS, con fechas en
+        ISO 8601. Usa su propia conexión de solo lectura: la memoria es
+        O(chunk_size) y las escrituras del ledger no se bloquean.
+        """
+        self.flush()
+        where, params = self._where(start_date, end_date, symbols)
+        reader = sqlite3.connect(f"file:{self.db_path.resolve()}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            cursor = reader.execute(f"SELECT {_SELECT_COLUMNS} FROM trades{where} ORDER BY timestamp", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            reader.close()
+
+    def close(self):
+        """Vuelca lo pendiente y cierra la conexión"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+
+class TradeStatistics:
+    """Agregados de reporte calculados en una sola pasada sobre filas del ledger"""
+
+    HIGH_LEVERAGE = 20
+    LARGE_LOSS = -1000
+
+    def __init__(self):
+        self.total_trades = 0
+        self.total_volume = 0.0
+        self.total_fees = 0.0
+        self.total_pnl = 0.0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.high_leverage_trades = 0
+        self.large_loss_trades = 0
+        # símbolo -> [trades, volumen, pnl, ganadores]
+        self.by_symbol: Dict[str, List[float]] = {}
+
+    def add_rows(self, rows: Sequence[Tuple]):
+        """Acumula un chunk de filas en el orden de REPORT_COLUMNS"""
+        by_symbol = self.by_symbol
+        volume = fees = total_pnl = 0.0
+        wins = losses = high_leverage = large_losses = 0
+        for row in rows:
+            value, leverage, fee, pnl = row[6], row[7], row[8], row[9]
+            volume += value
+            fees += fee
+            total_pnl += pnl
+            group = by_symbol.get(row[2])
+            if group is None:
+                group = by_symbol[row[2]] = [0, 0.0, 0.0, 0]
+            group[0] += 1
+            group[1] += value
+            group[2] += pnl
+            if pnl > 0:
+                wins += 1
+                group[3] += 1
+            elif pnl < 0:
+                losses += 1
+                if pnl < self.LARGE_LOSS:
+                    large_losses += 1
+            if leverage > self.HIGH_LEVERAGE:
+                high_leverage += 1
+
+        self.total_trades += len(rows)
+        self.total_volume += volume
+        self.total_fees += fees
+        self.total_pnl += total_pnl
+        self.winning_trades += wins
+        self.losing_trades += losses
+        self.high_leverage_trades += high_leverage
+        self.large_loss_trades += large_losses
+
+    @property
+    def win_rate(self) -> float:
+        return self.winning_trades / self.total_trades * 100 if self.total_trades else 0.0
+
+    def symbol_counts(self) -> Dict[str, int]:
+        return {symbol: int(group[0]) for symbol, group in self.by_symbol.items()}
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """Filas de resumen (Metric/Value) de los reportes"""
+        if not self.total_trades:
+            return []
+        total = self.total_trades
+        return [
+            {'Metric': 'Total Trades', 'Value': total},
+            {'Metric': 'Total Volume', 'Value': f"${self.total_volume:,.2f}"},
+            {'Metric': 'Total Fees', 'Value': f"${self.total_fees:,.2f}"},
+            {'Metric': 'Total PnL', 'Value': f"${self.total_pnl:,.2f}"},
+            {'Metric': 'Winning Trades', 'Value': self.winning_trades},
+            {'Metric': 'Losing Trades', 'Value': self.losing_trades},
+            {'Metric': 'Win Rate', 'Value': f"{self.win_rate:.2f}%"},
+            {'Metric': 'Avg Trade Size', 'Value': f"${self.total_volume / total:,.2f}"},
+            {'Metric': 'Avg PnL', 'Value': f"${self.total_pnl / total:,.2f}"}
+        ]
+
+    def symbol_rows(self) -> List[Dict[str, Any]]:
+        """Estadísticas por símbolo de los reportes"""
+        stats = []
+        for symbol, (count, volume, pnl, wins) in self.by_symbol.items():
+            stats.append({
+                'Symbol': symbol,
+                'Total Trades': count,
+                'Total Volume': f"${volume:,.2f}",
+                'Total PnL': f"${pnl:,.2f}",
+                'Winning Trades': wins,
+                'Win Rate': f"{wins / count * 100:.2f}%",
+                'Avg Trade Size': f"${volume / count:,.2f}"
+            })
+        return stats
+
+
+def _create_trade_ledger() -> TradeLedger:
+    """Instancia compartida configurada desde ``compliance.trade_ledger``"""
+    try:
+        from core.config.config_loader import user_config
+        config = user_config.get_value(['compliance', 'trade_ledger'], {})
+    except Exception as e:
+        logger.warning(f"⚠️ Configuración del ledger de trades no disponible, usando valores por defecto: {e}")
+        config = {}
+    return TradeLedger(
+        db_path=config.get('db_path', "data/enterprise/compliance/trade_ledger.db"),
+        batch_size=config.get('batch_size', 500),
+        flush_interval_s=config.get('flush_interval_s', 1.0),
+        max_pending=config.get('max_pending', 50000)
+    )
+
+
+# Instancia global (compartida por los AuditLogger y TradeReporting)
+trade_ledger = lazy_service('trade_ledger', _create_trade_ledger)
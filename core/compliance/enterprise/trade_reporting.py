@@ -13,6 +13,8 @@ Características:
 - Cumplimiento MiFID II
 - Reportes de transacciones
 - Análisis de cumplimiento
+- Generación en streaming desde el ledger de trades materializado
+  (memoria acotada por chunk, agregación en una sola pasada)
 
 Autor: Bot Trading v10 Enterprise
 Versión: 1.0.0
@@ -20,9 +22,7 @@ Versión: 1.0.0
 
 import asyncio
 import logging
-import csv
 import json
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -30,7 +30,10 @@ from pathlib import Path
 from enum import Enum
 
 from core.compliance.enterprise.audit_logger import AuditLogger, EventType
+from core.compliance.enterprise.report_writers import write_csv_report, write_excel_report, write_json_report
+from core.compliance.enterprise.trade_ledger import REPORT_COLUMNS, TradeStatistics, trade_ledger
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +101,11 @@ class TradeReporting:
         self.enabled = self.config.get('enabled', True)
         self.auto_generate = self.config.get('auto_generate', True)
         self.retention_days = self.config.get('retention_days', 2555)  # 7 años
+        self.chunk_size = self.config.get('chunk_size', 10000)
+        self.auto_backfill = self.config.get('auto_backfill', True)
+        
+        # Ledger de trades materializado (lo mantiene el AuditLogger)
+        self.ledger = trade_ledger
         
         # Formatos soportados
         self.supported_formats = [ReportFormat.CSV, ReportFormat.EXCEL, ReportFormat.JSON]
@@ -130,15 +138,15 @@ class TradeReporting:
         try:
             logger.info(f"📊 Generando reporte de trades: {start_date} - {end_date}")
             
-            # Obtener trades del período
-            trades = await self.get_trades_by_period(start_date, end_date, symbols)
+            # Contar trades del período en el ledger
+            total_trades = await self._count_trades(start_date, end_date, symbols)
             
-            if not trades:
+            if not total_trades:
                 logger.warning("⚠️ No se encontraron trades para el período especificado")
                 return ""
             
-            # Generar reporte según formato
-            report_path = await self._generate_report_file(trades, start_date, end_date, format)
+            # Generar reporte según formato (en streaming, fuera del event loop)
+            report_path, stats = await self._generate_report_file(start_date, end_date, symbols, format, total_trades)
             
             # Registrar generación de reporte
             await self.audit_logger.log_event(
@@ -148,7 +156,7 @@ class TradeReporting:
                     'report_path': str(report_path),
                     'period_start': start_date.isoformat(),
                     'period_end': end_date.isoformat(),
-                    'trades_count': len(trades),
+                    'trades_count': stats.total_trades,
                     'format': format.value
                 }
             )
@@ -160,61 +168,52 @@ class TradeReporting:
             logger.error(f"❌ Error generando reporte de trades: {e}")
             return ""
     
+    async def _count_trades(
+        self, 
+        start_date: datetime, 
+        end_date: datetime,
+        symbols: Optional[List[str]] = None
+    ) -> int:
+        """
+        Trades del período en el ledger; lo rellena desde auditoría si está
+        vacío o si perdió eventos del período por fallos de escritura
+        """
+        total_trades = await asyncio.to_thread(self.ledger.count, start_date, end_date, symbols)
+        incomplete = not total_trades or self.ledger.needs_rebuild(start_date, end_date)
+        if incomplete and self.auto_backfill and self.audit_logger.db_connection:
+            await self.backfill_ledger(start_date, end_date)
+            total_trades = await asyncio.to_thread(self.ledger.count, start_date, end_date, symbols)
+        return total_trades
+    
+    async def backfill_ledger(self, start_date: datetime, end_date: datetime) -> int:
+        """Materializa en el ledger los trades de auditoría de un período"""
+        try:
+            await self.audit_logger.flush()
+            return await asyncio.to_thread(
+                self.ledger.rebuild_from_audit, self.audit_logger, start_date, end_date, self.chunk_size
+            )
+        except Exception as e:
+            logger.error(f"❌ Error rellenando el ledger de trades: {e}")
+            return 0
+    
     async def get_trades_by_period(
         self, 
         start_date: datetime, 
         end_date: datetime,
         symbols: Optional[List[str]] = None
     ) -> List[TradeRecord]:
-        """Obtiene trades de un período específico"""
+        """
+        Obtiene trades de un período específico
+        
+        Carga el período completo en memoria; los reportes leen el ledger
+        por chunks con iter_trade_rows.
+        """
         try:
-            # Obtener eventos de auditoría de trades
-            trade_events = await self.audit_logger.get_events_by_type(
-                EventType.TRADE_OPENED, start_date, end_date
-            )
-            
-            close_events = await self.audit_logger.get_events_by_type(
-                EventType.TRADE_CLOSED, start_date, end_date
-            )
-            
-            # Crear diccionario de eventos de cierre por trade_id
-            close_events_dict = {}
-            for event in close_events:
-                trade_id = event.data.get('trade_id', event.id)
-                close_events_dict[trade_id] = event
+            await self._count_trades(start_date, end_date, symbols)
             
             trades = []
-            for event in trade_events:
-                # Filtrar por símbolos si se especifica
-                if symbols and event.data.get('symbol') not in symbols:
-                    continue
-                
-                # Buscar evento de cierre correspondiente
-                close_event = close_events_dict.get(event.id)
-                
-                # Crear registro de trade
-                trade = TradeRecord(
-                    trade_id=event.id,
-                    timestamp=event.timestamp,
-                    symbol=event.data.get('symbol', ''),
-                    side=event.data.get('side', ''),
-                    size=event.data.get('size', 0),
-                    price=event.data.get('price', 0),
-                    value=event.data.get('size', 0) * event.data.get('price', 0),
-                    leverage=event.data.get('leverage', 1),
-                    fees=event.data.get('fees', 0),
-                    pnl=close_event.data.get('pnl', 0) if close_event else 0,
-                    strategy=event.data.get('strategy', 'unknown'),
-                    user_id=event.user_id,
-                    session_id=event.session_id,
-                    entry_time=event.timestamp,
-                    exit_time=close_event.timestamp if close_event else None,
-                    duration_minutes=close_event.data.get('duration_minutes') if close_event else None,
-                    entry_price=event.data.get('price', 0),
-                    exit_price=close_event.data.get('exit_price', 0) if close_event else None
-                )
-                
-                trades.append(trade)
+            for rows in self.iter_trade_rows(start_date, end_date, symbols):
+                trades.extend(self._row_to_trade(row) for row in rows)
             
             return trades
             
@@ -222,13 +221,31 @@ class TradeReporting:
             logger.error(f"❌ Error obteniendo trades por período: {e}")
             return []
     
+    def iter_trade_rows(
+        self, 
+        start_date: datetime, 
+        end_date: datetime,
+        symbols: Optional[List[str]] = None
+    ):
+        """Chunks de filas del ledger (tuplas en el orden de REPORT_COLUMNS)"""
+        return self.ledger.iter_chunks(start_date, end_date, symbols, self.chunk_size)
+    
+    @staticmethod
+    def _row_to_trade(row: Tuple) -> TradeRecord:
+        trade = dict(zip(REPORT_COLUMNS, row))
+        for name in ('timestamp', 'entry_time', 'exit_time'):
+            if trade[name]:
+                trade[name] = datetime.fromisoformat(trade[name])
+        return TradeRecord(**trade)
+    
     async def _generate_report_file(
         self, 
-        trades: List[TradeRecord], 
         start_date: datetime, 
         end_date: datetime,
-        format: ReportFormat
-    ) -> Path:
+        symbols: Optional[List[str]],
+        format: ReportFormat,
+        total_trades: int
+    ) -> Tuple[Path, TradeStatistics]:
         """Genera archivo de reporte en el formato especificado"""
         try:
             # Crear nombre de archivo
@@ -237,228 +254,44 @@ class TradeReporting:
             filename = f"trade_report_{date_str}_{timestamp_str}.{format.value}"
             report_path = Path(f"exports/enterprise/compliance/{filename}")
             
+            chunks = self.iter_trade_rows(start_date, end_date, symbols)
+            
             if format == ReportFormat.CSV:
-                await self._generate_csv_report(trades, report_path)
+                stats = await asyncio.to_thread(write_csv_report, chunks, report_path)
             elif format == ReportFormat.EXCEL:
-                await self._generate_excel_report(trades, report_path)
+                stats = await asyncio.to_thread(write_excel_report, chunks, report_path)
             elif format == ReportFormat.JSON:
-                await self._generate_json_report(trades, report_path)
+                report_info = {
+                    'generated_at': datetime.now().isoformat(),
+                    'total_trades': total_trades,
+                    'format': 'json'
+                }
+                stats = await asyncio.to_thread(write_json_report, chunks, report_path, report_info)
             else:
                 raise ValueError(f"Formato no soportado: {format}")
             
-            return report_path
+            return report_path, stats
             
         except Exception as e:
             logger.error(f"❌ Error generando archivo de reporte: {e}")
             raise
     
-    async def _generate_csv_report(self, trades: List[TradeRecord], file_path: Path):
-        """Genera reporte en formato CSV"""
-        try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = [
-                    'trade_id', 'timestamp', 'symbol', 'side', 'size', 'price', 'value',
-                    'leverage', 'fees', 'pnl', 'strategy', 'user_id', 'session_id',
-                    'entry_time', 'exit_time', 'duration_minutes', 'entry_price', 'exit_price'
-                ]
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for trade in trades:
-                    writer.writerow({
-                        'trade_id': trade.trade_id,
-                        'timestamp': trade.timestamp.isoformat(),
-                        'symbol': trade.symbol,
-                        'side': trade.side,
-                        'size': trade.size,
-                        'price': trade.price,
-                        'value': trade.value,
-                        'leverage': trade.leverage,
-                        'fees': trade.fees,
-                        'pnl': trade.pnl,
-                        'strategy': trade.strategy,
-                        'user_id': trade.user_id,
-                        'session_id': trade.session_id,
-                        'entry_time': trade.entry_time.isoformat() if trade.entry_time else '',
-                        'exit_time': trade.exit_time.isoformat() if trade.exit_time else '',
-                        'duration_minutes': trade.duration_minutes or '',
-                        'entry_price': trade.entry_price or '',
-                        'exit_price': trade.exit_price or ''
-                    })
-            
-        except Exception as e:
-            logger.error(f"❌ Error generando reporte CSV: {e}")
-            raise
-    
-    async def _generate_excel_report(self, trades: List[TradeRecord], file_path: Path):
-        """Genera reporte en formato Excel"""
-        try:
-            # Convertir trades a DataFrame
-            data = []
-            for trade in trades:
-                data.append({
-                    'Trade ID': trade.trade_id,
-                    'Timestamp': trade.timestamp,
-                    'Symbol': trade.symbol,
-                    'Side': trade.side,
-                    'Size': trade.size,
-                    'Price': trade.price,
-                    'Value': trade.value,
-                    'Leverage': trade.leverage,
-                    'Fees': trade.fees,
-                    'PnL': trade.pnl,
-                    'Strategy': trade.strategy,
-                    'User ID': trade.user_id,
-                    'Session ID': trade.session_id,
-                    'Entry Time': trade.entry_time,
-                    'Exit Time': trade.exit_time,
-                    'Duration (min)': trade.duration_minutes,
-                    'Entry Price': trade.entry_price,
-                    'Exit Price': trade.exit_price
-                })
-            
-            df = pd.DataFrame(data)
-            
-            # Crear archivo Excel con múltiples hojas
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # Hoja principal con todos los trades
-                df.to_excel(writer, sheet_name='Trades', index=False)
-                
-                # Hoja de resumen
-                summary_data = self._create_summary_data(trades)
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Hoja de estadísticas por símbolo
-                symbol_stats = self._create_symbol_statistics(trades)
-                symbol_df = pd.DataFrame(symbol_stats)
-                symbol_df.to_excel(writer, sheet_name='Symbol Statistics', index=False)
-            
-        except Exception as e:
-            logger.error(f"❌ Error generando reporte Excel: {e}")
-            raise
-    
-    async def _generate_json_report(self, trades: List[TradeRecord], file_path: Path):
-        """Genera reporte en formato JSON"""
-        try:
-            # Convertir trades a diccionarios
-            trades_data = []
-            for trade in trades:
-                trade_dict = {
-                    'trade_id': trade.trade_id,
-                    'timestamp': trade.timestamp.isoformat(),
-                    'symbol': trade.symbol,
-                    'side': trade.side,
-                    'size': trade.size,
-                    'price': trade.price,
-                    'value': trade.value,
-                    'leverage': trade.leverage,
-                    'fees': trade.fees,
-                    'pnl': trade.pnl,
-                    'strategy': trade.strategy,
-                    'user_id': trade.user_id,
-                    'session_id': trade.session_id,
-                    'entry_time': trade.entry_time.isoformat() if trade.entry_time else None,
-                    'exit_time': trade.exit_time.isoformat() if trade.exit_time else None,
-                    'duration_minutes': trade.duration_minutes,
-                    'entry_price': trade.entry_price,
-                    'exit_price': trade.exit_price
-                }
-                trades_data.append(trade_dict)
-            
-            # Crear estructura completa del reporte
-            report_data = {
-                'report_info': {
-                    'generated_at': datetime.now().isoformat(),
-                    'total_trades': len(trades),
-                    'format': 'json'
-                },
-                'trades': trades_data,
-                'summary': self._create_summary_data(trades),
-                'symbol_statistics': self._create_symbol_statistics(trades)
-            }
-            
-            # Escribir archivo JSON
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
-            
-        except Exception as e:
-            logger.error(f"❌ Error generando reporte JSON: {e}")
-            raise
-    
-    def _create_summary_data(self, trades: List[TradeRecord]) -> List[Dict[str, Any]]:
-        """Crea datos de resumen del reporte"""
-        try:
-            if not trades:
-                return []
-            
-            total_trades = len(trades)
-            total_volume = sum(trade.value for trade in trades)
-            total_fees = sum(trade.fees for trade in trades)
-            total_pnl = sum(trade.pnl for trade in trades)
-            winning_trades = len([t for t in trades if t.pnl > 0])
-            losing_trades = len([t for t in trades if t.pnl < 0])
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-            
-            avg_trade_size = total_volume / total_trades if total_trades > 0 else 0
-            avg_pnl = total_pnl / total_trades if total_trades > 0 else 0
-            
-            return [
-                {'Metric': 'Total Trades', 'Value': total_trades},
-                {'Metric': 'Total Volume', 'Value': f"${total_volume:,.2f}"},
-                {'Metric': 'Total Fees', 'Value': f"${total_fees:,.2f}"},
-                {'Metric': 'Total PnL', 'Value': f"${total_pnl:,.2f}"},
-                {'Metric': 'Winning Trades', 'Value': winning_trades},
-                {'Metric': 'Losing Trades', 'Value': losing_trades},
-                {'Metric': 'Win Rate', 'Value': f"{win_rate:.2f}%"},
-                {'Metric': 'Avg Trade Size', 'Value': f"${avg_trade_size:,.2f}"},
-                {'Metric': 'Avg PnL', 'Value': f"${avg_pnl:,.2f}"}
-            ]
-            
-        except Exception as e:
-            logger.error(f"❌ Error creando datos de resumen: {e}")
-            return []
-    
-    def _create_symbol_statistics(self, trades: List[TradeRecord]) -> List[Dict[str, Any]]:
-        """Crea estadísticas por símbolo"""
-        try:
-            if not trades:
-                return []
-            
-            # Agrupar por símbolo
-            symbol_groups = {}
-            for trade in trades:
-                symbol = trade.symbol
-                if symbol not in symbol_groups:
-                    symbol_groups[symbol] = []
-                symbol_groups[symbol].append(trade)
-            
-            # Calcular estadísticas por símbolo
-            stats = []
-            for symbol, symbol_trades in symbol_groups.items():
-                total_trades = len(symbol_trades)
-                total_volume = sum(trade.value for trade in symbol_trades)
-                total_pnl = sum(trade.pnl for trade in symbol_trades)
-                winning_trades = len([t for t in symbol_trades if t.pnl > 0])
-                win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-                avg_trade_size = total_volume / total_trades if total_trades > 0 else 0
-                
-                stats.append({
-                    'Symbol': symbol,
-                    'Total Trades': total_trades,
-                    'Total Volume': f"${total_volume:,.2f}",
-                    'Total PnL': f"${total_pnl:,.2f}",
-                    'Winning Trades': winning_trades,
-                    'Win Rate': f"{win_rate:.2f}%",
-                    'Avg Trade Size': f"${avg_trade_size:,.2f}"
-                })
-            
+    async def collect_trade_statistics(
+        self, 
+        start_date: datetime, 
+        end_date: datetime,
+        symbols: Optional[List[str]] = None
+    ) -> TradeStatistics:
+        """Agregados del período en una sola pasada por chunks"""
+        await self._count_trades(start_date, end_date, symbols)
+        
+        def collect() -> TradeStatistics:
+            stats = TradeStatistics()
+            for rows in self.iter_trade_rows(start_date, end_date, symbols):
+                stats.add_rows(rows)
             return stats
-            
-        except Exception as e:
-            logger.error(f"❌ Error creando estadísticas por símbolo: {e}")
-            return []
+        
+        return await asyncio.to_thread(collect)
     
     async def generate_compliance_report(
         self, 
@@ -469,23 +302,23 @@ class TradeReporting:
         try:
             logger.info(f"📋 Generando reporte de cumplimiento: {start_date} - {end_date}")
             
-            # Obtener trades del período
-            trades = await self.get_trades_by_period(start_date, end_date)
+            # Agregados del período en una sola pasada
+            stats = await self.collect_trade_statistics(start_date, end_date)
             
             # Calcular métricas de cumplimiento
-            total_trades = len(trades)
-            total_volume = sum(trade.value for trade in trades)
-            total_fees = sum(trade.fees for trade in trades)
-            total_pnl = sum(trade.pnl for trade in trades)
+            total_trades = stats.total_trades
+            total_volume = stats.total_volume
+            total_fees = stats.total_fees
+            total_pnl = stats.total_pnl
             
             # Verificar violaciones de cumplimiento
-            violations = await self._check_compliance_violations(trades)
+            violations = await self._check_compliance_violations(stats)
             
             # Calcular score de cumplimiento
-            compliance_score = await self._calculate_compliance_score(trades, violations)
+            compliance_score = await self._calculate_compliance_score(stats, violations)
             
             # Generar recomendaciones
-            recommendations = await self._generate_recommendations(trades, violations)
+            recommendations = await self._generate_recommendations(stats, violations)
             
             # Crear reporte de cumplimiento
             report = ComplianceReport(
@@ -513,38 +346,32 @@ class TradeReporting:
             logger.error(f"❌ Error generando reporte de cumplimiento: {e}")
             raise
     
-    async def _check_compliance_violations(self, trades: List[TradeRecord]) -> List[Dict[str, Any]]:
+    async def _check_compliance_violations(self, stats: TradeStatistics) -> List[Dict[str, Any]]:
         """Verifica violaciones de cumplimiento"""
         try:
             violations = []
             
             # Verificar trades con leverage excesivo
-            high_leverage_trades = [t for t in trades if t.leverage > 20]
-            if high_leverage_trades:
+            if stats.high_leverage_trades:
                 violations.append({
                     'type': 'HIGH_LEVERAGE',
-                    'count': len(high_leverage_trades),
-                    'description': f'Trades con leverage > 20x: {len(high_leverage_trades)}',
+                    'count': stats.high_leverage_trades,
+                    'description': f'Trades con leverage > 20x: {stats.high_leverage_trades}',
                     'severity': 'WARNING'
                 })
             
             # Verificar trades con pérdidas excesivas
-            large_loss_trades = [t for t in trades if t.pnl < -1000]
-            if large_loss_trades:
+            if stats.large_loss_trades:
                 violations.append({
                     'type': 'LARGE_LOSSES',
-                    'count': len(large_loss_trades),
-                    'description': f'Trades con pérdidas > $1000: {len(large_loss_trades)}',
+                    'count': stats.large_loss_trades,
+                    'description': f'Trades con pérdidas > $1000: {stats.large_loss_trades}',
                     'severity': 'ERROR'
                 })
             
             # Verificar concentración de trades en un símbolo
-            symbol_counts = {}
-            for trade in trades:
-                symbol_counts[trade.symbol] = symbol_counts.get(trade.symbol, 0) + 1
-            
-            total_trades = len(trades)
-            for symbol, count in symbol_counts.items():
+            total_trades = stats.total_trades
+            for symbol, count in stats.symbol_counts().items():
                 concentration = (count / total_trades) * 100
                 if concentration > 50:  # Más del 50% en un símbolo
                     violations.append({
@@ -562,12 +389,12 @@ class TradeReporting:
     
     async def _calculate_compliance_score(
         self, 
-        trades: List[TradeRecord], 
+        stats: TradeStatistics, 
         violations: List[Dict[str, Any]]
     ) -> float:
         """Calcula el score de cumplimiento (0-100)"""
         try:
-            if not trades:
+            if not stats.total_trades:
                 return 100.0
             
             # Score base
@@ -583,16 +410,11 @@ class TradeReporting:
                     score -= 30
             
             # Penalizar por trades con pérdidas excesivas
-            large_losses = len([t for t in trades if t.pnl < -1000])
-            if large_losses > 0:
-                score -= min(large_losses * 2, 20)
+            if stats.large_loss_trades > 0:
+                score -= min(stats.large_loss_trades * 2, 20)
             
             # Penalizar por alta concentración
-            symbol_counts = {}
-            for trade in trades:
-                symbol_counts[trade.symbol] = symbol_counts.get(trade.symbol, 0) + 1
-            
-            max_concentration = max(symbol_counts.values()) / len(trades) * 100
+            max_concentration = max(stats.symbol_counts().values()) / stats.total_trades * 100
             if max_concentration > 80:
                 score -= 10
             
@@ -604,13 +426,16 @@ class TradeReporting:
     
     async def _generate_recommendations(
         self, 
-        trades: List[TradeRecord], 
+        stats: TradeStatistics, 
         violations: List[Dict[str, Any]]
     ) -> List[str]:
         """Genera recomendaciones de cumplimiento"""
         try:
             recommendations = []
             
+            if not stats.total_trades:
+                return recommendations
+            
             # Recomendaciones basadas en violaciones
             for violation in violations:
                 if violation['type'] == 'HIGH_LEVERAGE':
@@ -621,11 +446,10 @@ class TradeReporting:
                     recommendations.append("Diversificar más el portfolio")
             
             # Recomendaciones generales
-            if len(trades) > 100:
+            if stats.total_trades > 100:
                 recommendations.append("Considerar implementar límites de trading diario")
             
-            win_rate = len([t for t in trades if t.pnl > 0]) / len(trades) * 100
-            if win_rate < 40:
+            if stats.win_rate < 40:
                 recommendations.append("Revisar estrategias de trading - win rate bajo")
             
             return recommendations
@@ -669,4 +493,4 @@ class TradeReporting:
             logger.error(f"❌ Error cerrando TradeReporting: {e}")
 
 # Instancia global
-trade_reporting = TradeReporting()
+trade_reporting = lazy_service('trade_reporting', TradeReporting)
@@ -0,0 +1,188 @@
+# Ruta: core/config/config_index.py
+"""
+Índice plano de configuración
+=============================
+
+Los gestores de configuración resolvían cada ``get('a.b.c')`` dividiendo la
+ruta y recorriendo los diccionarios anidados de cada fuente. Este módulo
+compila las fuentes cargadas en una tabla ``ruta -> valor`` una sola vez
+(tras cargar o recargar), de modo que cada consulta es un acceso O(1) a un
+diccionario.
+
+Semántica conservada respecto al recorrido original:
+- Las fuentes se consultan en orden de prioridad y gana el primer valor
+  distinto de None.
+- También se indexan los nodos intermedios (``get('a.b')`` devuelve el dict).
+- Solo son accesibles las claves de texto sin punto, igual que con split('.').
+
+Además ofrece snapshots tipados e inmutables para bucles calientes:
+
+    @dataclass(frozen=True)
+    class RiskSnapshot(ConfigSnapshot):
+        max_risk_per_trade: float = config_field('risk_management.max_risk_per_trade', 0.02)
+
+    snapshot = manager.snapshot(RiskSnapshot)   # cacheado hasta el próximo reload
+    if not manager.is_current(snapshot): ...
+"""
+
+import dataclasses
+import logging
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar, get_type_hints
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_CONFIG_KEY = 'config_key'
+
+S = TypeVar('S', bound='ConfigSnapshot')
+
+
+def config_field(key_path: str, default: Any = None) -> Any:
+    """Declara un campo de snapshot ligado a una ruta de configuración"""
+    return field(default=default, metadata={_CONFIG_KEY: key_path})
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Base de los snapshots tipados; guarda la versión del índice que lo generó"""
+    config_version: int = field(default=0, compare=False)
+
+
+def _freeze(value: Any) -> Any:
+    """Copia inmutable de listas/dicts para que el snapshot sea realmente frozen"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _coerce(value: Any, target: Any) -> Any:
+    if target in (int, float, str) and not isinstance(value, bool):
+        try:
+            return target(value)
+        except (TypeError, ValueError):
+            return value
+    if target is bool and isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return _freeze(value)
+
+
+def flatten_config(config: Any, prefix: str = '') -> Iterable[Tuple[str, Any]]:
+    """Genera pares (ruta, valor) de un dict anidado, incluidos los nodos intermedios"""
+    if not isinstance(config, dict):
+        return
+    for key, value in config.items():
+        if not isinstance(key, str) or '.' in key:
+            continue
+        path = f"{prefix}{key}"
+        yield path, value
+        if isinstance(value, dict):
+            yield from flatten_config(value, f"{path}.")
+
+
+class FlatConfigIndex:
+    """Tabla precompilada de rutas de configuración"""
+
+    def __init__(self):
+        self._table: Dict[str, Any] = {}
+        self._snapshots: Dict[type, ConfigSnapshot] = {}
+        self._compiled = False
+        self._lock = threading.RLock()
+        self.version = 0
+
+    def compile(
+        self,
+        sources: List[Tuple[str, Any]],
+        priority: Optional[Callable[[str], List[str]]] = None
+    ):
+        """
+        Construye la tabla a partir de las fuentes cargadas
+
+        Args:
+            sources: Pares (nombre, config) en orden de prioridad
+            priority: Opcional; dado el primer segmento de la ruta devuelve el
+                orden de fuentes a consultar (los nombres no listados se
+                consultan después, en el orden de ``sources``)
+        """
+        with self._lock:
+            flat_sources = [(name, dict(flatten_config(config))) for name, config in sources]
+            names = [name for name, _ in flat_sources]
+            by_name = dict(flat_sources)
+
+            table: Dict[str, Any] = {}
+            if priority is None:
+                for _, flat in flat_sources:
+                    for path, value in flat.items():
+                        if value is not None and path not in table:
+                            table[path] = value
+            else:
+                orders: Dict[str, List[Dict[str, Any]]] = {}
+                all_paths = {path for _, flat in flat_sources for path in flat}
+                for path in all_paths:
+                    root = path.split('.', 1)[0]
+                    order = orders.get(root)
+                    if order is None:
+                        preferred = [name for name in priority(root) if name in by_name]
+                        ordered = preferred + [name for name in names if name not in preferred]
+                        order = orders[root] = [by_name[name] for name in ordered]
+                    for flat in order:
+                        value = flat.get(path)
+                        if value is not None:
+                            table[path] = value
+                            break
+
+            self._table = table
+            self._snapshots.clear()
+            self._compiled = True
+            self.version += 1
+            logger.debug(f"Índice de configuración compilado: {len(table)} rutas (v{self.version})")
+
+    def invalidate(self):
+        """Marca el índice como obsoleto; el propietario lo recompila en el siguiente acceso"""
+        with self._lock:
+            self._compiled = False
+            self._snapshots.clear()
+
+    @property
+    def is_compiled(self) -> bool:
+        return self._compiled
+
+    def get(self, key_path: str, default: Any = None) -> Any:
+        value = self._table.get(key_path, _MISSING)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key_path: str) -> bool:
+        return key_path in self._table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def snapshot(self, snapshot_cls: Type[S]) -> S:
+        """Devuelve (cacheado por versión) el snapshot tipado de la clase dada"""
+        snapshot = self._snapshots.get(snapshot_cls)
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            hints = get_type_hints(snapshot_cls)
+            values = {'config_version': self.version}
+            for snapshot_field in dataclasses.fields(snapshot_cls):
+                key_path = snapshot_field.metadata.get(_CONFIG_KEY)
+                if key_path is None:
+                    continue
+                value = self._table.get(key_path, _MISSING)
+                if value is _MISSING:
+                    continue
+                values[snapshot_field.name] = _coerce(value, hints.get(snapshot_field.name))
+
+            snapshot = snapshot_cls(**values)
+            self._snapshots[snapshot_cls] = snapshot
+            return snapshot
+
+    def is_current(self, snapshot: ConfigSnapshot) -> bool:
+        """True si el snapshot se generó con la versión actual del índice"""
+        return self._compiled and snapshot.config_version == self.version
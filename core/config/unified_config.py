@@ -29,6 +29,8 @@ import redis
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from .config_index import FlatConfigIndex, ConfigSnapshot
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
 
@@ -89,6 +91,9 @@ class UnifiedConfigManager:
         self.file_handler = None
         self.hot_reload_enabled = True
         
+        # Índice plano (ruta -> valor); se recompila tras cualquier carga
+        self._index = FlatConfigIndex()
+        
         # Configuraciones por módulo
         self.module_configs = {
             'data_collection': ['data_collection.yaml', 'infrastructure.yaml'],
@@ -223,6 +228,7 @@ class UnifiedConfigManager:
                 with open(file, 'r', encoding='utf-8') as f:
                     data = yaml.safe_load(f) or {}
                 self.configs[f"{prefix}{file.name}"] = data
+            self._index.invalidate()
         except Exception as e:
             logger.warning(f"No se pudieron cargar configuraciones desde {directory}: {e}")
 
@@ -271,6 +277,7 @@ class UnifiedConfigManager:
                     except Exception:
                         config_data = {}
                 self.configs[config_file] = config_data or {}
+            self._index.invalidate()
 
             # Cargar nuevas rutas unificadas
             self._load_directory_configs(Path("config/core"), prefix="core/")
@@ -303,6 +310,7 @@ class UnifiedConfigManager:
                         config_data = json.loads(cached_config)
                         logger.info(f"Configuración {config_file} cargada desde cache")
                         self.configs[config_file] = config_data
+                        self._index.invalidate()
                         return config_data
                 except Exception as e:
                     logger.warning(f"Error leyendo cache para {config_file}: {e}")
@@ -324,6 +332,7 @@ class UnifiedConfigManager:
                     logger.warning(f"Error guardando en cache {config_file}: {e}")
             
             self.configs[config_file] = config_data
+            self._index.invalidate()
             logger.info(f"Configuración {config_file} cargada exitosamente")
             
             return config_data
@@ -700,39 +709,48 @@ class UnifiedConfigManager:
                 # Notación no soportada explícitamente; devolver default para evitar errores
                 return default
             
-            keys = key_path.split(".") if key_path else []
-            if not keys:
+            if not key_path:
                 return default
             
-            # Intentar coincidencias conocidas por archivo para acelerar
-            preferred_files = []
-            if keys[0] in {"data_collection", "historical_data", "database", "alignment", "real_time_data"}:
-                preferred_files.append("data_config.yaml")
-            if keys[0] in {"trading", "portfolio_management", "risk_management", "security", "infrastructure"}:
-                # Buscar primero en enterprise
-                preferred_files.extend([
-                    "trading.yaml",
-                    "portfolio_management.yaml",
-                    "risk_management.yaml",
-                    "security.yaml",
-                    "infrastructure.yaml",
-                ])
-            
-            # Lista de archivos a revisar: preferidos primero, luego el resto
-            files_to_search = []
-            files_to_search.extend([f for f in preferred_files if f in self.configs])
-            files_to_search.extend([f for f in self.configs.keys() if f not in files_to_search])
-            
-            for config_file in files_to_search:
-                config_data = self.configs.get(config_file, {})
-                value = self._get_nested_value(config_data, keys)
-                if value is not None:
-                    return value
-            
-            return default
+            if not self._index.is_compiled:
+                self._compile_index()
+            return self._index.get(key_path, default)
         except Exception as e:
             logger.error(f"Error en get('{key_path}'): {e}")
             return default
+    
+    @staticmethod
+    def _preferred_files(root: str) -> List[str]:
+        """Archivos consultados primero según el primer segmento de la ruta"""
+        preferred_files = []
+        if root in {"data_collection", "historical_data", "database", "alignment", "real_time_data"}:
+            preferred_files.append("data_config.yaml")
+        if root in {"trading", "portfolio_management", "risk_management", "security", "infrastructure"}:
+            # Buscar primero en enterprise
+            preferred_files.extend([
+                "trading.yaml",
+                "portfolio_management.yaml",
+                "risk_management.yaml",
+                "security.yaml",
+                "infrastructure.yaml",
+            ])
+        return preferred_files
+    
+    def _compile_index(self):
+        """Compila todas las configuraciones cargadas en el índice plano.
+        Orden: archivos preferidos según la raíz de la ruta, luego el resto en orden de carga.
+        """
+        self._index.compile(list(self.configs.items()), priority=self._preferred_files)
+    
+    def snapshot(self, snapshot_cls):
+        """Snapshot tipado e inmutable de un grupo de claves (se invalida al recargar)"""
+        if not self._index.is_compiled:
+            self._compile_index()
+        return self._index.snapshot(snapshot_cls)
+    
+    def is_snapshot_current(self, snapshot: ConfigSnapshot) -> bool:
+        """Indica si un snapshot sigue correspondiendo a la configuración cargada"""
+        return self._index.is_current(snapshot)
 
     def _get_nested_value(self, config: Dict[str, Any], keys: List[str]) -> Any:
         """Obtiene valor anidado dado un diccionario y lista de claves."""
@@ -9,8 +9,55 @@ Gestión de datos enterprise con soporte para:
 - Almacenamiento en TimescaleDB
 - Cache inteligente con Redis
 - Agregación de timeframes
+
+Los submódulos se importan bajo demanda: ``import core.data.database`` ya no
+arrastra el stack enterprise (Kafka, Redis, TimescaleDB) ni el preprocessor.
+Los nombres que antes se re-exportaban con ``import *`` siguen disponibles
+como ``core.data.<nombre>`` y se resuelven en el primer acceso.
 """
 
-from .enterprise import *
-from .database import *
-from .preprocessor import *
+import importlib
+
+# Nombre re-exportado -> submódulo que lo define (antes ``import *``)
+_LAZY_EXPORTS = {
+    # core.data.enterprise
+    'EnterpriseDataCollector': '.enterprise',
+    'DataPreprocessor': '.enterprise',
+    'TimescaleDBManager': '.enterprise',
+    # core.data.database
+    'timing_decorator': '.database',
+    'MarketData': '.database',
+    'DatabaseManager': '.database',
+    'db_manager': '.database',
+    # core.data.feature_store
+    'FeatureStore': '.feature_store',
+    'FEATURE_STORE_VERSION': '.feature_store',
+    # core.data.preprocessor
+    'TechnicalIndicatorsAdvanced': '.preprocessor',
+    'PriceActionFeaturesAdvanced': '.preprocessor',
+    'MarketRegimeFeatures': '.preprocessor',
+    'TimeBasedFeatures': '.preprocessor',
+    'DataPreprocessorAdvanced': '.preprocessor',
+    'FeatureValidator': '.preprocessor',
+    'data_preprocessor': '.preprocessor',
+    'prepare_training_data': '.preprocessor',
+    'prepare_multi_symbol_training_data': '.preprocessor',
+    'prepare_prediction_data': '.preprocessor',
+    'analyze_feature_correlation': '.preprocessor',
+    'get_feature_statistics': '.preprocessor',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    submodule = _LAZY_EXPORTS.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(submodule, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
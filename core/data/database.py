@@ -23,6 +23,7 @@ import pickle
 from concurrent.futures import ThreadPoolExecutor
 import time
 from functools import wraps
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -332,4 +333,4 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"❌ Error registrando sesión de alineación: {e}")
 
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = lazy_service('db_manager', DatabaseManager)
\ No newline at end of file
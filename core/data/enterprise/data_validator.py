@@ -174,7 +174,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando precio {symbol}: {e}")
-            return ValidationResult(False, [f"Error validando precio: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando precio: {str(e)}"], warnings)
     
     def _validate_volume(self, symbol: str, volume: float) -> ValidationResult:
         """Validar volumen"""
@@ -217,7 +217,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando volumen {symbol}: {e}")
-            return ValidationResult(False, [f"Error validando volumen: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando volumen: {str(e)}"], warnings)
     
     def _validate_timestamp(self, timestamp: datetime) -> ValidationResult:
         """Validar timestamp"""
@@ -249,7 +249,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando timestamp: {e}")
-            return ValidationResult(False, [f"Error validando timestamp: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando timestamp: {str(e)}"], warnings)
     
     def _validate_bid_ask(self, bid: float, ask: float) -> ValidationResult:
         """Validar bid/ask"""
@@ -278,7 +278,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando bid/ask: {e}")
-            return ValidationResult(False, [f"Error validando bid/ask: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando bid/ask: {str(e)}"], warnings)
     
     def _validate_symbol(self, symbol: str) -> ValidationResult:
         """Validar símbolo"""
@@ -304,7 +304,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando símbolo {symbol}: {e}")
-            return ValidationResult(False, [f"Error validando símbolo: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando símbolo: {str(e)}"], warnings)
     
     def _detect_price_outlier(self, symbol: str, price: float) -> bool:
         """Detectar outlier en precio"""
@@ -370,7 +370,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando datos OHLCV: {e}")
-            return ValidationResult(False, [f"Error validando datos OHLCV: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando datos OHLCV: {str(e)}"], warnings)
     
     def validate_technical_features(self, features: Dict[str, Any]) -> ValidationResult:
         """Validar features técnicos"""
@@ -413,7 +413,7 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error validando features técnicos: {e}")
-            return ValidationResult(False, [f"Error validando features técnicos: {str(e)}], warnings)
+            return ValidationResult(False, [f"Error validando features técnicos: {str(e)}"], warnings)
     
     def get_metrics(self) -> Dict[str, Any]:
         """Obtener métricas del validador"""
@@ -18,6 +18,7 @@ import asyncio
 import logging
 import psycopg2
 import psycopg2.extras
+import psycopg2.errors
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -27,8 +28,34 @@ from contextlib import asynccontextmanager
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+from .bulk_ingest import BulkCopyWriter, CopyTableSpec, PsycopgCopyBackend
+
 logger = logging.getLogger(__name__)
 
+# Los índices únicos uq_ticks_symbol_time / uq_candles_symbol_interval_time
+# garantizan la misma deduplicación en la ruta COPY y en la ruta INSERT
+# (ON CONFLICT ... DO NOTHING: se conserva la fila ya guardada)
+TICKS_COPY_SPEC = CopyTableSpec(
+    table='market_ticks',
+    columns=('time', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'source'),
+    conflict_columns=('symbol', 'time'),
+    partition_column='symbol'
+)
+
+CANDLES_COPY_SPEC = CopyTableSpec(
+    table='market_candles',
+    columns=('time', 'symbol', 'interval', 'open', 'high', 'low', 'close', 'volume', 'indicators', 'source'),
+    conflict_columns=('symbol', 'interval', 'time'),
+    partition_column='symbol'
+)
+
+# Índices únicos por clave de deduplicación (incluyen la columna de tiempo,
+# requisito de TimescaleDB en hypertables)
+UNIQUE_INDEXES = {
+    'market_ticks': ('uq_ticks_symbol_time', ('symbol', 'time'), 'idx_ticks_symbol_time'),
+    'market_candles': ('uq_candles_symbol_interval_time', ('symbol', 'interval', 'time'), 'idx_candles_symbol_interval'),
+}
+
 class TimescaleDBManager:
     """
     Gestor de base de datos TimescaleDB para datos de trading
@@ -46,6 +73,17 @@ class TimescaleDBManager:
         self.is_connected = False
         self.executor = ThreadPoolExecutor(max_workers=4)
         
+        # Ingesta masiva por COPY para lotes grandes (backfills, ráfagas de ticks)
+        bulk_config = {**self._default_config()['bulk_ingest'], **self.config.get('bulk_ingest', {})}
+        self.bulk_ingest_enabled = bulk_config['enabled']
+        self.bulk_threshold_rows = bulk_config['threshold_rows']
+        self.bulk_writer = BulkCopyWriter(
+            PsycopgCopyBackend(lambda: psycopg2.connect(**self.connection_pool)),
+            batch_size=bulk_config['batch_size'],
+            writers_per_table=bulk_config['writers_per_table'],
+            executor=self.executor
+        )
+        
         # Métricas
         self.queries_executed = 0
         self.queries_failed = 0
@@ -73,6 +111,12 @@ class TimescaleDBManager:
             'retention': {
                 'enabled': True,
                 'data_retention_period': '1 year'
+            },
+            'bulk_ingest': {
+                'enabled': True,
+                'threshold_rows': 1000,
+                'batch_size': 50000,
+                'writers_per_table': 2
             }
         }
     
@@ -260,14 +304,16 @@ class TimescaleDBManager:
     async def _create_indexes(self):
         """Crea índices optimizados"""
         try:
+            # Índices únicos de deduplicación (sustituyen a los no únicos equivalentes)
+            for table in UNIQUE_INDEXES:
+                await self._create_unique_index(table)
+            
             indexes = [
                 # Índices para ticks
-                "CREATE INDEX IF NOT EXISTS idx_ticks_symbol_time ON market_ticks (symbol, time DESC);",
                 "CREATE INDEX IF NOT EXISTS idx_ticks_time ON market_ticks (time DESC);",
                 
                 # Índices para velas
                 "CREATE INDEX IF NOT EXISTS idx_candles_symbol_time ON market_candles (symbol, time DESC);",
-                "CREATE INDEX IF NOT EXISTS idx_candles_symbol_interval ON market_candles (symbol, interval, time DESC);",
                 "CREATE INDEX IF NOT EXISTS idx_candles_time ON market_candles (time DESC);",
                 
                 # Índices para order book
@@ -289,6 +335,38 @@ class TimescaleDBManager:
             logger.error(f"Error creando índices: {e}")
             raise
     
+    async def _create_unique_index(self, table: str):
+        """
+        Crea el índice único de deduplicación de ``table``
+        
+        Si la tabla ya contiene duplicados (escritos antes de existir el
+        índice) se eliminan conservando la fila más antigua y se reintenta.
+        """
+        name, keys, legacy_index = UNIQUE_INDEXES[table]
+        key_list = ', '.join(keys)
+        create_sql = (
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {name} "
+            f"ON {table} ({', '.join(keys[:-1])}, {keys[-1]} DESC);"
+        )
+        dedupe_sql = f"""
+        DELETE FROM {table} t
+        USING (
+            SELECT tableoid, ctid,
+                   row_number() OVER (PARTITION BY {key_list} ORDER BY created_at, ctid) AS rn
+            FROM {table}
+        ) d
+        WHERE t.tableoid = d.tableoid AND t.ctid = d.ctid AND d.rn > 1;
+        """
+        
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(self.executor, self._execute_query, create_sql)
+        except psycopg2.errors.UniqueViolation:
+            logger.warning(f"⚠️ {table} contiene duplicados, eliminándolos antes de crear {name}")
+            await loop.run_in_executor(self.executor, self._execute_query, dedupe_sql)
+            await loop.run_in_executor(self.executor, self._execute_query, create_sql)
+        await loop.run_in_executor(self.executor, self._execute_query, f"DROP INDEX IF EXISTS {legacy_index};")
+    
     async def _setup_compression(self):
         """Configura compresión de datos"""
         try:
@@ -373,7 +451,7 @@ class TimescaleDBManager:
             query = """
             INSERT INTO market_ticks (time, symbol, open, high, low, close, volume, source)
             VALUES %s
-            ON CONFLICT DO NOTHING
+            ON CONFLICT (symbol, time) DO NOTHING
             """
             
             values = [
@@ -390,13 +468,16 @@ class TimescaleDBManager:
                 for tick in ticks
             ]
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                self.executor,
-                self._execute_batch_insert,
-                query,
-                values
-            )
+            if self._use_bulk_ingest(values):
+                await self.bulk_writer.ingest(TICKS_COPY_SPEC, values)
+            else:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(
+                    self.executor,
+                    self._execute_batch_insert,
+                    query,
+                    values
+                )
             
             self.data_inserted += len(ticks)
             
@@ -413,7 +494,7 @@ class TimescaleDBManager:
             query = """
             INSERT INTO market_candles (time, symbol, interval, open, high, low, close, volume, indicators, source)
             VALUES %s
-            ON CONFLICT DO NOTHING
+            ON CONFLICT (symbol, interval, time) DO NOTHING
             """
             
             values = [
@@ -432,13 +513,16 @@ class TimescaleDBManager:
                 for candle in candles
             ]
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                self.executor,
-                self._execute_batch_insert,
-                query,
-                values
-            )
+            if self._use_bulk_ingest(values):
+                await self.bulk_writer.ingest(CANDLES_COPY_SPEC, values)
+            else:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(
+                    self.executor,
+                    self._execute_batch_insert,
+                    query,
+                    values
+                )
             
             self.data_inserted += len(candles)
             
@@ -446,12 +530,16 @@ class TimescaleDBManager:
             logger.error(f"Error insertando velas: {e}")
             raise
     
+    def _use_bulk_ingest(self, values: List[Tuple]) -> bool:
+        """Los lotes pequeños siguen por INSERT: el staging no compensa"""
+        return self.bulk_ingest_enabled and len(values) >= self.bulk_threshold_rows
+    
     def _execute_batch_insert(self, query: str, values: List[Tuple]):
         """Ejecuta inserción por lotes"""
         try:
             with psycopg2.connect(**self.connection_pool) as conn:
                 with conn.cursor() as cur:
-                    execute_values(
+                    psycopg2.extras.execute_values(
                         cur,
                         query,
                         values,
@@ -647,5 +735,6 @@ class TimescaleDBManager:
             'queries_failed': self.queries_failed,
             'data_inserted': self.data_inserted,
             'is_connected': self.is_connected,
-            'success_rate': (self.queries_executed - self.queries_failed) / self.queries_executed if self.queries_executed > 0 else 0
+            'success_rate': (self.queries_executed - self.queries_failed) / self.queries_executed if self.queries_executed > 0 else 0,
+            'bulk_ingest': self.bulk_writer.get_stats()
         }
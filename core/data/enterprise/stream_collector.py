@@ -103,6 +103,9 @@ class EnterpriseDataCollector:
         self.tick_cache: Dict[str, List[MarketTick]] = {symbol: [] for symbol in symbols}
         self.candle_cache: Dict[str, pd.DataFrame] = {symbol: pd.DataFrame() for symbol in symbols}
         
+        # Suscriptores de ticks (p.ej. PositionManager.on_price_update)
+        self.tick_listeners: List[Callable] = []
+        
         # Métricas de Prometheus
         self.setup_prometheus_metrics()
         
@@ -399,6 +402,9 @@ class EnterpriseDataCollector:
                 if len(self.tick_cache[symbol]) > 1000:
                     self.tick_cache[symbol] = self.tick_cache[symbol][-500:]
                 
+                # Notificar a los suscriptores antes de cualquier I/O
+                await self._notify_tick_listeners(tick)
+                
                 # Enviar a Kafka
                 await self._send_to_kafka('ticks', asdict(tick))
                 
@@ -414,6 +420,29 @@ class EnterpriseDataCollector:
             logger.error(f"Error procesando kline para {symbol}: {e}")
             self.websocket_errors.labels(error_type='kline_processing').inc()
     
+    def add_tick_listener(self, callback: Callable):
+        """
+        Registra un callback async(symbol, price, timestamp) por cada tick válido
+        
+        Args:
+            callback: Corrutina a invocar con el precio de cierre del tick
+        """
+        if callback not in self.tick_listeners:
+            self.tick_listeners.append(callback)
+    
+    def remove_tick_listener(self, callback: Callable):
+        """Elimina un callback de ticks"""
+        if callback in self.tick_listeners:
+            self.tick_listeners.remove(callback)
+    
+    async def _notify_tick_listeners(self, tick: MarketTick):
+        """Notifica un tick a los suscriptores"""
+        for callback in list(self.tick_listeners):
+            try:
+                await callback(tick.symbol, tick.close, tick.timestamp)
+            except Exception as e:
+                logger.error(f"Error en listener de ticks para {tick.symbol}: {e}")
+    
     async def _process_orderbook_data(self, data: Dict[str, Any], symbol: str):
         """Procesa datos del order book"""
         try:
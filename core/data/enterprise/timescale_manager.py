@@ -15,11 +15,24 @@ from asyncpg import Pool, Connection
 
 from core.config.unified_config import unified_config
 from .stream_collector import MarketTick
+from .bulk_ingest import AsyncpgCopyBackend, BulkCopyWriter, CopyTableSpec
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Misma semántica que insert_market_tick: ON CONFLICT (time, symbol) DO UPDATE
+MARKET_TICKS_COPY_SPEC = CopyTableSpec(
+    table='market_ticks',
+    columns=(
+        'time', 'symbol', 'price', 'volume', 'bid', 'ask', 'bid_size', 'ask_size',
+        'exchange', 'raw_data', 'created_at'
+    ),
+    conflict_columns=('time', 'symbol'),
+    update_columns=('price', 'volume', 'bid', 'ask', 'bid_size', 'ask_size', 'raw_data'),
+    partition_column='symbol'
+)
+
 class TimescaleDataManager:
     """Gestor TimescaleDB para datos enterprise"""
     
@@ -43,6 +56,14 @@ class TimescaleDataManager:
         self.pool: Optional[Pool] = None
         self.is_running = False
         
+        # Ingesta masiva por COPY (se crea al iniciar el pool)
+        bulk_config = self.timescaledb_config.get("bulk_ingest", {})
+        self.bulk_ingest_enabled = bulk_config.get("enabled", True)
+        self.bulk_threshold_rows = bulk_config.get("threshold_rows", 1000)
+        self.bulk_batch_size = bulk_config.get("batch_size", 50000)
+        self.bulk_writers_per_table = bulk_config.get("writers_per_table", 2)
+        self.bulk_writer: Optional[BulkCopyWriter] = None
+        
         # Métricas
         self.metrics = {
             "connections_active": 0,
@@ -86,6 +107,12 @@ class TimescaleDataManager:
             self.pool = await asyncpg.create_pool(**connection_config)
             self.is_running = True
             
+            self.bulk_writer = BulkCopyWriter(
+                AsyncpgCopyBackend(self.pool),
+                batch_size=self.bulk_batch_size,
+                writers_per_table=self.bulk_writers_per_table
+            )
+            
             # Verificar conexión
             async with self.pool.acquire() as conn:
                 await conn.fetchval("SELECT 1")
@@ -232,8 +259,12 @@ class TimescaleDataManager:
             
             # Ejecutar inserción en lote
             if self.pool and self.is_running:
-                async with self.pool.acquire() as conn:
-                    await conn.executemany(query, data)
+                if self.bulk_ingest_enabled and self.bulk_writer and len(data) >= self.bulk_threshold_rows:
+                    # COPY (CSV) a staging + upsert por writer
+                    await self.bulk_writer.ingest(MARKET_TICKS_COPY_SPEC, data)
+                else:
+                    async with self.pool.acquire() as conn:
+                        await conn.executemany(query, data)
                 
                 self.metrics["inserts_total"] += 1
                 self.metrics["queries_executed_total"] += 1
@@ -524,7 +555,10 @@ class TimescaleDataManager:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Obtener métricas del gestor TimescaleDB"""
-        return self.metrics.copy()
+        metrics = self.metrics.copy()
+        if self.bulk_writer:
+            metrics["bulk_ingest"] = self.bulk_writer.get_stats()
+        return metrics
     
     def get_status(self) -> Dict[str, Any]:
         """Obtener estado del gestor TimescaleDB"""
@@ -34,6 +34,7 @@ from prometheus_client import Counter, Histogram, Gauge
 from control.telegram_bot import telegram_bot
 from core.config.config_loader import config_loader
 from core.data.database import db_manager
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -678,4 +679,4 @@ class EnterpriseDataCollector:
             logger.error(f"Error limpiando EnterpriseDataCollector: {e}")
 
 # Instancia global
-enterprise_data_collector = EnterpriseDataCollector()
+enterprise_data_collector = lazy_service('enterprise_data_collector', EnterpriseDataCollector)
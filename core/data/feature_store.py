@@ -0,0 +1,602 @@
+# Ruta: core/data/feature_store.py
+"""
+core/data/feature_store.py - Almacén de features columnar direccionado por contenido
+
+Sustituye al antiguo FeatureCache (pickle del DataFrame completo con caducidad
+de 24h):
+- Cada serie (símbolo + frecuencia) guarda sus datos de entrada en ``_base`` con
+  un hash por fila: la validez se decide por contenido, no por reloj
+- Cada grupo de features vive en ``{grupo}-{huella}``; la huella combina nombre,
+  configuración y hash del código del grupo, así que cambiar un indicador solo
+  invalida su grupo
+- Los datos se guardan en Parquet por partes: leer unas pocas columnas no carga
+  el resto, y las filas nuevas se añaden como parte nueva calculando solo la
+  cola (más filas de calentamiento) en lugar de todo el histórico
+- Si una fila ya guardada cambia (p. ej. la última vela se cerró con otro
+  valor), la serie se trunca en la primera fila distinta y se recalcula solo
+  desde ahí
+
+Estructura en disco:
+    {root}/{serie}/_base/manifest.json, part-00000.parquet, ...
+    {root}/{serie}/{grupo}-{huella}/manifest.json, part-00000.parquet, ...
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    logger.warning("pyarrow no disponible - el feature store calculará sin persistir")
+
+# Subir al cambiar el formato en disco o la semántica de los grupos
+FEATURE_STORE_VERSION = "1"
+ROW_HASH_COLUMN = "__row_hash"
+BASE_DIR = "_base"
+
+FeatureGroup = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def group_fingerprint(
+    name: str,
+    func: FeatureGroup,
+    config: Optional[Dict[str, Any]] = None,
+    code_version: str = FEATURE_STORE_VERSION
+) -> str:
+    """Huella de un grupo: nombre + configuración + código fuente + versiones"""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, '__qualname__', repr(func))
+
+    payload = json.dumps({
+        'group': name,
+        'config': config or {},
+        'code': hashlib.sha256(source.encode()).hexdigest(),
+        'version': code_version,
+        'pandas': pd.__version__,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash uint64 por fila (índice incluido) de los datos de entrada"""
+    return pd.util.hash_pandas_object(df, index=True).to_numpy(dtype=np.uint64)
+
+
+class FeatureStore:
+    """Almacén de features por grupos con invalidación por contenido y append incremental"""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        warmup_rows: int = 2000,
+        check_rows: int = 50,
+        max_parts: int = 32,
+        code_version: str = FEATURE_STORE_VERSION
+    ):
+        if root is None:
+            root = Path(__file__).parent.parent.parent / "data" / "feature_store"
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        # Filas previas recalculadas al añadir (ventanas móviles / EMAs)
+        self.warmup_rows = warmup_rows
+        # Filas ya guardadas que deben coincidir para aceptar un append
+        self.check_rows = check_rows
+        # Número de partes a partir del cual se compacta un directorio
+        self.max_parts = max_parts
+        self.code_version = code_version
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'base_hits': 0,
+            'base_appends': 0,
+            'base_truncations': 0,
+            'base_resets': 0,
+            'group_hits': 0,
+            'group_appends': 0,
+            'group_full_computes': 0,
+            'group_errors': 0,
+            'uncached_requests': 0,
+            'last_request_s': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def can_store(self, df: pd.DataFrame) -> bool:
+        """Solo se persisten series con índice único y creciente"""
+        return (
+            PARQUET_AVAILABLE and not df.empty
+            and df.index.is_unique and df.index.is_monotonic_increasing
+        )
+
+    def materialize(
+        self,
+        df: pd.DataFrame,
+        groups: Dict[str, FeatureGroup],
+        series_key: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        config: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_workers: int = 4
+    ) -> pd.DataFrame:
+        """
+        Devuelve ``df`` con las features de ``groups`` añadidas.
+
+        Los grupos ya calculados para estas filas se leen de disco (solo las
+        ``columns`` pedidas, si se indican); las filas nuevas al final de la
+        serie se calculan de forma incremental y se añaden al almacén.
+        """
+        start_time = time.perf_counter()
+        self._bump('requests')
+        config = config or {}
+
+        if not self.can_store(df):
+            self._bump('uncached_requests')
+            return self._compute_direct(df, groups, columns, max_workers)
+
+        try:
+            series_dir = self.root / (series_key or self.series_key(df))
+            offset, base_rows = self._sync_base(series_dir, df)
+
+            def sync(name: str) -> Tuple[Path, Dict[str, Any]]:
+                fingerprint = group_fingerprint(name, groups[name], config.get(name), self.code_version)
+                return self._sync_group(series_dir, name, groups[name], fingerprint, base_rows)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                synced = dict(zip(groups, executor.map(self._safe(sync), groups)))
+
+            frames = []
+            present = set(df.columns)
+            for name in groups:
+                if synced[name] is None:
+                    continue
+                group_dir, manifest = synced[name]
+                wanted = [
+                    col for col in manifest['columns']
+                    if col not in present and (columns is None or col in columns)
+                ]
+                if not wanted:
+                    continue
+                frame = self._read_rows(group_dir, manifest, offset, offset + len(df), wanted)
+                frame.index = df.index
+                frames.append(frame)
+                present.update(wanted)
+
+            result = pd.concat([df] + frames, axis=1) if frames else df.copy()
+            return result
+
+        except Exception as e:
+            logger.error(f"Error en feature store, calculando sin cache: {e}")
+            return self._compute_direct(df, groups, columns, max_workers)
+        finally:
+            with self._lock:
+                self.stats['last_request_s'] = time.perf_counter() - start_time
+
+    def load(
+        self,
+        series_key: str,
+        columns: List[str],
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Lee columnas concretas de una serie (filas [start, stop) de la base)"""
+        series_dir = self.root / series_key
+        base_manifest = self._read_manifest(series_dir / BASE_DIR)
+        if base_manifest is None:
+            return pd.DataFrame()
+        stop = base_manifest['rows'] if stop is None else min(stop, base_manifest['rows'])
+
+        index = self._read_rows(series_dir / BASE_DIR, base_manifest, start, stop, [ROW_HASH_COLUMN]).index
+        frames = []
+        base_columns = [col for col in columns if col in base_manifest['columns']]
+        if base_columns:
+            frames.append(self._read_rows(series_dir / BASE_DIR, base_manifest, start, stop, base_columns))
+
+        remaining = [col for col in columns if col not in base_columns]
+        for group_dir in self._latest_group_dirs(series_dir).values():
+            if not remaining:
+                break
+            manifest = self._read_manifest(group_dir)
+            if manifest is None or manifest['rows'] < stop:
+                continue
+            wanted = [col for col in remaining if col in manifest['columns']]
+            if wanted:
+                frame = self._read_rows(group_dir, manifest, start, stop, wanted)
+                frame.index = index
+                frames.append(frame)
+                remaining = [col for col in remaining if col not in wanted]
+
+        if remaining:
+            logger.debug(f"Columnas no encontradas en {series_key}: {remaining}")
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame(index=index)
+
+    def prune(self, max_age_days: int = 30) -> Dict[str, int]:
+        """Elimina series sin actualizar y huellas antiguas de cada grupo"""
+        removed = {'series': 0, 'groups': 0}
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+        try:
+            for series_dir in [p for p in self.root.iterdir() if p.is_dir()]:
+                base_manifest = self._read_manifest(series_dir / BASE_DIR)
+                if base_manifest is None or datetime.fromisoformat(base_manifest['updated_at']) < cutoff:
+                    shutil.rmtree(series_dir, ignore_errors=True)
+                    removed['series'] += 1
+                    continue
+
+                latest = set(self._latest_group_dirs(series_dir).values())
+                for group_dir in series_dir.iterdir():
+                    if group_dir.is_dir() and group_dir.name != BASE_DIR and group_dir not in latest:
+                        shutil.rmtree(group_dir, ignore_errors=True)
+                        removed['groups'] += 1
+        except Exception as e:
+            logger.debug(f"Error limpiando feature store: {e}")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de uso y tamaño en disco"""
+        with self._lock:
+            stats = dict(self.stats)
+        try:
+            files = list(self.root.rglob("*.parquet"))
+            stats.update({
+                'series': sum(1 for p in self.root.iterdir() if p.is_dir()),
+                'parts': len(files),
+                'total_size_mb': round(sum(f.stat().st_size for f in files) / 1024 / 1024, 2),
+                'store_directory': str(self.root),
+            })
+        except Exception as e:
+            stats['error'] = str(e)
+        return stats
+
+    @staticmethod
+    def series_key(df: pd.DataFrame) -> str:
+        """Clave de serie: símbolo + paso mediano del índice"""
+        symbol = str(df['symbol'].iloc[0]) if 'symbol' in df.columns else 'UNKNOWN'
+        step = 'na'
+        if len(df) > 1:
+            diffs = pd.Series(df.index[1:] - df.index[:-1])
+            median = diffs.median()
+            step = f"{int(median.total_seconds())}s" if isinstance(median, pd.Timedelta) else str(median)
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', f"{symbol}_{step}")
+
+    # ------------------------------------------------------------------
+    # Base (datos de entrada)
+    # ------------------------------------------------------------------
+
+    def _sync_base(self, series_dir: Path, df: pd.DataFrame) -> Tuple[int, int]:
+        """
+        Alinea ``df`` con la base guardada y añade las filas nuevas.
+
+        Devuelve (posición de la primera fila de df en la base, filas de la base).
+        Si alguna fila solapada difiere, la base y los grupos se truncan en la
+        primera fila distinta; solo si df no empieza dentro de la base (o
+        cambian las columnas) la serie se reinicia.
+        """
+        base_dir = series_dir / BASE_DIR
+        hashes = row_hashes(df)
+        manifest = self._read_manifest(base_dir)
+
+        if manifest is not None and manifest['columns'] == [str(c) for c in df.columns]:
+            stored = self._read_rows(base_dir, manifest, 0, manifest['rows'], [ROW_HASH_COLUMN])
+            position = int(stored.index.get_indexer([df.index[0]])[0])
+            if position >= 0:
+                overlap = min(len(df), len(stored) - position)
+                same = (
+                    (stored.index[position:position + overlap].to_numpy() == df.index[:overlap].to_numpy())
+                    & (stored[ROW_HASH_COLUMN].to_numpy()[position:position + overlap] == hashes[:overlap])
+                )
+                mismatch = np.flatnonzero(~same)
+                matched = int(mismatch[0]) if len(mismatch) else overlap
+                if matched == len(df):
+                    self._bump('base_hits')
+                    return position, manifest['rows']
+                if position + matched > 0:
+                    if matched < overlap:
+                        manifest = self._truncate_series(series_dir, manifest, position + matched)
+                        self._bump('base_truncations')
+                    else:
+                        self._bump('base_appends')
+                    new_rows = df.iloc[matched:].copy()
+                    new_rows[ROW_HASH_COLUMN] = hashes[matched:]
+                    manifest = self._append_part(base_dir, manifest, new_rows)
+                    return position, manifest['rows']
+
+        # Serie nueva o incoherente con lo guardado: se reinicia entera
+        if manifest is not None:
+            self._bump('base_resets')
+        shutil.rmtree(series_dir, ignore_errors=True)
+        base = df.copy()
+        base[ROW_HASH_COLUMN] = hashes
+        manifest = self._new_manifest(columns=[str(c) for c in df.columns])
+        manifest = self._append_part(base_dir, manifest, base)
+        return 0, manifest['rows']
+
+    def _truncate_series(self, series_dir: Path, base_manifest: Dict[str, Any], rows: int) -> Dict[str, Any]:
+        """Trunca la base y todos los grupos de la serie a sus primeras ``rows`` filas"""
+        for group_dir in series_dir.iterdir():
+            if not group_dir.is_dir() or group_dir.name == BASE_DIR:
+                continue
+            manifest = self._read_manifest(group_dir)
+            if manifest is not None and manifest['rows'] > rows:
+                self._truncate(group_dir, manifest, rows)
+        return self._truncate(series_dir / BASE_DIR, base_manifest, rows)
+
+    def _read_base_inputs(self, series_dir: Path, start: int, stop: int) -> pd.DataFrame:
+        base_dir = series_dir / BASE_DIR
+        manifest = self._read_manifest(base_dir)
+        frame = self._read_rows(base_dir, manifest, start, stop, None)
+        return frame.drop(columns=[ROW_HASH_COLUMN])
+
+    # ------------------------------------------------------------------
+    # Grupos de features
+    # ------------------------------------------------------------------
+
+    def _sync_group(
+        self,
+        series_dir: Path,
+        name: str,
+        func: FeatureGroup,
+        fingerprint: str,
+        base_rows: int
+    ) -> Tuple[Path, Dict[str, Any]]:
+        group_dir = series_dir / f"{name}-{fingerprint[:16]}"
+        manifest = self._read_manifest(group_dir)
+
+        if manifest is not None and manifest['rows'] == base_rows:
+            self._bump('group_hits')
+            return group_dir, manifest
+
+        if manifest is not None and 0 < manifest['rows'] < base_rows:
+            appended = self._append_group(series_dir, group_dir, manifest, func, base_rows)
+            if appended is not None:
+                self._bump('group_appends')
+                return group_dir, appended
+            logger.info(f"🔄 Grupo {name}: la cola no reproduce lo guardado, recalculando completo")
+
+        # Cálculo completo sobre toda la base
+        inputs = self._read_base_inputs(series_dir, 0, base_rows)
+        output = func(inputs)
+        new_columns = [col for col in output.columns if col not in inputs.columns]
+
+        shutil.rmtree(group_dir, ignore_errors=True)
+        manifest = self._new_manifest(columns=[str(c) for c in new_columns], fingerprint=fingerprint)
+        manifest = self._append_part(group_dir, manifest, self._positional(output[new_columns]))
+        self._bump('group_full_computes')
+        return group_dir, manifest
+
+    def _append_group(
+        self,
+        series_dir: Path,
+        group_dir: Path,
+        manifest: Dict[str, Any],
+        func: FeatureGroup,
+        base_rows: int
+    ) -> Optional[Dict[str, Any]]:
+        """Calcula solo la cola; None si el resultado no es coherente con lo guardado"""
+        covered = manifest['rows']
+        start = max(0, covered - self.warmup_rows)
+        inputs = self._read_base_inputs(series_dir, start, base_rows)
+        output = func(inputs)
+
+        new_columns = [col for col in output.columns if col not in inputs.columns]
+        if [str(c) for c in new_columns] != manifest['columns']:
+            return None
+
+        # Las últimas filas ya guardadas deben salir iguales con este contexto
+        check_start = max(start, covered - self.check_rows)
+        recomputed = output[new_columns].iloc[check_start - start:covered - start]
+        stored = self._read_rows(group_dir, manifest, check_start, covered, manifest['columns'])
+        if not self._frames_match(recomputed, stored):
+            return None
+
+        tail = output[new_columns].iloc[covered - start:]
+        return self._append_part(group_dir, manifest, self._positional(tail))
+
+    @staticmethod
+    def _frames_match(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+        if left.shape != right.shape:
+            return False
+        left = left.reset_index(drop=True)
+        right = right.reset_index(drop=True)
+        right.columns = left.columns
+        numeric = left.select_dtypes(include=[np.number, bool]).columns
+        others = [col for col in left.columns if col not in numeric]
+        if len(numeric) and not np.allclose(
+            left[numeric].to_numpy(dtype=float, na_value=np.nan),
+            right[numeric].to_numpy(dtype=float, na_value=np.nan),
+            rtol=1e-6, atol=1e-9, equal_nan=True
+        ):
+            return False
+        return all(left[col].equals(right[col]) for col in others)
+
+    def _compute_direct(
+        self,
+        df: pd.DataFrame,
+        groups: Dict[str, FeatureGroup],
+        columns: Optional[List[str]],
+        max_workers: int
+    ) -> pd.DataFrame:
+        """Cálculo en paralelo sin persistencia (fallback)"""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(func, df.copy()) for func in groups.values()]
+            results = []
+            for name, future in zip(groups, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    self._bump('group_errors')
+                    logger.error(f"Error en grupo de features {name}: {e}")
+
+        frames = []
+        present = set(df.columns)
+        for result_df in results:
+            new_columns = [
+                col for col in result_df.columns
+                if col not in present and (columns is None or col in columns)
+            ]
+            if new_columns:
+                frames.append(result_df[new_columns])
+                present.update(new_columns)
+        return pd.concat([df] + frames, axis=1) if frames else df.copy()
+
+    # ------------------------------------------------------------------
+    # Partes y manifiestos
+    # ------------------------------------------------------------------
+
+    def _new_manifest(self, columns: List[str], fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'version': FEATURE_STORE_VERSION,
+            'fingerprint': fingerprint,
+            'columns': columns,
+            'rows': 0,
+            'parts': [],
+            'updated_at': datetime.now().isoformat(),
+        }
+
+    def _append_part(self, directory: Path, manifest: Dict[str, Any], frame: pd.DataFrame) -> Dict[str, Any]:
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest = dict(manifest, parts=list(manifest['parts']))
+
+        if len(manifest['parts']) + 1 > self.max_parts:
+            # Compactar: todas las partes previas + la nueva en una sola
+            previous = self._read_rows(directory, manifest, 0, manifest['rows'], None)
+            frame = pd.concat([previous, frame])
+            old_files = [part['file'] for part in manifest['parts']]
+            manifest['parts'] = []
+            manifest['rows'] = 0
+        else:
+            old_files = []
+
+        manifest['parts'].append(self._write_part(directory, frame, len(manifest['parts'])))
+        manifest['rows'] += len(frame)
+        manifest['updated_at'] = datetime.now().isoformat()
+        self._write_manifest(directory, manifest)
+
+        for old_file in old_files:
+            (directory / old_file).unlink(missing_ok=True)
+        return manifest
+
+    def _truncate(self, directory: Path, manifest: Dict[str, Any], rows: int) -> Dict[str, Any]:
+        """Conserva las primeras ``rows`` filas; solo se reescribe la parte partida"""
+        parts = []
+        old_files = []
+        position = 0
+        for part in manifest['parts']:
+            part_start, position = position, position + part['rows']
+            if position <= rows:
+                parts.append(part)
+                continue
+            old_files.append(part['file'])
+            if part_start < rows:
+                frame = pd.read_parquet(directory / part['file']).iloc[:rows - part_start]
+                parts.append(self._write_part(directory, frame, len(parts)))
+
+        manifest = dict(manifest, parts=parts, rows=min(rows, manifest['rows']))
+        manifest['updated_at'] = datetime.now().isoformat()
+        self._write_manifest(directory, manifest)
+
+        for old_file in old_files:
+            (directory / old_file).unlink(missing_ok=True)
+        return manifest
+
+    @staticmethod
+    def _write_part(directory: Path, frame: pd.DataFrame, number: int) -> Dict[str, Any]:
+        file_name = f"part-{int(time.time() * 1e6):x}-{number:05d}.parquet"
+        tmp_path = directory / f".{file_name}.tmp"
+        frame.to_parquet(tmp_path, index=True)
+        os.replace(tmp_path, directory / file_name)
+        return {'file': file_name, 'rows': len(frame)}
+
+    def _read_rows(
+        self,
+        directory: Path,
+        manifest: Dict[str, Any],
+        start: int,
+        stop: int,
+        columns: Optional[List[str]]
+    ) -> pd.DataFrame:
+        """Lee las filas [start, stop) saltándose las partes fuera del rango"""
+        frames = []
+        position = 0
+        for part in manifest['parts']:
+            part_start, part_stop = position, position + part['rows']
+            position = part_stop
+            if part_stop <= start or part_start >= stop:
+                continue
+            frame = pd.read_parquet(directory / part['file'], columns=columns)
+            frames.append(frame.iloc[max(start - part_start, 0):min(stop, part_stop) - part_start])
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    @staticmethod
+    def _positional(frame: pd.DataFrame) -> pd.DataFrame:
+        # Los grupos se alinean por posición con la base; no duplicar el índice
+        frame = frame.reset_index(drop=True)
+        frame.columns = [str(c) for c in frame.columns]
+        return frame
+
+    @staticmethod
+    def _read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(directory / "manifest.json", 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if manifest.get('version') == FEATURE_STORE_VERSION else None
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_manifest(directory: Path, manifest: Dict[str, Any]):
+        tmp_path = directory / "manifest.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, directory / "manifest.json")
+
+    def _latest_group_dirs(self, series_dir: Path) -> Dict[str, Path]:
+        """Directorio más reciente de cada grupo (una huella por nombre)"""
+        latest: Dict[str, Tuple[str, Path]] = {}
+        for group_dir in series_dir.iterdir():
+            if not group_dir.is_dir() or group_dir.name == BASE_DIR:
+                continue
+            manifest = self._read_manifest(group_dir)
+            if manifest is None:
+                continue
+            name = group_dir.name.rsplit('-', 1)[0]
+            if name not in latest or manifest['updated_at'] > latest[name][0]:
+                latest[name] = (manifest['updated_at'], group_dir)
+        return {name: path for name, (_, path) in latest.items()}
+
+    def _safe(self, func: Callable) -> Callable:
+        def wrapper(name: str):
+            try:
+                return func(name)
+            except Exception as e:
+                self._bump('group_errors')
+                logger.error(f"Error en grupo de features {name}: {e}")
+                return None
+        return wrapper
+
+    def _bump(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
@@ -30,6 +30,7 @@ from .symbol_database_manager import (
 )
 from .database import db_manager as legacy_db_manager
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -394,7 +395,7 @@ class HistoricalDataAdapter:
             return {'error': str(e)}
 
 # Instancia global del adaptador
-historical_data_adapter = HistoricalDataAdapter()
+historical_data_adapter = lazy_service('historical_data_adapter', HistoricalDataAdapter)
 
 # Funciones de conveniencia para compatibilidad
 def get_historical_data(
@@ -28,6 +28,7 @@ from .database import db_manager
 from .symbol_database_manager import symbol_db_manager
 from .historical_data_adapter import get_historical_data
 from core.config.unified_config import unified_config
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -497,7 +498,7 @@ class HistoricalDataManager:
         return recommendations
 
 # Instancia global del gestor
-historical_data_manager = HistoricalDataManager()
+historical_data_manager = lazy_service('historical_data_manager', HistoricalDataManager)
 
 # Funciones de conveniencia
 async def ensure_historical_data_coverage() -> Dict[str, Any]:
@@ -29,6 +29,7 @@ import yaml
 from .collector import BitgetDataCollector
 from .enterprise.database import TimescaleDBManager
 from .database import DatabaseManager
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -448,4 +449,4 @@ class HistoryAnalyzer:
         return report
 
 # Instancia global del analizador
-history_analyzer = HistoryAnalyzer()
+history_analyzer = lazy_service('history_analyzer', HistoryAnalyzer)
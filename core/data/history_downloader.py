@@ -29,6 +29,7 @@ from dataclasses import dataclass
 from .collector import BitgetDataCollector
 from .enterprise.database import TimescaleDBManager
 from .database import DatabaseManager
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -482,4 +483,4 @@ class HistoryDownloader:
             return False
 
 # Instancia global del descargador
-history_downloader = HistoryDownloader()
+history_downloader = lazy_service('history_downloader', HistoryDownloader)
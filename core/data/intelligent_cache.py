@@ -11,6 +11,7 @@ from typing import Dict, List, Tuple, Optional, Any, Union
 from pathlib import Path
 import json
 import pickle
+import gzip
 import hashlib
 import logging
 import threading
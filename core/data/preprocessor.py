@@ -33,76 +33,14 @@ import multiprocessing as mp
 from functools import partial
 import time
 from pathlib import Path
-import pickle
-import hashlib
 
 from .database import db_manager
+from .feature_store import FeatureStore, FEATURE_STORE_VERSION
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
-class FeatureCache:
-    """Cache inteligente para features calculados"""
-    
-    def __init__(self, cache_dir: Path = None):
-        if cache_dir is None:
-            from pathlib import Path
-            data_dir = Path(__file__).parent.parent.parent.parent / "data"
-            data_dir.mkdir(exist_ok=True)
-            self.cache_dir = data_dir / "feature_cache"
-        else:
-            self.cache_dir = Path(cache_dir)
-        
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_expiry_hours = 24  # Cache válido por 24 horas
-    
-    def _get_cache_key(self, symbol: str, start_date: datetime, end_date: datetime, 
-                      features_config: dict) -> str:
-        """Genera una clave única para el cache"""
-        key_data = f"{symbol}_{start_date}_{end_date}_{str(features_config)}"
-        return hashlib.md5(key_data.encode()).hexdigest()
-    
-    def get(self, cache_key: str) -> Optional[pd.DataFrame]:
-        """Obtiene datos del cache si están válidos"""
-        try:
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            
-            if not cache_file.exists():
-                return None
-            
-            # Verificar si el cache está expirado
-            file_age = time.time() - cache_file.stat().st_mtime
-            if file_age > (self.cache_expiry_hours * 3600):
-                cache_file.unlink()  # Eliminar cache expirado
-                return None
-            
-            with open(cache_file, 'rb') as f:
-                return pickle.load(f)
-                
-        except Exception as e:
-            logger.debug(f"Error accediendo cache: {e}")
-            return None
-    
-    def set(self, cache_key: str, data: pd.DataFrame):
-        """Guarda datos en el cache"""
-        try:
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
-        except Exception as e:
-            logger.debug(f"Error guardando en cache: {e}")
-    
-    def clear_expired(self):
-        """Limpia cache expirado"""
-        try:
-            current_time = time.time()
-            for cache_file in self.cache_dir.glob("*.pkl"):
-                file_age = current_time - cache_file.stat().st_mtime
-                if file_age > (self.cache_expiry_hours * 3600):
-                    cache_file.unlink()
-        except Exception as e:
-            logger.debug(f"Error limpiando cache: {e}")
-
 class TechnicalIndicatorsAdvanced:
     """Clase para calcular indicadores técnicos avanzados"""
     
@@ -742,8 +680,10 @@ class DataPreprocessorAdvanced:
         self.feature_columns = []
         self.feature_selector = None
         
-        # Cache de features
-        self.feature_cache = FeatureCache()
+        # Almacén de features por grupos (Parquet, invalidación por contenido)
+        self.feature_store = FeatureStore(
+            code_version=f"{FEATURE_STORE_VERSION}+ta{getattr(ta, '__version__', '')}"
+        )
         
         # Configuración desde usuario
         config_loader = ConfigLoader()
@@ -883,8 +823,34 @@ class DataPreprocessorAdvanced:
             logger.error(f"Error en limpieza inicial: {e}")
             return df
     
-    def add_all_technical_indicators_parallel(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Añade todos los indicadores técnicos usando paralelización"""
+    @staticmethod
+    def get_indicator_groups() -> Dict[str, Any]:
+        """Grupos de features, en el orden en que se combinan sus columnas"""
+        return {
+            'trend': TechnicalIndicatorsAdvanced.add_all_trend_indicators,
+            'momentum': TechnicalIndicatorsAdvanced.add_all_momentum_indicators,
+            'volatility': TechnicalIndicatorsAdvanced.add_all_volatility_indicators,
+            'volume': TechnicalIndicatorsAdvanced.add_all_volume_indicators,
+            'price_action': PriceActionFeaturesAdvanced.add_comprehensive_price_features,
+            'patterns': PriceActionFeaturesAdvanced.add_pattern_recognition_features,
+            'support_resistance': PriceActionFeaturesAdvanced.add_support_resistance_advanced,
+            'market_regime': MarketRegimeFeatures.add_market_regime_classification,
+            'microstructure': MarketRegimeFeatures.add_market_microstructure_features,
+            'time': TimeBasedFeatures.add_comprehensive_time_features,
+        }
+    
+    def add_all_technical_indicators_parallel(
+        self,
+        df: pd.DataFrame,
+        symbol: Optional[str] = None,
+        timeframe: str = "1h"
+    ) -> pd.DataFrame:
+        """
+        Añade todos los indicadores técnicos usando paralelización
+
+        Con ``symbol`` cada serie tiene su propia entrada en el feature store
+        (``{symbol}_{timeframe}``); sin él la clave se deduce del DataFrame.
+        """
         try:
             if df.empty:
                 return df
@@ -892,61 +858,15 @@ class DataPreprocessorAdvanced:
             logger.info("Calculando indicadores técnicos en paralelo...")
             start_time = time.time()
             
-            # Verificar cache
-            cache_key = self.feature_cache._get_cache_key(
-                df.get('symbol', ['UNKNOWN'])[0] if 'symbol' in df.columns else 'UNKNOWN',
-                df.index.min(),
-                df.index.max(),
-                {'indicators': 'all'}
+            # Grupos calculados/leídos desde el feature store; solo se recalcula
+            # lo que falta (grupos nuevos o modificados y filas nuevas)
+            combined_df = self.feature_store.materialize(
+                df,
+                self.get_indicator_groups(),
+                series_key=f"{symbol}_{timeframe}" if symbol else None,
+                max_workers=self.n_jobs
             )
             
-            cached_df = self.feature_cache.get(cache_key)
-            if cached_df is not None:
-                logger.info("Features técnicos obtenidos del cache")
-                return cached_df
-            
-            # Lista de funciones a ejecutar en paralelo
-            indicator_functions = [
-                TechnicalIndicatorsAdvanced.add_all_trend_indicators,
-                TechnicalIndicatorsAdvanced.add_all_momentum_indicators,
-                TechnicalIndicatorsAdvanced.add_all_volatility_indicators,
-                TechnicalIndicatorsAdvanced.add_all_volume_indicators,
-                PriceActionFeaturesAdvanced.add_comprehensive_price_features,
-                PriceActionFeaturesAdvanced.add_pattern_recognition_features,
-                PriceActionFeaturesAdvanced.add_support_resistance_advanced,
-                MarketRegimeFeatures.add_market_regime_classification,
-                MarketRegimeFeatures.add_market_microstructure_features,
-                TimeBasedFeatures.add_comprehensive_time_features
-            ]
-            
-            # Ejecutar funciones en paralelo
-            with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
-                # Preparar trabajos
-                futures = [executor.submit(func, df.copy()) for func in indicator_functions]
-                
-                # Recoger resultados
-                results = []
-                for i, future in enumerate(futures):
-                    try:
-                        result_df = future.result(timeout=60)  # 60 segundos timeout
-                        results.append(result_df)
-                        logger.debug(f"Indicador {i+1}/{len(indicator_functions)} completado")
-                    except Exception as e:
-                        logger.error(f"Error en indicador {i+1}: {e}")
-                        results.append(df.copy())  # Fallback al DataFrame original
-            
-            # Combinar todos los resultados
-            combined_df = df.copy()
-            for result_df in results:
-                # Solo agregar columnas nuevas
-                new_columns = [col for col in result_df.columns if col not in combined_df.columns]
-                if new_columns:
-                    for col in new_columns:
-                        combined_df[col] = result_df[col]
-            
-            # Guardar en cache
-            self.feature_cache.set(cache_key, combined_df)
-            
             calculation_time = time.time() - start_time
             logger.info(f"Indicadores técnicos calculados en {calculation_time:.2f}s. "
                        f"Features totales: {len(combined_df.columns)}")
@@ -1089,7 +1009,7 @@ class DataPreprocessorAdvanced:
                 return np.array([]), np.array([]), pd.DataFrame(), {}
             
             # 2. Añadir todos los indicadores técnicos (paralelizado)
-            df = self.add_all_technical_indicators_parallel(df)
+            df = self.add_all_technical_indicators_parallel(df, symbol=symbol)
             
             # 3. Crear variable objetivo
             df = self.create_target_variable_advanced(df, target_method, prediction_horizon)
@@ -1266,16 +1186,9 @@ class DataPreprocessorAdvanced:
         return categories
     
     def _get_cache_stats(self) -> Dict[str, Any]:
-        """Obtiene estadísticas del cache"""
+        """Obtiene estadísticas del feature store"""
         try:
-            cache_files = list(self.feature_cache.cache_dir.glob("*.pkl"))
-            total_size_mb = sum(f.stat().st_size for f in cache_files) / 1024 / 1024
-            
-            return {
-                'cache_files': len(cache_files),
-                'total_size_mb': round(total_size_mb, 2),
-                'cache_directory': str(self.feature_cache.cache_dir)
-            }
+            return self.feature_store.get_stats()
         except Exception as e:
             return {'error': str(e)}
     
@@ -1447,7 +1360,7 @@ class FeatureValidator:
             return 0.0
 
 # Instancia global del preprocessor
-data_preprocessor = DataPreprocessorAdvanced()
+data_preprocessor = lazy_service('data_preprocessor', DataPreprocessorAdvanced)
 
 # Funciones de utilidad para compatibilidad con código existente
 def prepare_training_data(symbol: str = "BTCUSDT", days_back: int = 100, 
@@ -27,6 +27,7 @@ import json
 import gzip
 import pickle
 from dataclasses import dataclass, asdict
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -460,7 +461,7 @@ class SymbolDatabaseManager:
         self.close_all_connections()
 
 # Instancia global del gestor
-symbol_db_manager = SymbolDatabaseManager()
+symbol_db_manager = lazy_service('symbol_db_manager', SymbolDatabaseManager)
 
 # Funciones de conveniencia
 def insert_ohlcv_data(symbol: str, timeframe: str, data: List[OHLCVData]) -> int:
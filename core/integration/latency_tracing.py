@@ -0,0 +1,434 @@
+# Ruta: core/integration/latency_tracing.py
+"""
+Trazas de latencia por etapa en la ruta señal -> orden
+======================================================
+
+Instrumentación ligera de la ruta de decisión (MLSignalGenerator,
+SignalProcessor, RiskManager, OrderManager/OrderExecutor) para saber en qué
+etapa se va el tiempo de un trade lento:
+
+    data_fetch -> indicators -> inference -> signal_filtering -> risk_check -> order_submit
+
+- Cada decisión abre una traza con un ``trace_id`` propio; los spans que se
+  ejecutan dentro (también en tareas asyncio hijas) lo heredan vía contextvars
+- Histogramas de latencia por etapa y componente (buckets fijos, p50/p95/p99)
+- Exportación a Prometheus (histograma ``signal_path_stage_latency_seconds``
+  en el REGISTRY por defecto que sirve PrometheusMetrics) si prometheus_client
+  está instalado
+- Exportación a JSON en formato Chrome Trace Event, visible en
+  chrome://tracing o https://ui.perfetto.dev (una pista por decisión)
+
+Desactivado (por defecto) el coste es una comprobación de atributo por
+llamada: ``span()`` y ``trace()`` devuelven un context manager vacío
+compartido y ``@traced`` llama directamente a la función.
+
+Los tiempos de una etapa son inclusivos: un span de data_fetch dentro de
+signal_filtering cuenta en ambas etapas.
+
+Configuración por entorno:
+    LATENCY_TRACING=1                      activa el trazado al importar
+    LATENCY_TRACE_FILE=logs/latency_trace.json   fichero que se escribe al salir
+
+Uso:
+    from core.integration.latency_tracing import latency_tracer, traced
+
+    @traced('risk_check')
+    def calculate_position_size(...): ...
+
+    with latency_tracer.trace('decision', symbol='BTCUSDT') as trace_id:
+        with latency_tracer.span('order_submit', 'OrderManager'):
+            ...
+    latency_tracer.export_chrome_trace('logs/latency_trace.json')
+"""
+
+import asyncio
+import atexit
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+try:
+    from prometheus_client import Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('data_fetch', 'indicators', 'inference', 'signal_filtering', 'risk_check', 'order_submit')
+
+# Buckets en segundos (compartidos por los histogramas internos y Prometheus)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+PROMETHEUS_METRIC = 'signal_path_stage_latency_seconds'
+
+# Trazas recientes cuya pista se recuerda (para continuar una decisión más tarde)
+MAX_TRACKED_TRACES = 10_000
+
+# (trace_id, pista) de la decisión en curso
+_current_trace: contextvars.ContextVar[Optional[Tuple[str, int]]] = contextvars.ContextVar(
+    'latency_trace', default=None
+)
+
+
+class StageHistogram:
+    """Histograma acumulativo de latencias con buckets fijos"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # último: > mayor bucket
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Cuantil estimado por interpolación lineal dentro del bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                fraction = (rank - cumulative) / bucket_count
+                return min(self.max, lower + (upper - lower) * fraction)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class _NoopSpan:
+    """Context manager vacío devuelto con el trazado desactivado"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'stage', 'component', 'operation', 'attrs', 'start_ns')
+
+    def __init__(self, tracer: 'LatencyTracer', stage: str, component: str,
+                 operation: Optional[str], attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.stage = stage
+        self.component = component
+        self.operation = operation
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._record(self, self.start_ns, end_ns, _current_trace.get())
+        return False
+
+
+class _TraceScope:
+    """Abre (o continúa) una traza y registra su span raíz"""
+
+    __slots__ = ('tracer', 'span', 'trace_id', 'token')
+
+    def __init__(self, tracer: 'LatencyTracer', name: str, component: str,
+                 trace_id: Optional[str], attrs: Dict[str, Any], operation: Optional[str] = None):
+        self.tracer = tracer
+        self.span = _Span(tracer, name, component, operation, attrs)
+        self.trace_id = trace_id
+        self.token = None
+
+    def __enter__(self) -> str:
+        current = _current_trace.get()
+        if self.trace_id is None and current is not None:
+            # Ya hay una decisión en curso: span anidado dentro de ella
+            self.trace_id = current[0]
+        elif current is None or current[0] != self.trace_id:
+            trace_id = self.trace_id or uuid.uuid4().hex[:16]
+            track = self.tracer._track_for(trace_id, self.span.attrs.get('symbol'))
+            self.token = _current_trace.set((trace_id, track))
+            self.trace_id = trace_id
+        self.span.__enter__()
+        return self.trace_id
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.__exit__(exc_type, exc, tb)
+        if self.token is not None:
+            _current_trace.reset(self.token)
+        return False
+
+
+class LatencyTracer:
+    """Spans por etapa con histogramas, Prometheus y exportación Chrome Trace"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        trace_file: Optional[str] = None,
+        max_events: int = 200_000,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.buckets = tuple(buckets)
+
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._histograms: Dict[Tuple[str, str], StageHistogram] = {}
+        self._tracks: Dict[str, int] = {}
+        self._trace_count = 0
+        self._lock = threading.Lock()
+        self._prometheus = None
+        self._pid = os.getpid()
+
+        # Reloj: perf_counter para duraciones, anclado a epoch para el fichero
+        self._wall_origin_ns = time.time_ns()
+        self._perf_origin_ns = time.perf_counter_ns()
+
+    # ----------------------------- Control -----------------------------
+
+    def enable(self, trace_file: Optional[str] = None):
+        if trace_file:
+            self.trace_file = trace_file
+        if PROMETHEUS_AVAILABLE and self._prometheus is None:
+            self._prometheus = _prometheus_histogram(self.buckets)
+        self.enabled = True
+        logger.info(f"⏱️ Trazado de latencia activado (fichero: {self.trace_file or 'ninguno'})")
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._events.clear()
+            self._histograms.clear()
+            self._tracks.clear()
+
+    # ----------------------------- Instrumentación -----------------------------
+
+    def span(self, stage: str, component: str = '', operation: Optional[str] = None, **attrs):
+        """Context manager que mide una etapa; no-op con el trazado desactivado"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, stage, component, operation, attrs)
+
+    def trace(self, name: str = 'decision', component: str = '',
+              trace_id: Optional[str] = None, **attrs):
+        """
+        Abre una traza de decisión (o continúa ``trace_id``) y devuelve su id
+
+        Si ya hay una traza activa y no se pasa ``trace_id``, se anida en ella.
+        Con el trazado desactivado devuelve un context manager vacío (``None``).
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _TraceScope(self, name, component, trace_id, attrs)
+
+    @staticmethod
+    def current_trace_id() -> Optional[str]:
+        current = _current_trace.get()
+        return current[0] if current else None
+
+    def _track_for(self, trace_id: str, label: Optional[str]) -> int:
+        with self._lock:
+            track = self._tracks.get(trace_id)
+            if track is None:
+                self._trace_count += 1
+                track = self._tracks[trace_id] = self._trace_count
+                if len(self._tracks) > MAX_TRACKED_TRACES:
+                    self._tracks.pop(next(iter(self._tracks)))
+                name = f"{label} · {trace_id}" if label else trace_id
+                self._events.append({
+                    'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': track,
+                    'args': {'name': name}
+                })
+            return track
+
+    def _record(self, span: _Span, start_ns: int, end_ns: int,
+                trace: Optional[Tuple[str, int]]):
+        seconds = (end_ns - start_ns) / 1e9
+        args = dict(span.attrs)
+        if trace is not None:
+            args['trace_id'] = trace[0]
+        event = {
+            'name': span.operation or span.stage,
+            'cat': f"{span.stage},{span.component}" if span.component else span.stage,
+            'ph': 'X',
+            'ts': (self._wall_origin_ns + start_ns - self._perf_origin_ns) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': self._pid,
+            'tid': trace[1] if trace is not None else threading.get_ident(),
+            'args': args,
+        }
+        key = (span.stage, span.component)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = StageHistogram(self.buckets)
+            histogram.observe(seconds)
+            self._events.append(event)
+        if self._prometheus is not None:
+            try:
+                self._prometheus.labels(stage=span.stage, component=span.component).observe(seconds)
+            except Exception as e:
+                logger.debug(f"Error exportando latencia a Prometheus: {e}")
+
+    # ----------------------------- Resultados -----------------------------
+
+    def get_histograms(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Resumen por etapa y componente: {stage: {component: {count, p50_ms, ...}}}"""
+        with self._lock:
+            items = list(self._histograms.items())
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (stage, component), histogram in sorted(items):
+            result.setdefault(stage, {})[component or '-'] = histogram.summary()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'events_buffered': len(self._events),
+                'traces': self._trace_count,
+                'prometheus': self._prometheus is not None,
+                'trace_file': self.trace_file,
+            }
+
+    def export_chrome_trace(self, path: Optional[str] = None) -> Optional[Path]:
+        """Escribe los eventos en formato Chrome Trace Event (chrome://tracing, Perfetto)"""
+        target = Path(path or self.trace_file or 'logs/latency_trace.json')
+        with self._lock:
+            events = list(self._events)
+        if not events:
+            return None
+        document = {
+            'traceEvents': [
+                {'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': 'bot_trading'}}
+            ] + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'stages': list(STAGES), 'histograms': self.get_histograms()},
+        }
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(target.suffix + '.tmp')
+            tmp.write_text(json.dumps(document, default=str))
+            os.replace(tmp, target)
+            logger.info(f"💾 Traza de latencia exportada: {target} ({len(events)} eventos)")
+            return target
+        except Exception as e:
+            logger.error(f"Error exportando traza de latencia: {e}")
+            return None
+
+
+_PROMETHEUS_HISTOGRAM = None
+
+
+def _prometheus_histogram(buckets: Tuple[float, ...]):
+    """Histograma de Prometheus compartido (se registra una sola vez por proceso)"""
+    global _PROMETHEUS_HISTOGRAM
+    if _PROMETHEUS_HISTOGRAM is None:
+        try:
+            _PROMETHEUS_HISTOGRAM = Histogram(
+                PROMETHEUS_METRIC,
+                'Latencia por etapa en la ruta señal -> orden',
+                ['stage', 'component'],
+                buckets=list(buckets)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo registrar {PROMETHEUS_METRIC}: {e}")
+    return _PROMETHEUS_HISTOGRAM
+
+
+def traced(stage: str, component: Optional[str] = None, root: bool = False,
+           tracer: Optional[LatencyTracer] = None):
+    """
+    Decorador de funciones síncronas o async
+
+    Args:
+        stage: Etapa de la ruta (ver STAGES)
+        component: Componente; por defecto la clase del método
+        root: Abre una traza de decisión si no hay ninguna activa
+        tracer: Tracer a usar (por defecto ``latency_tracer``)
+    """
+    def decorate(func: Callable) -> Callable:
+        qualname = func.__qualname__.split('.')
+        name = component or (qualname[-2] if len(qualname) > 1 else func.__module__.rsplit('.', 1)[-1])
+        operation = func.__name__
+
+        def scope(active: LatencyTracer):
+            if root:
+                return _TraceScope(active, stage, name, None, {}, operation)
+            return _Span(active, stage, name, operation, {})
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                active = tracer or latency_tracer
+                if not active.enabled:
+                    return await func(*args, **kwargs)
+                with scope(active):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = tracer or latency_tracer
+            if not active.enabled:
+                return func(*args, **kwargs)
+            with scope(active):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _env_enabled() -> bool:
+    return os.getenv('LATENCY_TRACING', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+latency_tracer = LatencyTracer(trace_file=os.getenv('LATENCY_TRACE_FILE', 'logs/latency_trace.json'))
+if _env_enabled():
+    latency_tracer.enable()
+
+
+@atexit.register
+def _export_on_exit():
+    if latency_tracer.enabled and latency_tracer.trace_file:
+        latency_tracer.export_chrome_trace()
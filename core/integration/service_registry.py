@@ -0,0 +1,195 @@
+# Ruta: core/integration/service_registry.py
+"""
+Registro de servicios perezoso
+==============================
+
+Los servicios globales del bot (db_manager, signal_processor, bitget_client,
+risk_manager, trading_executor, monitores y componentes de compliance) se
+declaraban como ``servicio = Clase()`` al final de cada módulo, de modo que
+cualquier import construía objetos pesados: leer configuración, abrir
+SQLite por símbolo, crear clientes, etc.
+
+Este módulo mantiene un registro de factorías y expone ``LazyService``, un
+proxy que se sustituye al singleton en el módulo original. El import sigue
+funcionando igual (``from core.data.database import db_manager``), pero la
+instancia real se construye en el primer acceso a un atributo.
+
+Uso:
+    db_manager = lazy_service('db_manager', DatabaseManager)
+
+    service_registry.is_initialized('db_manager')  # False hasta usarse
+    service_registry.get('db_manager')             # instancia real
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Registro de factorías con construcción en el primer acceso"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_times_ms: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any], replace: bool = False):
+        """
+        Registra la factoría de un servicio
+
+        Args:
+            name: Nombre del servicio
+            factory: Callable sin argumentos que construye la instancia
+            replace: Permite reemplazar una factoría existente
+        """
+        with self._lock:
+            if name in self._factories and not replace:
+                return
+            self._factories[name] = factory
+            if replace:
+                self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Devuelve la instancia del servicio, construyéndola si es necesario"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+
+            factory = self._factories.get(name)
+            if factory is None:
+                raise KeyError(f"Servicio no registrado: {name}")
+
+            start = time.perf_counter()
+            instance = factory()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._instances[name] = instance
+            self._init_times_ms[name] = elapsed_ms
+            logger.debug(f"Servicio '{name}' inicializado en {elapsed_ms:.1f}ms")
+            return instance
+
+    def set(self, name: str, instance: Any):
+        """Fija una instancia concreta (útil en tests)"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    def reset(self, name: Optional[str] = None):
+        """Descarta una instancia (o todas) para reconstruirla en el siguiente acceso"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._init_times_ms.clear()
+            else:
+                self._instances.pop(name, None)
+                self._init_times_ms.pop(name, None)
+
+    def registered(self) -> List[str]:
+        return list(self._factories)
+
+    def initialized(self) -> List[str]:
+        return list(self._instances)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Servicios registrados, inicializados y tiempo de construcción"""
+        with self._lock:
+            return {
+                'registered': len(self._factories),
+                'initialized': len(self._instances),
+                'init_times_ms': dict(self._init_times_ms),
+                'pending': [name for name in self._factories if name not in self._instances]
+            }
+
+
+service_registry = ServiceRegistry()
+
+
+class LazyService:
+    """
+    Proxy de un servicio del registro
+
+    Reenvía el acceso a atributos y los protocolos habituales (truth test,
+    ``len``, iteración, ``in``, ``with``/``async with``, ``isinstance``) a la
+    instancia real, que se construye la primera vez que se necesita.
+    """
+
+    __slots__ = ('_service_name', '_registry')
+
+    def __init__(self, name: str, registry: ServiceRegistry = service_registry):
+        object.__setattr__(self, '_service_name', name)
+        object.__setattr__(self, '_registry', registry)
+
+    def _resolve(self) -> Any:
+        return self._registry.get(self._service_name)
+
+    @property
+    def __class__(self):
+        # isinstance(proxy, Clase) se comprueba contra la instancia real
+        return self._resolve().__class__
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._resolve(), attr, value)
+
+    def __delattr__(self, attr: str):
+        delattr(self._resolve(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __bool__(self) -> bool:
+        return bool(self._resolve())
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._resolve()
+
+    def __enter__(self):
+        return self._resolve().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._resolve().__exit__(exc_type, exc, tb)
+
+    async def __aenter__(self):
+        return await self._resolve().__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._resolve().__aexit__(exc_type, exc, tb)
+
+    def __repr__(self) -> str:
+        if self._registry.is_initialized(self._service_name):
+            return repr(self._resolve())
+        return f"<LazyService '{self._service_name}' (no inicializado)>"
+
+
+def lazy_service(
+    name: str,
+    factory: Callable[[], Any],
+    registry: ServiceRegistry = service_registry
+) -> LazyService:
+    """Registra una factoría y devuelve el proxy perezoso del servicio"""
+    registry.register(name, factory)
+    return LazyService(name, registry)
+
+
+def get_service(name: str) -> Any:
+    """Obtiene la instancia real de un servicio registrado"""
+    return service_registry.get(name)
@@ -31,7 +31,7 @@ from .model_architecture import (
 # from .distributed_trainer import DistributedTrainer
 # from .hyperparameter_tuner import HyperparameterTuner
 # from .experiment_manager import ExperimentManager
-# from .checkpoint_manager import CheckpointManager
+from .checkpoint_manager import CheckpointManager
 # from .model_registry import ModelRegistry
 from .data_module import TradingDataModule
 from .callbacks import EnterpriseCallbacks
@@ -52,7 +52,7 @@ __all__ = [
     # "DistributedTrainer",
     # "HyperparameterTuner",
     # "ExperimentManager",
-    # "CheckpointManager",
+    "CheckpointManager",
     # "ModelRegistry",
     
     # Datos y utilidades
@@ -6,10 +6,10 @@
 Callbacks personalizados para PyTorch Lightning.
 
 Características:
-- Monitoreo de gradientes
+- Monitoreo de gradientes (reducción fusionada, acumulación en dispositivo)
 - Tracking de complejidad del modelo
 - Validación de calidad de datos
-- Métricas de trading especializadas
+- Métricas de trading especializadas (matriz de confusión acumulada)
 - Alertas automáticas
 """
 
@@ -24,53 +24,141 @@ from typing import Any, Dict, Optional, List
 import matplotlib.pyplot as plt
 from pathlib import Path
 import json
+from datetime import datetime
 
 # Importar ConfigLoader
 from core.config.config_loader import ConfigLoader
+from core.ml.enterprise.checkpoint_manager import CheckpointManager
 
 logger = logging.getLogger(__name__)
 
+def _grad_norms(grads: List[torch.Tensor]) -> torch.Tensor:
+    """Normas L2 de una lista de gradientes en una reducción multi-tensor"""
+    if hasattr(torch, '_foreach_norm'):
+        return torch.stack(torch._foreach_norm(grads, 2)).float()
+    return torch.stack([torch.linalg.vector_norm(g, 2) for g in grads]).float()
+
 class GradientNormCallback(Callback):
-    """Callback para monitorear normas de gradientes"""
+    """
+    Callback para monitorear normas de gradientes
+
+    Las normas de todos los gradientes se calculan con una reducción
+    multi-tensor (torch._foreach_norm) y se acumulan en el dispositivo: norma
+    global y por grupo (módulo de primer nivel) y, opcionalmente, por capa.
+    Solo se sincroniza con el host al volcar, cada ``log_every_n_steps``
+    pasos, con un único ``tolist()``.
+    """
     
-    def __init__(self, log_every_n_steps: int = 100):
+    def __init__(
+        self,
+        log_every_n_steps: int = 100,
+        sample_every_n_steps: int = 1,
+        per_layer: bool = False,
+        explosive_threshold: float = 10.0,
+        vanishing_threshold: float = 1e-6
+    ):
         super().__init__()
         self.log_every_n_steps = log_every_n_steps
+        self.sample_every_n_steps = sample_every_n_steps
+        self.per_layer = per_layer
+        self.explosive_threshold = explosive_threshold
+        self.vanishing_threshold = vanishing_threshold
         self.gradient_norms = []
         
-    def on_before_optimizer_step(self, trainer, pl_module, optimizer, optimizer_idx):
-        """Calcula y registra normas de gradientes"""
+        self._params: List[nn.Parameter] = []
+        self._names: List[str] = []
+        self._groups: List[str] = []
+        self._group_index: Optional[torch.Tensor] = None
+        self._stats: Optional[Dict[str, torch.Tensor]] = None
+    
+    def _setup(self, pl_module):
+        named = [(name, param) for name, param in pl_module.named_parameters() if param.requires_grad]
+        self._names = [name for name, _ in named]
+        self._params = [param for _, param in named]
+        self._groups = sorted({name.split('.')[0] for name in self._names})
+        position = {group: i for i, group in enumerate(self._groups)}
+        device = self._params[0].device if self._params else torch.device('cpu')
+        self._group_index = torch.tensor(
+            [position[name.split('.')[0]] for name in self._names], dtype=torch.long, device=device
+        )
+        self._reset(device)
+    
+    def _reset(self, device):
+        zeros = lambda n: torch.zeros(n, dtype=torch.float32, device=device)
+        self._stats = {
+            'total_sum': zeros(1), 'total_max': zeros(1),
+            'explosive': zeros(1), 'vanishing': zeros(1), 'samples': zeros(1),
+            'group_sq': zeros(len(self._groups)),
+            'layer_sum': zeros(len(self._names)) if self.per_layer else zeros(0),
+        }
+    
+    def on_fit_start(self, trainer, pl_module):
+        self._setup(pl_module)
+    
+    def on_before_optimizer_step(self, trainer, pl_module, optimizer, optimizer_idx=None):
+        """Acumula normas de gradientes en el dispositivo y vuelca cada N pasos"""
+        if self._stats is None:
+            self._setup(pl_module)
+        
+        if trainer.global_step % self.sample_every_n_steps == 0:
+            present = [(i, p.grad) for i, p in enumerate(self._params) if p.grad is not None]
+            if present:
+                index = [i for i, _ in present]
+                grads = [g.detach() for _, g in present]
+                norms = _grad_norms(grads)
+                total = norms.square().sum().sqrt()
+                stats = self._stats
+                
+                stats['total_sum'] += total
+                torch.maximum(stats['total_max'], total, out=stats['total_max'])
+                stats['explosive'] += (total > self.explosive_threshold).float()
+                stats['vanishing'] += (total < self.vanishing_threshold).float()
+                stats['samples'] += 1
+                
+                positions = self._group_index if len(index) == len(self._params) else self._group_index[index]
+                stats['group_sq'].index_add_(0, positions, norms.square())
+                if self.per_layer:
+                    if len(index) == len(self._params):
+                        stats['layer_sum'] += norms
+                    else:
+                        stats['layer_sum'].index_add_(0, torch.tensor(index, device=norms.device), norms)
+        
         if trainer.global_step % self.log_every_n_steps == 0:
-            total_norm = 0
-            param_count = 0
-            
-            for name, param in pl_module.named_parameters():
-                if param.grad is not None:
-                    param_norm = param.grad.data.norm(2)
-                    total_norm += param_norm.item() ** 2
-                    param_count += 1
-                    
-                    # Log gradientes por capa
-                    pl_module.log(f"grad_norm/{name}", param_norm.item(), on_step=True)
-            
-            total_norm = total_norm ** (1. / 2)
-            self.gradient_norms.append(total_norm)
-            
-            pl_module.log("grad_norm/total", total_norm, on_step=True)
-            
-            # Detectar gradientes explosivos
-            if total_norm > 10.0:
-                logger.warning(f"Gradientes explosivos detectados: {total_norm:.4f}")
-                pl_module.log("grad_norm/explosive", 1.0, on_step=True)
-            else:
-                pl_module.log("grad_norm/explosive", 0.0, on_step=True)
-            
-            # Detectar gradientes que se desvanecen
-            if total_norm < 1e-6:
-                logger.warning(f"Gradientes que se desvanecen detectados: {total_norm:.4f}")
-                pl_module.log("grad_norm/vanishing", 1.0, on_step=True)
-            else:
-                pl_module.log("grad_norm/vanishing", 0.0, on_step=True)
+            self._flush(pl_module)
+    
+    def _flush(self, pl_module):
+        """Vuelca las estadísticas acumuladas (una sincronización con el host)"""
+        stats = self._stats
+        values = torch.cat([stats[key] for key in ('total_sum', 'total_max', 'explosive', 'vanishing',
+                                                   'samples', 'group_sq', 'layer_sum')]).tolist()
+        self._reset(stats['samples'].device)
+        
+        total_sum, total_max, explosive, vanishing, samples = values[:5]
+        if not samples:
+            return
+        group_sq = values[5:5 + len(self._groups)]
+        layer_sum = values[5 + len(self._groups):]
+        
+        total_mean = total_sum / samples
+        self.gradient_norms.append(total_mean)
+        
+        pl_module.log("grad_norm/total", total_mean, on_step=True)
+        pl_module.log("grad_norm/total_max", total_max, on_step=True)
+        for group, value in zip(self._groups, group_sq):
+            # Norma cuadrática media del grupo en la ventana
+            pl_module.log(f"grad_norm/group/{group}", (value / samples) ** 0.5, on_step=True)
+        for name, value in zip(self._names, layer_sum):
+            pl_module.log(f"grad_norm/{name}", value / samples, on_step=True)
+        
+        # Detectar gradientes explosivos
+        if explosive:
+            logger.warning(f"Gradientes explosivos detectados en {int(explosive)} pasos (máx {total_max:.4f})")
+        pl_module.log("grad_norm/explosive", explosive / samples, on_step=True)
+        
+        # Detectar gradientes que se desvanecen
+        if vanishing:
+            logger.warning(f"Gradientes que se desvanecen detectados en {int(vanishing)} pasos")
+        pl_module.log("grad_norm/vanishing", vanishing / samples, on_step=True)
 
 class ModelComplexityCallback(Callback):
     """Callback para monitorear complejidad del modelo"""
@@ -181,84 +269,109 @@ class DataQualityCallback(Callback):
             logger.error(f"Error verificando calidad de datos: {e}")
 
 class TradingMetricsCallback(Callback):
-    """Callback para métricas específicas de trading"""
+    """
+    Callback para métricas específicas de trading
+
+    Acumula en el dispositivo una matriz de confusión y las sumas de
+    confianza y entropía por lote, en lugar de guardar todas las
+    predicciones de la época; al final de la validación se lee con una
+    única sincronización.
+    """
     
-    def __init__(self):
+    CLASS_NAMES = ['SELL', 'HOLD', 'BUY']
+    
+    def __init__(self, num_classes: int = 3):
         super().__init__()
-        self.predictions = []
-        self.targets = []
-        
-    def on_validation_batch_end(self, trainer, pl_module, outputs, batch, batch_idx):
-        """Recolecta predicciones y targets para métricas de trading"""
-        if outputs is not None:
-            if isinstance(outputs, dict):
-                preds = outputs.get('logits', outputs.get('predictions'))
-                targets = batch[1] if isinstance(batch, (list, tuple)) else batch['target']
-            else:
-                preds = outputs
-                targets = batch[1] if isinstance(batch, (list, tuple)) else batch['target']
+        self.num_classes = num_classes
+        self.confusion: Optional[torch.Tensor] = None
+        self.confidence_sum: Optional[torch.Tensor] = None
+        self.entropy_sum: Optional[torch.Tensor] = None
+    
+    def _reset(self):
+        self.confusion = None
+        self.confidence_sum = None
+        self.entropy_sum = None
+    
+    def on_validation_epoch_start(self, trainer, pl_module):
+        self._reset()
+        
+    def on_validation_batch_end(self, trainer, pl_module, outputs, batch, batch_idx, dataloader_idx=0):
+        """Actualiza la matriz de confusión y las sumas de confianza/entropía"""
+        if outputs is None:
+            return
+        if isinstance(outputs, dict):
+            preds = outputs.get('logits', outputs.get('predictions'))
+        else:
+            preds = outputs
+        targets = batch[1] if isinstance(batch, (list, tuple)) else batch['target']
+        
+        # Solo logits por muestra (las validaciones que devuelven la loss no aportan)
+        if preds is None or targets is None or preds.dim() != 2:
+            return
+        
+        with torch.no_grad():
+            preds = preds.detach()
+            targets = targets.detach().long()
+            n = self.num_classes
+            if self.confusion is None:
+                self.confusion = torch.zeros(n * n, dtype=torch.long, device=preds.device)
+                self.confidence_sum = torch.zeros((), dtype=torch.float32, device=preds.device)
+                self.entropy_sum = torch.zeros((), dtype=torch.float32, device=preds.device)
             
-            if preds is not None and targets is not None:
-                self.predictions.append(preds.detach().cpu())
-                self.targets.append(targets.detach().cpu())
+            pred_classes = torch.argmax(preds, dim=1)
+            self.confusion += torch.bincount(targets * n + pred_classes, minlength=n * n)
+            
+            probs = torch.softmax(preds.float(), dim=1)
+            self.confidence_sum += probs.max(dim=1)[0].sum()
+            self.entropy_sum += -(probs * torch.log(probs + 1e-8)).sum()
     
     def on_validation_epoch_end(self, trainer, pl_module):
         """Calcula métricas de trading al final de la validación"""
-        if not self.predictions or not self.targets:
+        if self.confusion is None:
             return
         
         try:
-            # Concatenar todas las predicciones y targets
-            all_preds = torch.cat(self.predictions, dim=0)
-            all_targets = torch.cat(self.targets, dim=0)
-            
-            # Convertir predicciones a clases
-            pred_classes = torch.argmax(all_preds, dim=1)
-            
-            # Calcular métricas de trading
-            metrics = self._calculate_trading_metrics(all_preds, all_targets, pred_classes)
+            metrics = self._calculate_trading_metrics()
             
             # Log métricas
             for metric_name, value in metrics.items():
                 pl_module.log(f"trading/{metric_name}", value, on_epoch=True)
             
-            # Limpiar listas para el siguiente epoch
-            self.predictions.clear()
-            self.targets.clear()
-            
         except Exception as e:
             logger.error(f"Error calculando métricas de trading: {e}")
+        finally:
+            self._reset()
     
-    def _calculate_trading_metrics(self, preds, targets, pred_classes):
-        """Calcula métricas específicas de trading"""
+    def _calculate_trading_metrics(self) -> Dict[str, float]:
+        """Calcula métricas específicas de trading desde los contadores acumulados"""
+        n = self.num_classes
+        values = torch.cat([
+            self.confusion.float(), self.confidence_sum.view(1), self.entropy_sum.view(1)
+        ]).tolist()
+        confusion = np.array(values[:n * n]).reshape(n, n)
+        confidence_sum, entropy_sum = values[n * n:]
+        total = confusion.sum()
+        names = self.CLASS_NAMES if n == len(self.CLASS_NAMES) else [f"class_{i}" for i in range(n)]
         metrics = {}
+        if total == 0:
+            return metrics
         
         # Accuracy por clase
-        for class_id in range(3):  # 0=SELL, 1=HOLD, 2=BUY
-            class_mask = targets == class_id
-            if class_mask.sum() > 0:
-                class_accuracy = (pred_classes[class_mask] == targets[class_mask]).float().mean()
-                class_names = ['SELL', 'HOLD', 'BUY']
-                metrics[f'accuracy_{class_names[class_id].lower()}'] = class_accuracy.item()
-        
-        # Distribución de predicciones
-        pred_dist = torch.bincount(pred_classes, minlength=3).float() / len(pred_classes)
-        for i, class_name in enumerate(['SELL', 'HOLD', 'BUY']):
-            metrics[f'pred_distribution_{class_name.lower()}'] = pred_dist[i].item()
-        
-        # Distribución de targets
-        target_dist = torch.bincount(targets, minlength=3).float() / len(targets)
-        for i, class_name in enumerate(['SELL', 'HOLD', 'BUY']):
-            metrics[f'target_distribution_{class_name.lower()}'] = target_dist[i].item()
-        
-        # Confianza promedio
-        confidence = torch.max(torch.softmax(preds, dim=1), dim=1)[0].mean()
-        metrics['average_confidence'] = confidence.item()
-        
-        # Entropía promedio
-        probs = torch.softmax(preds, dim=1)
-        entropy = -torch.sum(probs * torch.log(probs + 1e-8), dim=1).mean()
-        metrics['average_entropy'] = entropy.item()
+        target_counts = confusion.sum(axis=1)
+        for class_id, class_name in enumerate(names):
+            if target_counts[class_id] > 0:
+                metrics[f'accuracy_{class_name.lower()}'] = float(confusion[class_id, class_id] / target_counts[class_id])
+        
+        # Distribución de predicciones y de targets
+        pred_counts = confusion.sum(axis=0)
+        for class_id, class_name in enumerate(names):
+            metrics[f'pred_distribution_{class_name.lower()}'] = float(pred_counts[class_id] / total)
+        for class_id, class_name in enumerate(names):
+            metrics[f'target_distribution_{class_name.lower()}'] = float(target_counts[class_id] / total)
+        
+        # Confianza y entropía promedio
+        metrics['average_confidence'] = confidence_sum / total
+        metrics['average_entropy'] = entropy_sum / total
         
         return metrics
 
@@ -305,52 +418,88 @@ class LearningRateSchedulerCallback(Callback):
             self.wait = 0
 
 class ModelCheckpointCallback(Callback):
-    """Callback personalizado para guardar checkpoints con métricas adicionales"""
+    """
+    Callback personalizado para guardar checkpoints con métricas adicionales
+
+    Delegado en CheckpointManager: solo se copian y escriben las épocas que
+    entran en el top-k, y la serialización ocurre en un hilo de fondo.
+    """
     
-    def __init__(self, save_dir: str = "checkpoints", save_top_k: int = 3):
+    def __init__(
+        self,
+        save_dir: str = "checkpoints",
+        save_top_k: int = 3,
+        monitor: str = "val_loss",
+        mode: str = "min",
+        save_last: bool = False,
+        last_delta: bool = False,
+        max_pending: int = 2
+    ):
         super().__init__()
         self.save_dir = Path(save_dir)
-        self.save_dir.mkdir(parents=True, exist_ok=True)
         self.save_top_k = save_top_k
-        self.checkpoints = []
+        self.monitor = monitor
+        self.manager = CheckpointManager(
+            save_dir=save_dir,
+            save_top_k=save_top_k,
+            mode=mode,
+            save_last=save_last,
+            last_delta=last_delta,
+            max_pending=max_pending
+        )
+    
+    @property
+    def checkpoints(self):
+        return self.manager.top_k()
         
     def on_validation_epoch_end(self, trainer, pl_module):
         """Guarda checkpoint con métricas adicionales"""
+        if trainer.sanity_checking:
+            return
         try:
             # Obtener métricas actuales
             metrics = trainer.callback_metrics
+            default = float('inf') if self.manager.mode == "min" else float('-inf')
+            score = metrics.get(self.monitor, default)
             
             # Crear información del checkpoint
             checkpoint_info = {
                 'epoch': trainer.current_epoch,
                 'global_step': trainer.global_step,
-                'val_loss': metrics.get('val_loss', float('inf')),
-                'val_accuracy': metrics.get('val_accuracy', 0.0),
-                'timestamp': trainer.logger.experiment.start_time if hasattr(trainer.logger, 'experiment') else None
+                self.monitor: float(score),
+                'val_loss': float(metrics.get('val_loss', float('inf'))),
+                'val_accuracy': float(metrics.get('val_accuracy', 0.0)),
+                'timestamp': datetime.now().isoformat()
             }
             
-            # Guardar checkpoint
-            checkpoint_path = self.save_dir / f"checkpoint_epoch_{trainer.current_epoch:03d}.pth"
-            torch.save({
-                'model_state_dict': pl_module.state_dict(),
-                'optimizer_state_dict': trainer.optimizers[0].state_dict(),
-                'epoch': trainer.current_epoch,
-                'metrics': checkpoint_info
-            }, checkpoint_path)
-            
-            # Mantener solo los mejores checkpoints
-            self.checkpoints.append((checkpoint_path, checkpoint_info['val_loss']))
-            self.checkpoints.sort(key=lambda x: x[1])
-            
-            if len(self.checkpoints) > self.save_top_k:
-                # Eliminar el peor checkpoint
-                worst_checkpoint = self.checkpoints.pop()
-                worst_checkpoint[0].unlink()
+            # El state_dict del optimizador solo se construye si la época entra en el top-k
+            path = self.manager.save(
+                trainer.current_epoch,
+                score,
+                lambda: {
+                    'model_state_dict': pl_module.state_dict(),
+                    'optimizer_state_dict': trainer.optimizers[0].state_dict(),
+                    'epoch': trainer.current_epoch
+                },
+                info=checkpoint_info,
+                model_state_fn=pl_module.state_dict
+            )
             
-            logger.info(f"Checkpoint guardado: {checkpoint_path}")
+            if path is not None:
+                logger.info(f"Checkpoint encolado: {path}")
             
         except Exception as e:
             logger.error(f"Error guardando checkpoint: {e}")
+    
+    def on_fit_end(self, trainer, pl_module):
+        """Espera a que terminen las escrituras pendientes"""
+        self.manager.wait()
+    
+    def on_exception(self, trainer, pl_module, exception):
+        self.manager.wait()
+    
+    def teardown(self, trainer, pl_module, stage):
+        self.manager.wait()
 
 class EnterpriseCallbacks:
     """Clase de conveniencia para crear todos los callbacks enterprise"""
@@ -362,7 +511,9 @@ class EnterpriseCallbacks:
         
         # Callbacks básicos
         callbacks.append(GradientNormCallback(
-            log_every_n_steps=config.get('gradient_norm', {}).get('log_every_n_steps', 100)
+            log_every_n_steps=config.get('gradient_norm', {}).get('log_every_n_steps', 100),
+            sample_every_n_steps=config.get('gradient_norm', {}).get('sample_every_n_steps', 1),
+            per_layer=config.get('gradient_norm', {}).get('per_layer', False)
         ))
         
         callbacks.append(ModelComplexityCallback())
@@ -386,7 +537,11 @@ class EnterpriseCallbacks:
         if config.get('checkpoint', {}).get('enabled', True):
             callbacks.append(ModelCheckpointCallback(
                 save_dir=config.get('checkpoint', {}).get('save_dir', 'checkpoints'),
-                save_top_k=config.get('checkpoint', {}).get('save_top_k', 3)
+                save_top_k=config.get('checkpoint', {}).get('save_top_k', 3),
+                monitor=config.get('checkpoint', {}).get('monitor', 'val_loss'),
+                mode=config.get('checkpoint', {}).get('mode', 'min'),
+                save_last=config.get('checkpoint', {}).get('save_last', False),
+                last_delta=config.get('checkpoint', {}).get('last_delta', False)
             ))
         
         return callbacks
@@ -0,0 +1,301 @@
+# Ruta: core/ml/enterprise/checkpoint_manager.py
+# checkpoint_manager.py - Gestor de checkpoints top-k asíncrono
+# Ubicación: C:\TradingBot_v10\models\enterprise\checkpoint_manager.py
+
+"""
+Gestor de checkpoints top-k con escritura en segundo plano.
+
+Características:
+- Decide la pertenencia al top-k antes de escribir (las épocas que no
+  entrarían no se serializan)
+- Snapshot del estado en memoria de CPU en el hilo de entrenamiento; la
+  serialización (torch.save) se hace en un hilo de fondo
+- Escritura atómica: fichero temporal + fsync + os.replace
+- Checkpoint "last" opcional solo con pesos, guardado como delta frente a
+  una base completa (solo los tensores que cambiaron)
+"""
+
+import os
+import queue
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def snapshot_to_cpu(obj: Any) -> Any:
+    """Copia recursiva a CPU de los tensores de un state_dict (u objeto anidado)"""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        copied = type(obj)((key, snapshot_to_cpu(value)) for key, value in obj.items())
+        if hasattr(obj, '_metadata'):
+            copied._metadata = obj._metadata
+        return copied
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot_to_cpu(value) for value in obj)
+    return obj
+
+
+def atomic_save(payload: Any, path: Path):
+    """torch.save a un fichero temporal y renombrado atómico al destino"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as handle:
+        torch.save(payload, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, map_location: Any = 'cpu') -> Dict[str, Any]:
+    """Carga un checkpoint; los "last" delta se reconstruyen sobre su base"""
+    path = Path(path)
+    payload = torch.load(path, map_location=map_location)
+    base_name = payload.get('delta_base') if isinstance(payload, dict) else None
+    if base_name:
+        base = torch.load(path.with_name(base_name), map_location=map_location)
+        state = base['model_state_dict']
+        state.update(payload['model_state_dict'])
+        payload['model_state_dict'] = state
+    return payload
+
+
+@dataclass
+class CheckpointRecord:
+    """Checkpoint retenido en el top-k"""
+    path: Path
+    score: float
+    epoch: int
+    info: Dict[str, Any] = field(default_factory=dict)
+
+
+class CheckpointManager:
+    """
+    Gestor de checkpoints top-k con serialización en un hilo de fondo.
+
+    ``save`` decide primero si la época entra en el top-k; si no entra no se
+    copia ni escribe nada. Si entra, el estado se copia a CPU en el hilo que
+    llama (única espera del bucle de entrenamiento) y se encola; el hilo de
+    escritura serializa, renombra atómicamente y después borra el checkpoint
+    desplazado. La cola está acotada (``max_pending``) para limitar la memoria
+    de snapshots pendientes.
+    """
+
+    def __init__(
+        self,
+        save_dir: str = "checkpoints",
+        save_top_k: int = 3,
+        mode: str = "min",
+        save_last: bool = False,
+        last_delta: bool = False,
+        last_base_every: int = 10,
+        max_pending: int = 2
+    ):
+        self.save_dir = Path(save_dir)
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+        self.save_top_k = save_top_k
+        self.mode = mode
+        self.save_last = save_last
+        self.last_delta = last_delta
+        self.last_base_every = max(1, last_base_every)
+
+        self.checkpoints: List[CheckpointRecord] = []
+        self.stats = {'submitted': 0, 'skipped': 0, 'written': 0, 'deleted': 0,
+                      'errors': 0, 'snapshot_s': 0.0, 'write_s': 0.0}
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        # Checkpoints recortados del top-k antes de escribirse: su escritura se omite
+        self._discarded: set = set()
+        self._last_base: Optional[Dict[str, torch.Tensor]] = None
+        self._last_base_path: Optional[Path] = None
+        self._last_count = 0
+        self._writer = threading.Thread(target=self._writer_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    def _count(self, key: str, amount: float = 1):
+        # stats se actualiza desde el hilo de entrenamiento y el de escritura
+        with self._lock:
+            self.stats[key] += amount
+
+    def _better(self, score: float, other: float) -> bool:
+        return score < other if self.mode == "min" else score > other
+
+    def _normalize(self, score: Any) -> float:
+        try:
+            score = float(score)
+        except (TypeError, ValueError):
+            score = float('nan')
+        if score != score:  # NaN nunca entra por delante de un score válido
+            return float('inf') if self.mode == "min" else float('-inf')
+        return score
+
+    def would_keep(self, score: Any) -> bool:
+        """Indica si un checkpoint con este score entraría en el top-k"""
+        if self.save_top_k <= 0:
+            return False
+        if len(self.checkpoints) < self.save_top_k:
+            return True
+        return self._better(self._normalize(score), self.checkpoints[-1].score)
+
+    def save(
+        self,
+        epoch: int,
+        score: Any,
+        state_fn: Callable[[], Dict[str, Any]],
+        info: Optional[Dict[str, Any]] = None,
+        model_state_fn: Optional[Callable[[], Dict[str, Any]]] = None
+    ) -> Optional[Path]:
+        """
+        Registra el checkpoint de una época.
+
+        ``state_fn`` solo se invoca si la época entra en el top-k (evita
+        construir el state_dict del optimizador en vano). ``model_state_fn``
+        se usa para el checkpoint "last" con solo pesos.
+        """
+        score = self._normalize(score)
+        info = dict(info or {})
+        path = None
+
+        if self.would_keep(score):
+            start = time.perf_counter()
+            payload = snapshot_to_cpu(state_fn())
+            self._count('snapshot_s', time.perf_counter() - start)
+            payload['metrics'] = info
+
+            path = self.save_dir / f"checkpoint_epoch_{epoch:03d}.pth"
+            record = CheckpointRecord(path=path, score=score, epoch=epoch, info=info)
+            with self._lock:
+                self.checkpoints.append(record)
+                self.checkpoints.sort(key=lambda r: r.score, reverse=self.mode != "min")
+                evicted = self.checkpoints[self.save_top_k:]
+                del self.checkpoints[self.save_top_k:]
+            self._count('submitted')
+            # El borrado se encola detrás de la escritura del nuevo checkpoint;
+            # si la escritura falla, los desplazados vuelven al top-k
+            self._queue.put(('save', path, payload, [r.path for r in evicted], evicted))
+        else:
+            self._count('skipped')
+
+        if self.save_last and model_state_fn is not None:
+            self._save_last(epoch, model_state_fn, info)
+
+        return path
+
+    def _save_last(self, epoch: int, model_state_fn: Callable[[], Dict[str, Any]], info: Dict[str, Any]):
+        """Checkpoint "last" solo con pesos (delta frente a la base si last_delta)"""
+        start = time.perf_counter()
+        state = snapshot_to_cpu(model_state_fn())
+        self._count('snapshot_s', time.perf_counter() - start)
+
+        payload = {'model_state_dict': state, 'epoch': epoch, 'metrics': info}
+        if not self.last_delta:
+            self._queue.put(('save', self.save_dir / "last.pth", payload, [], []))
+            return
+
+        stale = []
+        if self._last_base is None or self._last_count % self.last_base_every == 0:
+            # Nueva base completa; la anterior se borra tras escribir el nuevo last.pth
+            if self._last_base_path is not None:
+                stale.append(self._last_base_path)
+            self._last_base = state
+            self._last_base_path = self.save_dir / f"last_base_epoch_{epoch:03d}.pth"
+            self._queue.put(('save', self._last_base_path, dict(payload), [], []))
+        self._last_count += 1
+        payload['delta_base'] = self._last_base_path.name
+        self._queue.put(('delta', self.save_dir / "last.pth", payload, stale, self._last_base))
+
+    def _writer_loop(self):
+        """Hilo de escritura: serializa, renombra atómicamente y borra desplazados"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, kind: str, path: Path, payload: Dict[str, Any], stale: List[Path], extra: Any):
+        with self._lock:
+            discarded = path in self._discarded
+            self._discarded.discard(path)
+        if discarded:
+            # Como si hubiera fallado: los checkpoints que desplazaba siguen vigentes
+            if kind == 'save':
+                self._restore_evicted(path, extra)
+            return
+        start = time.perf_counter()
+        try:
+            if kind == 'delta':
+                # Solo los tensores que cambiaron respecto a la base
+                base = extra
+                payload['model_state_dict'] = {
+                    key: value for key, value in payload['model_state_dict'].items()
+                    if key not in base or not torch.equal(value, base[key])
+                }
+            atomic_save(payload, path)
+        except Exception as e:
+            self._count('errors')
+            logger.error(f"❌ Error guardando checkpoint: {e}")
+            if kind == 'save':
+                self._restore_evicted(path, extra)
+            return
+
+        self._count('written')
+        self._count('write_s', time.perf_counter() - start)
+        logger.info(f"💾 Checkpoint guardado: {path}")
+        with self._lock:
+            # Un desplazado puede haber vuelto al top-k si falló una escritura anterior
+            listed = {r.path for r in self.checkpoints}
+        self._delete([p for p in stale if p not in listed])
+
+    def _restore_evicted(self, failed: Path, evicted: List[CheckpointRecord]):
+        """
+        Sin el nuevo checkpoint, los que desplazaba siguen en disco y vuelven
+        al top-k; lo que exceda save_top_k (si otra época ya desplazó al
+        fallido) se descarta: se borra si ya está escrito y, si no, se omite
+        su escritura pendiente
+        """
+        with self._lock:
+            kept = [r for r in self.checkpoints if r.path != failed] + list(evicted)
+            kept.sort(key=lambda r: r.score, reverse=self.mode != "min")
+            overflow = kept[self.save_top_k:]
+            self.checkpoints = kept[:self.save_top_k]
+            written = [r.path for r in overflow if r.path.exists()]
+            self._discarded.update(r.path for r in overflow if not r.path.exists())
+        self._delete(written)
+
+    def _delete(self, paths: List[Path]):
+        for stale_path in paths:
+            try:
+                if stale_path.exists():
+                    stale_path.unlink()
+                    self._count('deleted')
+            except OSError as e:
+                logger.warning(f"⚠️ No se pudo borrar el checkpoint desplazado {stale_path}: {e}")
+
+    def wait(self):
+        """Espera a que se escriban todos los checkpoints pendientes"""
+        self._queue.join()
+
+    def close(self):
+        """Vacía la cola y detiene el hilo de escritura"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    @property
+    def best(self) -> Optional[CheckpointRecord]:
+        return self.checkpoints[0] if self.checkpoints else None
+
+    def top_k(self) -> List[Tuple[Path, float]]:
+        return [(r.path, r.score) for r in self.checkpoints]
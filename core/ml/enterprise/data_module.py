@@ -32,28 +32,71 @@ from core.config.config_loader import ConfigLoader
 logger = logging.getLogger(__name__)
 
 class TradingDataset(Dataset):
-    """Dataset personalizado para datos de trading"""
+    """Dataset personalizado para datos de trading
+    
+    Puede construirse desde un DataFrame (copia en memoria, compatibilidad) o
+    desde arrays ya materializados (``from_arrays``), típicamente np.memmap de
+    archivos .npy. En el segundo caso cada split es un rango [start, stop) sobre
+    el mismo array compartido y los workers del DataLoader mapean el archivo en
+    lugar de recibir una copia serializada.
+    """
     
     def __init__(
         self,
-        data: pd.DataFrame,
+        data: Optional[pd.DataFrame],
         features: List[str],
         target_column: str = 'target',
         sequence_length: int = 60,
-        prediction_horizon: int = 1
+        prediction_horizon: int = 1,
+        X: Optional[np.ndarray] = None,
+        y: Optional[np.ndarray] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+        array_paths: Optional[Tuple[str, str]] = None
     ):
         self.data = data
         self.features = features
         self.target_column = target_column
         self.sequence_length = sequence_length
         self.prediction_horizon = prediction_horizon
+        self.array_paths = array_paths
         
         # Preparar datos
-        self.X = data[features].values.astype(np.float32)
-        self.y = data[target_column].values.astype(np.int64)
+        if X is None or y is None:
+            self.X = np.ascontiguousarray(data[features].values, dtype=np.float32)
+            self.y = np.ascontiguousarray(data[target_column].values, dtype=np.int64)
+            self._validate_data()
+        else:
+            # Arrays materializados: ya validados al escribirse en disco
+            self.X = X
+            self.y = y
+        
+        self.start = start
+        self.stop = len(self.X) if stop is None else stop
         
-        # Validar datos
-        self._validate_data()
+        if self.stop - self.start < self.sequence_length + self.prediction_horizon:
+            raise ValueError(
+                f"Datos insuficientes: {self.stop - self.start} < {self.sequence_length + self.prediction_horizon}"
+            )
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        X: np.ndarray,
+        y: np.ndarray,
+        features: List[str],
+        start: int = 0,
+        stop: Optional[int] = None,
+        target_column: str = 'target',
+        sequence_length: int = 60,
+        prediction_horizon: int = 1,
+        array_paths: Optional[Tuple[str, str]] = None
+    ) -> 'TradingDataset':
+        """Crea un dataset como vista [start, stop) sobre arrays compartidos"""
+        return cls(
+            None, features, target_column, sequence_length, prediction_horizon,
+            X=X, y=y, start=start, stop=stop, array_paths=array_paths
+        )
         
     def _validate_data(self):
         """Valida la integridad de los datos"""
@@ -68,20 +111,37 @@ class TradingDataset(Dataset):
             logger.warning("Datos con infinitos encontrados, rellenando con 0")
             self.X = np.nan_to_num(self.X, nan=0.0, posinf=0.0, neginf=0.0)
     
+    def __getstate__(self) -> Dict[str, Any]:
+        # Con memmap respaldado por archivo, los workers reabren el archivo
+        # en vez de recibir el array serializado (relevante con 'spawn')
+        state = self.__dict__.copy()
+        if self.array_paths is not None:
+            state['X'] = None
+            state['y'] = None
+            state['data'] = None
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        if self.X is None and self.array_paths is not None:
+            features_path, target_path = self.array_paths
+            self.X = np.load(features_path, mmap_mode='c')
+            self.y = np.load(target_path, mmap_mode='c')
+    
     def __len__(self) -> int:
-        return len(self.X) - self.sequence_length - self.prediction_horizon + 1
+        return self.stop - self.start - self.sequence_length - self.prediction_horizon + 1
     
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
-        # Obtener secuencia de features
-        start_idx = idx
+        # Obtener secuencia de features (vista, sin copia)
+        start_idx = self.start + idx
         end_idx = start_idx + self.sequence_length
-        X_seq = self.X[start_idx:end_idx]
+        X_seq = torch.from_numpy(self.X[start_idx:end_idx])
         
         # Obtener target (predicción futura)
         target_idx = end_idx + self.prediction_horizon - 1
-        y_target = self.y[target_idx]
+        y_target = torch.from_numpy(self.y[target_idx:target_idx + 1]).squeeze(0)
         
-        return torch.tensor(X_seq), torch.tensor(y_target)
+        return X_seq, y_target
 
 class TradingDataModule(pl.LightningDataModule):
     """DataModule de PyTorch Lightning para datos de trading"""
@@ -120,6 +180,10 @@ class TradingDataModule(pl.LightningDataModule):
         self.val_dataset = None
         self.test_dataset = None
         
+        # Arrays compartidos (memmap), cargados una sola vez en setup()
+        self._X: Optional[np.ndarray] = None
+        self._y: Optional[np.ndarray] = None
+        
     def _get_features(self) -> List[str]:
         """Obtiene la lista de features a usar"""
         # Features por defecto
@@ -450,65 +514,101 @@ class TradingDataModule(pl.LightningDataModule):
         
         return data
     
+    def _processed_paths(self) -> Dict[str, Path]:
+        """Rutas de los artefactos procesados del símbolo"""
+        processed_dir = Path("data/processed")
+        return {
+            'parquet': processed_dir / f"{self.symbol}_processed.parquet",
+            'features': processed_dir / f"{self.symbol}_features.npy",
+            'target': processed_dir / f"{self.symbol}_target.npy",
+        }
+    
     def _save_processed_data(self, data: pd.DataFrame):
         """Guarda datos procesados"""
-        processed_dir = Path("data/processed")
-        processed_dir.mkdir(parents=True, exist_ok=True)
+        paths = self._processed_paths()
+        paths['parquet'].parent.mkdir(parents=True, exist_ok=True)
         
         # Guardar como parquet para mejor rendimiento
-        filename = f"{self.symbol}_processed.parquet"
-        filepath = processed_dir / filename
-        data.to_parquet(filepath, index=False)
+        data.to_parquet(paths['parquet'], index=False)
+        
+        # Materializar arrays contiguos para carga por memmap
+        self._materialize_arrays(data)
+        
+        logger.info(f"Datos procesados guardados en {paths['parquet']}")
+    
+    def _materialize_arrays(self, data: pd.DataFrame):
+        """Escribe features (float32) y target (int64) como .npy contiguos y validados"""
+        paths = self._processed_paths()
+        X = np.ascontiguousarray(data[self.features].values, dtype=np.float32)
+        if not np.isfinite(X).all():
+            logger.warning("Datos con NaN/infinitos encontrados, rellenando con 0")
+            X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+        y = np.ascontiguousarray(data[self.target_column].values, dtype=np.int64)
+        
+        np.save(paths['features'], X)
+        np.save(paths['target'], y)
+        self._X = None
+        self._y = None
+        logger.info(f"Arrays materializados: {paths['features']} {X.shape}")
+    
+    def _load_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Carga (una sola vez) los arrays procesados como memmap copy-on-write"""
+        if getattr(self, '_X', None) is not None:
+            return self._X, self._y
+        
+        paths = self._processed_paths()
+        if not paths['parquet'].exists():
+            # Preparar datos si no existen
+            self.prepare_data()
+        
+        arrays_stale = (
+            not paths['features'].exists() or not paths['target'].exists()
+            or paths['features'].stat().st_mtime < paths['parquet'].stat().st_mtime
+        )
+        if arrays_stale:
+            self._materialize_arrays(pd.read_parquet(paths['parquet']))
+        
+        # 'c' (copy-on-write): páginas compartidas entre workers y tensores escribibles
+        self._X = np.load(paths['features'], mmap_mode='c')
+        self._y = np.load(paths['target'], mmap_mode='c')
+        
+        if self._X.shape[1] != len(self.features):
+            # Features cambiadas desde la última materialización
+            self._X = self._y = None
+            self._materialize_arrays(pd.read_parquet(paths['parquet']))
+            return self._load_arrays()
         
-        logger.info(f"Datos procesados guardados en {filepath}")
+        return self._X, self._y
+    
+    def _make_split(self, start: int, stop: int) -> TradingDataset:
+        paths = self._processed_paths()
+        X, y = self._load_arrays()
+        return TradingDataset.from_arrays(
+            X, y, self.features, start=start, stop=stop,
+            target_column=self.target_column,
+            sequence_length=self.sequence_length,
+            prediction_horizon=self.prediction_horizon,
+            array_paths=(str(paths['features']), str(paths['target']))
+        )
     
     def setup(self, stage: Optional[str] = None):
         """Configura los datasets para cada etapa"""
+        X, _ = self._load_arrays()
+        n_rows = len(X)
+        
         if stage == "fit" or stage is None:
-            # Cargar datos procesados
-            processed_file = Path(f"data/processed/{self.symbol}_processed.parquet")
-            if processed_file.exists():
-                data = pd.read_parquet(processed_file)
-            else:
-                # Preparar datos si no existen
-                self.prepare_data()
-                data = pd.read_parquet(processed_file)
-            
             # Dividir datos
-            train_size = int(len(data) * self.train_split)
-            val_size = int(len(data) * self.val_split)
-            
-            train_data = data[:train_size]
-            val_data = data[train_size:train_size + val_size]
+            train_size = int(n_rows * self.train_split)
+            val_size = int(n_rows * self.val_split)
             
-            # Crear datasets
-            self.train_dataset = TradingDataset(
-                train_data, self.features, self.target_column,
-                self.sequence_length, self.prediction_horizon
-            )
-            
-            self.val_dataset = TradingDataset(
-                val_data, self.features, self.target_column,
-                self.sequence_length, self.prediction_horizon
-            )
+            # Crear datasets como rangos sobre los mismos arrays
+            self.train_dataset = self._make_split(0, train_size)
+            self.val_dataset = self._make_split(train_size, train_size + val_size)
         
         if stage == "test" or stage is None:
-            # Cargar datos procesados
-            processed_file = Path(f"data/processed/{self.symbol}_processed.parquet")
-            if processed_file.exists():
-                data = pd.read_parquet(processed_file)
-            else:
-                self.prepare_data()
-                data = pd.read_parquet(processed_file)
-            
             # Usar últimos datos para test
-            test_size = int(len(data) * self.test_split)
-            test_data = data[-test_size:]
-            
-            self.test_dataset = TradingDataset(
-                test_data, self.features, self.target_column,
-                self.sequence_length, self.prediction_horizon
-            )
+            test_size = int(n_rows * self.test_split)
+            self.test_dataset = self._make_split(n_rows - test_size, n_rows)
     
     def train_dataloader(self) -> DataLoader:
         """DataLoader para entrenamiento"""
@@ -7,8 +7,10 @@ Enterprise Data Pipeline - Sistema de Pipelines de Datos Escalables
 Sistema enterprise-grade para procesamiento de datos de trading con:
 - Pipelines escalables con Dask
 - Procesamiento distribuido
-- Caching inteligente (disco + Redis)
+- Caching inteligente (disco + Redis, formato columnar Arrow IPC)
 - Validación de datos
+- Ejecución fusionada: la validación, las transformaciones y los destinos
+  (Parquet, cache) se evalúan en una sola pasada sobre los datos de origen
 - ETL optimizado con indicadores trading (Volatility, Bollinger Bands, ATR)
 - Soporte para streaming en tiempo real (Kafka)
 - Auditoría detallada por símbolo
@@ -24,7 +26,7 @@ import logging
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
 import pickle
 from pathlib import Path
@@ -36,6 +38,7 @@ import dask.dataframe as dd
 from dask.distributed import Client, LocalCluster
 from dask.diagnostics import ProgressBar
 import dask.array as da
+import pyarrow as pa
 import mlflow
 import mlflow.data
 import redis
@@ -44,6 +47,42 @@ from core.data.historical_data_adapter import get_historical_data
 
 logger = logging.getLogger(__name__)
 
+# Margen de TTL de las particiones cacheadas respecto al manifiesto, para que
+# un manifiesto vigente nunca apunte a particiones ya expiradas
+_CACHE_GRACE_S = 60
+
+# Clientes Redis por URL en cada proceso worker
+_redis_clients: Dict[str, Any] = {}
+
+def _worker_redis(redis_url: str):
+    client = _redis_clients.get(redis_url)
+    if client is None:
+        client = _redis_clients[redis_url] = redis.Redis.from_url(redis_url)
+    return client
+
+def to_arrow_ipc(df: pd.DataFrame, compression: Optional[str] = "lz4") -> bytes:
+    """Serializa un DataFrame (con índice) a un stream Arrow IPC comprimido"""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def from_arrow_ipc(payload: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
+
+def _cache_partition(df: pd.DataFrame, redis_url: str, key: str, ttl: int, compression: Optional[str]) -> int:
+    payload = to_arrow_ipc(df, compression)
+    _worker_redis(redis_url).setex(key, ttl, payload)
+    return len(payload)
+
+def _read_cached_partition(redis_url: str, key: str) -> pd.DataFrame:
+    payload = _worker_redis(redis_url).get(key)
+    if payload is None:
+        raise KeyError(f"Partición cacheada expirada: {key}")
+    return from_arrow_ipc(payload)
+
 @dataclass
 class DataPipelineConfig:
     """Configuración del pipeline de datos"""
@@ -64,9 +103,11 @@ class DataPipelineConfig:
     log_level: str = "INFO"
     log_file: str = "logs/data_pipeline.log"
     enable_streaming: bool = False
-    kafka_bootstrap_servers: List[str] = ["localhost:9092"]
+    kafka_bootstrap_servers: List[str] = field(default_factory=lambda: ["localhost:9092"])
     kafka_topic: str = "trading_data"
     redis_url: str = "redis://localhost:6379"
+    cache_compression: Optional[str] = "lz4"
+    checkpoint_dir: Optional[str] = None
 
 class DataValidator:
     """Validador de datos enterprise"""
@@ -78,32 +119,42 @@ class DataValidator:
         }
         self.logger = logging.getLogger(__name__)
 
+    def build(self, data: dd.DataFrame) -> Tuple[dd.DataFrame, Dict[str, Any]]:
+        """
+        Construye los filtros y las estadísticas de validación sin ejecutarlos
+
+        Retorna los datos filtrados y un reporte de escalares dask; ambos se
+        evalúan juntos (dask.compute/dask.persist) en una sola pasada.
+        """
+        report = {}
+        # Validar columnas positivas
+        for col in self.rules.get("positive_columns", []):
+            if col in data.columns:
+                report[f"invalid_{col}"] = (data[col] <= 0).sum()
+                data = data[data[col] > 0]
+
+        # Validar gaps temporales
+        if 'timestamp' in data.columns:
+            if not pd.api.types.is_datetime64_any_dtype(data['timestamp'].dtype):
+                data = data.assign(timestamp=dd.to_datetime(data['timestamp'], unit='s'))
+            gaps = data['timestamp'].diff().dt.total_seconds() / 60 > self.rules["max_gap_minutes"]
+            report["gaps"] = gaps.sum()
+
+        # Validar outliers
+        for col in ['close', 'volume']:
+            if col in data.columns:
+                z_scores = (data[col] - data[col].mean()) / data[col].std()
+                report[f"outliers_{col}"] = (z_scores.abs() > self.rules["outlier_threshold"]).sum()
+                data = data[z_scores.abs() <= self.rules["outlier_threshold"]]
+
+        return data, report
+
     def validate(self, data: dd.DataFrame) -> Tuple[bool, Dict[str, Any]]:
-        """Valida datos y retorna estado y reporte"""
+        """Valida datos y retorna estado y reporte (un único compute)"""
         try:
-            report = {}
-            # Validar columnas positivas
-            for col in self.rules.get("positive_columns", []):
-                if col in data.columns:
-                    invalid = data[data[col] <= 0][col].compute()
-                    report[f"invalid_{col}"] = len(invalid)
-                    data = data[data[col] > 0]
-
-            # Validar gaps temporales
-            if 'timestamp' in data.columns:
-                data['timestamp'] = dd.to_datetime(data['timestamp'], unit='s')
-                gaps = (data['timestamp'].diff().dt.total_seconds() / 60 > self.rules["max_gap_minutes"]).sum().compute()
-                report["gaps"] = gaps
-
-            # Validar outliers
-            for col in ['close', 'volume']:
-                if col in data.columns:
-                    z_scores = (data[col] - data[col].mean()) / data[col].std()
-                    outliers = (z_scores.abs() > self.rules["outlier_threshold"]).sum().compute()
-                    report[f"outliers_{col}"] = outliers
-                    data = data[z_scores.abs() <= self.rules["outlier_threshold"]]
-
-            return True, report
+            _, lazy_report = self.build(data)
+            values = dask.compute(*lazy_report.values())
+            return True, {key: int(value) for key, value in zip(lazy_report, values)}
         except Exception as e:
             self.logger.error(f"Error en validación: {e}")
             return False, {"error": str(e)}
@@ -194,19 +245,28 @@ class EnterpriseDataPipeline:
         data_config: Dict[str, Any],
         transform_config: Optional[Dict[str, Any]] = None
     ) -> dd.DataFrame:
-        """Procesa datos de trading (históricos o en tiempo real)"""
+        """
+        Procesa datos de trading (históricos o en tiempo real)
+
+        El origen se evalúa una sola vez: los filtros y estadísticas de
+        validación se calculan juntos y el resultado validado se mantiene en
+        memoria (persist) o en un checkpoint Parquet (checkpoint_dir). Las
+        transformaciones, el cache y el Parquet de salida se ejecutan después
+        en un único compute sobre ese resultado.
+        """
         try:
             start_time = time.time()
             symbol = data_config.get('symbol', 'BTCUSDT')
             timeframe = data_config.get('timeframe', '1h')
+            use_cache = bool(self.redis_client and self.config.enable_caching)
+            cache_key = f"pipeline_arrow_{symbol}_{timeframe}"
 
             # Verificar cache en Redis
-            if self.redis_client and self.config.enable_caching:
-                cache_key = f"pipeline_{symbol}_{timeframe}"
-                cached_data = self.redis_client.get(cache_key)
-                if cached_data:
+            if use_cache:
+                cached_data = self._load_cached(cache_key)
+                if cached_data is not None:
                     self.logger.info(f"Usando datos cacheados para {symbol}_{timeframe}")
-                    return dd.from_pandas(pd.read_json(cached_data), npartitions=self.config.npartitions or 1)
+                    return cached_data
 
             # Cargar datos
             if data_config.get('type') == 'streaming':
@@ -214,12 +274,16 @@ class EnterpriseDataPipeline:
             else:
                 data = await self._load_historical_data(data_config)
 
-            # Validar datos
+            # Validar datos (filtros + reporte en una pasada)
             if self.config.enable_validation:
                 validator = DataValidator(self.config.validation_rules)
-                valid, report = validator.validate(data)
-                if not valid:
-                    self.logger.error(f"Validación fallida: {report}")
+                validated, lazy_report = validator.build(data)
+                try:
+                    data, report = await asyncio.to_thread(
+                        self._materialize, validated, lazy_report, f"{symbol}_{timeframe}"
+                    )
+                except Exception as e:
+                    self.logger.error(f"Validación fallida: {e}")
                     return data
                 self.logger.info(f"Validación completada: {report}")
 
@@ -227,23 +291,31 @@ class EnterpriseDataPipeline:
             if transform_config and self.config.enable_etl:
                 data = self._apply_transformations(data, transform_config, symbol, timeframe)
 
-            # Guardar en cache
-            if self.redis_client and self.config.enable_caching:
-                self.redis_client.setex(cache_key, self.config.cache_ttl, data.compute().to_json())
-                self.logger.info(f"Datos cacheados para {symbol}_{timeframe}")
-
-            # Guardar en disco
+            # Destinos: cache y disco en el mismo compute que el conteo
+            sinks = []
+            if use_cache:
+                sinks.extend(self._cache_tasks(data, cache_key))
+            output_path = None
             if data_config.get('save_to_disk', True):
                 output_path = Path(f"data/processed/{symbol}_{timeframe}_processed.parquet")
                 output_path.parent.mkdir(parents=True, exist_ok=True)
-                data.compute().to_parquet(output_path)
+                sinks.append(data.to_parquet(str(output_path), write_index=True, overwrite=True, compute=False))
+
+            records, *_ = await asyncio.to_thread(dask.compute, data.map_partitions(len).sum(), *sinks)
+
+            if use_cache:
+                # El manifiesto se escribe al final: nunca apunta a un cache incompleto
+                manifest = json.dumps({"format": "arrow_ipc", "partitions": data.npartitions})
+                self.redis_client.setex(cache_key, self.config.cache_ttl, manifest)
+                self.logger.info(f"Datos cacheados para {symbol}_{timeframe}")
+            if output_path is not None:
                 self.logger.info(f"Datos guardados en {output_path}")
 
             # Log en MLflow
             with mlflow.start_run():
                 mlflow.log_metrics({
                     "processing_time": time.time() - start_time,
-                    "records_processed": len(data),
+                    "records_processed": int(records),
                     "partitions": data.npartitions
                 })
                 mlflow.log_param("symbol", symbol)
@@ -255,11 +327,59 @@ class EnterpriseDataPipeline:
             self.logger.error(f"Error procesando datos: {e}")
             return dd.from_pandas(pd.DataFrame(), npartitions=1)
 
+    def _materialize(self, data: dd.DataFrame, lazy_report: Dict[str, Any], name: str) -> Tuple[dd.DataFrame, Dict[str, int]]:
+        """
+        Evalúa los datos validados y el reporte en una sola pasada
+
+        Sin checkpoint_dir el resultado queda en memoria del cluster
+        (dask.persist); con checkpoint_dir se escribe en Parquet en la misma
+        pasada y se relee de forma perezosa, para datos mayores que la
+        memoria de los workers.
+        """
+        keys = list(lazy_report)
+        if self.config.checkpoint_dir:
+            path = Path(self.config.checkpoint_dir) / f"{name}_validated.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write = data.to_parquet(str(path), write_index=True, overwrite=True, compute=False)
+            _, *values = dask.compute(write, *lazy_report.values())
+            data = dd.read_parquet(str(path))
+        else:
+            data, *scalars = dask.persist(data, *lazy_report.values())
+            values = dask.compute(*scalars)
+        return data, {key: int(value) for key, value in zip(keys, values)}
+
+    def _cache_tasks(self, data: dd.DataFrame, cache_key: str) -> List[Any]:
+        """Una tarea por partición que la guarda en Redis como Arrow IPC"""
+        ttl = self.config.cache_ttl + _CACHE_GRACE_S
+        return [
+            dask.delayed(_cache_partition)(part, self.config.redis_url, f"{cache_key}:{i}", ttl, self.config.cache_compression)
+            for i, part in enumerate(data.to_delayed())
+        ]
+
+    def _load_cached(self, cache_key: str) -> Optional[dd.DataFrame]:
+        """Reconstruye el DataFrame desde las particiones Arrow IPC cacheadas"""
+        try:
+            manifest = self.redis_client.get(cache_key)
+            if not manifest:
+                return None
+            partitions = json.loads(manifest)["partitions"]
+            first = _read_cached_partition(self.config.redis_url, f"{cache_key}:0")
+            parts = [
+                dask.delayed(_read_cached_partition)(self.config.redis_url, f"{cache_key}:{i}")
+                for i in range(partitions)
+            ]
+            return dd.from_delayed(parts, meta=first.iloc[:0])
+        except Exception as e:
+            self.logger.error(f"Error leyendo cache: {e}")
+            return None
+
     async def _load_historical_data(self, data_config: Dict[str, Any]) -> dd.DataFrame:
-        """Carga datos históricos desde SQLite"""
+        """Carga datos históricos desde SQLite (o desde Parquet con 'parquet_path')"""
         try:
             symbol = data_config.get('symbol', 'BTCUSDT')
             timeframe = data_config.get('timeframe', '1h')
+            if data_config.get('parquet_path'):
+                return dd.read_parquet(data_config['parquet_path'])
             data = get_historical_data(symbol, timeframe)
             if data.empty:
                 self.logger.warning(f"No se encontraron datos para {symbol}_{timeframe}")
@@ -342,10 +462,14 @@ class EnterpriseDataPipeline:
     async def get_data_summary(self, data: dd.DataFrame) -> Dict[str, Any]:
         """Obtiene resumen estadístico de los datos"""
         try:
-            stats = data.describe().compute().to_dict()
-            stats['symbol'] = data['symbol'].iloc[0].compute()
-            stats['timeframe'] = data['timeframe'].iloc[0].compute()
-            stats['records'] = len(data)
+            labels = [col for col in ('symbol', 'timeframe') if col in data.columns]
+            described, first, records = dask.compute(
+                data.describe(), data[labels].head(1, npartitions=-1, compute=False), data.map_partitions(len).sum()
+            )
+            stats = described.to_dict()
+            for col in labels:
+                stats[col] = first[col].iloc[0] if len(first) else None
+            stats['records'] = int(records)
             return stats
         except Exception as e:
             self.logger.error(f"Error obteniendo resumen: {e}")
@@ -7,6 +7,9 @@ Sistema enterprise-grade para optimización de hiperparámetros con:
 - Optimización bayesiana con Optuna (TPE, CmaEs, Random)
 - Multi-objective optimization (val_loss, val_accuracy, Sharpe, drawdown)
 - Ejecución asíncrona y paralela
+- Modo por procesos: workers sobre un study compartido en disco (SQLite o
+  journal), dataset cargado una vez (memmap) y pruning con valores
+  intermedios por época
 - Integración con MLflow y Redis
 - Visualización interactiva (Plotly) y estática (Matplotlib)
 - Métricas trading específicas (Sortino, max drawdown)
@@ -15,14 +18,18 @@ Uso:
     from core.ml.enterprise.hyperparameter_optimization import EnterpriseHyperparameterTuner
     tuner = EnterpriseHyperparameterTuner(config)
     best_params = await tuner.optimize(training_config, data_config)
+    best_params = await tuner.optimize_processes(trial_function, {"X": X, "y": y})
 """
 
 import asyncio
 import logging
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable, Tuple, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import json
 import pickle
 from pathlib import Path
@@ -31,6 +38,9 @@ import yaml
 import optuna
 from optuna.samplers import TPESampler, CmaEsSampler, RandomSampler
 from optuna.pruners import MedianPruner, SuccessiveHalvingPruner, HyperbandPruner
+from optuna.storages import JournalStorage
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
 from optuna.integration import PyTorchLightningPruningCallback
 from optuna.visualization import plot_optimization_history, plot_param_importances
 import plotly.graph_objects as go
@@ -55,14 +65,22 @@ class HyperparameterSpace:
     attention_heads: Tuple[int, int] = (4, 16)
     learning_rate: Tuple[float, float] = (1e-5, 1e-2)  # log scale
     weight_decay: Tuple[float, float] = (1e-6, 1e-3)  # log scale
-    batch_size: List[int] = [16, 32, 64, 128, 256]
-    optimizer: List[str] = ["adam", "adamw", "sgd", "rmsprop"]
-    scheduler: List[str] = ["cosine", "step", "plateau", "none"]
+    batch_size: List[int] = field(default_factory=lambda: [16, 32, 64, 128, 256])
+    optimizer: List[str] = field(default_factory=lambda: ["adam", "adamw", "sgd", "rmsprop"])
+    scheduler: List[str] = field(default_factory=lambda: ["cosine", "step", "plateau", "none"])
     warmup_epochs: Tuple[int, int] = (0, 10)
     l1_regularization: Tuple[float, float] = (0.0, 1e-4)
     l2_regularization: Tuple[float, float] = (0.0, 1e-3)
     gradient_clip_val: Tuple[float, float] = (0.1, 10.0)
 
+# Journal en archivo: admite varios procesos escribiendo el mismo study
+# (SQLite serializa las escrituras y se bloquea con varios workers)
+DEFAULT_STORAGE = "journal:///cache/hpo/optuna_study.log"
+
+# TrialReporter informa una vez por época: el warmup del MedianPruner se
+# mide en épocas y debe ser corto para que se poden trials en runs breves
+DEFAULT_PRUNER_WARMUP_EPOCHS = 3
+
 @dataclass
 class TuningConfig:
     """Configuración de optimización"""
@@ -72,10 +90,197 @@ class TuningConfig:
     pruner_type: str = "median"
     study_name: str = "trading_bot_optimization"
     direction: str = "maximize"  # or minimize
-    storage: str = "sqlite:///optuna_study.db"
+    storage: str = DEFAULT_STORAGE
     n_jobs: int = 4
     redis_cache: bool = False
     redis_url: str = "redis://localhost:6379"
+    n_workers: int = 4
+    start_method: str = "spawn"
+    shared_data_dir: str = "cache/hpo_shared"
+
+def _build_sampler(config: Dict[str, Any]):
+    sampler_config = config.get('sampler', {})
+    sampler_name = sampler_config.get('name', config.get('sampler_type', 'tpe'))
+    if sampler_name.lower() == 'tpe':
+        return TPESampler(n_startup_trials=sampler_config.get('n_startup_trials', 10))
+    elif sampler_name.lower() == 'cmaes':
+        return CmaEsSampler()
+    elif sampler_name.lower() == 'random':
+        return RandomSampler()
+    raise ValueError(f"Sampler no soportado: {sampler_name}")
+
+def _pruner_warmup_steps(config: Dict[str, Any]) -> int:
+    """Épocas de warmup: las configuradas, ~10% de ``max_epochs`` o el valor por defecto"""
+    pruner_config = config.get('pruner', {})
+    if 'n_warmup_steps' in pruner_config:
+        return int(pruner_config['n_warmup_steps'])
+    max_epochs = config.get('max_epochs')
+    if max_epochs:
+        return max(1, int(max_epochs) // 10)
+    return DEFAULT_PRUNER_WARMUP_EPOCHS
+
+def _build_pruner(config: Dict[str, Any]):
+    pruner_config = config.get('pruner', {})
+    pruner_name = pruner_config.get('name', config.get('pruner_type', 'median'))
+    if pruner_name.lower() == 'median':
+        return MedianPruner(
+            n_startup_trials=pruner_config.get('n_startup_trials', 5),
+            n_warmup_steps=_pruner_warmup_steps(config)
+        )
+    elif pruner_name.lower() == 'hyperband':
+        return HyperbandPruner()
+    elif pruner_name.lower() == 'successivehalving':
+        return SuccessiveHalvingPruner()
+    raise ValueError(f"Pruner no soportado: {pruner_name}")
+
+def _make_storage(storage: str):
+    """
+    URL RDB (``sqlite:///estudio.db``) o journal en archivo
+    (``journal:///ruta.log``; como en SQLite, ``journal:////ruta`` es absoluta)
+    """
+    if not storage.startswith('journal:///'):
+        return storage
+    path = storage[len('journal:///'):]
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:  # optuna < 4.0
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return JournalStorage(JournalFileBackend(path))
+
+def _study_settings(config: Dict[str, Any]) -> Tuple[str, str, str]:
+    study_config = config.get('study', {})
+    study_name = study_config.get('study_name', config.get('study_name', 'trading_bot_optimization'))
+    direction = study_config.get('direction', config.get('direction', 'maximize'))
+    storage = study_config.get('storage', config.get('storage', DEFAULT_STORAGE))
+    return study_name, direction, storage
+
+def _suggest_params(trial: optuna.trial.Trial, space: HyperparameterSpace) -> Dict[str, Any]:
+    params = {}
+    params['hidden_size'] = trial.suggest_int('hidden_size', space.hidden_size[0], space.hidden_size[1])
+    params['num_layers'] = trial.suggest_int('num_layers', space.num_layers[0], space.num_layers[1])
+    params['dropout'] = trial.suggest_float('dropout', space.dropout[0], space.dropout[1])
+    params['attention_heads'] = trial.suggest_int('attention_heads', space.attention_heads[0], space.attention_heads[1])
+    params['learning_rate'] = trial.suggest_float('learning_rate', space.learning_rate[0], space.learning_rate[1], log=True)
+    params['weight_decay'] = trial.suggest_float('weight_decay', space.weight_decay[0], space.weight_decay[1], log=True)
+    params['batch_size'] = trial.suggest_categorical('batch_size', space.batch_size)
+    params['optimizer'] = trial.suggest_categorical('optimizer', space.optimizer)
+    params['scheduler'] = trial.suggest_categorical('scheduler', space.scheduler)
+    params['warmup_epochs'] = trial.suggest_int('warmup_epochs', space.warmup_epochs[0], space.warmup_epochs[1])
+    params['l1_regularization'] = trial.suggest_float('l1_regularization', space.l1_regularization[0], space.l1_regularization[1])
+    params['l2_regularization'] = trial.suggest_float('l2_regularization', space.l2_regularization[0], space.l2_regularization[1])
+    params['gradient_clip_val'] = trial.suggest_float('gradient_clip_val', space.gradient_clip_val[0], space.gradient_clip_val[1])
+    return params
+
+def objective_value(metrics: Dict[str, float]) -> float:
+    """Objetivo multi-métrica (ponderado); también para los valores por época"""
+    val_loss = metrics.get('val_loss', float('inf'))
+    val_accuracy = metrics.get('val_accuracy', 0.0)
+    sharpe_ratio = metrics.get('sharpe_ratio', 0.0)
+    max_drawdown = metrics.get('max_drawdown', 1.0)
+    return 0.5 * val_accuracy - 0.3 * val_loss + 0.2 * sharpe_ratio - 0.1 * max_drawdown
+
+def _log_trial_mlflow(params: Dict[str, Any], metrics: Dict[str, float], value: float):
+    with mlflow.start_run():
+        mlflow.log_params(params)
+        mlflow.log_metrics({
+            "val_loss": metrics.get('val_loss', float('inf')),
+            "val_accuracy": metrics.get('val_accuracy', 0.0),
+            "sharpe_ratio": metrics.get('sharpe_ratio', 0.0),
+            "max_drawdown": metrics.get('max_drawdown', 1.0),
+            "objective_value": value
+        })
+
+@dataclass
+class SharedTrialData:
+    """
+    Dataset de los trials guardado una vez como .npy
+
+    Cada worker lo abre con np.load(mmap_mode='r'): las páginas se comparten
+    a través del page cache y ningún trial vuelve a cargar ni copiar datos.
+    """
+    paths: Dict[str, str]
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], directory: str) -> 'SharedTrialData':
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        paths = {}
+        for name, array in arrays.items():
+            path = Path(directory) / f"{name}.npy"
+            np.save(path, np.ascontiguousarray(array))
+            paths[name] = str(path)
+        return cls(paths)
+
+    def load(self) -> Dict[str, np.ndarray]:
+        return {name: np.load(path, mmap_mode='r') for name, path in self.paths.items()}
+
+class TrialReporter:
+    """
+    Callback de valores intermedios para la función de trial
+
+    ``report(step, value)`` acepta el objetivo o un dict de métricas (se
+    pondera con objective_value) y lanza optuna.TrialPruned si el pruner
+    decide detener el trial.
+    """
+
+    def __init__(self, trial: optuna.trial.Trial):
+        self.trial = trial
+
+    def __call__(self, step: int, value: Union[float, Dict[str, float]]):
+        if isinstance(value, dict):
+            value = objective_value(value)
+        self.trial.report(value, step)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Trial {self.trial.number} podado en el paso {step}")
+
+class _ProcessObjective:
+    """Objetivo de un worker: params del trial + dataset compartido + reporter"""
+
+    def __init__(self, trial_function: Callable, data: Dict[str, np.ndarray], space: HyperparameterSpace, log_mlflow: bool):
+        self.trial_function = trial_function
+        self.data = data
+        self.space = space
+        self.log_mlflow = log_mlflow
+
+    def __call__(self, trial: optuna.trial.Trial) -> float:
+        params = _suggest_params(trial, self.space)
+        reporter = TrialReporter(trial)
+        if asyncio.iscoroutinefunction(self.trial_function):
+            metrics = asyncio.run(self.trial_function(params, self.data, reporter))
+        else:
+            metrics = self.trial_function(params, self.data, reporter)
+        value = objective_value(metrics)
+        if self.log_mlflow:
+            _log_trial_mlflow(params, metrics, value)
+        return value
+
+_BUDGET_STATES = (TrialState.COMPLETE, TrialState.PRUNED, TrialState.FAIL, TrialState.RUNNING)
+
+def _run_worker(
+    config: Dict[str, Any],
+    trial_function: Callable,
+    shared_data: SharedTrialData,
+    space: HyperparameterSpace,
+    max_trials: int,
+    timeout: Optional[float]
+) -> int:
+    """
+    Proceso worker: ejecuta trials del study compartido hasta agotar el presupuesto
+
+    ``max_trials`` es el total de trials del study (los de ejecuciones previas
+    más los de esta); los RUNNING de otros workers cuentan para no pasarse.
+    """
+    study_name, _, storage = _study_settings(config)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_make_storage(storage),
+        sampler=_build_sampler(config),
+        pruner=_build_pruner(config)
+    )
+    objective = _ProcessObjective(trial_function, shared_data.load(), space, config.get('mlflow_logging', True))
+    budget = MaxTrialsCallback(max_trials, states=_BUDGET_STATES)
+    study.optimize(objective, timeout=timeout, callbacks=[budget], catch=(Exception,))
+    return os.getpid()
 
 class EnterpriseHyperparameterTuner:
     """Optimizador de hiperparámetros enterprise"""
@@ -92,39 +297,14 @@ class EnterpriseHyperparameterTuner:
 
     def _setup_optuna(self):
         """Configura Optuna con la configuración especificada"""
-        study_config = self.config.get('study', {})
-        study_name = study_config.get('study_name', self.config.get('study_name', 'trading_bot_optimization'))
-        direction = study_config.get('direction', self.config.get('direction', 'maximize'))
-        storage = study_config.get('storage', self.config.get('storage', 'sqlite:///optuna_study.db'))
-
-        sampler_config = self.config.get('sampler', {})
-        sampler_name = sampler_config.get('name', self.config.get('sampler_type', 'tpe'))
-        if sampler_name.lower() == 'tpe':
-            sampler = TPESampler(n_startup_trials=sampler_config.get('n_startup_trials', 10))
-        elif sampler_name.lower() == 'cmaes':
-            sampler = CmaEsSampler()
-        elif sampler_name.lower() == 'random':
-            sampler = RandomSampler()
-        else:
-            raise ValueError(f"Sampler no soportado: {sampler_name}")
-
-        pruner_config = self.config.get('pruner', {})
-        pruner_name = pruner_config.get('name', self.config.get('pruner_type', 'median'))
-        if pruner_name.lower() == 'median':
-            pruner = MedianPruner(n_startup_trials=5, n_warmup_steps=30)
-        elif pruner_name.lower() == 'hyperband':
-            pruner = HyperbandPruner()
-        elif pruner_name.lower() == 'successivehalving':
-            pruner = SuccessiveHalvingPruner()
-        else:
-            raise ValueError(f"Pruner no soportado: {pruner_name}")
-
+        study_name, direction, storage = _study_settings(self.config)
         self.study = optuna.create_study(
             study_name=study_name,
             direction=direction,
-            sampler=sampler,
-            pruner=pruner,
-            storage=storage
+            sampler=_build_sampler(self.config),
+            pruner=_build_pruner(self.config),
+            storage=_make_storage(storage),
+            load_if_exists=True
         )
 
     def _setup_redis(self):
@@ -145,21 +325,7 @@ class EnterpriseHyperparameterTuner:
         """Optimiza hiperparámetros de forma asíncrona"""
         try:
             def objective(trial: optuna.trial.Trial) -> float:
-                params = {}
-                space = hyperparameter_space or HyperparameterSpace()
-                params['hidden_size'] = trial.suggest_int('hidden_size', space.hidden_size[0], space.hidden_size[1])
-                params['num_layers'] = trial.suggest_int('num_layers', space.num_layers[0], space.num_layers[1])
-                params['dropout'] = trial.suggest_float('dropout', space.dropout[0], space.dropout[1])
-                params['attention_heads'] = trial.suggest_int('attention_heads', space.attention_heads[0], space.attention_heads[1])
-                params['learning_rate'] = trial.suggest_float('learning_rate', space.learning_rate[0], space.learning_rate[1], log=True)
-                params['weight_decay'] = trial.suggest_float('weight_decay', space.weight_decay[0], space.weight_decay[1], log=True)
-                params['batch_size'] = trial.suggest_categorical('batch_size', space.batch_size)
-                params['optimizer'] = trial.suggest_categorical('optimizer', space.optimizer)
-                params['scheduler'] = trial.suggest_categorical('scheduler', space.scheduler)
-                params['warmup_epochs'] = trial.suggest_int('warmup_epochs', space.warmup_epochs[0], space.warmup_epochs[1])
-                params['l1_regularization'] = trial.suggest_float('l1_regularization', space.l1_regularization[0], space.l1_regularization[1])
-                params['l2_regularization'] = trial.suggest_float('l2_regularization', space.l2_regularization[0], space.l2_regularization[1])
-                params['gradient_clip_val'] = trial.suggest_float('gradient_clip_val', space.gradient_clip_val[0], space.gradient_clip_val[1])
+                params = _suggest_params(trial, hyperparameter_space or HyperparameterSpace())
 
                 # Cache en Redis
                 if self.redis_client:
@@ -169,40 +335,28 @@ class EnterpriseHyperparameterTuner:
                         logger.info(f"Usando resultado cacheado para trial {trial.number}")
                         return float(cached_result)
 
-                # Ejecutar entrenamiento
-                loop = asyncio.get_event_loop()
-                metrics = loop.run_until_complete(training_function(params, data_config))
-
-                # Calcular métricas trading
-                val_loss = metrics.get('val_loss', float('inf'))
-                val_accuracy = metrics.get('val_accuracy', 0.0)
-                sharpe_ratio = metrics.get('sharpe_ratio', 0.0)
-                max_drawdown = metrics.get('max_drawdown', 1.0)
+                # Ejecutar entrenamiento (event loop propio: el trial corre en un hilo de Optuna)
+                metrics = asyncio.run(training_function(params, data_config))
 
                 # Multi-objective (ponderado)
-                objective_value = 0.5 * val_accuracy - 0.3 * val_loss + 0.2 * sharpe_ratio - 0.1 * max_drawdown
+                value = objective_value(metrics)
 
                 # Guardar en MLflow
-                with mlflow.start_run():
-                    mlflow.log_params(params)
-                    mlflow.log_metrics({
-                        "val_loss": val_loss,
-                        "val_accuracy": val_accuracy,
-                        "sharpe_ratio": sharpe_ratio,
-                        "max_drawdown": max_drawdown,
-                        "objective_value": objective_value
-                    })
+                if self.config.get('mlflow_logging', True):
+                    _log_trial_mlflow(params, metrics, value)
 
                 # Cachear resultado
                 if self.redis_client:
-                    self.redis_client.setex(cache_key, 3600, objective_value)
+                    self.redis_client.setex(cache_key, 3600, value)
 
-                return objective_value
+                return value
 
-            # Ejecutar optimización
+            # Ejecutar optimización (fuera del event loop del llamador)
             n_trials = self.config.get('n_trials', 100)
             timeout = self.config.get('timeout', 3600)
-            self.study.optimize(objective, n_trials=n_trials, timeout=timeout, n_jobs=self.config.get('n_jobs', 4))
+            await asyncio.to_thread(
+                self.study.optimize, objective, n_trials=n_trials, timeout=timeout, n_jobs=self.config.get('n_jobs', 4)
+            )
 
             self.best_params = self.study.best_params
             self.best_value = self.study.best_value
@@ -220,6 +374,76 @@ class EnterpriseHyperparameterTuner:
             logger.error(f"Error en optimización: {e}")
             return {"success": False, "error": str(e)}
 
+    async def optimize_processes(
+        self,
+        trial_function: Callable,
+        data: Union[Dict[str, np.ndarray], SharedTrialData],
+        hyperparameter_space: Optional[HyperparameterSpace] = None,
+        n_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Optimiza hiperparámetros con trials en procesos worker
+
+        Los workers comparten el study a través del storage en disco
+        (``journal:///...`` por defecto; ``sqlite:///...`` no escala con
+        varios procesos) y el presupuesto se cuenta en el propio storage:
+        se ejecutan n_trials nuevos además de los que ya tuviera el study. El dataset se guarda una vez como .npy y cada worker
+        lo mapea en memoria.
+
+        Args:
+            trial_function: Función de nivel de módulo (serializable)
+                ``trial_function(params, data, report) -> métricas``, síncrona
+                o async. ``data`` son los arrays memmap y
+                ``report(epoch, métricas_u_objetivo)`` registra el valor
+                intermedio y lanza optuna.TrialPruned si hay que parar.
+            data: Arrays del dataset o un SharedTrialData ya materializado
+            n_workers: Procesos worker (por defecto config['n_workers'])
+        """
+        try:
+            if not isinstance(data, SharedTrialData):
+                data = SharedTrialData.from_arrays(data, self.config.get('shared_data_dir', 'cache/hpo_shared'))
+
+            n_workers = n_workers or self.config.get('n_workers', 4)
+            n_trials = self.config.get('n_trials', 100)
+            timeout = self.config.get('timeout', 3600)
+            space = hyperparameter_space or HyperparameterSpace()
+            context = multiprocessing.get_context(self.config.get('start_method', 'spawn'))
+
+            _, _, storage = _study_settings(self.config)
+            if n_workers > 1 and storage.startswith('sqlite:'):
+                logger.warning("⚠️ Storage SQLite con varios procesos: usar journal:///... para evitar bloqueos")
+
+            # Presupuesto total del study: los trials previos no consumen el de esta ejecución
+            existing = len(self.study.get_trials(deepcopy=False, states=_BUDGET_STATES))
+            max_trials = existing + n_trials
+
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+                workers = [
+                    loop.run_in_executor(pool, _run_worker, self.config, trial_function, data, space, max_trials, timeout)
+                    for _ in range(n_workers)
+                ]
+                await asyncio.gather(*workers)
+
+            trials = self.study.get_trials(deepcopy=False)
+            pruned = sum(1 for trial in trials if trial.state == TrialState.PRUNED)
+            self.best_params = self.study.best_params
+            self.best_value = self.study.best_value
+            logger.info(f"Mejores parámetros: {self.best_params}")
+            logger.info(f"Mejor score: {self.best_value:.4f} ({len(trials)} trials, {pruned} podados, {n_workers} procesos)")
+
+            return {
+                "success": True,
+                "best_params": self.best_params,
+                "best_score": self.best_value,
+                "trials": len(trials),
+                "pruned_trials": pruned
+            }
+
+        except Exception as e:
+            logger.error(f"Error en optimización por procesos: {e}")
+            return {"success": False, "error": str(e)}
+
     async def plot_optimization_history(self, save_path: Optional[str] = None):
         """Genera gráfico interactivo de historial de optimización"""
         try:
@@ -298,12 +522,13 @@ def create_hyperparameter_tuner(config_path: Optional[str] = None) -> 'Enterpris
     config = {
         "study_name": "trading_bot_optimization",
         "direction": "maximize",
-        "storage": "sqlite:///optuna_study.db",
+        "storage": DEFAULT_STORAGE,
         "n_trials": 100,
         "timeout": 3600,
         "sampler_type": "tpe",
         "pruner_type": "median",
         "n_jobs": 4,
+        "n_workers": 4,
         "redis_cache": False,
         "redis_url": "redis://localhost:6379"
     }
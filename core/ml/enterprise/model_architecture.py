@@ -10,7 +10,7 @@ Características:
 - Transformer para series temporales
 - CNN-LSTM híbrido
 - GRU simple
-- Modelo ensemble
+- Modelo ensemble (inferencia concurrente y exportación TorchScript/ONNX)
 - Integración con PyTorch Lightning
 """
 
@@ -20,9 +20,17 @@ import torch.nn.functional as F
 import pytorch_lightning as pl
 from typing import Dict, List, Optional, Any, Tuple
 import math
+import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 
+try:
+    from pytorch_lightning.core.module import _jit_is_scripting
+except ImportError:  # versiones de Lightning sin el context manager
+    _jit_is_scripting = nullcontext
+
 # Importar ConfigLoader
 from core.config.config_loader import ConfigLoader
 
@@ -594,6 +602,101 @@ class GRUSimpleModel(pl.LightningModule):
             }
         }
 
+def _logits(output):
+    """Logits de un modelo base (LSTMAttentionModel devuelve (logits, atención))"""
+    return output[0] if isinstance(output, tuple) else output
+
+def _autocast_state(device_type: str) -> Tuple[bool, torch.dtype]:
+    """Estado de autocast del hilo actual para un tipo de dispositivo"""
+    try:
+        return torch.is_autocast_enabled(device_type), torch.get_autocast_dtype(device_type)
+    except (TypeError, AttributeError):
+        # torch < 2.4: API separada para CPU y GPU
+        if device_type == "cpu":
+            return torch.is_autocast_cpu_enabled(), torch.get_autocast_cpu_dtype()
+        return torch.is_autocast_enabled(), torch.get_autocast_gpu_dtype()
+
+def _run_in_context(model: nn.Module, x: torch.Tensor, grad_enabled: bool, inference: bool,
+                    autocast_enabled: bool, autocast_dtype: torch.dtype):
+    """
+    Ejecuta un modelo base en un hilo del pool con el modo de autograd y
+    autocast del hilo que llamó (son estado por hilo y no se heredan)
+    """
+    with torch.inference_mode(inference), torch.set_grad_enabled(grad_enabled), \
+            torch.autocast(x.device.type, dtype=autocast_dtype, enabled=autocast_enabled):
+        return model(x)
+
+def aggregate_predictions(
+    stacked: torch.Tensor,
+    aggregation_method: str,
+    weights: torch.Tensor,
+    num_classes: int,
+    meta_learner: Optional[nn.Module] = None
+) -> torch.Tensor:
+    """
+    Agrega las predicciones apiladas (modelos, batch, clases) con operaciones
+    tensoriales, sin bucles de Python por clase
+    """
+    if aggregation_method == "weighted_average":
+        return (stacked * weights.to(stacked).view(-1, 1, 1)).sum(dim=0)
+    if aggregation_method == "voting":
+        # Fracción de votos por clase
+        votes = F.one_hot(stacked.argmax(dim=-1), num_classes).to(stacked.dtype)
+        return votes.mean(dim=0)
+    if aggregation_method == "stacking":
+        # Mismo orden que torch.cat(predicciones, dim=1): modelo a modelo
+        return meta_learner(stacked.transpose(0, 1).reshape(stacked.size(1), -1))
+    raise ValueError(f"Método de agregación no soportado: {aggregation_method}")
+
+class _BaseLogits(nn.Module):
+    """Envuelve un modelo base para que devuelva solo los logits"""
+    
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.model = model
+        
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return _logits(self.model(x))
+
+class EnsembleInferenceModule(nn.Module):
+    """
+    Grafo de inferencia del ensemble en una sola pasada.
+
+    Comparte parámetros con el EnsembleModel de origen. Con ``concurrent``
+    cada modelo base se lanza con torch.jit.fork: en eager se ejecutan en
+    serie, pero una vez exportado a TorchScript los forks corren en paralelo
+    en el pool inter-op (torch.set_num_interop_threads).
+    """
+    
+    def __init__(
+        self,
+        members: List[nn.Module],
+        weights: torch.Tensor,
+        aggregation_method: str,
+        num_classes: int,
+        meta_learner: Optional[nn.Module] = None,
+        concurrent: bool = True
+    ):
+        super().__init__()
+        self.members = nn.ModuleList([_BaseLogits(member) for member in members])
+        self.register_buffer('weights', weights.clone())
+        self.aggregation_method = aggregation_method
+        self.num_classes = num_classes
+        self.meta_learner = meta_learner
+        self.concurrent = concurrent
+        
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if self.concurrent:
+            futures = [torch.jit.fork(member, x) for member in self.members]
+            predictions = [torch.jit.wait(future) for future in futures]
+        else:
+            predictions = [member(x) for member in self.members]
+        
+        return aggregate_predictions(
+            torch.stack(predictions, dim=0), self.aggregation_method,
+            self.weights, self.num_classes, self.meta_learner
+        )
+
 class EnsembleModel(pl.LightningModule):
     """Modelo ensemble de múltiples arquitecturas"""
     
@@ -638,34 +741,95 @@ class EnsembleModel(pl.LightningModule):
         # Loss function
         self.criterion = nn.CrossEntropyLoss()
         
+        # Inferencia concurrente (configure_parallel_inference); el pool de
+        # hilos se crea en el primer forward y no se serializa
+        self._parallel_inference = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._previous_num_threads: Optional[int] = None
+        
+    def __getstate__(self) -> Dict[str, Any]:
+        # Un ThreadPoolExecutor no se puede copiar ni serializar (pickle,
+        # deepcopy, torch.save); la copia lo recrea al primer forward
+        state = super().__getstate__()
+        state['_executor'] = None
+        return state
+        
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         # Obtener predicciones de todos los modelos
-        predictions = []
-        for model_name, model in self.models.items():
-            pred = model(x)
-            predictions.append(pred)
+        models = list(self.models.values())
+        if self._parallel_inference and not self.training:
+            # Inferencia: modelos base concurrentes (los kernels de torch liberan el GIL)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="ensemble")
+            context = (torch.is_grad_enabled(), torch.is_inference_mode_enabled(),
+                       *_autocast_state(x.device.type))
+            futures = [self._executor.submit(_run_in_context, model, x, *context) for model in models]
+            predictions = [_logits(future.result()) for future in futures]
+        else:
+            predictions = [_logits(model(x)) for model in models]
         
         # Agregar predicciones
-        if self.aggregation_method == "weighted_average":
-            # Promedio ponderado
-            weighted_preds = torch.stack(predictions, dim=0)
-            weights = self.model_weights.view(-1, 1, 1).to(weighted_preds.device)
-            ensemble_pred = torch.sum(weighted_preds * weights, dim=0)
-            
-        elif self.aggregation_method == "voting":
-            # Votación
-            pred_classes = torch.stack([torch.argmax(pred, dim=1) for pred in predictions], dim=1)
-            ensemble_pred = torch.zeros_like(predictions[0])
-            for i in range(self.num_classes):
-                votes = (pred_classes == i).sum(dim=1).float()
-                ensemble_pred[:, i] = votes / len(predictions)
-                
-        elif self.aggregation_method == "stacking":
-            # Stacking con meta-learner
-            stacked_preds = torch.cat(predictions, dim=1)
-            ensemble_pred = self.meta_learner(stacked_preds)
-        
-        return ensemble_pred
+        return aggregate_predictions(
+            torch.stack(predictions, dim=0), self.aggregation_method,
+            self.model_weights, self.num_classes, getattr(self, 'meta_learner', None)
+        )
+    
+    def configure_parallel_inference(self, enabled: bool = True, intra_op_threads: Optional[int] = None):
+        """
+        Ejecuta los modelos base en paralelo durante la inferencia en eager.
+        
+        ``intra_op_threads`` reparte los hilos de CPU entre los modelos
+        concurrentes (por defecto, núcleos / número de modelos). Es un ajuste
+        global del proceso (torch.set_num_threads); al desactivar se restaura
+        el valor previo.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._parallel_inference = enabled
+        if not enabled:
+            if self._previous_num_threads is not None:
+                torch.set_num_threads(self._previous_num_threads)
+                self._previous_num_threads = None
+            return
+        
+        if intra_op_threads is None:
+            intra_op_threads = max(1, (os.cpu_count() or 1) // max(1, len(self.models)))
+        if self._previous_num_threads is None:
+            self._previous_num_threads = torch.get_num_threads()
+        torch.set_num_threads(intra_op_threads)
+    
+    def inference_module(self, concurrent: bool = True) -> EnsembleInferenceModule:
+        """Grafo de inferencia de una sola pasada que comparte los parámetros"""
+        return EnsembleInferenceModule(
+            list(self.models.values()), self.model_weights, self.aggregation_method,
+            self.num_classes, getattr(self, 'meta_learner', None), concurrent
+        ).eval()
+    
+    def export_torchscript(self, example_input: torch.Tensor, path: Optional[str] = None,
+                           concurrent: bool = True) -> torch.jit.ScriptModule:
+        """Exporta el ensemble completo como un único grafo TorchScript (trace + freeze)"""
+        # _jit_is_scripting: el trace recorre las propiedades de los
+        # LightningModule (trainer) y fallan si no hay Trainer asociado
+        with torch.no_grad(), _jit_is_scripting():
+            traced = torch.jit.trace(self.inference_module(concurrent), example_input, check_trace=False)
+            traced = torch.jit.freeze(traced)
+        if path is not None:
+            traced.save(path)
+        return traced
+    
+    def export_onnx(self, example_input: torch.Tensor, path: str, opset_version: int = 17):
+        """Exporta el ensemble completo como un único grafo ONNX con batch dinámico"""
+        with torch.no_grad(), _jit_is_scripting():
+            torch.onnx.export(
+                self.inference_module(concurrent=False),
+                example_input,
+                path,
+                input_names=['features'],
+                output_names=['logits'],
+                dynamic_axes={'features': {0: 'batch'}, 'logits': {0: 'batch'}},
+                opset_version=opset_version
+            )
     
     def training_step(self, batch, batch_idx):
         x, y = batch
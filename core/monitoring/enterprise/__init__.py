@@ -11,6 +11,8 @@ Componentes principales:
 - RiskMonitor: Monitoreo de riesgo y alertas automáticas
 - PerformanceMonitor: Métricas de performance avanzadas (Sharpe, VaR)
 - PnLTracker: Seguimiento detallado de PnL
+- StreamingRiskStats: Estadísticas incrementales compartidas por los monitores
+- SnapshotStore: Series temporales append-only de los snapshots de los monitores
 
 Autor: Bot Trading v10 Enterprise
 Versión: 1.0.0
@@ -20,12 +22,18 @@ from .trading_monitor import TradingMonitor
 from .risk_monitor import RiskMonitor
 from .performance_monitor import PerformanceMonitor
 from .pnl_tracker import PnLTracker
+from .streaming_stats import StreamingRiskStats, streaming_risk_stats
+from .snapshot_store import SnapshotStore, snapshot_store
 
 __all__ = [
     'TradingMonitor',
     'RiskMonitor', 
     'PerformanceMonitor',
-    'PnLTracker'
+    'PnLTracker',
+    'StreamingRiskStats',
+    'streaming_risk_stats',
+    'SnapshotStore',
+    'snapshot_store'
 ]
 
 __version__ = '1.0.0'
@@ -25,6 +25,8 @@ from prometheus_client.core import CollectorRegistry
 
 from core.trading.bitget_client import bitget_client
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
+from core.monitoring.enterprise.streaming_stats import streaming_risk_stats
 
 logger = logging.getLogger(__name__)
 
@@ -78,9 +80,12 @@ class PerformanceMonitor:
         self.start_time = None
         self.last_metrics = None
         self.performance_history = []
-        self.returns_history = []
         self.max_history = 10000
         
+        # Estadísticas de retornos compartidas con RiskMonitor y TradingMonitor
+        self.return_stats = streaming_risk_stats
+        self._histogram_version = 0
+        
         # Configuración
         self.update_interval = self.config.get('update_interval', 60)  # segundos
         self.risk_free_rate = self.config.get('risk_free_rate', 0.02)  # 2% anual
@@ -196,6 +201,7 @@ class PerformanceMonitor:
             # Obtener información de la cuenta
             balance_info = await self.bitget_client.get_margin_info()
             current_balance = balance_info.get('total_balance', 0) if balance_info else 0
+            self.return_stats.observe_equity(current_balance)
             
             # Calcular retornos
             total_return = await self.calculate_total_return(current_balance)
@@ -295,6 +301,10 @@ class PerformanceMonitor:
                 cagr=0, mdd_duration=0, recovery_time=0
             )
     
+    def _stats(self):
+        """Snapshot de las estadísticas (cacheado hasta el siguiente retorno)"""
+        return self.return_stats.snapshot()
+    
     async def calculate_total_return(self, current_balance: float) -> float:
         """Calcula el retorno total"""
         try:
@@ -316,11 +326,11 @@ class PerformanceMonitor:
     async def calculate_volatility(self) -> float:
         """Calcula la volatilidad"""
         try:
-            if len(self.returns_history) < 2:
+            stats = self._stats()
+            if stats.count < 2:
                 return 0.0
             
-            returns = np.array(self.returns_history)
-            return np.std(returns) * np.sqrt(252) * 100  # Volatilidad anualizada
+            return stats.volatility * 100  # Volatilidad anualizada
         except Exception as e:
             logger.error(f"Error calculando volatilidad: {e}")
             return 0.0
@@ -328,16 +338,11 @@ class PerformanceMonitor:
     async def calculate_sharpe_ratio(self) -> float:
         """Calcula el ratio de Sharpe"""
         try:
-            if len(self.returns_history) < 2:
-                return 0.0
-            
-            returns = np.array(self.returns_history)
-            excess_returns = returns - (self.risk_free_rate / 252)
-            
-            if np.std(excess_returns) == 0:
+            stats = self._stats()
+            if stats.count < 2:
                 return 0.0
             
-            return np.mean(excess_returns) / np.std(excess_returns) * np.sqrt(252)
+            return stats.sharpe_ratio
         except Exception as e:
             logger.error(f"Error calculando Sharpe ratio: {e}")
             return 0.0
@@ -345,17 +350,11 @@ class PerformanceMonitor:
     async def calculate_sortino_ratio(self) -> float:
         """Calcula el ratio de Sortino"""
         try:
-            if len(self.returns_history) < 2:
+            stats = self._stats()
+            if stats.count < 2:
                 return 0.0
             
-            returns = np.array(self.returns_history)
-            excess_returns = returns - (self.risk_free_rate / 252)
-            downside_returns = excess_returns[excess_returns < 0]
-            
-            if len(downside_returns) == 0 or np.std(downside_returns) == 0:
-                return 0.0
-            
-            return np.mean(excess_returns) / np.std(downside_returns) * np.sqrt(252)
+            return stats.sortino_ratio
         except Exception as e:
             logger.error(f"Error calculando Sortino ratio: {e}")
             return 0.0
@@ -377,15 +376,11 @@ class PerformanceMonitor:
     async def calculate_max_drawdown(self) -> float:
         """Calcula el drawdown máximo"""
         try:
-            if len(self.returns_history) < 2:
+            stats = self._stats()
+            if stats.count < 2:
                 return 0.0
             
-            returns = np.array(self.returns_history)
-            cumulative = np.cumprod(1 + returns)
-            running_max = np.maximum.accumulate(cumulative)
-            drawdown = (cumulative - running_max) / running_max
-            
-            return np.min(drawdown) * 100
+            return stats.max_drawdown * 100
         except Exception as e:
             logger.error(f"Error calculando drawdown máximo: {e}")
             return 0.0
@@ -393,8 +388,8 @@ class PerformanceMonitor:
     async def calculate_mdd_duration(self) -> int:
         """Calcula la duración del drawdown máximo en días"""
         try:
-            # Implementar cálculo de duración de MDD
-            return 0
+            periods = self._stats().max_drawdown_duration
+            return int(periods * self.return_stats.sample_interval // 86400)
         except Exception as e:
             logger.error(f"Error calculando duración de MDD: {e}")
             return 0
@@ -402,11 +397,7 @@ class PerformanceMonitor:
     async def calculate_var(self, confidence_level: float) -> float:
         """Calcula el Value at Risk"""
         try:
-            if len(self.returns_history) < 2:
-                return 0.0
-            
-            returns = np.array(self.returns_history)
-            return np.percentile(returns, (1 - confidence_level) * 100) * 100
+            return self.return_stats.value_at_risk(confidence_level) * 100
         except Exception as e:
             logger.error(f"Error calculando VaR: {e}")
             return 0.0
@@ -414,17 +405,11 @@ class PerformanceMonitor:
     async def calculate_expected_shortfall(self) -> float:
         """Calcula el Expected Shortfall (CVaR)"""
         try:
-            if len(self.returns_history) < 2:
+            stats = self._stats()
+            if stats.count < 2:
                 return 0.0
             
-            returns = np.array(self.returns_history)
-            var_95 = np.percentile(returns, 5)
-            tail_returns = returns[returns <= var_95]
-            
-            if len(tail_returns) == 0:
-                return 0.0
-            
-            return np.mean(tail_returns) * 100
+            return stats.expected_shortfall * 100
         except Exception as e:
             logger.error(f"Error calculando Expected Shortfall: {e}")
             return 0.0
@@ -464,13 +449,13 @@ class PerformanceMonitor:
         return 0.0
     
     async def calculate_omega_ratio(self) -> float:
-        return 0.0
+        return self._stats().omega_ratio
     
     async def calculate_gain_to_pain_ratio(self) -> float:
-        return 0.0
+        return self._stats().gain_to_pain_ratio
     
     async def calculate_tail_ratio(self) -> float:
-        return 0.0
+        return self._stats().tail_ratio
     
     async def calculate_common_sense_ratio(self) -> float:
         return 0.0
@@ -515,9 +500,10 @@ class PerformanceMonitor:
             self.profit_factor_gauge.set(metrics.profit_factor)
             self.recovery_factor_gauge.set(metrics.recovery_factor)
             
-            # Histogramas
-            for return_val in self.returns_history[-100:]:  # Últimos 100 retornos
+            # Histogramas: solo los retornos nuevos desde la última actualización
+            for return_val in self.return_stats.returns_since(self._histogram_version):
                 self.returns_histogram.observe(return_val)
+            self._histogram_version = self.return_stats.version
             
         except Exception as e:
             logger.error(f"Error actualizando métricas de Prometheus: {e}")
@@ -540,4 +526,4 @@ class PerformanceMonitor:
             logger.error(f"Error deteniendo monitoreo de performance: {e}")
 
 # Instancia global
-performance_monitor = PerformanceMonitor()
+performance_monitor = lazy_service('performance_monitor', PerformanceMonitor)
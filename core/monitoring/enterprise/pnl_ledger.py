@@ -0,0 +1,208 @@
+# Ruta: core/monitoring/enterprise/pnl_ledger.py
+#!/usr/bin/env python3
+"""
+Ledger de PnL Indexado y Pre-agregado
+=====================================
+
+Almacén acotado de registros de PnL para PnLTracker:
+
+- Columnas NumPy en buffer circular (timestamp, día, pnl, fees, duración y
+  códigos de símbolo/estrategia) para consultas vectorizadas
+- Agregados mantenidos en cada inserción/expulsión: total, por símbolo, por
+  estrategia y por día natural
+- Máximo/mínimo de la ventana (mayor ganancia/pérdida) con deques monótonas,
+  válidas porque la expulsión es FIFO
+
+Un resumen completo cuesta O(grupos) en lugar de O(registros × grupos).
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import logging
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PnLAggregate:
+    """Agregado incremental de un grupo de registros"""
+
+    __slots__ = ('count', 'wins', 'losses', 'win_sum', 'loss_sum', 'pnl_sum', 'fees_sum')
+
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.losses = 0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+        self.pnl_sum = 0.0
+        self.fees_sum = 0.0
+
+    def add(self, pnl: float, fees: float, sign: int = 1):
+        self.count += sign
+        self.pnl_sum += sign * pnl
+        self.fees_sum += sign * fees
+        if pnl > 0:
+            self.wins += sign
+            self.win_sum += sign * pnl
+        elif pnl < 0:
+            self.losses += sign
+            self.loss_sum += sign * pnl
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PnLLedger:
+    """Ledger columnar acotado con agregados por símbolo, estrategia y día"""
+
+    def __init__(self, max_records: int = 50000):
+        self.max_records = max_records
+
+        # Columnas en buffer circular
+        self.timestamps = np.zeros(max_records, dtype=np.float64)
+        self.days = np.zeros(max_records, dtype=np.int64)
+        self.pnl = np.zeros(max_records, dtype=np.float64)
+        self.fees = np.zeros(max_records, dtype=np.float64)
+        self.durations = np.zeros(max_records, dtype=np.float64)
+        self.symbol_codes = np.zeros(max_records, dtype=np.int32)
+        self.strategy_codes = np.zeros(max_records, dtype=np.int32)
+        self.records = deque()
+        self._head = 0  # Posición del registro más antiguo
+        self._sequence = 0  # Registros insertados desde el inicio
+
+        # Diccionarios de códigos
+        self.symbols: List[str] = []
+        self.strategies: List[str] = []
+        self._symbol_index: Dict[str, int] = {}
+        self._strategy_index: Dict[str, int] = {}
+
+        # Agregados
+        self.total = PnLAggregate()
+        self.by_symbol: Dict[str, PnLAggregate] = {}
+        self.by_strategy: Dict[str, PnLAggregate] = {}
+        self.by_day: Dict[int, PnLAggregate] = {}
+
+        # (secuencia, pnl) monótonas para mayor ganancia / mayor pérdida
+        self._max_wins = deque()
+        self._min_losses = deque()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _code(self, value: str, index: Dict[str, int], values: List[str]) -> int:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    @staticmethod
+    def _group(groups: Dict[Any, PnLAggregate], key: Any) -> PnLAggregate:
+        aggregate = groups.get(key)
+        if aggregate is None:
+            aggregate = groups[key] = PnLAggregate()
+        return aggregate
+
+    def _apply(self, record: Any, day: int, sign: int):
+        pnl, fees = record.pnl, record.fees
+        self.total.add(pnl, fees, sign)
+        for groups, key in ((self.by_symbol, record.symbol), (self.by_strategy, record.strategy), (self.by_day, day)):
+            aggregate = self._group(groups, key)
+            aggregate.add(pnl, fees, sign)
+            if aggregate.count == 0:
+                del groups[key]
+
+    def append(self, record: Any):
+        """Añade un registro (PnLRecord); expulsa el más antiguo si está lleno"""
+        if len(self.records) == self.max_records:
+            self._evict()
+
+        position = (self._head + len(self.records)) % self.max_records
+        day = record.timestamp.toordinal()
+        self.timestamps[position] = record.timestamp.timestamp()
+        self.days[position] = day
+        self.pnl[position] = record.pnl
+        self.fees[position] = record.fees
+        self.durations[position] = record.duration_minutes
+        self.symbol_codes[position] = self._code(record.symbol, self._symbol_index, self.symbols)
+        self.strategy_codes[position] = self._code(record.strategy, self._strategy_index, self.strategies)
+        self.records.append(record)
+        self._apply(record, day, 1)
+
+        sequence = self._sequence
+        self._sequence += 1
+        if record.pnl > 0:
+            while self._max_wins and self._max_wins[-1][1] <= record.pnl:
+                self._max_wins.pop()
+            self._max_wins.append((sequence, record.pnl))
+        elif record.pnl < 0:
+            while self._min_losses and self._min_losses[-1][1] >= record.pnl:
+                self._min_losses.pop()
+            self._min_losses.append((sequence, record.pnl))
+
+    def _evict(self):
+        record = self.records.popleft()
+        self._apply(record, int(self.days[self._head]), -1)
+        self._head = (self._head + 1) % self.max_records
+
+        # Secuencia del registro expulsado
+        evicted = self._sequence - len(self.records) - 1
+        for extremes in (self._max_wins, self._min_losses):
+            if extremes and extremes[0][0] == evicted:
+                extremes.popleft()
+
+    def clear(self):
+        self.__init__(self.max_records)
+
+    # ----------------------------- Consultas -----------------------------
+
+    @property
+    def largest_win(self) -> float:
+        return self._max_wins[0][1] if self._max_wins else 0
+
+    @property
+    def largest_loss(self) -> float:
+        return self._min_losses[0][1] if self._min_losses else 0
+
+    def symbol_pnl(self, symbol: str) -> float:
+        aggregate = self.by_symbol.get(symbol)
+        return aggregate.pnl_sum if aggregate else 0.0
+
+    def strategy_pnl(self) -> Dict[str, float]:
+        return {strategy: aggregate.pnl_sum for strategy, aggregate in self.by_strategy.items()}
+
+    def pnl_since(self, day: date) -> float:
+        """PnL de los registros con fecha >= ``day`` (O(días en el ledger))"""
+        start = day.toordinal()
+        return sum(aggregate.pnl_sum for key, aggregate in self.by_day.items() if key >= start)
+
+    def pnl_on(self, day: date) -> float:
+        aggregate = self.by_day.get(day.toordinal())
+        return aggregate.pnl_sum if aggregate else 0.0
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columnas en orden de inserción (copias)"""
+        order = (self._head + np.arange(len(self.records))) % self.max_records
+        return {
+            'timestamp': self.timestamps[order],
+            'day': self.days[order],
+            'pnl': self.pnl[order],
+            'fees': self.fees[order],
+            'duration_minutes': self.durations[order],
+            'symbol_code': self.symbol_codes[order],
+            'strategy_code': self.strategy_codes[order],
+        }
+
+    def pnl_between(self, start: datetime, end: datetime) -> float:
+        """PnL en un rango arbitrario de timestamps (consulta vectorizada)"""
+        count = len(self.records)
+        stamps = self.timestamps[:count] if count < self.max_records else self.timestamps
+        values = self.pnl[:count] if count < self.max_records else self.pnl
+        mask = (stamps >= start.timestamp()) & (stamps <= end.timestamp())
+        return float(values[mask].sum())
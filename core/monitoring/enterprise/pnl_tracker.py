@@ -26,6 +26,9 @@ from prometheus_client.core import CollectorRegistry
 
 from core.trading.bitget_client import bitget_client
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
+from core.monitoring.enterprise.pnl_ledger import PnLLedger
+from core.monitoring.enterprise.snapshot_store import snapshot_store
 
 logger = logging.getLogger(__name__)
 
@@ -85,8 +88,9 @@ class PnLTracker:
         self.is_running = False
         self.start_time = None
         self.last_summary = None
-        self.pnl_records = []
-        self.max_records = 50000
+        self.max_records = self.config.get('max_records', 50000)
+        self.ledger = PnLLedger(self.max_records)
+        self.snapshot_store = snapshot_store
         
         # Configuración
         self.update_interval = self.config.get('update_interval', 10)  # segundos
@@ -213,44 +217,30 @@ class PnLTracker:
             realized_pnl = 0  # Se calcularía desde el historial de trades
             unrealized_pnl = total_pnl
             
-            # Calcular métricas de trades
-            total_trades = len(self.pnl_records)
-            winning_trades = len([r for r in self.pnl_records if r.pnl > 0])
-            losing_trades = len([r for r in self.pnl_records if r.pnl < 0])
+            # Calcular métricas de trades (agregados del ledger)
+            totals = self.ledger.total
+            total_trades = totals.count
+            winning_trades = totals.wins
+            losing_trades = totals.losses
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
             
             # Calcular métricas de performance
-            if self.pnl_records:
-                wins = [r.pnl for r in self.pnl_records if r.pnl > 0]
-                losses = [r.pnl for r in self.pnl_records if r.pnl < 0]
-                
-                avg_win = np.mean(wins) if wins else 0
-                avg_loss = np.mean(losses) if losses else 0
-                largest_win = max(wins) if wins else 0
-                largest_loss = min(losses) if losses else 0
-                
-                total_wins = sum(wins)
-                total_losses = abs(sum(losses))
-                profit_factor = (total_wins / total_losses) if total_losses > 0 else 0
-            else:
-                avg_win = avg_loss = largest_win = largest_loss = profit_factor = 0
+            avg_win = totals.win_sum / totals.wins if totals.wins else 0
+            avg_loss = totals.loss_sum / totals.losses if totals.losses else 0
+            largest_win = self.ledger.largest_win
+            largest_loss = self.ledger.largest_loss
+            total_losses = abs(totals.loss_sum)
+            profit_factor = (totals.win_sum / total_losses) if total_losses > 0 else 0
             
             # Calcular fees totales
-            total_fees = sum(r.fees for r in self.pnl_records)
+            total_fees = totals.fees_sum
             net_pnl = total_pnl - total_fees
             
             # Calcular PnL por símbolo
-            pnl_by_symbol = {}
-            for symbol in self.symbols:
-                symbol_pnl = sum(r.pnl for r in self.pnl_records if r.symbol == symbol)
-                pnl_by_symbol[symbol] = symbol_pnl
+            pnl_by_symbol = {symbol: self.ledger.symbol_pnl(symbol) for symbol in self.symbols}
             
             # Calcular PnL por estrategia
-            pnl_by_strategy = {}
-            strategies = set(r.strategy for r in self.pnl_records)
-            for strategy in strategies:
-                strategy_pnl = sum(r.pnl for r in self.pnl_records if r.strategy == strategy)
-                pnl_by_strategy[strategy] = strategy_pnl
+            pnl_by_strategy = self.ledger.strategy_pnl()
             
             # Calcular PnL temporal
             daily_pnl = await self.calculate_daily_pnl()
@@ -298,9 +288,7 @@ class PnLTracker:
     async def calculate_daily_pnl(self) -> float:
         """Calcula el PnL diario"""
         try:
-            today = datetime.now().date()
-            daily_records = [r for r in self.pnl_records if r.timestamp.date() == today]
-            return sum(r.pnl for r in daily_records)
+            return self.ledger.pnl_on(datetime.now().date())
         except Exception as e:
             logger.error(f"Error calculando PnL diario: {e}")
             return 0.0
@@ -310,8 +298,7 @@ class PnLTracker:
         try:
             today = datetime.now().date()
             week_start = today - timedelta(days=today.weekday())
-            weekly_records = [r for r in self.pnl_records if r.timestamp.date() >= week_start]
-            return sum(r.pnl for r in weekly_records)
+            return self.ledger.pnl_since(week_start)
         except Exception as e:
             logger.error(f"Error calculando PnL semanal: {e}")
             return 0.0
@@ -321,8 +308,7 @@ class PnLTracker:
         try:
             today = datetime.now().date()
             month_start = today.replace(day=1)
-            monthly_records = [r for r in self.pnl_records if r.timestamp.date() >= month_start]
-            return sum(r.pnl for r in monthly_records)
+            return self.ledger.pnl_since(month_start)
         except Exception as e:
             logger.error(f"Error calculando PnL mensual: {e}")
             return 0.0
@@ -330,11 +316,11 @@ class PnLTracker:
     def add_pnl_record(self, record: PnLRecord):
         """Añade un nuevo registro de PnL"""
         try:
-            self.pnl_records.append(record)
+            # El ledger expulsa el registro más antiguo al llegar a max_records
+            self.ledger.append(record)
             
-            # Mantener solo los últimos registros
-            if len(self.pnl_records) > self.max_records:
-                self.pnl_records.pop(0)
+            self.pnl_histogram.observe(record.pnl)
+            self.trade_duration_histogram.observe(record.duration_minutes)
             
             logger.info(f"💰 PnL registrado: {record.symbol} {record.side} ${record.pnl:.2f}")
             
@@ -379,55 +365,23 @@ class PnLTracker:
             self.weekly_pnl_gauge.set(summary.weekly_pnl)
             self.monthly_pnl_gauge.set(summary.monthly_pnl)
             
-            # Histogramas
-            for record in self.pnl_records[-100:]:  # Últimos 100 registros
-                self.pnl_histogram.observe(record.pnl)
-                self.trade_duration_histogram.observe(record.duration_minutes)
-            
         except Exception as e:
             logger.error(f"Error actualizando métricas de Prometheus: {e}")
     
     async def save_pnl_summary_to_file(self, summary: PnLSummary):
-        """Guarda el resumen de PnL en archivo"""
+        """Añade el resumen de PnL al almacén de series temporales"""
         try:
-            summary_file = Path("data/enterprise/pnl_tracking/pnl_summary.json")
-            
-            # Convertir resumen a diccionario
-            summary_dict = {
-                'timestamp': summary.timestamp.isoformat(),
-                'total_pnl': summary.total_pnl,
-                'realized_pnl': summary.realized_pnl,
-                'unrealized_pnl': summary.unrealized_pnl,
-                'total_trades': summary.total_trades,
-                'winning_trades': summary.winning_trades,
-                'losing_trades': summary.losing_trades,
-                'win_rate': summary.win_rate,
-                'avg_win': summary.avg_win,
-                'avg_loss': summary.avg_loss,
-                'largest_win': summary.largest_win,
-                'largest_loss': summary.largest_loss,
-                'profit_factor': summary.profit_factor,
-                'total_fees': summary.total_fees,
-                'net_pnl': summary.net_pnl,
-                'pnl_by_symbol': summary.pnl_by_symbol,
-                'pnl_by_strategy': summary.pnl_by_strategy,
-                'daily_pnl': summary.daily_pnl,
-                'weekly_pnl': summary.weekly_pnl,
-                'monthly_pnl': summary.monthly_pnl
-            }
-            
-            # Guardar en archivo
-            with open(summary_file, 'w') as f:
-                json.dump(summary_dict, f, indent=2)
-                
+            self.snapshot_store.append('pnl', summary)
         except Exception as e:
             logger.error(f"Error guardando resumen de PnL: {e}")
     
     async def load_pnl_history(self):
         """Carga el historial de PnL"""
         try:
-            # Implementar carga de historial
-            pass
+            restored = self.snapshot_store.load_dataclasses('pnl', PnLSummary, 1)
+            if restored:
+                self.last_summary = restored[-1]
+                logger.info(f"📂 Último resumen de PnL restaurado ({self.last_summary.timestamp})")
         except Exception as e:
             logger.error(f"Error cargando historial de PnL: {e}")
     
@@ -437,9 +391,8 @@ class PnLTracker:
             logger.info("⏹️ Deteniendo seguimiento de PnL...")
             self.is_running = False
             
-            # Guardar resumen final
-            if self.last_summary:
-                await self.save_pnl_summary_to_file(self.last_summary)
+            # Volcar snapshots pendientes
+            self.snapshot_store.flush()
             
             logger.info("✅ Seguimiento de PnL detenido correctamente")
             
@@ -452,7 +405,7 @@ class PnLTracker:
     
     def get_pnl_records(self) -> List[PnLRecord]:
         """Obtiene todos los registros de PnL"""
-        return self.pnl_records.copy()
+        return list(self.ledger.records)
 
 # Instancia global
-pnl_tracker = PnLTracker()
+pnl_tracker = lazy_service('pnl_tracker', PnLTracker)
@@ -35,6 +35,9 @@ from prometheus_client.core import CollectorRegistry
 
 from core.trading.bitget_client import bitget_client
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
+from core.monitoring.enterprise.streaming_stats import streaming_risk_stats
+from core.monitoring.enterprise.snapshot_store import snapshot_store
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -92,6 +95,10 @@ class RiskMonitor:
         self.last_metrics = None
         self.risk_history = []
         self.max_history = 10000
+        self.snapshot_store = snapshot_store
+        
+        # Estadísticas de retornos compartidas con PerformanceMonitor y TradingMonitor
+        self.return_stats = streaming_risk_stats
         
         # Configuración de riesgo
         self.risk_limits = self.config.get('risk_limits', {})
@@ -316,6 +323,7 @@ class RiskMonitor:
             # Obtener información de la cuenta
             balance_info = await self.bitget_client.get_margin_info()
             portfolio_value = balance_info.get('total_balance', 0) if balance_info else 0
+            self.return_stats.observe_equity(portfolio_value)
             
             # Obtener posiciones
             positions = await self.bitget_client.get_positions()
@@ -430,8 +438,7 @@ class RiskMonitor:
     async def calculate_current_drawdown(self) -> float:
         """Calcula el drawdown actual"""
         try:
-            # Implementar cálculo de drawdown actual
-            return 0.0
+            return -self.return_stats.snapshot().current_drawdown * 100
         except Exception as e:
             logger.error(f"Error calculando drawdown actual: {e}")
             return 0.0
@@ -439,8 +446,7 @@ class RiskMonitor:
     async def calculate_max_drawdown(self) -> float:
         """Calcula el drawdown máximo"""
         try:
-            # Implementar cálculo de drawdown máximo
-            return 0.0
+            return -self.return_stats.snapshot().max_drawdown * 100
         except Exception as e:
             logger.error(f"Error calculando drawdown máximo: {e}")
             return 0.0
@@ -448,8 +454,8 @@ class RiskMonitor:
     async def calculate_var(self, confidence_level: float) -> float:
         """Calcula el Value at Risk"""
         try:
-            # Implementar cálculo de VaR
-            return 0.0
+            # Pérdida positiva en % del portfolio
+            return max(0.0, -self.return_stats.value_at_risk(confidence_level) * 100)
         except Exception as e:
             logger.error(f"Error calculando VaR: {e}")
             return 0.0
@@ -457,8 +463,8 @@ class RiskMonitor:
     async def calculate_expected_shortfall(self) -> float:
         """Calcula el Expected Shortfall (CVaR)"""
         try:
-            # Implementar cálculo de Expected Shortfall
-            return 0.0
+            stats = self.return_stats.snapshot()
+            return max(0.0, -stats.expected_shortfall * 100) if stats.count >= 2 else 0.0
         except Exception as e:
             logger.error(f"Error calculando Expected Shortfall: {e}")
             return 0.0
@@ -466,8 +472,7 @@ class RiskMonitor:
     async def calculate_sharpe_ratio(self) -> float:
         """Calcula el ratio de Sharpe"""
         try:
-            # Implementar cálculo de Sharpe ratio
-            return 0.0
+            return self.return_stats.snapshot().sharpe_ratio
         except Exception as e:
             logger.error(f"Error calculando Sharpe ratio: {e}")
             return 0.0
@@ -475,8 +480,10 @@ class RiskMonitor:
     async def calculate_calmar_ratio(self) -> float:
         """Calcula el ratio de Calmar"""
         try:
-            # Implementar cálculo de Calmar ratio
-            return 0.0
+            stats = self.return_stats.snapshot()
+            if stats.max_drawdown == 0:
+                return 0.0
+            return stats.mean * self.return_stats.periods_per_year / abs(stats.max_drawdown)
         except Exception as e:
             logger.error(f"Error calculando Calmar ratio: {e}")
             return 0.0
@@ -676,10 +683,11 @@ class RiskMonitor:
             
             # Circuit breaker por VaR excesivo
             max_var_limit = self.circuit_breakers.get('max_var', 2000.0)
-            if metrics.var_99 > max_var_limit and not self.circuit_breaker_active:
+            var_99_usd = metrics.var_99 / 100 * metrics.portfolio_value
+            if var_99_usd > max_var_limit and not self.circuit_breaker_active:
                 await self.activate_circuit_breaker(
                     "EXCESSIVE_VAR",
-                    f"VaR excesivo: ${metrics.var_99:.2f}"
+                    f"VaR excesivo: ${var_99_usd:.2f} ({metrics.var_99:.2f}%)"
                 )
             
         except Exception as e:
@@ -778,53 +786,21 @@ class RiskMonitor:
             logger.error(f"Error actualizando métricas de Prometheus: {e}")
     
     async def save_risk_metrics_to_file(self, metrics: RiskMetrics):
-        """Guarda las métricas de riesgo en archivo"""
+        """Añade el snapshot de riesgo al almacén de series temporales"""
         try:
-            metrics_file = Path("data/enterprise/risk_monitoring/risk_metrics.json")
-            
-            # Convertir métricas a diccionario
-            metrics_dict = {
-                'timestamp': metrics.timestamp.isoformat(),
-                'portfolio_value': metrics.portfolio_value,
-                'total_exposure': metrics.total_exposure,
-                'exposure_percentage': metrics.exposure_percentage,
-                'margin_used': metrics.margin_used,
-                'margin_available': metrics.margin_available,
-                'margin_ratio': metrics.margin_ratio,
-                'current_drawdown': metrics.current_drawdown,
-                'max_drawdown': metrics.max_drawdown,
-                'var_95': metrics.var_95,
-                'var_99': metrics.var_99,
-                'expected_shortfall': metrics.expected_shortfall,
-                'sharpe_ratio': metrics.sharpe_ratio,
-                'calmar_ratio': metrics.calmar_ratio,
-                'max_position_size': metrics.max_position_size,
-                'correlation_risk': metrics.correlation_risk,
-                'concentration_risk': metrics.concentration_risk,
-                'liquidity_risk': metrics.liquidity_risk,
-                'market_risk': metrics.market_risk,
-                'operational_risk': metrics.operational_risk,
-                'risk_score': metrics.risk_score,
-                'risk_level': metrics.risk_level.value,
-                'alerts_count': metrics.alerts_count,
-                'circuit_breaker_active': metrics.circuit_breaker_active
-            }
-            
-            # Guardar en archivo
-            with open(metrics_file, 'w') as f:
-                json.dump(metrics_dict, f, indent=2)
-                
+            self.snapshot_store.append('risk', metrics)
         except Exception as e:
             logger.error(f"Error guardando métricas de riesgo: {e}")
     
     async def load_risk_history(self):
         """Carga el historial de métricas de riesgo"""
         try:
-            metrics_file = Path("data/enterprise/risk_monitoring/risk_metrics.json")
-            if metrics_file.exists():
-                with open(metrics_file, 'r') as f:
-                    data = json.load(f)
-                    # Procesar datos históricos si es necesario
+            self.risk_history = self.snapshot_store.load_dataclasses(
+                'risk', RiskMetrics, self.max_history, converters={'risk_level': RiskLevel}
+            )
+            if self.risk_history:
+                self.last_metrics = self.risk_history[-1]
+                logger.info(f"📂 {len(self.risk_history)} snapshots de riesgo restaurados")
                     
         except Exception as e:
             logger.error(f"Error cargando historial de métricas de riesgo: {e}")
@@ -835,9 +811,8 @@ class RiskMonitor:
             logger.info("⏹️ Deteniendo monitoreo de riesgo...")
             self.is_running = False
             
-            # Guardar métricas finales
-            if self.last_metrics:
-                await self.save_risk_metrics_to_file(self.last_metrics)
+            # Volcar snapshots pendientes
+            self.snapshot_store.flush()
             
             logger.info("✅ Monitoreo de riesgo detenido correctamente")
             
@@ -857,4 +832,4 @@ class RiskMonitor:
         return self.circuit_breaker_active
 
 # Instancia global
-risk_monitor = RiskMonitor()
+risk_monitor = lazy_service('risk_monitor', RiskMonitor)
@@ -0,0 +1,479 @@
+# Ruta: core/monitoring/enterprise/snapshot_store.py
+#!/usr/bin/env python3
+"""
+Almacén de Snapshots de Monitores - Series Temporales Append-Only
+================================================================
+
+Persistencia compacta de los snapshots periódicos de RiskMonitor,
+TradingMonitor y PnLTracker en una base SQLite (WAL):
+
+- Una tabla por stream con ``ts`` (epoch en ms) como INTEGER PRIMARY KEY:
+  las filas quedan ordenadas por tiempo y las consultas por rango son
+  búsquedas en el árbol de la clave
+- Columnas tipadas derivadas del snapshot; los campos nuevos se añaden con
+  ALTER TABLE; diccionarios/listas como JSON
+- Escritura append-only con buffer: un ``executemany`` y un COMMIT por lote
+  (``batch_size`` snapshots o ``flush_interval_s`` segundos)
+- Consultas por rango, últimos N y downsampling por buckets (avg/min/max/last)
+  para dashboards e informes
+- Retención opcional por antigüedad
+- Fallos de escritura: el lote se reintenta fila a fila; las filas que la BD
+  rechaza van a ``dead_letters`` y los errores transitorios (BD bloqueada)
+  devuelven el lote a una cola acotada (``max_pending``)
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import atexit
+import dataclasses
+import json
+import logging
+import re
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from core.integration.service_registry import lazy_service
+
+logger = logging.getLogger(__name__)
+
+# Tipos declarados: el sufijo TEXT da afinidad de texto en SQLite
+_JSON_TYPE = 'JSON_TEXT'
+_BOOL_TYPE = 'BOOLEAN'
+_AGGREGATES = {'avg': 'AVG', 'min': 'MIN', 'max': 'MAX', 'sum': 'SUM'}
+
+
+def _plain(value: Any) -> Any:
+    """Escalares y arrays de numpy (u objetos con ``item``/``tolist``) a tipos Python"""
+    if isinstance(value, (str, bytes, int, float)) or value is None:
+        return value
+    if type(value).__module__ == 'numpy':
+        return value.tolist() if hasattr(value, 'shape') and value.shape else value.item()
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    plain = _plain(value)
+    return str(value) if plain is value else plain
+
+
+def _column_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return _BOOL_TYPE
+    if isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    if isinstance(value, (dict, list, tuple)):
+        return _JSON_TYPE
+    return 'TEXT'
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return value
+    # Cualquier otro objeto se guarda con su representación de texto
+    return str(value)
+
+
+def _to_millis(value: Any) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(float(value) * 1000)
+
+
+class SnapshotStore:
+    """Series temporales append-only de snapshots de monitores en SQLite"""
+
+    def __init__(
+        self,
+        db_path: str = "data/enterprise/monitoring/snapshots.db",
+        batch_size: int = 100,
+        flush_interval_s: float = 10.0,
+        retention_days: Optional[int] = None,
+        max_pending: int = 10000,
+        max_dead_letters: int = 1000
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.retention_days = retention_days
+        self.max_pending = max(batch_size, max_pending)
+
+        self._lock = RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        self._columns: Dict[str, Dict[str, str]] = {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+        self._retry_after = 0.0
+        # Filas rechazadas por la BD: (stream, fila, error)
+        self.dead_letters: "deque[Tuple[str, Dict[str, Any], str]]" = deque(maxlen=max_dead_letters)
+        self.stats = {'snapshots_written': 0, 'batches_written': 0, 'flush_errors': 0, 'flush_seconds': 0.0,
+                      'dead_lettered': 0, 'snapshots_dropped': 0}
+
+        atexit.register(self.close)
+        logger.info(f"🗄️ SnapshotStore inicializado en {self.db_path}")
+
+    # ----------------------------- Esquema -----------------------------
+
+    @staticmethod
+    def _table(stream: str) -> str:
+        if not re.fullmatch(r'[A-Za-z0-9_]+', stream):
+            raise ValueError(f"Nombre de stream inválido: {stream!r}")
+        return f'snap_{stream}'
+
+    @staticmethod
+    def _quote(column: str) -> str:
+        return '"' + column.replace('"', '""') + '"'
+
+    def _load_columns(self, stream: str) -> Dict[str, str]:
+        columns = self._columns.get(stream)
+        if columns is None:
+            info = self._conn.execute(f"PRAGMA table_info({self._table(stream)})").fetchall()
+            columns = {row[1]: (row[2] or '').upper() for row in info if row[1] != 'ts'}
+            self._columns[stream] = columns
+        return columns
+
+    def _ensure_columns(self, stream: str, rows: Sequence[Dict[str, Any]]):
+        table = self._table(stream)
+        columns = self._load_columns(stream)
+        if not columns and not self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone():
+            self._conn.execute(f"CREATE TABLE {table} (ts INTEGER PRIMARY KEY)")
+        for row in rows:
+            for name, value in row.items():
+                if name not in columns and name != 'timestamp' and value is not None:
+                    declared = _column_type(value)
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {self._quote(name)} {declared}")
+                    columns[name] = declared
+
+    # ----------------------------- Escritura -----------------------------
+
+    @staticmethod
+    def _normalize(snapshot: Any) -> Dict[str, Any]:
+        if dataclasses.is_dataclass(snapshot):
+            snapshot = {field.name: getattr(snapshot, field.name) for field in dataclasses.fields(snapshot)}
+        row = {key: _plain(value.value if isinstance(value, Enum) else value) for key, value in snapshot.items()}
+        if 'timestamp' not in row:
+            row['timestamp'] = datetime.now()
+        return row
+
+    def append(self, stream: str, snapshot: Any):
+        """Encola un snapshot (dataclass o dict con ``timestamp``)"""
+        row = self._normalize(snapshot)
+        self._table(stream)
+        with self._lock:
+            self._pending.setdefault(stream, []).append(row)
+            self._pending_count += 1
+            self._enforce_pending_limit()
+            now = time.monotonic()
+            if now >= self._retry_after and (
+                self._pending_count >= self.batch_size
+                or now - self._last_flush >= self.flush_interval_s
+            ):
+                self.flush()
+
+    def _enforce_pending_limit(self):
+        """Descarta los snapshots más antiguos del stream más cargado por encima de ``max_pending``"""
+        dropped = 0
+        while self._pending_count > self.max_pending:
+            rows = max(self._pending.values(), key=len)
+            del rows[0]
+            self._pending_count -= 1
+            dropped += 1
+        if dropped:
+            self.stats['snapshots_dropped'] += dropped
+            logger.warning(f"⚠️ Cola de snapshots llena: {dropped} snapshots antiguos descartados")
+
+    def _write_rows(self, stream: str, rows: Sequence[Dict[str, Any]]) -> int:
+        """INSERT de las filas de un stream (sin COMMIT); devuelve las filas escritas"""
+        self._ensure_columns(stream, rows)
+        columns = self._columns[stream]
+        table = self._table(stream)
+        # Agrupar por conjunto de campos para un INSERT por forma
+        shapes: Dict[Tuple[str, ...], List[Tuple]] = {}
+        for row in rows:
+            # 'timestamp' se guarda como clave ts en milisegundos
+            names = tuple(name for name in row if name in columns and name != 'timestamp')
+            shapes.setdefault(names, []).append(
+                (_to_millis(row['timestamp']),) + tuple(_encode(row[name]) for name in names)
+            )
+        written = 0
+        for names, values in shapes.items():
+            column_sql = ', '.join(('ts',) + tuple(self._quote(name) for name in names))
+            placeholders = ', '.join('?' * (len(names) + 1))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({column_sql}) VALUES ({placeholders})", values
+            )
+            written += len(values)
+        return written
+
+    def _rollback(self, streams):
+        self._conn.rollback()
+        # Los ALTER TABLE deshechos por el rollback: el esquema de esos
+        # streams se vuelve a leer de la BD
+        for stream in streams:
+            self._columns.pop(stream, None)
+
+    def _requeue(self, pending: Dict[str, List[Dict[str, Any]]]):
+        """Devuelve snapshots no escritos a la cola, por delante de los nuevos"""
+        for stream, rows in pending.items():
+            if rows:
+                self._pending[stream] = rows + self._pending.get(stream, [])
+                self._pending_count += len(rows)
+        self._enforce_pending_limit()
+
+    def _write_isolated(self, pending: Dict[str, List[Dict[str, Any]]]) -> int:
+        """
+        Reintento fila a fila tras un lote fallido: las filas que la BD
+        rechaza van a ``dead_letters``; ante un error transitorio
+        (OperationalError: BD bloqueada, disco) el resto vuelve a la cola
+        """
+        written = 0
+        remaining = {stream: list(rows) for stream, rows in pending.items()}
+        for stream, rows in remaining.items():
+            while rows:
+                try:
+                    written += self._write_rows(stream, rows[:1])
+                    self._conn.commit()
+                except sqlite3.OperationalError as e:
+                    self._rollback([stream])
+                    self._requeue(remaining)
+                    self._retry_after = time.monotonic() + self.flush_interval_s
+                    logger.error(f"❌ Error transitorio escribiendo snapshots, se reintentará: {e}")
+                    return written
+                except Exception as e:
+                    self._rollback([stream])
+                    self.dead_letters.append((stream, rows[0], str(e)))
+                    self.stats['dead_lettered'] += 1
+                    logger.error(f"❌ Snapshot de {stream} rechazado por la BD: {e}")
+                del rows[0]
+        return written
+
+    def flush(self):
+        """Escribe los snapshots pendientes: un executemany por stream y un COMMIT"""
+        with self._lock:
+            if not self._pending_count or self._conn is None:
+                self._last_flush = time.monotonic()
+                return
+            start = time.perf_counter()
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+            written = 0
+            try:
+                for stream, rows in pending.items():
+                    written += self._write_rows(stream, rows)
+                self._conn.commit()
+                self._retry_after = 0.0
+            except Exception as e:
+                self._rollback(pending)
+                self.stats['flush_errors'] += 1
+                logger.error(f"❌ Error escribiendo snapshots: {e}")
+                written = self._write_isolated(pending)
+            finally:
+                self._last_flush = time.monotonic()
+
+            self.stats['snapshots_written'] += written
+            self.stats['batches_written'] += 1
+            self.stats['flush_seconds'] += time.perf_counter() - start
+            self._maybe_prune()
+
+    def _maybe_prune(self):
+        if not self.retention_days or time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+        self.prune(datetime.now() - timedelta(days=self.retention_days))
+
+    def prune(self, older_than: datetime) -> int:
+        """Elimina snapshots anteriores a ``older_than`` en todos los streams"""
+        with self._lock:
+            cutoff = _to_millis(older_than)
+            deleted = 0
+            tables = self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'snap\\_%' ESCAPE '\\'"
+            ).fetchall()
+            for (table,) in tables:
+                deleted += self._conn.execute(f"DELETE FROM {table} WHERE ts < ?", (cutoff,)).rowcount
+            self._conn.commit()
+            if deleted:
+                logger.info(f"🧹 {deleted} snapshots eliminados por retención")
+            return deleted
+
+    # ----------------------------- Lectura -----------------------------
+
+    def _decode(self, stream: str, names: Sequence[str], record: Tuple) -> Dict[str, Any]:
+        columns = self._columns.get(stream, {})
+        row = {'timestamp': datetime.fromtimestamp(record[0] / 1000)}
+        for name, value in zip(names, record[1:]):
+            declared = columns.get(name)
+            if value is not None and declared == _JSON_TYPE:
+                value = json.loads(value)
+            elif value is not None and declared == _BOOL_TYPE:
+                value = bool(value)
+            row[name] = value
+        return row
+
+    def _select(self, stream: str, columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+        self.flush()
+        known = self._load_columns(stream)
+        if not known:
+            return None
+        return [name for name in (columns or known) if name in known]
+
+    def query(
+        self,
+        stream: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Snapshots de ``stream`` en [start, end] en orden cronológico"""
+        with self._lock:
+            names = self._select(stream, columns)
+            if names is None:
+                return []
+            column_sql = ', '.join(['ts'] + [self._quote(name) for name in names])
+            sql = f"SELECT {column_sql} FROM {self._table(stream)} WHERE ts BETWEEN ? AND ? ORDER BY ts"
+            params: List[Any] = [
+                _to_millis(start) if start else -2 ** 63,
+                _to_millis(end) if end else 2 ** 63 - 1
+            ]
+            if limit:
+                sql += " LIMIT ?"
+                params.append(limit)
+            return [self._decode(stream, names, record) for record in self._conn.execute(sql, params)]
+
+    def latest(self, stream: str, count: int = 1, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Últimos ``count`` snapshots en orden cronológico"""
+        with self._lock:
+            names = self._select(stream, columns)
+            if names is None:
+                return []
+            column_sql = ', '.join(['ts'] + [self._quote(name) for name in names])
+            records = self._conn.execute(
+                f"SELECT {column_sql} FROM {self._table(stream)} ORDER BY ts DESC LIMIT ?", (count,)
+            ).fetchall()
+            return [self._decode(stream, names, record) for record in reversed(records)]
+
+    def downsample(
+        self,
+        stream: str,
+        bucket_seconds: int,
+        columns: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        how: str = 'avg'
+    ) -> List[Dict[str, Any]]:
+        """
+        Agrega ``columns`` por buckets de ``bucket_seconds``
+
+        ``how``: avg, min, max, sum o last (valor del último snapshot del bucket)
+        """
+        with self._lock:
+            names = self._select(stream, columns)
+            if not names:
+                return []
+            bucket_ms = int(bucket_seconds * 1000)
+            if how == 'last':
+                # SQLite toma las columnas sueltas de la fila con MAX(ts)
+                selected = ', '.join(self._quote(name) for name in names)
+                sql = f"SELECT (ts / ?) * ? AS bucket, MAX(ts), {selected}"
+            elif how in _AGGREGATES:
+                selected = ', '.join(f"{_AGGREGATES[how]}({self._quote(name)})" for name in names)
+                sql = f"SELECT (ts / ?) * ? AS bucket, COUNT(*), {selected}"
+            else:
+                raise ValueError(f"Agregación no soportada: {how}")
+            sql += f" FROM {self._table(stream)} WHERE ts BETWEEN ? AND ? GROUP BY bucket ORDER BY bucket"
+            params = (
+                bucket_ms, bucket_ms,
+                _to_millis(start) if start else -2 ** 63,
+                _to_millis(end) if end else 2 ** 63 - 1
+            )
+            result = []
+            for record in self._conn.execute(sql, params):
+                row = {'timestamp': datetime.fromtimestamp(record[0] / 1000)}
+                if how != 'last':
+                    row['samples'] = record[1]
+                row.update(zip(names, record[2:]))
+                result.append(row)
+            return result
+
+    def load_dataclasses(
+        self,
+        stream: str,
+        cls: Type,
+        count: int,
+        converters: Optional[Dict[str, Callable[[Any], Any]]] = None
+    ) -> List[Any]:
+        """Reconstruye los últimos ``count`` snapshots como instancias de ``cls``"""
+        converters = converters or {}
+        fields = [field.name for field in dataclasses.fields(cls)]
+        restored = []
+        for row in self.latest(stream, count):
+            if any(name not in row for name in fields):
+                continue
+            try:
+                restored.append(cls(**{
+                    name: converters[name](row[name]) if name in converters else row[name] for name in fields
+                }))
+            except Exception as e:
+                logger.debug(f"Snapshot de {stream} no restaurable: {e}")
+        return restored
+
+    def count(self, stream: str) -> int:
+        with self._lock:
+            self.flush()
+            if not self._load_columns(stream):
+                return 0
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self._table(stream)}").fetchone()[0]
+
+    def close(self):
+        """Vuelca lo pendiente y cierra la conexión"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+
+def _create_snapshot_store() -> SnapshotStore:
+    """Instancia compartida configurada desde ``monitoring.snapshots``"""
+    try:
+        from core.config.config_loader import ConfigLoader
+        config = ConfigLoader().get_main_config().get('monitoring', {}).get('snapshots', {})
+    except Exception as e:
+        logger.warning(f"⚠️ Configuración de snapshots no disponible, usando valores por defecto: {e}")
+        config = {}
+    return SnapshotStore(
+        db_path=config.get('db_path', "data/enterprise/monitoring/snapshots.db"),
+        batch_size=config.get('batch_size', 100),
+        flush_interval_s=config.get('flush_interval_s', 10.0),
+        retention_days=config.get('retention_days'),
+        max_pending=config.get('max_pending', 10000)
+    )
+
+
+# Instancia global compartida por los monitores
+snapshot_store = lazy_service('snapshot_store', _create_snapshot_store)
@@ -0,0 +1,484 @@
+# Ruta: core/monitoring/enterprise/streaming_stats.py
+#!/usr/bin/env python3
+"""
+Estadísticas de Riesgo/Performance en Streaming
+===============================================
+
+Motor compartido por PerformanceMonitor, RiskMonitor y TradingMonitor que
+mantiene las estadísticas de la serie de retornos de forma incremental, O(1)
+por retorno nuevo, en lugar de reconstruir y recorrer el historial completo
+en cada tick:
+
+- Momentos (Welford): media, volatilidad, Sharpe y Sortino
+- Sketch de cuantiles con error relativo acotado (buckets logarítmicos):
+  VaR, Expected Shortfall y tail ratio
+- Seguimiento online de pico/drawdown: drawdown actual, máximo y duraciones
+- Sumas de ganancias/pérdidas: omega y gain-to-pain
+
+Con ``window`` los momentos y el sketch son móviles (últimos N retornos);
+el drawdown siempre es acumulado desde el inicio.
+
+Los monitores alimentan el motor con ``observe_equity`` en cada tick: las
+observaciones se agrupan en periodos de ``sample_interval`` segundos y solo
+el cierre de cada periodo genera un retorno, de modo que varios monitores
+pueden observar el mismo balance sin duplicar retornos.
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.integration.service_registry import lazy_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReturnStatsSnapshot:
+    """Estadísticas de la serie de retornos (fracciones, no porcentajes)"""
+    count: int
+    mean: float
+    volatility: float
+    sharpe_ratio: float
+    sortino_ratio: float
+    var_95: float
+    var_99: float
+    expected_shortfall: float
+    current_drawdown: float
+    max_drawdown: float
+    drawdown_duration: int
+    max_drawdown_duration: int
+    omega_ratio: float
+    gain_to_pain_ratio: float
+    tail_ratio: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class QuantileSketch:
+    """
+    Sketch de cuantiles con error relativo ``alpha`` (estilo DDSketch)
+
+    Cada valor cae en un bucket logarítmico; por bucket se guardan cuenta y
+    suma, lo que permite también la media de la cola (Expected Shortfall).
+    Admite borrado exacto para ventanas móviles.
+    """
+
+    def __init__(self, alpha: float = 0.005, min_value: float = 1e-9):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        # clave -> [cuenta, suma]; negativos por |x|
+        self.positive: Dict[int, List[float]] = {}
+        self.negative: Dict[int, List[float]] = {}
+        self.zero = [0, 0.0]
+        self.count = 0
+        # Orden de los buckets; solo se invalida al crear/borrar un bucket
+        self._ordered = None
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self.log_gamma)
+
+    def _bucket(self, value: float) -> List[float]:
+        magnitude = abs(value)
+        if magnitude <= self.min_value:
+            return self.zero
+        store = self.positive if value > 0 else self.negative
+        key = self._key(magnitude)
+        bucket = store.get(key)
+        if bucket is None:
+            bucket = store[key] = [0, 0.0]
+            self._ordered = None
+        return bucket
+
+    def add(self, value: float):
+        bucket = self._bucket(value)
+        bucket[0] += 1
+        bucket[1] += value
+        self.count += 1
+
+    def remove(self, value: float):
+        bucket = self._bucket(value)
+        bucket[0] -= 1
+        bucket[1] -= value
+        self.count -= 1
+        if bucket[0] <= 0 and bucket is not self.zero:
+            store = self.positive if value > 0 else self.negative
+            store.pop(self._key(abs(value)), None)
+            self._ordered = None
+
+    def add_many(self, values: np.ndarray):
+        """Inserción vectorizada de un lote"""
+        values = np.asarray(values, dtype=np.float64)
+        magnitude = np.abs(values)
+        is_zero = magnitude <= self.min_value
+        self.zero[0] += int(is_zero.sum())
+        self.zero[1] += float(values[is_zero].sum())
+        for store, mask in ((self.positive, (values > 0) & ~is_zero), (self.negative, (values < 0) & ~is_zero)):
+            if not mask.any():
+                continue
+            keys = np.ceil(np.log(magnitude[mask]) / self.log_gamma).astype(np.int64)
+            unique, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=values[mask])
+            for key, count, total in zip(unique.tolist(), counts.tolist(), sums.tolist()):
+                bucket = store.get(key)
+                if bucket is None:
+                    store[key] = [count, total]
+                    self._ordered = None
+                else:
+                    bucket[0] += count
+                    bucket[1] += total
+        self.count += len(values)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _buckets_ascending(self) -> List[tuple]:
+        """(valor representativo, bucket [cuenta, suma]) de menor a mayor valor"""
+        if self._ordered is None:
+            ordered = [(-self._value(k), b) for k, b in sorted(self.negative.items(), reverse=True)]
+            ordered.append((0.0, self.zero))
+            ordered.extend((self._value(k), b) for k, b in sorted(self.positive.items()))
+            self._ordered = ordered
+        return self._ordered
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        last = 0.0
+        for value, (count, _) in self._buckets_ascending():
+            if not count:
+                continue
+            seen += count
+            last = value
+            if seen > rank:
+                return value
+        return last
+
+    def tail_mean(self, q: float) -> float:
+        """Media de los valores por debajo del cuantil ``q``"""
+        if self.count == 0:
+            return 0.0
+        needed = max(1.0, q * self.count)
+        taken = 0.0
+        total = 0.0
+        for _, (count, bucket_sum) in self._buckets_ascending():
+            if not count:
+                continue
+            if taken + count >= needed:
+                total += bucket_sum / count * (needed - taken)
+                taken = needed
+                break
+            taken += count
+            total += bucket_sum
+        return total / taken if taken else 0.0
+
+
+class StreamingRiskStats:
+    """Motor incremental de estadísticas de riesgo/performance"""
+
+    def __init__(
+        self,
+        risk_free_rate: float = 0.02,
+        periods_per_year: int = 252,
+        window: Optional[int] = None,
+        sample_interval: float = 86400.0,
+        sketch_alpha: float = 0.005,
+        recent_size: int = 1000
+    ):
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        self.period_risk_free = risk_free_rate / periods_per_year
+        self.window = window
+        self.sample_interval = sample_interval
+        self.sketch_alpha = sketch_alpha
+
+        self._lock = Lock()
+        self._window_values = deque() if window else None
+        self.recent_returns = deque(maxlen=recent_size)
+        self.reset()
+
+    def reset(self):
+        """Vacía todas las estadísticas"""
+        with self._lock:
+            # Momentos de la serie y de los excesos negativos (Sortino)
+            self.count = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+            self.down_count = 0
+            self.down_mean = 0.0
+            self.down_m2 = 0.0
+            self.gains = 0.0
+            self.losses = 0.0
+            self.sketch = QuantileSketch(self.sketch_alpha)
+
+            # Drawdown acumulado sobre log-equity (equity inicial = 1)
+            self.total_count = 0
+            self.log_equity = 0.0
+            self.log_peak = 0.0
+            self.max_drawdown = 0.0
+            self.drawdown_duration = 0
+            self.max_drawdown_duration = 0
+
+            # Agrupación de observaciones de equity por periodo
+            self._period = None
+            self._period_open = None
+            self._period_last = None
+
+            if self._window_values is not None:
+                self._window_values.clear()
+            self.recent_returns.clear()
+            self.version = 0
+            self._snapshot = None
+
+    # ----------------------------- Actualización -----------------------------
+
+    def _add_moments(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        excess = value - self.period_risk_free
+        if excess < 0:
+            self.down_count += 1
+            delta = excess - self.down_mean
+            self.down_mean += delta / self.down_count
+            self.down_m2 += delta * (excess - self.down_mean)
+
+        if value > 0:
+            self.gains += value
+        else:
+            self.losses -= value
+        self.sketch.add(value)
+
+    def _remove_moments(self, value: float):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+
+        excess = value - self.period_risk_free
+        if excess < 0:
+            self.down_count -= 1
+            if self.down_count == 0:
+                self.down_mean = self.down_m2 = 0.0
+            else:
+                delta = excess - self.down_mean
+                self.down_mean -= delta / self.down_count
+                self.down_m2 = max(0.0, self.down_m2 - delta * (excess - self.down_mean))
+
+        if value > 0:
+            self.gains -= value
+        else:
+            self.losses += value
+        self.sketch.remove(value)
+
+    def _track_drawdown(self, value: float):
+        self.total_count += 1
+        self.log_equity += math.log1p(value) if value > -1 else -math.inf
+        if self.log_equity >= self.log_peak:
+            self.log_peak = self.log_equity
+            self.drawdown_duration = 0
+            return
+        self.drawdown_duration += 1
+        self.max_drawdown_duration = max(self.max_drawdown_duration, self.drawdown_duration)
+        self.max_drawdown = min(self.max_drawdown, math.expm1(self.log_equity - self.log_peak))
+
+    def update(self, value: float):
+        """Añade un retorno (fracción por periodo)"""
+        value = float(value)
+        if not math.isfinite(value):
+            return
+        with self._lock:
+            self._add_moments(value)
+            if self._window_values is not None:
+                self._window_values.append(value)
+                if len(self._window_values) > self.window:
+                    self._remove_moments(self._window_values.popleft())
+            self._track_drawdown(value)
+            self.recent_returns.append(value)
+            self.version += 1
+
+    def update_many(self, values: Sequence[float]):
+        """Añade un lote de retornos (carga de historial) con operaciones vectorizadas"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        if self._window_values is not None:
+            for value in values:
+                self.update(value)
+            return
+
+        with self._lock:
+            # Combinación de momentos (Chan et al.)
+            n = len(values)
+            batch_mean = float(values.mean())
+            batch_m2 = float(((values - batch_mean) ** 2).sum())
+            total = self.count + n
+            delta = batch_mean - self.mean
+            self.m2 += batch_m2 + delta * delta * self.count * n / total
+            self.mean += delta * n / total
+            self.count = total
+
+            excess = values - self.period_risk_free
+            down = excess[excess < 0]
+            if len(down):
+                k = len(down)
+                down_mean = float(down.mean())
+                down_m2 = float(((down - down_mean) ** 2).sum())
+                total = self.down_count + k
+                delta = down_mean - self.down_mean
+                self.down_m2 += down_m2 + delta * delta * self.down_count * k / total
+                self.down_mean += delta * k / total
+                self.down_count = total
+
+            self.gains += float(values[values > 0].sum())
+            self.losses -= float(values[values <= 0].sum())
+            self.sketch.add_many(values)
+
+            # Drawdown: log-equity acumulada con el pico previo como arrastre
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_equity = self.log_equity + np.cumsum(np.log1p(np.maximum(values, -1.0)))
+            peak = np.maximum.accumulate(np.maximum(log_equity, self.log_peak))
+            drawdown = np.expm1(log_equity - peak)
+            at_peak = log_equity >= peak
+            index = np.arange(n)
+            last_peak = np.maximum.accumulate(np.where(at_peak, index, -1))
+            duration = np.where(last_peak >= 0, index - last_peak, index + 1 + self.drawdown_duration)
+
+            self.max_drawdown = min(self.max_drawdown, float(drawdown.min()))
+            self.max_drawdown_duration = max(self.max_drawdown_duration, int(duration.max()))
+            self.drawdown_duration = int(duration[-1])
+            self.log_equity = float(log_equity[-1])
+            self.log_peak = float(peak[-1])
+            self.total_count += n
+
+            self.recent_returns.extend(values[-self.recent_returns.maxlen:].tolist())
+            self.version += 1
+
+    def observe_equity(self, equity: float, timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Registra una observación de equity/balance
+
+        Las observaciones del mismo periodo solo actualizan el cierre; al
+        empezar un periodo nuevo se añade el retorno del periodo anterior
+        (que se devuelve).
+        """
+        if equity is None or equity <= 0:
+            return None
+        timestamp = time.time() if timestamp is None else timestamp
+        period = int(timestamp // self.sample_interval)
+
+        if self._period is None:
+            self._period, self._period_open, self._period_last = period, equity, equity
+            return None
+        if period <= self._period:
+            self._period_last = equity
+            return None
+
+        value = self._period_last / self._period_open - 1
+        self._period, self._period_open, self._period_last = period, self._period_last, equity
+        self.update(value)
+        return value
+
+    # ----------------------------- Lectura -----------------------------
+
+    def returns_since(self, version: int) -> List[float]:
+        """Retornos añadidos desde ``version`` (limitado a ``recent_size``)"""
+        new = self.version - version
+        if new <= 0:
+            return []
+        recent = list(self.recent_returns)
+        return recent[-new:]
+
+    def snapshot(self) -> ReturnStatsSnapshot:
+        """Estadísticas actuales; se recalculan solo si hubo retornos nuevos"""
+        with self._lock:
+            if self._snapshot is not None and self._snapshot[0] == self.version:
+                return self._snapshot[1]
+
+            annual = math.sqrt(self.periods_per_year)
+            std = math.sqrt(self.m2 / self.count) if self.count > 1 else 0.0
+            down_std = math.sqrt(self.down_m2 / self.down_count) if self.down_count > 0 else 0.0
+            excess_mean = self.mean - self.period_risk_free
+
+            if self.count > 1:
+                var_95 = self.sketch.quantile(0.05)
+                var_99 = self.sketch.quantile(0.01)
+                expected_shortfall = self.sketch.tail_mean(0.05)
+                upper = self.sketch.quantile(0.95)
+                tail_ratio = abs(upper / var_95) if var_95 else 0.0
+            else:
+                var_95 = var_99 = expected_shortfall = tail_ratio = 0.0
+
+            current_drawdown = math.expm1(self.log_equity - self.log_peak) if self.total_count else 0.0
+            snapshot = ReturnStatsSnapshot(
+                count=self.count,
+                mean=self.mean,
+                volatility=std * annual,
+                sharpe_ratio=excess_mean / std * annual if std > 0 else 0.0,
+                sortino_ratio=excess_mean / down_std * annual if down_std > 0 and self.count > 1 else 0.0,
+                var_95=var_95,
+                var_99=var_99,
+                expected_shortfall=expected_shortfall,
+                current_drawdown=current_drawdown,
+                max_drawdown=self.max_drawdown,
+                drawdown_duration=self.drawdown_duration,
+                max_drawdown_duration=self.max_drawdown_duration,
+                omega_ratio=self.gains / self.losses if self.losses > 0 else 0.0,
+                gain_to_pain_ratio=(self.gains - self.losses) / self.losses if self.losses > 0 else 0.0,
+                tail_ratio=tail_ratio
+            )
+            self._snapshot = (self.version, snapshot)
+            return snapshot
+
+    def value_at_risk(self, confidence_level: float) -> float:
+        """Cuantil ``1 - confidence_level`` de los retornos (negativo = pérdida)"""
+        stats = self.snapshot()
+        if stats.count < 2:
+            return 0.0
+        if confidence_level == 0.95:
+            return stats.var_95
+        if confidence_level == 0.99:
+            return stats.var_99
+        with self._lock:
+            return self.sketch.quantile(1 - confidence_level)
+
+
+def _create_streaming_risk_stats() -> StreamingRiskStats:
+    """Instancia compartida configurada desde ``performance_monitoring``"""
+    try:
+        from core.config.config_loader import ConfigLoader
+        config = ConfigLoader().get_main_config().get('performance_monitoring', {})
+    except Exception as e:
+        logger.warning(f"⚠️ Configuración de performance no disponible, usando valores por defecto: {e}")
+        config = {}
+    return StreamingRiskStats(
+        risk_free_rate=config.get('risk_free_rate', 0.02),
+        periods_per_year=config.get('periods_per_year', 252),
+        window=config.get('stats_window'),
+        sample_interval=config.get('return_interval', 86400)
+    )
+
+
+# Instancia global compartida por los monitores
+streaming_risk_stats = lazy_service('streaming_risk_stats', _create_streaming_risk_stats)
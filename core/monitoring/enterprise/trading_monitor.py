@@ -35,6 +35,9 @@ from prometheus_client.core import CollectorRegistry
 from core.trading.enterprise.futures_engine import EnterpriseFuturesEngine
 from core.trading.bitget_client import bitget_client
 from core.config.config_loader import ConfigLoader
+from core.integration.service_registry import lazy_service
+from core.monitoring.enterprise.streaming_stats import streaming_risk_stats
+from core.monitoring.enterprise.snapshot_store import snapshot_store
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -91,6 +94,10 @@ class TradingMonitor:
         self.last_metrics = None
         self.metrics_history = []
         self.max_history = 10000
+        self.snapshot_store = snapshot_store
+        
+        # Estadísticas de retornos compartidas con PerformanceMonitor y RiskMonitor
+        self.return_stats = streaming_risk_stats
         
         # Configuración
         self.update_interval = self.config.get('update_interval', 5)  # segundos
@@ -333,6 +340,7 @@ class TradingMonitor:
             # Obtener balance de la cuenta
             balance_info = await self.bitget_client.get_margin_info()
             account_balance = balance_info.get('total_balance', 0) if balance_info else 0
+            self.return_stats.observe_equity(account_balance)
             
             # Obtener posiciones abiertas
             positions = await self.bitget_client.get_positions()
@@ -493,8 +501,7 @@ class TradingMonitor:
     async def calculate_sharpe_ratio(self) -> float:
         """Calcula el ratio de Sharpe"""
         try:
-            # Implementar cálculo de Sharpe ratio
-            return 0.0
+            return self.return_stats.snapshot().sharpe_ratio
         except Exception as e:
             logger.error(f"Error calculando Sharpe ratio: {e}")
             return 0.0
@@ -502,8 +509,10 @@ class TradingMonitor:
     async def calculate_calmar_ratio(self) -> float:
         """Calcula el ratio de Calmar"""
         try:
-            # Implementar cálculo de Calmar ratio
-            return 0.0
+            stats = self.return_stats.snapshot()
+            if stats.max_drawdown == 0:
+                return 0.0
+            return stats.mean * self.return_stats.periods_per_year / abs(stats.max_drawdown)
         except Exception as e:
             logger.error(f"Error calculando Calmar ratio: {e}")
             return 0.0
@@ -511,8 +520,7 @@ class TradingMonitor:
     async def calculate_max_drawdown(self) -> float:
         """Calcula el drawdown máximo"""
         try:
-            # Implementar cálculo de drawdown máximo
-            return 0.0
+            return -self.return_stats.snapshot().max_drawdown * 100
         except Exception as e:
             logger.error(f"Error calculando drawdown máximo: {e}")
             return 0.0
@@ -520,8 +528,7 @@ class TradingMonitor:
     async def calculate_current_drawdown(self) -> float:
         """Calcula el drawdown actual"""
         try:
-            # Implementar cálculo de drawdown actual
-            return 0.0
+            return -self.return_stats.snapshot().current_drawdown * 100
         except Exception as e:
             logger.error(f"Error calculando drawdown actual: {e}")
             return 0.0
@@ -547,8 +554,8 @@ class TradingMonitor:
     async def calculate_var(self, confidence_level: float) -> float:
         """Calcula el Value at Risk"""
         try:
-            # Implementar cálculo de VaR
-            return 0.0
+            # Pérdida positiva en % del balance
+            return max(0.0, -self.return_stats.value_at_risk(confidence_level) * 100)
         except Exception as e:
             logger.error(f"Error calculando VaR: {e}")
             return 0.0
@@ -634,53 +641,21 @@ class TradingMonitor:
             logger.error(f"Error enviando alerta: {e}")
     
     async def save_metrics_to_file(self, metrics: TradingMetrics):
-        """Guarda las métricas en archivo"""
+        """Añade el snapshot de trading al almacén de series temporales"""
         try:
-            metrics_file = Path("data/enterprise/monitoring/metrics.json")
-            
-            # Convertir métricas a diccionario
-            metrics_dict = {
-                'timestamp': metrics.timestamp.isoformat(),
-                'account_balance': metrics.account_balance,
-                'total_pnl': metrics.total_pnl,
-                'unrealized_pnl': metrics.unrealized_pnl,
-                'realized_pnl': metrics.realized_pnl,
-                'open_positions_count': metrics.open_positions_count,
-                'daily_return_pct': metrics.daily_return_pct,
-                'weekly_return_pct': metrics.weekly_return_pct,
-                'monthly_return_pct': metrics.monthly_return_pct,
-                'sharpe_ratio': metrics.sharpe_ratio,
-                'calmar_ratio': metrics.calmar_ratio,
-                'max_drawdown_pct': metrics.max_drawdown_pct,
-                'current_drawdown_pct': metrics.current_drawdown_pct,
-                'win_rate': metrics.win_rate,
-                'profit_factor': metrics.profit_factor,
-                'var_95': metrics.var_95,
-                'var_99': metrics.var_99,
-                'total_trades': metrics.total_trades,
-                'winning_trades': metrics.winning_trades,
-                'losing_trades': metrics.losing_trades,
-                'exposure_pct': metrics.exposure_pct,
-                'margin_used': metrics.margin_used,
-                'margin_available': metrics.margin_available,
-                'margin_ratio': metrics.margin_ratio
-            }
-            
-            # Guardar en archivo
-            with open(metrics_file, 'w') as f:
-                json.dump(metrics_dict, f, indent=2)
-                
+            self.snapshot_store.append('trading', metrics)
         except Exception as e:
             logger.error(f"Error guardando métricas: {e}")
     
     async def load_metrics_history(self):
         """Carga el historial de métricas"""
         try:
-            metrics_file = Path("data/enterprise/monitoring/metrics.json")
-            if metrics_file.exists():
-                with open(metrics_file, 'r') as f:
-                    data = json.load(f)
-                    # Procesar datos históricos si es necesario
+            self.metrics_history = self.snapshot_store.load_dataclasses(
+                'trading', TradingMetrics, self.max_history
+            )
+            if self.metrics_history:
+                self.last_metrics = self.metrics_history[-1]
+                logger.info(f"📂 {len(self.metrics_history)} snapshots de trading restaurados")
                     
         except Exception as e:
             logger.error(f"Error cargando historial de métricas: {e}")
@@ -691,9 +666,8 @@ class TradingMonitor:
             logger.info("⏹️ Deteniendo monitoreo de trading...")
             self.is_running = False
             
-            # Guardar métricas finales
-            if self.last_metrics:
-                await self.save_metrics_to_file(self.last_metrics)
+            # Volcar snapshots pendientes
+            self.snapshot_store.flush()
             
             logger.info("✅ Monitoreo detenido correctamente")
             
@@ -709,4 +683,4 @@ class TradingMonitor:
         return self.metrics_history.copy()
 
 # Instancia global
-trading_monitor = TradingMonitor()
+trading_monitor = lazy_service('trading_monitor', TradingMonitor)
@@ -8,6 +8,11 @@ Agregador Mejorado de Métricas con Análisis de Portfolio Completo
 Proporciona análisis avanzado de métricas conjuntas, correlación entre agentes,
 diversificación, riesgo de portfolio y métricas operacionales detalladas.
 
+Los trades se acumulan en un TradeLedger columnar: las métricas del ciclo
+se calculan sobre los trades nuevos y las métricas de trayectoria (Sharpe,
+drawdown, correlación) salen de agregados acumulados, de modo que cada
+ciclo cuesta O(trades nuevos).
+
 Autor: Bot Trading v10 Enterprise
 Versión: 1.0.0
 """
@@ -23,6 +28,7 @@ from pathlib import Path
 import json
 
 from ..metrics.trade_metrics import DetailedTradeMetric
+from .trade_ledger import TradeLedger
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +88,9 @@ class EnhancedMetricsAggregator:
         # Historial de métricas para análisis temporal
         self.metrics_history: List[PortfolioMetrics] = []
         
+        # Ledger columnar con agregados incrementales
+        self.ledger = TradeLedger(initial_capital)
+        
         # Cache para cálculos costosos
         self._correlation_cache: Dict[str, float] = {}
         self._cache_ttl = timedelta(minutes=5)
@@ -107,37 +116,38 @@ class EnhancedMetricsAggregator:
         try:
             start_time = datetime.now()
             
-            # 1. Extraer todos los trades del ciclo
-            all_trades = []
-            for symbol, trades in agent_results.items():
-                all_trades.extend(trades)
+            # 1. Añadir al ledger los trades nuevos del ciclo
+            batch = self.ledger.append(agent_results)
+            non_empty = [rows for rows in batch.values() if len(rows)]
             
-            if not all_trades:
+            if not non_empty:
                 return self._create_empty_metrics(current_cycle)
             
+            all_rows = np.concatenate(non_empty)
+            
             # 2. Calcular métricas financieras globales
-            financial_metrics = await self._calculate_financial_metrics(all_trades)
+            financial_metrics = await self._calculate_financial_metrics(all_rows)
             
             # 3. Análisis de correlación entre agentes
-            correlation_metrics = await self._calculate_correlation_metrics(agent_results)
+            correlation_metrics = await self._calculate_correlation_metrics(batch)
             
             # 4. Diversification score
-            diversification = await self._calculate_diversification_score(agent_results)
+            diversification = await self._calculate_diversification_score(batch)
             
-            # 5. Portfolio Sharpe ratio
-            portfolio_sharpe = await self._calculate_portfolio_sharpe(all_trades)
+            # 5. Portfolio Sharpe ratio (Welford acumulado)
+            portfolio_sharpe = self.ledger.sharpe_ratio()
             
-            # 6. Drawdown conjunto
-            portfolio_drawdown = await self._calculate_portfolio_drawdown(all_trades)
+            # 6. Drawdown conjunto (curva de equity acumulada)
+            portfolio_drawdown = self.ledger.max_drawdown_pct
             
             # 7. Métricas operacionales
-            operational_metrics = await self._calculate_operational_metrics(agent_results)
+            operational_metrics = await self._calculate_operational_metrics(batch)
             
             # 8. Métricas de calidad
-            quality_metrics = await self._calculate_quality_metrics(all_trades)
+            quality_metrics = await self._calculate_quality_metrics(all_rows)
             
             # 9. Métricas de timing
-            timing_metrics = await self._calculate_timing_metrics(all_trades, current_cycle)
+            timing_metrics = await self._calculate_timing_metrics(all_rows, current_cycle)
             
             # 10. Crear objeto de métricas completo
             portfolio_metrics = PortfolioMetrics(
@@ -191,10 +201,10 @@ class EnhancedMetricsAggregator:
             self.logger.error(f"❌ Error calculando métricas de portfolio: {e}")
             return self._create_empty_metrics(current_cycle)
     
-    async def _calculate_financial_metrics(self, all_trades: List[DetailedTradeMetric]) -> Dict[str, Any]:
-        """Calcula métricas financieras globales"""
+    async def _calculate_financial_metrics(self, rows: np.ndarray) -> Dict[str, Any]:
+        """Calcula métricas financieras globales del lote de trades"""
         try:
-            if not all_trades:
+            if not len(rows):
                 return {
                     'total_pnl_usdt': 0.0,
                     'portfolio_return_pct': 0.0,
@@ -202,12 +212,11 @@ class EnhancedMetricsAggregator:
                 }
             
             # PnL total
-            total_pnl = sum(trade.pnl_usdt for trade in all_trades)
+            total_pnl = float(rows['pnl_usdt'].sum())
             portfolio_return_pct = (total_pnl / self.initial_capital) * 100
             
             # Win rate
-            successful_trades = sum(1 for trade in all_trades if trade.was_successful)
-            win_rate = successful_trades / len(all_trades) if all_trades else 0.0
+            win_rate = float(rows['was_successful'].mean())
             
             return {
                 'total_pnl_usdt': total_pnl,
@@ -219,107 +228,77 @@ class EnhancedMetricsAggregator:
             self.logger.error(f"❌ Error calculando métricas financieras: {e}")
             return {'total_pnl_usdt': 0.0, 'portfolio_return_pct': 0.0, 'win_rate': 0.0}
     
-    async def _calculate_correlation_metrics(self, agent_results: Dict[str, List[DetailedTradeMetric]]) -> Dict[str, Any]:
+    async def _calculate_correlation_metrics(self, batch: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Calcula métricas de correlación entre agentes"""
+        empty = {
+            'correlation_avg': 0.0,
+            'var_95': 0.0,
+            'concentration_risk': 0.0,
+            'correlation_matrix': {},
+            'agent_contributions': {}
+        }
         try:
-            if len(agent_results) < 2:
-                return {
-                    'correlation_avg': 0.0,
-                    'var_95': 0.0,
-                    'concentration_risk': 0.0,
-                    'correlation_matrix': {},
-                    'agent_contributions': {}
-                }
+            if len(batch) < 2:
+                return empty
+            
+            # Correlación del PnL por minuto (sumas cruzadas acumuladas del ledger)
+            correlation_matrix = self.ledger.correlation_matrix()
+            correlations = [
+                value
+                for symbol1, row in correlation_matrix.items()
+                for symbol2, value in row.items()
+                if symbol1 != symbol2 and np.isfinite(value)
+            ]
+            correlation_avg = float(np.mean(correlations)) if correlations else 0.0
+            
+            # VaR 95% sobre el PnL por minuto del portfolio en este ciclo
+            non_empty = [rows for rows in batch.values() if len(rows)]
+            if not non_empty:
+                return empty
+            rows = np.concatenate(non_empty)
+            _, inverse = np.unique(rows['minute'], return_inverse=True)
+            portfolio_returns = np.bincount(inverse, weights=rows['pnl_usdt'])
+            var_95 = np.percentile(portfolio_returns, 5) if len(portfolio_returns) > 0 else 0.0
+            
+            # Calcular concentración de riesgo
+            agent_pnl = {symbol: float(agent_rows['pnl_usdt'].sum()) for symbol, agent_rows in batch.items()}
+            total_pnl = sum(agent_pnl.values())
+            agent_contributions = {
+                symbol: (pnl / total_pnl) * 100 if total_pnl != 0 else 0.0
+                for symbol, pnl in agent_pnl.items()
+            }
             
-            # Crear DataFrame de PnL por agente
-            agent_pnl_data = {}
-            for symbol, trades in agent_results.items():
-                if trades:
-                    # Agrupar por timestamp para calcular PnL por período
-                    pnl_by_time = {}
-                    for trade in trades:
-                        time_key = trade.timestamp.replace(second=0, microsecond=0)
-                        if time_key not in pnl_by_time:
-                            pnl_by_time[time_key] = 0.0
-                        pnl_by_time[time_key] += trade.pnl_usdt
-                    
-                    agent_pnl_data[symbol] = pnl_by_time
-            
-            # Crear DataFrame de correlación
-            if agent_pnl_data:
-                df = pd.DataFrame(agent_pnl_data).fillna(0.0)
-                correlation_matrix = df.corr().to_dict()
-                
-                # Calcular correlación promedio (excluyendo diagonal)
-                correlations = []
-                for i, symbol1 in enumerate(df.columns):
-                    for j, symbol2 in enumerate(df.columns):
-                        if i != j:
-                            correlations.append(correlation_matrix[symbol1][symbol2])
-                
-                correlation_avg = np.mean(correlations) if correlations else 0.0
-                
-                # Calcular VaR 95%
-                portfolio_returns = df.sum(axis=1)
-                var_95 = np.percentile(portfolio_returns, 5) if len(portfolio_returns) > 0 else 0.0
-                
-                # Calcular concentración de riesgo
-                agent_contributions = {}
-                total_pnl = df.sum().sum()
-                for symbol in df.columns:
-                    agent_pnl = df[symbol].sum()
-                    agent_contributions[symbol] = (agent_pnl / total_pnl) * 100 if total_pnl != 0 else 0.0
-                
-                # Concentración = suma de cuadrados de contribuciones
-                concentration_risk = sum(contrib**2 for contrib in agent_contributions.values()) / 100
-                
-                return {
-                    'correlation_avg': correlation_avg,
-                    'var_95': abs(var_95),
-                    'concentration_risk': concentration_risk,
-                    'correlation_matrix': correlation_matrix,
-                    'agent_contributions': agent_contributions
-                }
+            # Concentración = suma de cuadrados de contribuciones
+            concentration_risk = sum(contrib**2 for contrib in agent_contributions.values()) / 100
             
             return {
-                'correlation_avg': 0.0,
-                'var_95': 0.0,
-                'concentration_risk': 0.0,
-                'correlation_matrix': {},
-                'agent_contributions': {}
+                'correlation_avg': correlation_avg,
+                'var_95': abs(float(var_95)),
+                'concentration_risk': concentration_risk,
+                'correlation_matrix': correlation_matrix,
+                'agent_contributions': agent_contributions
             }
             
         except Exception as e:
             self.logger.error(f"❌ Error calculando métricas de correlación: {e}")
-            return {
-                'correlation_avg': 0.0,
-                'var_95': 0.0,
-                'concentration_risk': 0.0,
-                'correlation_matrix': {},
-                'agent_contributions': {}
-            }
+            return empty
     
-    async def _calculate_diversification_score(self, agent_results: Dict[str, List[DetailedTradeMetric]]) -> float:
+    async def _calculate_diversification_score(self, batch: Dict[str, np.ndarray]) -> float:
         """Calcula score de diversificación del portfolio"""
         try:
-            if len(agent_results) < 2:
+            if len(batch) < 2:
                 return 0.0
             
             # Calcular PnL por agente
-            agent_pnl = {}
-            for symbol, trades in agent_results.items():
-                agent_pnl[symbol] = sum(trade.pnl_usdt for trade in trades)
+            agent_pnl = np.array([rows['pnl_usdt'].sum() for rows in batch.values()])
             
             # Calcular índice de Herfindahl (inverso = diversificación)
-            total_pnl = sum(agent_pnl.values())
+            total_pnl = agent_pnl.sum()
             if total_pnl == 0:
                 return 0.0
             
-            # Proporciones de PnL
-            proportions = [pnl / total_pnl for pnl in agent_pnl.values()]
-            
-            # Índice de Herfindahl
-            herfindahl = sum(p**2 for p in proportions)
+            # Índice de Herfindahl sobre las proporciones de PnL
+            herfindahl = float(((agent_pnl / total_pnl) ** 2).sum())
             
             # Diversificación = 1 - Herfindahl (normalizado)
             diversification = 1 - herfindahl
@@ -330,109 +309,46 @@ class EnhancedMetricsAggregator:
             self.logger.error(f"❌ Error calculando diversificación: {e}")
             return 0.0
     
-    async def _calculate_portfolio_sharpe(self, all_trades: List[DetailedTradeMetric]) -> float:
-        """Calcula Sharpe ratio del portfolio"""
-        try:
-            if len(all_trades) < 2:
-                return 0.0
-            
-            # Obtener returns por trade
-            returns = [trade.pnl_percentage / 100 for trade in all_trades]
-            
-            if len(returns) < 2:
-                return 0.0
-            
-            # Calcular Sharpe ratio
-            mean_return = np.mean(returns)
-            std_return = np.std(returns)
-            
-            if std_return == 0:
-                return 0.0
-            
-            # Asumir risk-free rate de 0% para simplificar
-            sharpe_ratio = mean_return / std_return
-            
-            return sharpe_ratio
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error calculando Sharpe ratio: {e}")
-            return 0.0
-    
-    async def _calculate_portfolio_drawdown(self, all_trades: List[DetailedTradeMetric]) -> float:
-        """Calcula drawdown máximo del portfolio"""
-        try:
-            if not all_trades:
-                return 0.0
-            
-            # Ordenar trades por timestamp
-            sorted_trades = sorted(all_trades, key=lambda x: x.timestamp)
-            
-            # Calcular balance acumulado
-            balance = self.initial_capital
-            peak_balance = balance
-            max_drawdown = 0.0
-            
-            for trade in sorted_trades:
-                balance += trade.pnl_usdt
-                
-                if balance > peak_balance:
-                    peak_balance = balance
-                
-                drawdown = (peak_balance - balance) / peak_balance * 100
-                max_drawdown = max(max_drawdown, drawdown)
-            
-            return max_drawdown
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error calculando drawdown: {e}")
-            return 0.0
-    
-    async def _calculate_operational_metrics(self, agent_results: Dict[str, List[DetailedTradeMetric]]) -> Dict[str, Any]:
+    async def _calculate_operational_metrics(self, batch: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Calcula métricas operacionales"""
+        empty = {
+            'total_trades': 0,
+            'avg_trade_duration': 0.0,
+            'best_performing_agent': 'N/A',
+            'worst_performing_agent': 'N/A',
+            'strategy_effectiveness': {}
+        }
         try:
-            all_trades = []
-            for trades in agent_results.values():
-                all_trades.extend(trades)
-            
-            if not all_trades:
-                return {
-                    'total_trades': 0,
-                    'avg_trade_duration': 0.0,
-                    'best_performing_agent': 'N/A',
-                    'worst_performing_agent': 'N/A',
-                    'strategy_effectiveness': {}
-                }
+            non_empty = [rows for rows in batch.values() if len(rows)]
+            if not non_empty:
+                return empty
+            rows = np.concatenate(non_empty)
             
             # Total trades
-            total_trades = len(all_trades)
+            total_trades = len(rows)
             
             # Duración promedio
-            avg_duration = np.mean([trade.duration_hours for trade in all_trades])
+            avg_duration = float(rows['duration_hours'].mean())
             
             # Mejor y peor agente por PnL
-            agent_pnl = {}
-            for symbol, trades in agent_results.items():
-                agent_pnl[symbol] = sum(trade.pnl_usdt for trade in trades)
-            
+            agent_pnl = {symbol: float(agent_rows['pnl_usdt'].sum()) for symbol, agent_rows in batch.items()}
             best_agent = max(agent_pnl.items(), key=lambda x: x[1])[0] if agent_pnl else 'N/A'
             worst_agent = min(agent_pnl.items(), key=lambda x: x[1])[0] if agent_pnl else 'N/A'
             
-            # Efectividad de estrategias
-            strategy_pnl = {}
-            for trade in all_trades:
-                strategy = trade.strategy_name
-                if strategy not in strategy_pnl:
-                    strategy_pnl[strategy] = []
-                strategy_pnl[strategy].append(trade.pnl_usdt)
+            # Efectividad de estrategias (agrupación por id de estrategia)
+            strategy_ids, inverse, counts = np.unique(
+                rows['strategy_id'], return_inverse=True, return_counts=True
+            )
+            pnl_sums = np.bincount(inverse, weights=rows['pnl_usdt'])
+            wins = np.bincount(inverse, weights=(rows['pnl_usdt'] > 0).astype(float))
             
             strategy_effectiveness = {}
-            for strategy, pnls in strategy_pnl.items():
-                if pnls:
-                    strategy_effectiveness[strategy] = {
-                        'avg_pnl': np.mean(pnls),
-                        'win_rate': sum(1 for pnl in pnls if pnl > 0) / len(pnls),
-                        'total_trades': len(pnls)
-                    }
+            for k, strategy_id in enumerate(strategy_ids.tolist()):
+                strategy_effectiveness[self.ledger.strategies[strategy_id]] = {
+                    'avg_pnl': float(pnl_sums[k] / counts[k]),
+                    'win_rate': float(wins[k] / counts[k]),
+                    'total_trades': int(counts[k])
+                }
             
             return {
                 'total_trades': total_trades,
@@ -444,35 +360,26 @@ class EnhancedMetricsAggregator:
             
         except Exception as e:
             self.logger.error(f"❌ Error calculando métricas operacionales: {e}")
-            return {
-                'total_trades': 0,
-                'avg_trade_duration': 0.0,
-                'best_performing_agent': 'N/A',
-                'worst_performing_agent': 'N/A',
-                'strategy_effectiveness': {}
-            }
+            return empty
     
-    async def _calculate_quality_metrics(self, all_trades: List[DetailedTradeMetric]) -> Dict[str, Any]:
+    async def _calculate_quality_metrics(self, rows: np.ndarray) -> Dict[str, Any]:
         """Calcula métricas de calidad de trades"""
         try:
-            if not all_trades:
+            if not len(rows):
                 return {
                     'avg_quality_score': 0.0,
                     'high_quality_trades_pct': 0.0,
                     'avg_confluence_score': 0.0
                 }
             
-            # Calcular quality scores
-            quality_scores = [trade.get_quality_score() for trade in all_trades]
-            avg_quality_score = np.mean(quality_scores)
+            # Quality scores (calculados una vez al entrar en el ledger)
+            avg_quality_score = float(rows['quality_score'].mean())
             
             # Porcentaje de trades de alta calidad
-            high_quality_trades = sum(1 for trade in all_trades if trade.is_high_quality_trade())
-            high_quality_pct = (high_quality_trades / len(all_trades)) * 100
+            high_quality_pct = float(rows['high_quality'].mean()) * 100
             
             # Score de confluence promedio
-            confluence_scores = [trade.confluence_score for trade in all_trades]
-            avg_confluence = np.mean(confluence_scores)
+            avg_confluence = float(rows['confluence_score'].mean())
             
             return {
                 'avg_quality_score': avg_quality_score,
@@ -488,10 +395,10 @@ class EnhancedMetricsAggregator:
                 'avg_confluence_score': 0.0
             }
     
-    async def _calculate_timing_metrics(self, all_trades: List[DetailedTradeMetric], cycle_id: int) -> Dict[str, Any]:
+    async def _calculate_timing_metrics(self, rows: np.ndarray, cycle_id: int) -> Dict[str, Any]:
         """Calcula métricas de timing y eficiencia"""
         try:
-            if not all_trades:
+            if not len(rows):
                 return {
                     'avg_cycle_duration': 0.0,
                     'trades_per_hour': 0.0,
@@ -499,20 +406,17 @@ class EnhancedMetricsAggregator:
                 }
             
             # Duración promedio de trades
-            avg_trade_duration = np.mean([trade.duration_hours for trade in all_trades])
+            avg_trade_duration = float(rows['duration_hours'].mean())
             
             # Trades por hora (asumiendo ciclo de 1 hora)
-            trades_per_hour = len(all_trades)  # Para simplificar, asumimos ciclo de 1h
+            trades_per_hour = len(rows)  # Para simplificar, asumimos ciclo de 1h
             
             # Score de eficiencia basado en duración vs PnL
-            if all_trades:
-                total_pnl = sum(trade.pnl_usdt for trade in all_trades)
-                total_duration = sum(trade.duration_hours for trade in all_trades)
-                
-                if total_duration > 0:
-                    efficiency_score = (total_pnl / total_duration) * 100  # PnL por hora
-                else:
-                    efficiency_score = 0.0
+            total_pnl = float(rows['pnl_usdt'].sum())
+            total_duration = float(rows['duration_hours'].sum())
+            
+            if total_duration > 0:
+                efficiency_score = (total_pnl / total_duration) * 100  # PnL por hora
             else:
                 efficiency_score = 0.0
             
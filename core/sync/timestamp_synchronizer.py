@@ -20,15 +20,19 @@ Versión: 1.0.0
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from functools import reduce
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from threading import Barrier, Lock
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
 @dataclass
 class TimeWindow:
     """Ventana temporal sincronizada"""
@@ -45,6 +49,67 @@ class SyncPoint:
     all_symbols_ready: bool
     data_quality_score: float
 
+@dataclass
+class SymbolSeries:
+    """Serie columnar de un símbolo/timeframe: timestamps epoch (s) ordenados y únicos"""
+    timestamps: np.ndarray
+    values: Dict[str, np.ndarray]
+    quality: np.ndarray
+    datetimes: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        if self.datetimes is None:
+            self.datetimes = self.timestamps.astype('datetime64[s]').astype('datetime64[ns]')
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def lookup(self, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Posiciones de ``timestamps`` en la serie y máscara de presencia"""
+        positions = np.searchsorted(self.timestamps, timestamps)
+        clipped = np.minimum(positions, max(len(self) - 1, 0))
+        found = (positions < len(self)) & (self.timestamps[clipped] == timestamps) if len(self) else \
+            np.zeros(len(timestamps), dtype=bool)
+        return clipped, found
+
+    def window(self, end: int, size: int) -> pd.DataFrame:
+        """Filas [end - size, end) en orden cronológico"""
+        start = max(0, end - size)
+        columns = {'timestamp': self.datetimes[start:end]}
+        columns.update((name, column[start:end]) for name, column in self.values.items())
+        return pd.DataFrame(columns)
+
+def to_epoch_seconds(value: datetime) -> int:
+    """datetime (naive = UTC) a segundos epoch"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.value // 10**9)
+
+def _column_to_epoch_seconds(column: pd.Series) -> np.ndarray:
+    """Normaliza la columna timestamp (ISO, segundos o milisegundos) a segundos epoch"""
+    if pd.api.types.is_numeric_dtype(column):
+        raw = column.to_numpy(dtype=np.float64)
+        # Valores por encima de 1e11 solo tienen sentido como milisegundos
+        return np.where(raw > 1e11, raw // 1000, raw)
+    parsed = pd.to_datetime(column, utc=True, errors='coerce')
+    seconds = (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    return seconds.to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _row_quality(values: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Calidad por fila: 1.0 correcta, 0.8 volumen no positivo,
+    0.5 con NaN o OHLC incoherente
+    """
+    o, h, l, c, v = (values[name] for name in OHLCV_COLUMNS)
+    has_nan = np.isnan(np.column_stack([o, h, l, c, v])).any(axis=1)
+    with np.errstate(invalid='ignore'):
+        coherent = (l <= o) & (o <= h) & (l <= c) & (c <= h)
+        positive_volume = v > 0
+    quality = np.where(positive_volume, 1.0, 0.8)
+    quality = np.where(has_nan | ~coherent, 0.5, quality)
+    return quality.astype(np.float32)
+
 class TimestampSynchronizer:
     """
     Sincronizador de timestamps para entrenamiento paralelo
@@ -52,28 +117,39 @@ class TimestampSynchronizer:
     
     Garantiza que todos los agentes entrenen en el mismo punto temporal,
     permitiendo comparaciones justas y métricas agregadas precisas.
+    
+    Cada base de datos ``data/{symbol}/{symbol}_{timeframe}.db`` se lee una
+    sola vez a una serie columnar (timestamps epoch int64 + OHLCV) que se
+    guarda en ``data_cache``. Intersección de timestamps, máscaras de calidad
+    y ventanas por timestamp se resuelven con operaciones NumPy sobre arrays
+    ordenados (intersect1d / searchsorted), sin consultas por timestamp.
     """
     
-    def __init__(self, symbols: List[str], timeframes: List[str]):
+    def __init__(self, symbols: List[str], timeframes: List[str], data_root: str = "data"):
         """
         Inicializa el sincronizador
         
         Args:
             symbols: Lista de símbolos a sincronizar
             timeframes: Lista de timeframes
+            data_root: Directorio con las bases de datos por símbolo
         """
         self.symbols = symbols
         self.timeframes = timeframes
+        self.data_root = Path(data_root)
         self.sync_points = []
         self.current_sync_point = None
         self.agent_barriers = {}
-        self.data_cache = {}
+        self.data_cache: Dict[Tuple[str, str], SymbolSeries] = {}
         self.sync_lock = Lock()
+        self._cache_lock = Lock()
         
         # Configuración
         self.batch_size = 500  # Barras por lote
         self.min_data_quality = 0.8  # Calidad mínima de datos
         self.max_gap_tolerance = timedelta(hours=1)
+        self.reference_timeframe = "1h"
+        self.window_size = 100  # Barras por símbolo en get_synchronized_data
         
         # Inicializar barreras para sincronización
         self._setup_barriers()
@@ -87,6 +163,95 @@ class TimestampSynchronizer:
         
         logger.debug(f"🚧 Barreras configuradas para {len(self.timeframes)} timeframes")
     
+    # ----------------------------- Caché columnar -----------------------------
+    
+    def _db_path(self, symbol: str, timeframe: str) -> Path:
+        return self.data_root / symbol / f"{symbol}_{timeframe}.db"
+    
+    def _load_series(self, symbol: str, timeframe: str) -> Optional[SymbolSeries]:
+        """Lee la serie completa de un símbolo/timeframe (una consulta) y la cachea"""
+        key = (symbol, timeframe)
+        series = self.data_cache.get(key)
+        if series is not None:
+            return series
+        
+        with self._cache_lock:
+            series = self.data_cache.get(key)
+            if series is not None:
+                return series
+            
+            db_path = self._db_path(symbol, timeframe)
+            if not db_path.exists():
+                logger.warning(f"⚠️ Base de datos no encontrada: {db_path}")
+                return None
+            
+            try:
+                with sqlite3.connect(str(db_path)) as conn:
+                    df = pd.read_sql_query(
+                        f"SELECT timestamp, {', '.join(OHLCV_COLUMNS)} FROM market_data", conn
+                    )
+            except Exception as e:
+                logger.error(f"❌ Error cargando {symbol}_{timeframe}: {e}")
+                return None
+            
+            seconds = _column_to_epoch_seconds(df['timestamp'])
+            valid = ~np.isnan(seconds)
+            timestamps = seconds[valid].astype(np.int64)
+            values = {
+                name: pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)[valid]
+                for name in OHLCV_COLUMNS
+            }
+            
+            # Orden estable + primera aparición de cada timestamp (equivale a DISTINCT)
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+            unique_ts, first = np.unique(timestamps, return_index=True)
+            values = {name: column[order][first] for name, column in values.items()}
+            
+            series = SymbolSeries(timestamps=unique_ts, values=values, quality=_row_quality(values))
+            self.data_cache[key] = series
+            logger.debug(f"📥 {symbol}_{timeframe}: {len(series)} barras en caché")
+            return series
+    
+    def preload(self, timeframes: Optional[Sequence[str]] = None) -> int:
+        """Carga en caché todas las series; devuelve el número de barras cargadas"""
+        total = 0
+        for timeframe in timeframes or self.timeframes:
+            for symbol in self.symbols:
+                series = self._load_series(symbol, timeframe)
+                total += len(series) if series is not None else 0
+        return total
+    
+    def _symbol_timestamps(self, symbol: str, start: int, end: int) -> np.ndarray:
+        """Timestamps epoch del símbolo en [start, end] (timeframe de referencia)"""
+        series = self._load_series(symbol, self.reference_timeframe)
+        if series is None:
+            return np.empty(0, dtype=np.int64)
+        lo = np.searchsorted(series.timestamps, start, side='left')
+        hi = np.searchsorted(series.timestamps, end, side='right')
+        return series.timestamps[lo:hi]
+    
+    def _quality_scores(self, timestamps: np.ndarray) -> np.ndarray:
+        """Score medio por timestamp: (disponible + calidad) / 2 promediado por símbolo"""
+        if not self.symbols or len(timestamps) == 0:
+            return np.zeros(len(timestamps), dtype=np.float64)
+        
+        total = np.zeros(len(timestamps), dtype=np.float64)
+        for symbol in self.symbols:
+            series = self._load_series(symbol, self.reference_timeframe)
+            if series is None or len(series) == 0:
+                continue
+            positions, found = series.lookup(timestamps)
+            quality = np.where(found, series.quality[positions], 0.0)
+            total += (found + quality) / 2
+        return total / len(self.symbols)
+    
+    @staticmethod
+    def _to_datetimes(timestamps: np.ndarray) -> List[datetime]:
+        return list(pd.to_datetime(timestamps, unit='s').to_pydatetime())
+    
+    # ----------------------------- Timeline -----------------------------
+    
     async def build_sync_timeline(self, start_date: datetime, end_date: datetime) -> List[SyncPoint]:
         """
         Construye timeline sincronizado para el período especificado
@@ -101,22 +266,24 @@ class TimestampSynchronizer:
         try:
             logger.info(f"🔄 Construyendo timeline sincronizado: {start_date} → {end_date}")
             
-            # 1. Obtener timestamps disponibles para todos los símbolos
-            common_timestamps = await self._find_common_timestamps(start_date, end_date)
+            # 1. Timestamps comunes (intersección de arrays ordenados)
+            common = self._common_timestamps(to_epoch_seconds(start_date), to_epoch_seconds(end_date))
             
-            # 2. Validar calidad de datos en cada timestamp
-            validated_timestamps = await self._validate_data_quality(common_timestamps)
+            # 2. Scores de calidad de todos los timestamps de una vez
+            scores = self._quality_scores(common)
+            mask = scores >= self.min_data_quality
+            logger.info(f"✅ Timestamps validados: {int(mask.sum())}/{len(common)}")
             
             # 3. Crear puntos de sincronización
-            sync_points = []
-            for i, timestamp in enumerate(validated_timestamps):
-                sync_point = SyncPoint(
+            sync_points = [
+                SyncPoint(
                     timestamp=timestamp,
                     cycle_id=i,
                     all_symbols_ready=True,
-                    data_quality_score=await self._calculate_quality_score(timestamp)
+                    data_quality_score=float(score)
                 )
-                sync_points.append(sync_point)
+                for i, (timestamp, score) in enumerate(zip(self._to_datetimes(common[mask]), scores[mask]))
+            ]
             
             self.sync_points = sync_points
             logger.info(f"✅ Timeline construido: {len(sync_points)} puntos de sincronización")
@@ -127,78 +294,32 @@ class TimestampSynchronizer:
             logger.error(f"❌ Error construyendo timeline: {e}")
             return []
     
+    def _common_timestamps(self, start: int, end: int) -> np.ndarray:
+        """Intersección de los timestamps epoch de todos los símbolos en [start, end]"""
+        if not self.symbols:
+            return np.empty(0, dtype=np.int64)
+        arrays = [self._symbol_timestamps(symbol, start, end) for symbol in self.symbols]
+        # Empezar por el más corto acota el coste de cada intersección
+        arrays.sort(key=len)
+        common = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), arrays)
+        logger.info(f"📊 Timestamps comunes encontrados: {len(common)}")
+        return common
+    
     async def _find_common_timestamps(self, start_date: datetime, end_date: datetime) -> List[datetime]:
         """Encuentra timestamps comunes entre todos los símbolos"""
         try:
-            all_timestamps = {}
-            
-            # Obtener timestamps de cada símbolo
-            for symbol in self.symbols:
-                symbol_timestamps = await self._get_symbol_timestamps(symbol, start_date, end_date)
-                all_timestamps[symbol] = set(symbol_timestamps)
-            
-            # Encontrar intersección (timestamps comunes)
-            if not all_timestamps:
-                return []
-            
-            common_timestamps = set.intersection(*all_timestamps.values())
-            common_timestamps = sorted(list(common_timestamps))
-            
-            logger.info(f"📊 Timestamps comunes encontrados: {len(common_timestamps)}")
-            return common_timestamps
-            
+            common = self._common_timestamps(to_epoch_seconds(start_date), to_epoch_seconds(end_date))
+            return self._to_datetimes(common)
         except Exception as e:
             logger.error(f"❌ Error encontrando timestamps comunes: {e}")
             return []
     
-    async def _get_symbol_timestamps(self, symbol: str, start_date: datetime, end_date: datetime) -> List[datetime]:
-        """Obtiene timestamps disponibles para un símbolo"""
-        try:
-            # Construir path de base de datos
-            db_path = f"data/{symbol}/{symbol}_1h.db"  # Usar 1h como referencia
-            
-            if not Path(db_path).exists():
-                logger.warning(f"⚠️ Base de datos no encontrada: {db_path}")
-                return []
-            
-            # Consultar timestamps
-            with sqlite3.connect(db_path) as conn:
-                query = """
-                SELECT DISTINCT datetime(timestamp) as timestamp
-                FROM market_data 
-                WHERE timestamp BETWEEN ? AND ?
-                ORDER BY timestamp
-                """
-                
-                df = pd.read_sql_query(
-                    query, 
-                    conn,
-                    params=[start_date.isoformat(), end_date.isoformat()]
-                )
-                
-                if df.empty:
-                    return []
-                
-                timestamps = pd.to_datetime(df['timestamp']).tolist()
-                return timestamps
-            
-        except Exception as e:
-            logger.error(f"❌ Error obteniendo timestamps de {symbol}: {e}")
-            return []
-    
     async def _validate_data_quality(self, timestamps: List[datetime]) -> List[datetime]:
-        """Valida calidad de datos en cada timestamp"""
+        """Valida calidad de datos en todos los timestamps con una máscara vectorizada"""
         try:
-            validated = []
-            
-            for timestamp in timestamps:
-                quality_score = await self._calculate_quality_score(timestamp)
-                
-                if quality_score >= self.min_data_quality:
-                    validated.append(timestamp)
-                else:
-                    logger.debug(f"⚠️ Timestamp {timestamp} descartado - calidad: {quality_score:.2f}")
-            
+            epochs = np.array([to_epoch_seconds(t) for t in timestamps], dtype=np.int64)
+            mask = self._quality_scores(epochs) >= self.min_data_quality
+            validated = [t for t, keep in zip(timestamps, mask) if keep]
             logger.info(f"✅ Timestamps validados: {len(validated)}/{len(timestamps)}")
             return validated
             
@@ -209,90 +330,12 @@ class TimestampSynchronizer:
     async def _calculate_quality_score(self, timestamp: datetime) -> float:
         """Calcula score de calidad para un timestamp específico"""
         try:
-            scores = []
-            
-            for symbol in self.symbols:
-                # Verificar disponibilidad de datos
-                data_available = await self._check_data_availability(symbol, timestamp)
-                
-                # Verificar calidad de datos (no NaN, rangos válidos)
-                data_quality = await self._check_data_quality(symbol, timestamp)
-                
-                symbol_score = (data_available + data_quality) / 2
-                scores.append(symbol_score)
-            
-            # Score promedio
-            overall_score = sum(scores) / len(scores) if scores else 0.0
-            return overall_score
-            
+            return float(self._quality_scores(np.array([to_epoch_seconds(timestamp)], dtype=np.int64))[0])
         except Exception as e:
             logger.error(f"❌ Error calculando quality score: {e}")
             return 0.0
     
-    async def _check_data_availability(self, symbol: str, timestamp: datetime) -> float:
-        """Verifica disponibilidad de datos para símbolo en timestamp"""
-        try:
-            db_path = f"data/{symbol}/{symbol}_1h.db"
-            
-            if not Path(db_path).exists():
-                return 0.0
-            
-            with sqlite3.connect(db_path) as conn:
-                query = """
-                SELECT COUNT(*) as count
-                FROM market_data 
-                WHERE datetime(timestamp) = ?
-                """
-                
-                cursor = conn.execute(query, [timestamp.isoformat()])
-                count = cursor.fetchone()[0]
-                
-                return 1.0 if count > 0 else 0.0
-            
-        except Exception as e:
-            logger.error(f"❌ Error verificando disponibilidad {symbol}: {e}")
-            return 0.0
-    
-    async def _check_data_quality(self, symbol: str, timestamp: datetime) -> float:
-        """Verifica calidad de datos (no NaN, rangos válidos)"""
-        try:
-            db_path = f"data/{symbol}/{symbol}_1h.db"
-            
-            if not Path(db_path).exists():
-                return 0.0
-            
-            with sqlite3.connect(db_path) as conn:
-                query = """
-                SELECT open, high, low, close, volume
-                FROM market_data 
-                WHERE datetime(timestamp) = ?
-                LIMIT 1
-                """
-                
-                df = pd.read_sql_query(query, conn, params=[timestamp.isoformat()])
-                
-                if df.empty:
-                    return 0.0
-                
-                # Verificar que no haya NaN
-                if df.isnull().any().any():
-                    return 0.5
-                
-                # Verificar rangos válidos (OHLC)
-                row = df.iloc[0]
-                if not (row['low'] <= row['open'] <= row['high'] and 
-                       row['low'] <= row['close'] <= row['high']):
-                    return 0.5
-                
-                # Verificar volumen positivo
-                if row['volume'] <= 0:
-                    return 0.8
-                
-                return 1.0
-            
-        except Exception as e:
-            logger.error(f"❌ Error verificando calidad {symbol}: {e}")
-            return 0.0
+    # ----------------------------- Datos sincronizados -----------------------------
     
     async def get_synchronized_data(self, timestamp: datetime, timeframe: str = "1h") -> Dict[str, pd.DataFrame]:
         """
@@ -303,14 +346,20 @@ class TimestampSynchronizer:
             timeframe: Timeframe de datos
             
         Returns:
-            Diccionario con datos por símbolo
+            Diccionario con las últimas ``window_size`` barras (<= timestamp)
+            de cada símbolo en orden cronológico
         """
         try:
+            epoch = to_epoch_seconds(timestamp)
             synchronized_data = {}
             
             for symbol in self.symbols:
-                symbol_data = await self._get_symbol_data_at_timestamp(symbol, timestamp, timeframe)
-                synchronized_data[symbol] = symbol_data
+                series = self._load_series(symbol, timeframe)
+                if series is None:
+                    synchronized_data[symbol] = pd.DataFrame()
+                    continue
+                end = int(np.searchsorted(series.timestamps, epoch, side='right'))
+                synchronized_data[symbol] = series.window(end, self.window_size)
             
             logger.debug(f"📊 Datos sincronizados obtenidos para {len(synchronized_data)} símbolos")
             return synchronized_data
@@ -319,38 +368,6 @@ class TimestampSynchronizer:
             logger.error(f"❌ Error obteniendo datos sincronizados: {e}")
             return {}
     
-    async def _get_symbol_data_at_timestamp(self, symbol: str, timestamp: datetime, timeframe: str) -> pd.DataFrame:
-        """Obtiene datos de un símbolo en timestamp específico"""
-        try:
-            db_path = f"data/{symbol}/{symbol}_{timeframe}.db"
-            
-            if not Path(db_path).exists():
-                logger.warning(f"⚠️ Base de datos no encontrada: {db_path}")
-                return pd.DataFrame()
-            
-            with sqlite3.connect(db_path) as conn:
-                # Obtener ventana de datos alrededor del timestamp
-                query = """
-                SELECT *
-                FROM market_data 
-                WHERE timestamp <= ?
-                ORDER BY timestamp DESC
-                LIMIT 100
-                """
-                
-                df = pd.read_sql_query(
-                    query, 
-                    conn,
-                    params=[timestamp.isoformat()],
-                    parse_dates=['timestamp']
-                )
-                
-                return df
-            
-        except Exception as e:
-            logger.error(f"❌ Error obteniendo datos de {symbol}: {e}")
-            return pd.DataFrame()
-    
     async def wait_for_sync_point(self, agent_id: str, timeframe: str) -> bool:
         """
         Hace que un agente espere en el punto de sincronización
@@ -422,15 +439,10 @@ class TimestampSynchronizer:
                     self.current_sync_point = self.sync_points[0]
                     return self.current_sync_point
                 
-                # Buscar siguiente punto
-                current_index = None
-                for i, point in enumerate(self.sync_points):
-                    if point.cycle_id == self.current_sync_point.cycle_id:
-                        current_index = i
-                        break
-                
-                if current_index is not None and current_index + 1 < len(self.sync_points):
-                    self.current_sync_point = self.sync_points[current_index + 1]
+                # cycle_id coincide con la posición en sync_points
+                next_index = self.current_sync_point.cycle_id + 1
+                if next_index < len(self.sync_points):
+                    self.current_sync_point = self.sync_points[next_index]
                     return self.current_sync_point
                 
                 # Fin del timeline
@@ -464,6 +476,6 @@ class TimestampSynchronizer:
             logger.error(f"❌ Error limpiando TimestampSynchronizer: {e}")
 
 # Función de conveniencia para crear sincronizador
-def create_timestamp_synchronizer(symbols: List[str], timeframes: List[str]) -> TimestampSynchronizer:
+def create_timestamp_synchronizer(symbols: List[str], timeframes: List[str], data_root: str = "data") -> TimestampSynchronizer:
     """Crea una instancia del sincronizador de timestamps"""
-    return TimestampSynchronizer(symbols, timeframes)
\ No newline at end of file
+    return TimestampSynchronizer(symbols, timeframes, data_root)
\ No newline at end of file
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+core/sync/trade_ledger.py
+=========================
+Ledger Columnar de Trades con Agregados Incrementales
+
+Almacena los trades de cada agente en arrays estructurados de NumPy (una
+columna por campo) y mantiene agregados acumulados que se actualizan solo
+con los trades nuevos:
+
+- Curva de equity, pico y drawdown máximo del portfolio
+- Media/varianza de retornos por trade (Welford, combinación por lotes)
+- PnL por minuto y agente con sumas cruzadas para la correlación, sobre una
+  ventana rolling de minutos
+
+Así el coste de cada ciclo es O(trades nuevos) en lugar de O(todos los trades).
+La deduplicación por trade_id y los buckets por minuto están acotados para
+procesos de larga duración.
+
+Autor: Bot Trading v10 Enterprise
+Versión: 1.0.0
+"""
+
+import heapq
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Any, Iterable
+
+import numpy as np
+
+from ..metrics.trade_metrics import DetailedTradeMetric
+
+logger = logging.getLogger(__name__)
+
+TRADE_DTYPE = np.dtype([
+    ('timestamp', 'f8'),        # epoch en segundos
+    ('minute', 'i8'),           # bucket de minuto (epoch // 60)
+    ('pnl_usdt', 'f8'),
+    ('pnl_pct', 'f8'),
+    ('duration_hours', 'f8'),
+    ('quality_score', 'f8'),
+    ('confluence_score', 'f8'),
+    ('was_successful', '?'),
+    ('high_quality', '?'),
+    ('strategy_id', 'i4'),
+])
+
+
+class AgentTradeLedger:
+    """Columnas de trades de un agente con crecimiento amortizado"""
+
+    def __init__(self, symbol: str, initial_capacity: int = 1024):
+        self.symbol = symbol
+        self._data = np.zeros(initial_capacity, dtype=TRADE_DTYPE)
+        self._size = 0
+        self.total_pnl = 0.0
+
+    def append(self, rows: np.ndarray):
+        """Añade un lote de filas TRADE_DTYPE"""
+        needed = self._size + len(rows)
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            grown = np.zeros(capacity, dtype=TRADE_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = rows
+        self._size = needed
+        self.total_pnl += float(rows['pnl_usdt'].sum())
+
+    @property
+    def trades(self) -> np.ndarray:
+        """Vista (sin copia) de los trades almacenados"""
+        return self._data[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class TradeLedger:
+    """Ledger de portfolio: un AgentTradeLedger por agente más agregados acumulados"""
+
+    def __init__(
+        self,
+        initial_capital: float = 1000.0,
+        max_seen_trade_ids: int = 100_000,
+        correlation_window_minutes: int = 7 * 24 * 60
+    ):
+        """
+        Args:
+            initial_capital: Capital inicial del portfolio
+            max_seen_trade_ids: trade_id recientes recordados para deduplicar
+            correlation_window_minutes: Ventana rolling de los buckets de PnL
+                por minuto usados en la correlación
+        """
+        self.initial_capital = initial_capital
+        self.max_seen_trade_ids = max_seen_trade_ids
+        self.correlation_window_minutes = correlation_window_minutes
+        self.reset()
+
+    def reset(self):
+        """Vacía el ledger y todos los agregados (p. ej. al iniciar una nueva sesión)"""
+        self.agents: Dict[str, AgentTradeLedger] = {}
+        self.strategies: List[str] = []
+        self._strategy_ids: Dict[str, int] = {}
+        self._seen_trade_ids = set()
+        self._seen_order: deque = deque()
+
+        # Equity / drawdown
+        self.equity = self.initial_capital
+        self.peak_equity = self.initial_capital
+        self.max_drawdown_pct = 0.0
+
+        # Welford de retornos por trade
+        self.n_returns = 0
+        self.mean_return = 0.0
+        self._m2_returns = 0.0
+
+        # PnL por minuto y agente (ventana rolling) + sumas para correlación
+        self._agent_index: Dict[str, int] = {}
+        self._buckets: Dict[int, np.ndarray] = {}
+        self._bucket_heap: List[int] = []
+        self._latest_minute: Optional[int] = None
+        self._evictions_since_rebuild = 0
+        self._bucket_sum = np.zeros(0)
+        self._bucket_cross = np.zeros((0, 0))
+
+    # ------------------------------------------------------------------
+    # Ingesta
+    # ------------------------------------------------------------------
+
+    def _strategy_id(self, name: str) -> int:
+        strategy_id = self._strategy_ids.get(name)
+        if strategy_id is None:
+            strategy_id = len(self.strategies)
+            self._strategy_ids[name] = strategy_id
+            self.strategies.append(name)
+        return strategy_id
+
+    def _agent_column(self, symbol: str) -> int:
+        column = self._agent_index.get(symbol)
+        if column is None:
+            column = len(self._agent_index)
+            self._agent_index[symbol] = column
+            self.agents[symbol] = AgentTradeLedger(symbol)
+            self._bucket_sum = np.append(self._bucket_sum, 0.0)
+            cross = np.zeros((column + 1, column + 1))
+            cross[:column, :column] = self._bucket_cross
+            self._bucket_cross = cross
+            for minute, row in self._buckets.items():
+                self._buckets[minute] = np.append(row, 0.0)
+        return column
+
+    def _remember_trade_id(self, trade_id: Any):
+        """Registra un trade_id, olvidando los más antiguos por encima del límite"""
+        self._seen_trade_ids.add(trade_id)
+        self._seen_order.append(trade_id)
+        while len(self._seen_order) > self.max_seen_trade_ids:
+            self._seen_trade_ids.discard(self._seen_order.popleft())
+
+    def _to_rows(self, trades: Iterable[DetailedTradeMetric]) -> np.ndarray:
+        new_trades = []
+        for trade in trades:
+            trade_id = getattr(trade, 'trade_id', None)
+            if trade_id is not None:
+                if trade_id in self._seen_trade_ids:
+                    continue
+                self._remember_trade_id(trade_id)
+            new_trades.append(trade)
+
+        rows = np.zeros(len(new_trades), dtype=TRADE_DTYPE)
+        for i, trade in enumerate(new_trades):
+            ts = trade.timestamp.timestamp()
+            rows[i] = (
+                ts,
+                int(ts // 60),
+                trade.pnl_usdt,
+                trade.pnl_percentage,
+                trade.duration_hours,
+                trade.get_quality_score(),
+                trade.confluence_score,
+                bool(trade.was_successful),
+                bool(trade.is_high_quality_trade()),
+                self._strategy_id(trade.strategy_name),
+            )
+        return rows
+
+    def append(self, agent_results: Dict[str, List[DetailedTradeMetric]]) -> Dict[str, np.ndarray]:
+        """
+        Añade al ledger los trades no vistos y actualiza los agregados
+
+        Args:
+            agent_results: Trades por agente (se ignoran trade_id ya registrados)
+
+        Returns:
+            Lote de filas nuevas por agente
+        """
+        batch: Dict[str, np.ndarray] = {}
+        for symbol, trades in agent_results.items():
+            self._agent_column(symbol)
+            rows = self._to_rows(trades or [])
+            batch[symbol] = rows
+            if len(rows):
+                self.agents[symbol].append(rows)
+
+        non_empty = [rows for rows in batch.values() if len(rows)]
+        if non_empty:
+            merged = np.concatenate(non_empty)
+            self._update_equity(merged)
+            self._update_returns(merged['pnl_pct'] / 100)
+            for symbol, rows in batch.items():
+                if len(rows):
+                    self._update_buckets(self._agent_index[symbol], rows)
+
+        return batch
+
+    def _update_equity(self, rows: np.ndarray):
+        ordered = rows[np.argsort(rows['timestamp'], kind='stable')]
+        equity_curve = self.equity + np.cumsum(ordered['pnl_usdt'])
+        peaks = np.maximum(np.maximum.accumulate(equity_curve), self.peak_equity)
+        drawdowns = (peaks - equity_curve) / peaks * 100
+
+        self.equity = float(equity_curve[-1])
+        self.peak_equity = float(peaks[-1])
+        self.max_drawdown_pct = max(self.max_drawdown_pct, float(drawdowns.max()))
+
+    def _update_returns(self, returns: np.ndarray):
+        # Combinación de Welford por lotes (Chan et al.)
+        n_b = len(returns)
+        mean_b = float(returns.mean())
+        m2_b = float(((returns - mean_b) ** 2).sum())
+        n = self.n_returns + n_b
+        delta = mean_b - self.mean_return
+        self.mean_return += delta * n_b / n
+        self._m2_returns += m2_b + delta * delta * self.n_returns * n_b / n
+        self.n_returns = n
+
+    def _update_buckets(self, column: int, rows: np.ndarray):
+        minutes, inverse = np.unique(rows['minute'], return_inverse=True)
+        deltas = np.bincount(inverse, weights=rows['pnl_usdt'])
+        n_agents = len(self._agent_index)
+
+        latest = int(minutes[-1])
+        if self._latest_minute is None or latest > self._latest_minute:
+            self._latest_minute = latest
+        cutoff = self._latest_minute - self.correlation_window_minutes
+
+        for minute, delta in zip(minutes.tolist(), deltas.tolist()):
+            if minute <= cutoff:
+                # Fuera de la ventana rolling: no cuenta para la correlación
+                continue
+            row = self._buckets.get(minute)
+            if row is None:
+                row = np.zeros(n_agents)
+                self._buckets[minute] = row
+                heapq.heappush(self._bucket_heap, minute)
+            # (x + δ)·y - x·y = δ·y para j != i; (x + δ)² - x² = 2xδ + δ² en la diagonal
+            cross_update = delta * row
+            self._bucket_cross[column, :] += cross_update
+            self._bucket_cross[:, column] += cross_update
+            self._bucket_cross[column, column] += delta * delta
+            self._bucket_sum[column] += delta
+            row[column] += delta
+
+        self._evict_buckets(cutoff)
+
+    def _evict_buckets(self, cutoff: int):
+        """Retira de las sumas los buckets que salen de la ventana rolling"""
+        while self._bucket_heap and self._bucket_heap[0] <= cutoff:
+            row = self._buckets.pop(heapq.heappop(self._bucket_heap))
+            self._bucket_sum -= row
+            self._bucket_cross -= np.outer(row, row)
+            self._evictions_since_rebuild += 1
+
+        # Recalcular desde los buckets vivos para acotar el error de redondeo
+        if self._evictions_since_rebuild and self._evictions_since_rebuild >= len(self._buckets):
+            matrix = np.array(list(self._buckets.values())).reshape(-1, len(self._bucket_sum))
+            self._bucket_sum = matrix.sum(axis=0)
+            self._bucket_cross = matrix.T @ matrix
+            self._evictions_since_rebuild = 0
+
+    # ------------------------------------------------------------------
+    # Lectura de agregados
+    # ------------------------------------------------------------------
+
+    @property
+    def return_std(self) -> float:
+        """Desviación típica poblacional de los retornos por trade"""
+        if self.n_returns < 1:
+            return 0.0
+        return float(np.sqrt(self._m2_returns / self.n_returns))
+
+    def sharpe_ratio(self) -> float:
+        if self.n_returns < 2:
+            return 0.0
+        std = self.return_std
+        return float(self.mean_return / std) if std > 0 else 0.0
+
+    def correlation_matrix(self) -> Dict[str, Dict[str, float]]:
+        """Correlación de Pearson del PnL por minuto entre agentes"""
+        m = len(self._buckets)
+        symbols = list(self._agent_index)
+        if m < 2 or len(symbols) < 2:
+            return {}
+
+        mean = self._bucket_sum / m
+        cov = (self._bucket_cross - m * np.outer(mean, mean)) / (m - 1)
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        denom = np.outer(std, std)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.where(denom > 0, cov / denom, np.nan)
+
+        return {
+            s1: {s2: float(corr[j, i]) for s2, j in self._agent_index.items()}
+            for s1, i in self._agent_index.items()
+        }
+
+    def __len__(self) -> int:
+        return sum(len(agent) for agent in self.agents.values())
@@ -9,7 +9,27 @@ Motor de trading enterprise con soporte para:
 - Gestión de posiciones
 - Ejecución de órdenes
 - Análisis de mercado
+
+Los submódulos se importan bajo demanda: ``import core.trading.executor`` ya
+no construye el motor de futuros enterprise. Los nombres re-exportados
+siguen disponibles como ``core.trading.<nombre>``.
 """
 
-from .bitget_client import *
-from .enterprise import *
\ No newline at end of file
+import importlib
+
+# Orden de búsqueda: el último ``import *`` original tenía prioridad
+_LAZY_SUBMODULES = ('.enterprise', '.bitget_client')
+
+
+def __getattr__(name):
+    if name.startswith('_'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    for submodule in _LAZY_SUBMODULES:
+        module = importlib.import_module(submodule, __name__)
+        if name in globals():
+            return globals()[name]
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
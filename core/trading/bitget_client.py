@@ -30,6 +30,7 @@ from urllib.parse import urlencode
 import redis
 
 from core.config.config_loader import config_loader
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -350,4 +351,4 @@ class BitgetClient:
             logger.error(f"Error cerrando BitgetClient: {e}")
 
 # Instancia global
-bitget_client = BitgetClient()
\ No newline at end of file
+bitget_client = lazy_service('bitget_client', BitgetClient)
\ No newline at end of file
@@ -45,6 +45,7 @@ from .leverage_calculator import LeverageCalculator
 from .market_analyzer import MarketAnalyzer
 from core.data.enterprise.stream_collector import EnterpriseDataCollector
 from core.config.unified_config import unified_config
+from core.integration.latency_tracing import latency_tracer, traced
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +86,7 @@ class EnterpriseFuturesEngine:
         # Data collector
         symbols = [s['symbol'] for s in self.config.trading.symbols.primary]
         self.data_collector = EnterpriseDataCollector(symbols)
+        self.data_collector.add_tick_listener(self.position_manager.on_price_update)
         
         # Threading y control
         self.trading_thread = None
@@ -389,27 +391,30 @@ class EnterpriseFuturesEngine:
                 if signal.action == 'HOLD':
                     continue
                 
-                # Calcular tamaño de posición
-                position_size_usd = await self.calculate_position_size(signal)
-                
-                if position_size_usd < self.get_min_position_size(signal.symbol):
-                    continue
-                
-                # Calcular leverage dinámico
-                leverage = await self.leverage_calculator.calculate_optimal_leverage(
-                    symbol=signal.symbol,
-                    confidence=signal.confidence,
-                    volatility=signal.predicted_volatility
-                )
-                
-                # Ejecutar trade
-                await self.execute_trade(
-                    symbol=signal.symbol,
-                    action=signal.action,
-                    size_usd=position_size_usd,
-                    leverage=leverage,
-                    signal=signal
-                )
+                # Continúa la traza de latencia abierta al generar la señal
+                trace_id = (signal.metadata or {}).get('trace_id')
+                with latency_tracer.trace('trade_execution', trace_id=trace_id, symbol=signal.symbol):
+                    # Calcular tamaño de posición
+                    position_size_usd = await self.calculate_position_size(signal)
+                    
+                    if position_size_usd < self.get_min_position_size(signal.symbol):
+                        continue
+                    
+                    # Calcular leverage dinámico
+                    leverage = await self.leverage_calculator.calculate_optimal_leverage(
+                        symbol=signal.symbol,
+                        confidence=signal.confidence,
+                        volatility=signal.predicted_volatility
+                    )
+                    
+                    # Ejecutar trade
+                    await self.execute_trade(
+                        symbol=signal.symbol,
+                        action=signal.action,
+                        size_usd=position_size_usd,
+                        leverage=leverage,
+                        signal=signal
+                    )
                 
             except Exception as e:
                 logger.error(f"Error ejecutando trade para señal {signal.symbol}: {e}")
@@ -615,6 +620,7 @@ class EnterpriseFuturesEngine:
         except Exception as e:
             logger.error(f"Error cerrando posición {position.symbol}: {e}")
     
+    @traced('risk_check')
     async def calculate_position_size(self, signal: TradingSignal) -> float:
         """
         Calcula el tamaño de posición basado en la señal y risk management
@@ -26,6 +26,8 @@ import numpy as np
 # Imports de trading
 import ccxt.async_support as ccxt
 
+from core.integration.latency_tracing import traced
+
 logger = logging.getLogger(__name__)
 
 class OrderType(Enum):
@@ -137,6 +139,7 @@ class OrderExecutor:
         self.exchange = exchange
         logger.info("Exchange configurado en OrderExecutor")
     
+    @traced('order_submit')
     async def execute_order(
         self,
         symbol: str,
@@ -481,6 +484,7 @@ class OrderExecutor:
             order.status = OrderStatus.REJECTED
             return OrderResult(False, order, str(e), 0, 0, 0)
     
+    @traced('risk_check')
     async def _validate_order(
         self,
         symbol: str,
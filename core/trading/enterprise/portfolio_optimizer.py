@@ -14,6 +14,7 @@ Características principales:
 - Optimización con restricciones
 - Backtesting de estrategias
 - Métricas de performance
+- Covarianza EWMA incremental por barra y solver con warm start
 """
 
 import logging
@@ -60,6 +61,96 @@ class OptimizationResult:
     convergence: bool
     message: str
 
+class EWMACovarianceTracker:
+    """
+    Covarianza exponencialmente ponderada de retornos, actualizada por barra.
+
+    Mantiene además una ventana de retornos recientes para las métricas
+    históricas (VaR/CVaR/drawdown) sin releer la base de datos.
+    """
+    
+    def __init__(self, symbols: List[str], decay: float = 0.94, history_size: int = 720):
+        n = len(symbols)
+        self.symbols = list(symbols)
+        self.decay = decay
+        self.mean = np.zeros(n)
+        self.cov = np.zeros((n, n))
+        self.last_prices = np.full(n, np.nan)
+        self.last_bar_time: Optional[int] = None
+        self.n_updates = 0
+        
+        self._returns = np.zeros((history_size, n))
+        self._count = 0
+        self._head = 0
+    
+    def update(self, timestamp: int, prices: np.ndarray) -> bool:
+        """
+        Incorpora una barra de precios alineada con self.symbols (NaN = sin dato)
+        
+        Returns:
+            True si la barra era nueva y se aplicó
+        """
+        if self.last_bar_time is not None and timestamp <= self.last_bar_time:
+            return False
+        
+        prices = np.asarray(prices, dtype=float)
+        has_price = np.isfinite(prices) & (prices > 0)
+        had_price = np.isfinite(self.last_prices) & (self.last_prices > 0)
+        
+        if had_price.any():
+            valid = has_price & had_price
+            r = np.zeros(len(self.symbols))
+            r[valid] = prices[valid] / self.last_prices[valid] - 1.0
+            
+            if self.n_updates == 0:
+                self.mean = r.copy()
+            else:
+                # Actualización EWMA de media y covarianza (O(n²))
+                delta = r - self.mean
+                self.mean = self.mean + (1 - self.decay) * delta
+                self.cov = self.decay * (self.cov + (1 - self.decay) * np.outer(delta, delta))
+            self.n_updates += 1
+            
+            self._returns[self._head] = r
+            self._head = (self._head + 1) % len(self._returns)
+            self._count = min(self._count + 1, len(self._returns))
+        
+        self.last_prices = np.where(has_price, prices, self.last_prices)
+        self.last_bar_time = int(timestamp)
+        return True
+    
+    def recent_returns(self) -> np.ndarray:
+        """Retornos recientes en orden temporal (T x n)"""
+        if self._count < len(self._returns):
+            return self._returns[:self._count]
+        return np.roll(self._returns, -self._head, axis=0)
+    
+    @property
+    def effective_observations(self) -> float:
+        """Tamaño de muestra efectivo de la EWMA: min(barras, 1/(1-decay))"""
+        return float(min(self.n_updates, 1.0 / (1.0 - self.decay)))
+    
+    def shrinkage_intensity(self) -> float:
+        """Intensidad de shrinkage automática: n / (n + n_eff)"""
+        n = len(self.symbols)
+        n_eff = max(self.effective_observations, 1.0)
+        return n / (n + n_eff)
+    
+    def shrunk_cov(self, shrinkage: Optional[float] = None) -> np.ndarray:
+        """
+        Covarianza regularizada hacia su diagonal
+        
+        Con pocas observaciones efectivas (decay bajo o muchos símbolos) la
+        covarianza EWMA tiene rango deficiente; la combinación convexa con la
+        diagonal (más un ridge mínimo para varianzas nulas) es siempre
+        definida positiva.
+        """
+        delta = self.shrinkage_intensity() if shrinkage is None else float(np.clip(shrinkage, 0.0, 1.0))
+        variances = np.clip(np.diag(self.cov), 0.0, None)
+        shrunk = (1 - delta) * self.cov + delta * np.diag(variances)
+        ridge = 1e-6 * (float(variances.mean()) if variances.any() else 1.0)
+        return shrunk + ridge * np.eye(len(self.symbols))
+
 class PortfolioOptimizer:
     """Optimizador de portafolio enterprise"""
     
@@ -81,6 +172,19 @@ class PortfolioOptimizer:
         # Métricas de performance
         self.optimization_history = []
         
+        # Estado incremental: covarianza EWMA por universo de símbolos,
+        # últimos pesos por (método, universo) para warm start y resultados
+        # cacheados por timestamp de la última barra
+        self.ewma_decay = self.optimization_config.get('ewma_decay', 0.94)
+        self.bar_seconds = self.optimization_config.get('bar_seconds', 3600)
+        # None = intensidad automática según observaciones efectivas y nº de símbolos
+        self.cov_shrinkage = self.optimization_config.get('cov_shrinkage')
+        # Barras recientes incompletas que se esperan antes de aplicarlas (datos tardíos)
+        self.late_bar_tolerance = self.optimization_config.get('late_bar_tolerance', 2)
+        self._cov_trackers: Dict[Tuple[Tuple[str, ...], int], EWMACovarianceTracker] = {}
+        self._last_weights: Dict[Tuple[str, Tuple[str, ...]], np.ndarray] = {}
+        self._result_cache: Dict[str, OptimizationResult] = {}
+        
         logger.info("PortfolioOptimizer inicializado")
     
     def _setup_redis(self):
@@ -111,58 +215,66 @@ class PortfolioOptimizer:
         try:
             start_time = datetime.now()
             
-            # Verificar cache
-            cache_key = f"portfolio_optimization_{method}_{'_'.join(symbols)}_{lookback_days}"
-            if self.redis_client:
-                cached_result = self.redis_client.get(cache_key)
-                if cached_result:
-                    logger.info("Usando resultado de optimización desde cache")
-                    return OptimizationResult(**json.loads(cached_result))
-            
-            # Obtener datos históricos
-            historical_data = await self._get_historical_data(symbols, lookback_days)
-            if not historical_data:
+            # Covarianza EWMA (carga la historia una vez y luego solo barras nuevas)
+            tracker = await self._get_cov_tracker(symbols, lookback_days)
+            if tracker is None or tracker.n_updates < 24:  # Al menos 1 día de barras
                 raise ValueError("No hay datos históricos suficientes")
             
-            # Calcular retornos y matriz de covarianza
-            returns_df = self._calculate_returns(historical_data)
-            cov_matrix = returns_df.cov()
-            expected_returns = returns_df.mean()
+            # Verificar cache (clave ligada a la última barra de datos)
+            cache_key = (
+                f"portfolio_optimization_{method}_{'_'.join(symbols)}_"
+                f"{lookback_days}_{tracker.last_bar_time}"
+            )
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                logger.info("Usando resultado de optimización desde cache")
+                return cached_result
+            
+            cov_matrix = tracker.shrunk_cov(self.cov_shrinkage)
+            expected_returns = tracker.mean
+            returns = tracker.recent_returns()
             
             # Optimizar según el método
             if method == "risk_parity":
-                weights = self._risk_parity_optimization(cov_matrix)
+                weights = self._risk_parity_optimization(
+                    cov_matrix, x0=self._last_weights.get((method, tuple(symbols)))
+                )
             elif method == "equal_weight":
                 weights = self._equal_weight_optimization(symbols)
             elif method == "market_cap":
                 weights = self._market_cap_optimization(symbols)
             elif method == "kelly":
-                weights = self._kelly_optimization(returns_df, expected_returns)
+                weights = self._kelly_optimization(cov_matrix, expected_returns)
             else:
                 raise ValueError(f"Método de optimización no soportado: {method}")
             
+            # Guardar pesos sin restricciones para el warm start siguiente
+            self._last_weights[(method, tuple(symbols))] = weights
+            
             # Aplicar restricciones
             weights = self._apply_constraints(weights, symbols)
             
             # Calcular métricas del portafolio
             portfolio_metrics = self._calculate_portfolio_metrics(
-                weights, expected_returns, cov_matrix, returns_df
+                weights, expected_returns, cov_matrix, returns
             )
             
             # Crear resultado
             portfolio_weights = []
             total_value = sum(pos.get('value', 0) for pos in self._get_current_positions().values())
+            risk_contributions = self._calculate_risk_contributions(weights, cov_matrix)
+            volatilities = np.sqrt(np.clip(np.diag(cov_matrix), 0.0, None))
             
             for i, symbol in enumerate(symbols):
                 weight = weights[i] if i < len(weights) else 0.0
                 portfolio_weights.append(PortfolioWeights(
                     symbol=symbol,
-                    weight=weight,
+                    weight=float(weight),
                     target_value=total_value * weight,
                     current_value=self._get_current_position_value(symbol),
-                    risk_contribution=self._calculate_risk_contribution(weights, cov_matrix, i),
-                    expected_return=expected_returns.iloc[i] if i < len(expected_returns) else 0.0,
-                    volatility=np.sqrt(cov_matrix.iloc[i, i]) if i < cov_matrix.shape[0] else 0.0
+                    risk_contribution=float(risk_contributions[i]),
+                    expected_return=float(expected_returns[i]),
+                    volatility=float(volatilities[i])
                 ))
             
             result = OptimizationResult(
@@ -182,8 +294,7 @@ class PortfolioOptimizer:
             )
             
             # Cachear resultado
-            if self.redis_client:
-                self.redis_client.setex(cache_key, 3600, json.dumps(asdict(result), default=str))
+            self._store_cached_result(cache_key, result)
             
             # Guardar en historial
             self.optimization_history.append(result)
@@ -217,37 +328,49 @@ class PortfolioOptimizer:
                 message=f"Error: {str(e)}"
             )
     
-    def _risk_parity_optimization(self, cov_matrix: pd.DataFrame) -> np.ndarray:
-        """Optimización de paridad de riesgo"""
+    def _risk_parity_optimization(self, cov_matrix: np.ndarray, x0: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Optimización de paridad de riesgo (equal risk contribution)
+        
+        Formulación convexa de Spinu: min ½·wᵀΣw − Σ bᵢ·log(wᵢ), con gradiente
+        analítico Σw − b/w. En el óptimo wᵢ(Σw)ᵢ = bᵢ, por lo que las
+        contribuciones de riesgo son iguales tras normalizar.
+        
+        Args:
+            cov_matrix: Matriz de covarianza
+            x0: Pesos previos para warm start (opcional)
+        """
+        cov = np.asarray(cov_matrix, dtype=float)
+        n = len(cov)
         try:
-            n = len(cov_matrix)
+            # Escalar Σ para un problema bien condicionado (no cambia la solución normalizada)
+            scale = float(np.mean(np.diag(cov)))
+            if not np.isfinite(scale) or scale <= 0:
+                return np.ones(n) / n
+            sigma = cov / scale
+            budget = np.ones(n) / n
             
-            def objective(weights):
-                # Normalizar pesos
-                weights = weights / np.sum(weights)
-                
-                # Calcular contribución de riesgo
-                portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-                marginal_contrib = np.dot(cov_matrix, weights)
-                risk_contrib = weights * marginal_contrib / portfolio_variance
-                
-                # Objetivo: minimizar la varianza de las contribuciones de riesgo
-                return np.var(risk_contrib)
+            def objective(w):
+                sigma_w = sigma @ w
+                value = 0.5 * w @ sigma_w - budget @ np.log(w)
+                grad = sigma_w - budget / w
+                return value, grad
             
-            # Restricciones
-            constraints = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1}]
-            bounds = [(0.01, 1.0) for _ in range(n)]
+            # Warm start: pesos previos reescalados para que wᵀΣw = Σb = 1
+            start = np.ones(n) / n if x0 is None or len(x0) != n else np.clip(np.asarray(x0, dtype=float), 1e-6, None)
+            start_var = float(start @ sigma @ start)
+            if start_var > 0:
+                start = start / np.sqrt(start_var)
             
-            # Optimización
             result = minimize(
                 objective,
-                x0=np.ones(n) / n,
-                method='SLSQP',
-                bounds=bounds,
-                constraints=constraints
+                x0=start,
+                jac=True,
+                method='L-BFGS-B',
+                bounds=[(1e-10, None)] * n
             )
             
-            if result.success:
+            if result.success and np.all(np.isfinite(result.x)):
                 return result.x / np.sum(result.x)
             else:
                 logger.warning("Optimización de risk parity falló, usando pesos iguales")
@@ -255,7 +378,7 @@ class PortfolioOptimizer:
                 
         except Exception as e:
             logger.error(f"Error en risk parity optimization: {e}")
-            return np.ones(len(cov_matrix)) / len(cov_matrix)
+            return np.ones(n) / n
     
     def _equal_weight_optimization(self, symbols: List[str]) -> np.ndarray:
         """Optimización de peso igual"""
@@ -279,17 +402,16 @@ class PortfolioOptimizer:
             logger.error(f"Error en market cap optimization: {e}")
             return np.ones(len(symbols)) / len(symbols)
     
-    def _kelly_optimization(self, returns_df: pd.DataFrame, expected_returns: pd.Series) -> np.ndarray:
+    def _kelly_optimization(self, cov_matrix: np.ndarray, expected_returns: np.ndarray) -> np.ndarray:
         """Optimización usando el criterio de Kelly"""
         try:
             # Calcular estadísticas necesarias para Kelly
-            mean_returns = expected_returns.values
-            cov_matrix = returns_df.cov().values
+            mean_returns = np.asarray(expected_returns, dtype=float)
+            cov_matrix = np.asarray(cov_matrix, dtype=float)
             
-            # Kelly óptimo: w = Σ^(-1) * μ
+            # Kelly óptimo: w = Σ^(-1) * μ (Σ ya regularizada)
             try:
-                inv_cov = np.linalg.inv(cov_matrix)
-                kelly_weights = np.dot(inv_cov, mean_returns)
+                kelly_weights = np.linalg.solve(cov_matrix, mean_returns)
                 
                 # Normalizar y aplicar factor de Kelly (típicamente 0.25)
                 kelly_factor = 0.25
@@ -305,7 +427,7 @@ class PortfolioOptimizer:
                 
         except Exception as e:
             logger.error(f"Error en Kelly optimization: {e}")
-            return np.ones(len(returns_df.columns)) / len(returns_df.columns)
+            return np.ones(len(expected_returns)) / len(expected_returns)
     
     def _apply_constraints(self, weights: np.ndarray, symbols: List[str]) -> np.ndarray:
         """Aplica restricciones a los pesos del portafolio"""
@@ -330,9 +452,9 @@ class PortfolioOptimizer:
     
     def _calculate_portfolio_metrics(self, 
                                    weights: np.ndarray, 
-                                   expected_returns: pd.Series, 
-                                   cov_matrix: pd.DataFrame,
-                                   returns_df: pd.DataFrame) -> Dict[str, float]:
+                                   expected_returns: np.ndarray, 
+                                   cov_matrix: np.ndarray,
+                                   returns: np.ndarray) -> Dict[str, float]:
         """Calcula métricas del portafolio optimizado"""
         try:
             # Retorno esperado del portafolio
@@ -346,15 +468,15 @@ class PortfolioOptimizer:
             sharpe_ratio = portfolio_return / portfolio_volatility if portfolio_volatility > 0 else 0
             
             # Calcular retornos del portafolio
-            portfolio_returns = returns_df.dot(weights)
+            portfolio_returns = returns @ weights
             
             # VaR y CVaR
             var_95 = np.percentile(portfolio_returns, 5)
             cvar_95 = portfolio_returns[portfolio_returns <= var_95].mean()
             
             # Max drawdown
-            cumulative_returns = (1 + portfolio_returns).cumprod()
-            running_max = cumulative_returns.expanding().max()
+            cumulative_returns = np.cumprod(1 + portfolio_returns)
+            running_max = np.maximum.accumulate(cumulative_returns)
             drawdown = (cumulative_returns - running_max) / running_max
             max_drawdown = drawdown.min()
             
@@ -386,11 +508,15 @@ class PortfolioOptimizer:
                 'convergence': False
             }
     
-    async def _get_historical_data(self, symbols: List[str], lookback_days: int) -> Dict[str, List]:
-        """Obtiene datos históricos para los símbolos"""
+    async def _get_historical_data(self,
+                                   symbols: List[str],
+                                   lookback_days: int = 30,
+                                   start_date: Optional[datetime] = None) -> Dict[str, List]:
+        """Obtiene datos históricos para los símbolos (desde start_date si se indica)"""
         try:
             end_date = datetime.now()
-            start_date = end_date - timedelta(days=lookback_days)
+            if start_date is None:
+                start_date = end_date - timedelta(days=lookback_days)
             
             historical_data = {}
             for symbol in symbols:
@@ -401,7 +527,7 @@ class PortfolioOptimizer:
                         end_date=end_date,
                         timeframe='1h'
                     )
-                    if data and len(data) > 24:  # Al menos 1 día de datos
+                    if data:
                         historical_data[symbol] = data
                 except Exception as e:
                     logger.warning(f"Error obteniendo datos para {symbol}: {e}")
@@ -413,32 +539,147 @@ class PortfolioOptimizer:
             logger.error(f"Error obteniendo datos históricos: {e}")
             return {}
     
-    def _calculate_returns(self, historical_data: Dict[str, List]) -> pd.DataFrame:
-        """Calcula retornos a partir de datos históricos"""
+    async def _get_cov_tracker(self, symbols: List[str], lookback_days: int) -> Optional[EWMACovarianceTracker]:
+        """
+        Devuelve el tracker de covarianza del universo, sincronizado con la BD
+        
+        La primera llamada carga lookback_days de historia; las siguientes solo
+        consultan la BD si ha pasado al menos una barra desde la última. Las
+        barras recientes a las que aún les falta algún símbolo no se aplican
+        hasta completarse (o hasta superar late_bar_tolerance barras), de modo
+        que un dato tardío no se pierde como retorno 0.
+        """
+        key = (tuple(symbols), lookback_days)
+        tracker = self._cov_trackers.get(key)
+        now_ts = int(datetime.now().timestamp())
+        
+        if tracker is None:
+            if 1.0 / (1.0 - self.ewma_decay) <= len(symbols):
+                logger.warning(
+                    f"⚠️ Ventana efectiva EWMA ({1.0 / (1.0 - self.ewma_decay):.0f} barras) <= "
+                    f"{len(symbols)} símbolos: la covarianza se regulariza con shrinkage"
+                )
+            tracker = EWMACovarianceTracker(
+                symbols,
+                decay=self.ewma_decay,
+                history_size=max(2, lookback_days * 86400 // self.bar_seconds)
+            )
+            start_date = datetime.now() - timedelta(days=lookback_days)
+        elif now_ts - tracker.last_bar_time < self.bar_seconds:
+            return tracker
+        else:
+            start_date = datetime.fromtimestamp(tracker.last_bar_time + 1)
+        
+        historical_data = await self._get_historical_data(symbols, start_date=start_date)
+        timestamps, price_matrix = self._align_bars(symbols, historical_data)
+        settled_before = now_ts - self.late_bar_tolerance * self.bar_seconds
+        for timestamp, prices in zip(timestamps, price_matrix):
+            if not np.isfinite(prices).all() and timestamp > settled_before:
+                # Barra reciente incompleta: se vuelve a leer en la próxima sincronización
+                break
+            tracker.update(int(timestamp), prices)
+        
+        if tracker.last_bar_time is None:
+            return None
+        
+        self._cov_trackers[key] = tracker
+        return tracker
+    
+    def on_new_bar(self, timestamp: int, prices: Dict[str, float]):
+        """
+        Aplica una barra nueva a todos los trackers que contienen sus símbolos
+        
+        Solo se aplican barras completas para el universo del tracker; las
+        incompletas se incorporan en la siguiente sincronización con la BD.
+        
+        Args:
+            timestamp: Timestamp epoch de la barra
+            prices: Precio de cierre por símbolo
+        """
+        for (symbols, _), tracker in self._cov_trackers.items():
+            row = np.array([prices.get(symbol, np.nan) for symbol in symbols], dtype=float)
+            if np.isfinite(row).all():
+                tracker.update(int(timestamp), row)
+    
+    def _align_bars(self, symbols: List[str], historical_data: Dict[str, List]) -> Tuple[np.ndarray, np.ndarray]:
+        """Alinea cierres por timestamp en una matriz (T x n) con NaN donde falta dato"""
         try:
-            returns_data = {}
-            
-            for symbol, data in historical_data.items():
-                if data and len(data) > 1:
-                    df = pd.DataFrame(data)
-                    if 'close' in df.columns:
-                        returns = df['close'].pct_change().dropna()
-                        returns_data[symbol] = returns
-            
-            if returns_data:
-                # Alinear todos los retornos en el mismo DataFrame
-                min_length = min(len(returns) for returns in returns_data.values())
-                aligned_returns = {}
-                for symbol, returns in returns_data.items():
-                    aligned_returns[symbol] = returns.iloc[-min_length:]
-                
-                return pd.DataFrame(aligned_returns)
-            else:
-                return pd.DataFrame()
-                
+            all_ts = sorted({int(row['timestamp']) for data in historical_data.values() for row in data})
+            timestamps = np.array(all_ts, dtype=np.int64)
+            price_matrix = np.full((len(timestamps), len(symbols)), np.nan)
+            
+            for j, symbol in enumerate(symbols):
+                data = historical_data.get(symbol)
+                if not data:
+                    continue
+                ts = np.array([int(row['timestamp']) for row in data], dtype=np.int64)
+                closes = np.array([row['close'] for row in data], dtype=float)
+                price_matrix[np.searchsorted(timestamps, ts), j] = closes
+            
+            return timestamps, price_matrix
+            
         except Exception as e:
-            logger.error(f"Error calculando retornos: {e}")
-            return pd.DataFrame()
+            logger.error(f"Error alineando datos históricos: {e}")
+            return np.zeros(0, dtype=np.int64), np.zeros((0, len(symbols)))
+    
+    @staticmethod
+    def _result_from_dict(data: Dict[str, Any]) -> OptimizationResult:
+        """Reconstruye un OptimizationResult desde JSON restaurando los tipos de cada campo"""
+        def coerce(cls, values):
+            parsed = {}
+            for name, field_type in cls.__annotations__.items():
+                value = values.get(name)
+                if field_type is bool:
+                    parsed[name] = value if isinstance(value, bool) else str(value).lower() == 'true'
+                elif field_type is float:
+                    parsed[name] = float(value) if value is not None else 0.0
+                else:
+                    parsed[name] = value
+            return parsed
+        
+        result = coerce(OptimizationResult, data)
+        result['weights'] = [PortfolioWeights(**coerce(PortfolioWeights, w)) for w in data.get('weights', [])]
+        return OptimizationResult(**result)
+    
+    @staticmethod
+    def _to_native(value: Any) -> Any:
+        """Convierte escalares numpy a tipos nativos para serializar en JSON"""
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, dict):
+            return {k: PortfolioOptimizer._to_native(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [PortfolioOptimizer._to_native(v) for v in value]
+        return value
+    
+    def _get_cached_result(self, cache_key: str) -> Optional[OptimizationResult]:
+        """Busca un resultado en la cache local y después en Redis"""
+        result = self._result_cache.get(cache_key)
+        if result is not None:
+            return result
+        
+        if self.redis_client:
+            try:
+                cached_result = self.redis_client.get(cache_key)
+                if cached_result:
+                    result = self._result_from_dict(json.loads(cached_result))
+                    self._result_cache[cache_key] = result
+                    return result
+            except Exception as e:
+                logger.warning(f"Error leyendo cache de optimización: {e}")
+        return None
+    
+    def _store_cached_result(self, cache_key: str, result: OptimizationResult):
+        """Guarda un resultado en la cache local (acotada) y en Redis"""
+        if len(self._result_cache) >= 256:
+            self._result_cache.pop(next(iter(self._result_cache)))
+        self._result_cache[cache_key] = result
+        
+        if self.redis_client:
+            try:
+                self.redis_client.setex(cache_key, 3600, json.dumps(self._to_native(asdict(result))))
+            except Exception as e:
+                logger.warning(f"Error guardando cache de optimización: {e}")
     
     def _get_current_positions(self) -> Dict[str, Dict]:
         """Obtiene posiciones actuales"""
@@ -475,16 +716,17 @@ class PortfolioOptimizer:
             logger.error(f"Error obteniendo market cap para {symbol}: {e}")
             return 0.1
     
-    def _calculate_risk_contribution(self, weights: np.ndarray, cov_matrix: pd.DataFrame, asset_index: int) -> float:
-        """Calcula la contribución de riesgo de un activo"""
+    def _calculate_risk_contributions(self, weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray:
+        """Calcula la contribución de riesgo de todos los activos"""
         try:
-            portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-            marginal_contrib = np.dot(cov_matrix.iloc[asset_index, :], weights)
-            risk_contrib = weights[asset_index] * marginal_contrib / portfolio_variance
-            return float(risk_contrib)
+            marginal_contrib = np.dot(cov_matrix, weights)
+            portfolio_variance = np.dot(weights, marginal_contrib)
+            if portfolio_variance <= 0:
+                return np.zeros(len(weights))
+            return weights * marginal_contrib / portfolio_variance
         except Exception as e:
             logger.error(f"Error calculando contribución de riesgo: {e}")
-            return 0.0
+            return np.zeros(len(weights))
     
     def get_optimization_history(self) -> List[Dict[str, Any]]:
         """Obtiene el historial de optimizaciones"""
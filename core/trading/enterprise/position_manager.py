@@ -10,7 +10,7 @@ Características principales:
 - Stop loss y take profit dinámicos
 - Trailing stops inteligentes
 - Risk management por posición
-- Monitoreo en tiempo real
+- Monitoreo en tiempo real dirigido por ticks de mercado
 - Integración con circuit breakers
 """
 
@@ -26,6 +26,7 @@ from enum import Enum
 
 # Imports del proyecto
 from .position import Position
+from .price_level_index import PriceLevelIndex, BELOW, ABOVE
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +48,14 @@ class ExitReason(Enum):
     SIGNAL_CHANGE = "signal_change"
     MARGIN_RISK = "margin_risk"
 
+# Prioridad al cruzar varios niveles en un mismo tick (menor = primero)
+EXIT_PRIORITY = {
+    ExitReason.STOP_LOSS: 0,
+    ExitReason.TRAILING_STOP: 0,
+    ExitReason.TAKE_PROFIT: 1,
+    ExitReason.MARGIN_RISK: 2,
+}
+
 @dataclass
 class PositionMetrics:
     """Métricas de una posición"""
@@ -104,6 +113,13 @@ class PositionManager:
         self.monitoring_active = False
         self.monitoring_task = None
         
+        # Índice de niveles de precio (SL/TP/riesgo/trailing) por símbolo.
+        # Los ticks de mercado (on_price_update) solo evalúan los niveles
+        # cruzados; el loop de monitoreo queda para condiciones temporales.
+        self.level_index = PriceLevelIndex()
+        self.trailing_active: set = set()
+        self.housekeeping_interval = 60  # segundos
+        
         # Métricas de performance
         self.total_trades = 0
         self.winning_trades = 0
@@ -135,7 +151,13 @@ class PositionManager:
         logger.info("🛑 Monitoreo de posiciones detenido")
     
     async def _monitoring_loop(self):
-        """Loop principal de monitoreo de posiciones"""
+        """
+        Loop de mantenimiento de posiciones.
+        
+        Las salidas por precio se disparan en on_price_update; este loop solo
+        cubre condiciones que no dependen de un tick (duración máxima,
+        volatilidad) y hace de red de seguridad si el índice quedó desfasado.
+        """
         while self.monitoring_active:
             try:
                 # Monitorear cada posición
@@ -146,7 +168,7 @@ class PositionManager:
                 await self._update_global_metrics()
                 
                 # Esperar antes del siguiente ciclo
-                await asyncio.sleep(5)  # Monitorear cada 5 segundos
+                await asyncio.sleep(self.housekeeping_interval)
                 
             except Exception as e:
                 logger.error(f"Error en monitoring loop: {e}")
@@ -160,32 +182,136 @@ class PositionManager:
             position: Posición a monitorear
         """
         try:
-            symbol = position.symbol
-            
-            # Actualizar precio actual (simulado)
-            # En un sistema real, esto vendría del exchange
-            price_change = np.random.normal(0, 0.001)  # 0.1% cambio promedio
-            position.current_price *= (1 + price_change)
-            
-            # Actualizar PnL
-            await self._update_position_pnl(position)
-            
-            # Verificar condiciones de salida
+            # Verificar condiciones de salida con el último precio recibido
             should_exit, reason = await self._check_exit_conditions(position)
             
             if should_exit:
                 await self._exit_position(position, reason)
                 return
             
-            # Actualizar trailing stop
-            await self._update_trailing_stop(position)
-            
             # Actualizar métricas de la posición
             await self._update_position_metrics(position)
             
         except Exception as e:
             logger.error(f"Error monitoreando posición {position.symbol}: {e}")
     
+    async def on_price_update(
+        self,
+        symbol: str,
+        price: float,
+        timestamp: Optional[datetime] = None
+    ) -> Optional[ExitReason]:
+        """
+        Procesa un tick de precio del stream de mercado
+        
+        Solo se evalúan los niveles cruzados por el nuevo precio (búsqueda
+        binaria en el índice), y la salida se ejecuta en el mismo tick.
+        
+        Args:
+            symbol: Símbolo del tick
+            price: Último precio
+            timestamp: Momento del tick
+            
+        Returns:
+            Razón de salida si la posición se cerró, None en caso contrario
+        """
+        position = self.positions.get(symbol)
+        if position is None:
+            return None
+        
+        try:
+            position.current_price = price
+            await self._update_position_pnl(position)
+            
+            crossed = self.level_index.pop_crossed(symbol, price)
+            exit_reasons = []
+            for level in crossed:
+                if level.kind == 'trailing_activation':
+                    self.trailing_active.add(symbol)
+                else:
+                    exit_reasons.append(level.payload)
+            
+            if exit_reasons:
+                reason = min(exit_reasons, key=lambda r: EXIT_PRIORITY.get(r, len(EXIT_PRIORITY)))
+                await self._exit_position(position, reason)
+                return reason
+            
+            if symbol in self.trailing_active:
+                await self._update_trailing_stop(position)
+            
+            await self._update_position_metrics(position)
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error procesando tick de {symbol}: {e}")
+            return None
+    
+    def _price_for_pnl_pct(self, position: Position, pnl_pct: float) -> float:
+        """Precio al que la posición alcanza un PnL porcentual (con leverage)"""
+        move = pnl_pct / (100 * (position.leverage or 1))
+        if position.side == 'long':
+            return position.entry_price * (1 + move)
+        return position.entry_price * (1 - move)
+    
+    def _index_stop_loss(self, position: Position, reason: ExitReason = ExitReason.STOP_LOSS):
+        """Registra el stop loss de la posición en el índice de niveles"""
+        direction = BELOW if position.side == 'long' else ABOVE
+        self.level_index.set_level(
+            position.symbol, position.symbol, 'stop_loss',
+            position.stop_loss or None, direction, reason
+        )
+    
+    def refresh_levels(self, symbol: str):
+        """
+        Reconstruye los niveles de precio de una posición
+        
+        Debe llamarse si stop_loss/take_profit se modifican desde fuera.
+        """
+        try:
+            position = self.positions.get(symbol)
+            self.level_index.remove_key(symbol, symbol)
+            if position is None:
+                self.trailing_active.discard(symbol)
+                return
+            
+            is_long = position.side == 'long'
+            loss_direction = BELOW if is_long else ABOVE
+            gain_direction = ABOVE if is_long else BELOW
+            
+            # Stop loss y take profit
+            self._index_stop_loss(position)
+            self.level_index.set_level(
+                symbol, symbol, 'take_profit',
+                position.take_profit or None, gain_direction, ExitReason.TAKE_PROFIT
+            )
+            
+            # Límites de riesgo expresados como precio: se indexa el más estricto
+            loss_limits = [
+                -self.risk_config.capital_management.max_drawdown_pct * 100
+            ]
+            risk_limits = self.risk_limits.get(symbol)
+            if risk_limits:
+                loss_limits.append(-risk_limits.max_loss_pct)
+                notional = position.entry_price * position.size
+                if notional > 0:
+                    loss_limits.append(-risk_limits.max_loss_usd / notional * 100)
+            risk_prices = [self._price_for_pnl_pct(position, pct) for pct in loss_limits]
+            risk_price = max(risk_prices) if is_long else min(risk_prices)
+            self.level_index.set_level(
+                symbol, symbol, 'risk_limit', risk_price, loss_direction, ExitReason.MARGIN_RISK
+            )
+            
+            # Activación del trailing stop
+            trailing_config = self.sl_tp_config.stop_loss.trailing_stop
+            if trailing_config.enabled and symbol not in self.trailing_active:
+                activation_price = self._price_for_pnl_pct(position, trailing_config.trigger_pct * 100)
+                self.level_index.set_level(
+                    symbol, symbol, 'trailing_activation', activation_price, gain_direction
+                )
+            
+        except Exception as e:
+            logger.error(f"Error indexando niveles de {symbol}: {e}")
+    
     async def _update_position_pnl(self, position: Position):
         """Actualiza el PnL de una posición"""
         try:
@@ -240,7 +366,7 @@ class PositionManager:
                     return True, ExitReason.MARGIN_RISK
                 
                 # Duración máxima
-                if position.duration_hours > risk_limits.max_drawdown_pct:
+                if position.duration_hours > risk_limits.max_duration_hours:
                     return True, ExitReason.TIME_LIMIT
             
             # 4. Verificar drawdown máximo
@@ -288,12 +414,16 @@ class PositionManager:
             # Calcular nuevo stop loss
             if position.side == 'long':
                 new_stop_loss = position.current_price * (1 - trailing_config.trail_distance_pct)
-                if not position.stop_loss or new_stop_loss > position.stop_loss:
-                    position.stop_loss = new_stop_loss
+                moved = not position.stop_loss or new_stop_loss > position.stop_loss
             else:  # short
                 new_stop_loss = position.current_price * (1 + trailing_config.trail_distance_pct)
-                if not position.stop_loss or new_stop_loss < position.stop_loss:
-                    position.stop_loss = new_stop_loss
+                moved = not position.stop_loss or new_stop_loss < position.stop_loss
+            
+            if not moved:
+                return
+            
+            position.stop_loss = new_stop_loss
+            self._index_stop_loss(position, ExitReason.TRAILING_STOP)
             
             logger.debug(f"Trailing stop actualizado para {symbol}: {position.stop_loss:.4f}")
             
@@ -404,6 +534,7 @@ class PositionManager:
             
             # Agregar posición
             self.positions[symbol] = position
+            self.refresh_levels(symbol)
             
             # Inicializar métricas
             await self._update_position_metrics(position)
@@ -564,6 +695,10 @@ class PositionManager:
             if symbol in self.risk_limits:
                 del self.risk_limits[symbol]
             
+            # Remover niveles de precio
+            self.level_index.remove_key(symbol, symbol)
+            self.trailing_active.discard(symbol)
+            
             logger.info(
                 f"🔒 Posición cerrada: {symbol} {position.side} "
                 f"PnL: ${final_pnl:.2f} ({position.unrealized_pnl_pct:.2f}%) "
@@ -0,0 +1,187 @@
+# Ruta: core/trading/enterprise/price_level_index.py
+"""
+Índice de niveles de precio
+===========================
+
+Estructura ordenada de niveles de precio (stop loss, take profit, límites de
+riesgo y activación de trailing stops) por símbolo. Permite que cada tick
+evalúe únicamente los niveles que cruza, con búsqueda binaria O(log n),
+en lugar de recorrer todas las posiciones.
+
+Cada nivel tiene una dirección:
+- ``below``: se dispara cuando el precio cae hasta o por debajo del nivel
+  (stop loss de un long, take profit de un short)
+- ``above``: se dispara cuando el precio sube hasta o por encima del nivel
+  (take profit de un long, stop loss de un short)
+"""
+
+import bisect
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+BELOW = "below"
+ABOVE = "above"
+
+
+@dataclass(order=True)
+class PriceLevel:
+    """Nivel de precio registrado en el índice"""
+    price: float
+    seq: int
+    key: str = field(compare=False)
+    kind: str = field(compare=False)
+    direction: str = field(compare=False)
+    payload: Any = field(default=None, compare=False)
+
+
+class _SymbolLevels:
+    """Niveles ordenados de un único símbolo"""
+
+    def __init__(self):
+        # Ascendentes por precio; los cruces de ``below`` están al final
+        # y los de ``above`` al principio.
+        self.below: List[Tuple[float, int]] = []
+        self.above: List[Tuple[float, int]] = []
+        self.levels: Dict[int, PriceLevel] = {}
+
+    def insert(self, level: PriceLevel):
+        side = self.below if level.direction == BELOW else self.above
+        bisect.insort(side, (level.price, level.seq))
+        self.levels[level.seq] = level
+
+    def remove(self, level: PriceLevel):
+        side = self.below if level.direction == BELOW else self.above
+        idx = bisect.bisect_left(side, (level.price, level.seq))
+        if idx < len(side) and side[idx] == (level.price, level.seq):
+            del side[idx]
+        self.levels.pop(level.seq, None)
+
+    def pop_crossed(self, price: float) -> List[PriceLevel]:
+        crossed: List[PriceLevel] = []
+
+        # below: todos los niveles >= precio
+        idx = bisect.bisect_left(self.below, (price, -1))
+        if idx < len(self.below):
+            for _, seq in self.below[idx:]:
+                crossed.append(self.levels.pop(seq))
+            del self.below[idx:]
+
+        # above: todos los niveles <= precio
+        idx = bisect.bisect_right(self.above, (price, float('inf')))
+        if idx > 0:
+            for _, seq in self.above[:idx]:
+                crossed.append(self.levels.pop(seq))
+            del self.above[:idx]
+
+        return crossed
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class PriceLevelIndex:
+    """
+    Índice de niveles de precio por símbolo.
+
+    Los niveles se identifican por ``(symbol, key, kind)``: registrar de nuevo
+    la misma combinación reemplaza el nivel anterior, lo que permite mover
+    un trailing stop con una eliminación y una inserción.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[str, _SymbolLevels] = {}
+        self._by_id: Dict[Tuple[str, str, str], PriceLevel] = {}
+        self._seq = itertools.count()
+
+    def set_level(
+        self,
+        symbol: str,
+        key: str,
+        kind: str,
+        price: Optional[float],
+        direction: str,
+        payload: Any = None
+    ) -> Optional[PriceLevel]:
+        """
+        Registra (o reemplaza) un nivel de precio
+
+        Args:
+            symbol: Símbolo del nivel
+            key: Identificador del propietario (p.ej. id de posición)
+            kind: Tipo de nivel (stop_loss, take_profit, ...)
+            price: Precio del nivel; None elimina el nivel
+            direction: ``below`` o ``above``
+            payload: Datos asociados devueltos al dispararse
+
+        Returns:
+            Nivel registrado o None si se eliminó
+        """
+        if direction not in (BELOW, ABOVE):
+            raise ValueError(f"Dirección de nivel inválida: {direction}")
+
+        self.remove_level(symbol, key, kind)
+        if price is None:
+            return None
+
+        level = PriceLevel(
+            price=float(price),
+            seq=next(self._seq),
+            key=key,
+            kind=kind,
+            direction=direction,
+            payload=payload
+        )
+        self._symbols.setdefault(symbol, _SymbolLevels()).insert(level)
+        self._by_id[(symbol, key, kind)] = level
+        return level
+
+    def get_level(self, symbol: str, key: str, kind: str) -> Optional[PriceLevel]:
+        """Obtiene un nivel registrado"""
+        return self._by_id.get((symbol, key, kind))
+
+    def remove_level(self, symbol: str, key: str, kind: str) -> bool:
+        """Elimina un nivel concreto"""
+        level = self._by_id.pop((symbol, key, kind), None)
+        if level is None:
+            return False
+        self._symbols[symbol].remove(level)
+        return True
+
+    def remove_key(self, symbol: str, key: str) -> int:
+        """Elimina todos los niveles de un propietario"""
+        levels = self._symbols.get(symbol)
+        if not levels:
+            return 0
+
+        kinds = [level.kind for level in levels.levels.values() if level.key == key]
+        for kind in kinds:
+            self.remove_level(symbol, key, kind)
+        return len(kinds)
+
+    def pop_crossed(self, symbol: str, price: float) -> List[PriceLevel]:
+        """
+        Extrae los niveles cruzados por un nuevo precio
+
+        Args:
+            symbol: Símbolo del tick
+            price: Último precio
+
+        Returns:
+            Niveles disparados (ya eliminados del índice)
+        """
+        levels = self._symbols.get(symbol)
+        if not levels:
+            return []
+
+        crossed = levels.pop_crossed(price)
+        for level in crossed:
+            self._by_id.pop((symbol, level.key, level.kind), None)
+        return crossed
+
+    def symbols(self) -> List[str]:
+        """Símbolos con niveles registrados"""
+        return [symbol for symbol, levels in self._symbols.items() if len(levels)]
+
+    def __len__(self) -> int:
+        return len(self._by_id)
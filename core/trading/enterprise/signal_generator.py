@@ -33,6 +33,7 @@ import joblib
 
 # Imports del proyecto
 from .trading_signal import TradingSignal, SignalType, SignalStrength
+from core.integration.latency_tracing import latency_tracer, traced
 
 logger = logging.getLogger(__name__)
 
@@ -279,6 +280,7 @@ class MLSignalGenerator:
         self.inference_worker = threading.Thread(target=inference_worker, daemon=True)
         self.inference_worker.start()
     
+    @traced('signal_generation', root=True)
     async def generate_signal(
         self,
         symbol: str,
@@ -319,6 +321,11 @@ class MLSignalGenerator:
             # Convertir a señal de trading
             signal = self._predictions_to_signal(symbol, predictions)
             
+            # La ejecución continúa la misma traza de latencia
+            trace_id = latency_tracer.current_trace_id()
+            if signal is not None and trace_id:
+                signal.metadata = {**(signal.metadata or {}), 'trace_id': trace_id}
+            
             return signal
             
         except Exception as e:
@@ -380,6 +387,7 @@ class MLSignalGenerator:
             logger.error(f"Error extrayendo features para {symbol}: {e}")
             return None
     
+    @traced('indicators')
     def calculate_technical_features(self, df: pd.DataFrame) -> np.ndarray:
         """
         Calcula features técnicos de un DataFrame de precios
@@ -520,6 +528,7 @@ class MLSignalGenerator:
         except:
             return np.full(len(close), 0.0)
     
+    @traced('data_fetch')
     async def get_historical_data(self, symbol: str, lookback_periods: int = 100) -> Optional[List[Dict]]:
         """
         Obtiene datos históricos para un símbolo
@@ -554,6 +563,7 @@ class MLSignalGenerator:
             logger.error(f"Error obteniendo datos históricos para {symbol}: {e}")
             return None
     
+    @traced('inference')
     async def _generate_predictions(
         self,
         symbol: str,
@@ -33,6 +33,7 @@ from core.trading.risk_manager import risk_manager
 from core.trading.enterprise.leverage_calculator import LeverageCalculator
 from core.trading.enterprise.market_analyzer import MarketAnalyzer, MarketCondition
 from core.sync.metrics_aggregator import metrics_aggregator
+from core.integration.service_registry import lazy_service
 
 logger = logging.getLogger(__name__)
 
@@ -579,4 +580,4 @@ class StrategyManager:
             logger.error(f"Error limpiando StrategyManager: {e}")
 
 # Instancia global
-strategy_manager = StrategyManager()
+strategy_manager = lazy_service('strategy_manager', StrategyManager)
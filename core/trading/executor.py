@@ -30,6 +30,8 @@ from .order_manager import order_manager, TradeRecord
 from .bitget_client import bitget_client
 from .signal_processor import signal_processor
 from .portfolio_optimizer import portfolio_optimizer
+from core.integration.service_registry import lazy_service
+from core.integration.latency_tracing import latency_tracer, traced
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +68,7 @@ class TradingExecutor:
         self.cooldown_minutes = self.trading_config.get('cooldown_between_trades', 30)
         self.max_daily_trades = self.trading_config.get('max_daily_trades', 20)
         self.max_positions = self.trading_config.get('max_concurrent_positions', 3)
+        self.cycle_max_concurrency = self.trading_config.get('cycle_max_concurrency', 8)
         
         # Métricas de performance
         self.metrics = {
@@ -76,6 +79,8 @@ class TradingExecutor:
             'average_confidence': 0.0,
             'prediction_accuracy': 0.0,
             'execution_latency_ms': 0.0,
+            'portfolio_cycle_latency_ms': 0.0,
+            'portfolio_stage_latency_ms': {},
             'daily_pnl': 0.0,
             'current_positions': 0,
             'win_rate': 0.0,
@@ -88,6 +93,7 @@ class TradingExecutor:
         
         logger.info("TradingExecutor inicializado")
     
+    @traced('decision', root=True)
     async def execute_trading_cycle(self, symbol: str) -> Dict[str, Any]:
         """
         Ciclo principal de trading para un símbolo
@@ -141,7 +147,8 @@ class TradingExecutor:
             cycle_result['actions_taken'].append('ml_prediction_processed')
             
             # 3. Evaluar señales de salida para posiciones existentes
-            exit_results = await self.evaluate_exit_signals(symbol)
+            positions_before = dict(self.active_positions)
+            exit_results = await self.evaluate_exit_signals(symbol, prediction=prediction_result)
             if exit_results:
                 cycle_result['exit_trades'] = exit_results
                 cycle_result['actions_taken'].append(f'exit_signals_evaluated_{len(exit_results)}')
@@ -164,7 +171,7 @@ class TradingExecutor:
             
             # 7. Retroalimentar al modelo si hay trades cerrados
             if exit_results:
-                await self._update_model_feedback(exit_results)
+                await self._update_model_feedback(exit_results, positions_before)
             
             cycle_result['execution_time_ms'] = (time.time() - cycle_start_time) * 1000
             self.metrics['total_cycles_executed'] += 1
@@ -179,6 +186,191 @@ class TradingExecutor:
             cycle_result['execution_time_ms'] = (time.time() - cycle_start_time) * 1000
             return cycle_result
     
+    async def execute_portfolio_cycle(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Ciclo de trading a nivel de portfolio para varios símbolos
+        
+        Flujo:
+        1. Verificaciones globales (una vez por ciclo)
+        2. Fan-out concurrente por símbolo: predicción ML + precio actual
+        3. Fan-out concurrente de salidas con los datos ya obtenidos
+        4. Central: filtrado de entradas, ranking y asignación de capital
+        5. Métricas y feedback al modelo en un único lote
+        
+        La I/O por símbolo se lanza con asyncio.gather bajo un semáforo
+        (cycle_max_concurrency), por lo que el tiempo del ciclo queda acotado
+        por el símbolo más lento y no por la suma. Las entradas se deciden de
+        forma secuencial para que riesgo y capital se asignen sobre un estado
+        consistente del portfolio.
+        
+        Args:
+            symbols: Símbolos a procesar
+            
+        Returns:
+            Dict con resultados por símbolo y latencia por etapa
+        """
+        cycle_start_time = time.perf_counter()
+        stage_timings: Dict[str, float] = {}
+        cycle_result = {
+            'symbols': list(symbols),
+            'timestamp': datetime.now().isoformat(),
+            'status': 'completed',
+            'results': {},
+            'errors': [],
+            'stage_timings_ms': stage_timings,
+            'symbol_fetch_ms': {},
+            'execution_time_ms': 0
+        }
+        
+        def mark(stage: str, started: float) -> float:
+            now = time.perf_counter()
+            stage_timings[stage] = (now - started) * 1000
+            return now
+        
+        try:
+            logger.info(f"🔄 Iniciando ciclo de portfolio para {len(symbols)} símbolos")
+            stage_start = time.perf_counter()
+            
+            # 1. Verificaciones globales
+            await self._reset_daily_counters_if_needed()
+            tradeable = await self._filter_tradeable_symbols(symbols)
+            for symbol in symbols:
+                cycle_result['results'][symbol] = {
+                    'symbol': symbol,
+                    'status': 'completed' if symbol in tradeable else 'skipped',
+                    'actions_taken': [] if symbol in tradeable else ['symbol_trading_disabled'],
+                    'errors': []
+                }
+            stage_start = mark('checks', stage_start)
+            
+            # 2. Fan-out: predicción + precio por símbolo
+            semaphore = asyncio.Semaphore(max(1, self.cycle_max_concurrency))
+            inputs = await asyncio.gather(
+                *(self._fetch_symbol_inputs(symbol, semaphore) for symbol in tradeable)
+            )
+            inputs_by_symbol = {}
+            for symbol, (prediction, current_price, elapsed_ms) in zip(tradeable, inputs):
+                result = cycle_result['results'][symbol]
+                cycle_result['symbol_fetch_ms'][symbol] = elapsed_ms
+                if not prediction or prediction.get('error'):
+                    result['status'] = 'failed'
+                    result['errors'].append(f"Error en predicción ML: {(prediction or {}).get('error', 'Unknown')}")
+                    continue
+                result['prediction'] = prediction
+                result['actions_taken'].append('ml_prediction_processed')
+                inputs_by_symbol[symbol] = (prediction, current_price)
+            # Precios del ciclo al motor de riesgo: el sizing lee su VaR/CVaR cacheado
+            risk_manager.update_market_prices({
+                symbol: current_price for symbol, (_, current_price) in inputs_by_symbol.items() if current_price
+            })
+            stage_start = mark('fetch', stage_start)
+            
+            # 3. Fan-out: salidas con los datos ya obtenidos
+            positions_before = dict(self.active_positions)
+            exit_symbols = [symbol for symbol in inputs_by_symbol if symbol in self.active_positions]
+            
+            async def run_exit(symbol: str) -> List[Dict[str, Any]]:
+                prediction, current_price = inputs_by_symbol[symbol]
+                async with semaphore:
+                    return await self.evaluate_exit_signals(
+                        symbol, prediction=prediction, current_price=current_price
+                    )
+            
+            exit_lists = await asyncio.gather(*(run_exit(symbol) for symbol in exit_symbols))
+            all_exits = []
+            for symbol, exit_results in zip(exit_symbols, exit_lists):
+                if exit_results:
+                    result = cycle_result['results'][symbol]
+                    result['exit_trades'] = exit_results
+                    result['actions_taken'].append(f'exit_signals_evaluated_{len(exit_results)}')
+                    all_exits.extend(exit_results)
+            stage_start = mark('exits', stage_start)
+            
+            # 4. Central: entradas ordenadas por calidad, asignación secuencial
+            candidates = sorted(
+                inputs_by_symbol.items(),
+                key=lambda item: item[1][0].get('confidence', 0.0) * item[1][0].get('quality_score', 0.0),
+                reverse=True
+            )
+            for symbol, (prediction, current_price) in candidates:
+                result = cycle_result['results'][symbol]
+                if await self.evaluate_entry_signal(prediction, symbol):
+                    trade_result = await self.execute_trade_decision(
+                        symbol, prediction, current_price=current_price
+                    )
+                    if trade_result:
+                        result['entry_trade'] = trade_result
+                        result['actions_taken'].append('entry_trade_executed')
+                    else:
+                        result['actions_taken'].append('entry_trade_failed')
+                else:
+                    result['actions_taken'].append('entry_signal_rejected')
+            stage_start = mark('allocation', stage_start)
+            
+            # 5. Métricas y feedback al modelo en un único lote
+            for result in cycle_result['results'].values():
+                await self._update_metrics(result)
+            if all_exits:
+                await self._update_model_feedback(all_exits, positions_before)
+            mark('feedback', stage_start)
+            
+            self.metrics['total_cycles_executed'] += 1
+            
+        except Exception as e:
+            logger.error(f"❌ Error en ciclo de portfolio: {e}")
+            cycle_result['status'] = 'error'
+            cycle_result['errors'].append(str(e))
+        
+        cycle_result['execution_time_ms'] = (time.perf_counter() - cycle_start_time) * 1000
+        self.metrics['portfolio_cycle_latency_ms'] = cycle_result['execution_time_ms']
+        self.metrics['portfolio_stage_latency_ms'] = dict(stage_timings)
+        
+        logger.info(
+            f"✅ Ciclo de portfolio completado en {cycle_result['execution_time_ms']:.1f}ms "
+            f"({', '.join(f'{stage}={ms:.1f}ms' for stage, ms in stage_timings.items())})"
+        )
+        return cycle_result
+    
+    async def _filter_tradeable_symbols(self, symbols: List[str]) -> List[str]:
+        """Equivalente a _can_trade_symbol con un único health check del exchange"""
+        try:
+            allowed_symbols = self.trading_config.get('allowed_symbols', ['BTCUSDT'])
+            candidates = [symbol for symbol in symbols if symbol in allowed_symbols]
+            if not candidates or not self.is_running:
+                return []
+            
+            health = await bitget_client.health_check()
+            if health.get('status') != 'healthy':
+                return []
+            
+            return candidates
+            
+        except Exception as e:
+            logger.error(f"Error verificando símbolos operables: {e}")
+            return []
+    
+    async def _fetch_symbol_inputs(
+        self,
+        symbol: str,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[Dict[str, Any], Optional[float], float]:
+        """Obtiene predicción y precio actual de un símbolo"""
+        started = time.perf_counter()
+        # Una traza de latencia por decisión; execute_trade_decision la continúa
+        with latency_tracer.trace('decision', 'TradingExecutor', symbol=symbol):
+            async with semaphore:
+                try:
+                    # La lectura de precio es síncrona (sqlite): se ejecuta en un hilo
+                    prediction, market_data = await asyncio.gather(
+                        self.process_ml_prediction(symbol),
+                        asyncio.to_thread(db_manager.get_recent_market_data, symbol, timeframe="1m", limit=1)
+                    )
+                    current_price = market_data[0].get('close') if market_data else None
+                except Exception as e:
+                    logger.error(f"Error obteniendo datos de {symbol}: {e}")
+                    prediction, current_price = {'error': str(e)}, None
+        return prediction, current_price, (time.perf_counter() - started) * 1000
+    
     async def process_ml_prediction(self, symbol: str) -> Dict[str, Any]:
         """
         Procesar predicción completa del modelo ML usando signal_processor
@@ -227,7 +419,8 @@ class TradingExecutor:
                 'timeframe_alignment': signal_quality.timeframe_alignment,
                 'timeframe_confidence': signal_quality.timeframe_confidence,
                 'filtering_applied': signal_quality.filtering_applied,
-                'rejection_reasons': signal_quality.rejection_reasons
+                'rejection_reasons': signal_quality.rejection_reasons,
+                'trace_id': latency_tracer.current_trace_id()
             }
             
             # Actualizar métricas
@@ -326,12 +519,19 @@ class TradingExecutor:
             logger.error(f"❌ Error evaluando señal de entrada para {symbol}: {e}")
             return False
     
-    async def evaluate_exit_signals(self, symbol: str) -> List[Dict[str, Any]]:
+    async def evaluate_exit_signals(
+        self,
+        symbol: str,
+        prediction: Optional[Dict] = None,
+        current_price: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
         """
         Evaluar si cerrar posiciones existentes
         
         Args:
             symbol: Símbolo a evaluar
+            prediction: Predicción ya calculada en el ciclo (evita recalcularla)
+            current_price: Precio ya obtenido en el ciclo (evita otra consulta)
             
         Returns:
             Lista de trades cerrados
@@ -344,7 +544,8 @@ class TradingExecutor:
             exit_results = []
             
             # 1. Verificar stop-loss y take-profit
-            current_price = await self._get_current_price(symbol)
+            if current_price is None:
+                current_price = await self._get_current_price(symbol)
             if current_price:
                 sl_exit = await self._check_stop_loss_take_profit(trade, current_price)
                 if sl_exit:
@@ -352,7 +553,8 @@ class TradingExecutor:
                     return exit_results
             
             # 2. Verificar señales contrarias del modelo
-            prediction = await self.process_ml_prediction(symbol)
+            if prediction is None:
+                prediction = await self.process_ml_prediction(symbol)
             if prediction and not prediction.get('error'):
                 opposite_signal = await self._check_opposite_signal(trade, prediction)
                 if opposite_signal:
@@ -377,67 +579,77 @@ class TradingExecutor:
             logger.error(f"❌ Error evaluando señales de salida para {symbol}: {e}")
             return []
     
-    async def execute_trade_decision(self, symbol: str, decision: Dict) -> Optional[TradeRecord]:
+    async def execute_trade_decision(
+        self,
+        symbol: str,
+        decision: Dict,
+        current_price: Optional[float] = None
+    ) -> Optional[TradeRecord]:
         """
         Ejecutar decisión de trade
         
         Args:
             symbol: Símbolo a operar
             decision: Decisión de trading con predicción
+            current_price: Precio ya obtenido en el ciclo (opcional)
             
         Returns:
             TradeRecord si se ejecutó exitosamente, None en caso contrario
         """
-        try:
-            logger.info(f"⚡ Ejecutando decisión de trade para {symbol}: {decision['action']}")
-            
-            # 1. Obtener precio actual
-            current_price = await self._get_current_price(symbol)
-            if not current_price:
-                logger.error(f"❌ No se pudo obtener precio actual para {symbol}")
-                return None
-            
-            # 2. Calcular position sizing
-            risk_decision = await risk_manager.calculate_position_size(
-                symbol=symbol,
-                signal=decision['action'],
-                confidence=decision['confidence'],
-                expected_return=decision['expected_return'],
-                current_price=current_price
-            )
-            
-            if not risk_decision:
-                logger.warning(f"⚠️ Risk manager rechazó trade para {symbol}")
-                return None
-            
-            # 3. Ejecutar orden
-            trade_result = await order_manager.execute_order(
-                symbol=symbol,
-                signal=decision['action'],
-                risk_decision=risk_decision,
-                current_price=current_price,
-                confidence=decision['confidence']
-            )
-            
-            if trade_result:
-                # 4. Registrar trade activo
-                self.active_positions[symbol] = trade_result
-                self.last_trade_time[symbol] = datetime.now()
-                self.daily_trade_count[symbol] += 1
+        # Continúa la traza de la predicción (ciclo de portfolio) o abre una nueva
+        trace_id = decision.get('trace_id')
+        with latency_tracer.trace('trade_decision', 'TradingExecutor', trace_id=trace_id, symbol=symbol):
+            try:
+                logger.info(f"⚡ Ejecutando decisión de trade para {symbol}: {decision['action']}")
                 
-                # 5. Actualizar métricas
-                self.metrics['trades_executed'] += 1
-                self.metrics['current_positions'] = len(self.active_positions)
+                # 1. Obtener precio actual
+                if not current_price:
+                    current_price = await self._get_current_price(symbol)
+                if not current_price:
+                    logger.error(f"❌ No se pudo obtener precio actual para {symbol}")
+                    return None
                 
-                logger.info(f"✅ Trade ejecutado: {symbol} {decision['action']} - {trade_result.trade_id}")
-                return trade_result
-            else:
-                logger.warning(f"⚠️ Fallo en ejecución de orden para {symbol}")
-                return None
+                # 2. Calcular position sizing
+                risk_decision = await risk_manager.calculate_position_size(
+                    symbol=symbol,
+                    signal=decision['action'],
+                    confidence=decision['confidence'],
+                    expected_return=decision['expected_return'],
+                    current_price=current_price
+                )
                 
-        except Exception as e:
-            logger.error(f"❌ Error ejecutando decisión de trade para {symbol}: {e}")
-            return None
+                if not risk_decision:
+                    logger.warning(f"⚠️ Risk manager rechazó trade para {symbol}")
+                    return None
+                
+                # 3. Ejecutar orden
+                trade_result = await order_manager.execute_order(
+                    symbol=symbol,
+                    signal=decision['action'],
+                    risk_decision=risk_decision,
+                    current_price=current_price,
+                    confidence=decision['confidence']
+                )
+                
+                if trade_result:
+                    # 4. Registrar trade activo
+                    self.active_positions[symbol] = trade_result
+                    self.last_trade_time[symbol] = datetime.now()
+                    self.daily_trade_count[symbol] += 1
+                    
+                    # 5. Actualizar métricas
+                    self.metrics['trades_executed'] += 1
+                    self.metrics['current_positions'] = len(self.active_positions)
+                    
+                    logger.info(f"✅ Trade ejecutado: {symbol} {decision['action']} - {trade_result.trade_id}")
+                    return trade_result
+                else:
+                    logger.warning(f"⚠️ Fallo en ejecución de orden para {symbol}")
+                    return None
+                    
+            except Exception as e:
+                logger.error(f"❌ Error ejecutando decisión de trade para {symbol}: {e}")
+                return None
     
     async def update_model_feedback(self, trade_records: List[TradeRecord]) -> None:
         """
@@ -754,20 +966,29 @@ class TradingExecutor:
         except Exception as e:
             logger.error(f"Error actualizando métricas: {e}")
     
-    async def _update_model_feedback(self, exit_results: List[Dict]):
-        """Actualizar feedback del modelo con trades cerrados"""
+    async def _update_model_feedback(
+        self,
+        exit_results: List[Dict],
+        positions: Optional[Dict[str, TradeRecord]] = None
+    ):
+        """
+        Actualizar feedback del modelo con trades cerrados
+        
+        Args:
+            exit_results: Resultados de salida del ciclo
+            positions: Posiciones previas a las salidas (las cerradas ya no
+                están en active_positions)
+        """
         try:
             if not exit_results:
                 return
             
             # Convertir a TradeRecord para feedback
-            trade_records = []
-            for result in exit_results:
-                # Buscar el trade original
-                for symbol, trade in self.active_positions.items():
-                    if trade.trade_id == result['trade_id']:
-                        trade_records.append(trade)
-                        break
+            positions = positions if positions is not None else self.active_positions
+            closed_ids = {result['trade_id'] for result in exit_results if result}
+            trade_records = [
+                trade for trade in positions.values() if trade.trade_id in closed_ids
+            ]
             
             if trade_records:
                 await self.update_model_feedback(trade_records)
@@ -1015,13 +1236,17 @@ class TradingExecutor:
             }
 
 # Instancia global del ejecutor de trading
-trading_executor = TradingExecutor()
+trading_executor = lazy_service('trading_executor', TradingExecutor)
 
 # Funciones de conveniencia
 async def execute_trading_cycle(symbol: str) -> Dict[str, Any]:
     """Función de conveniencia para ejecutar ciclo de trading"""
     return await trading_executor.execute_trading_cycle(symbol)
 
+async def execute_portfolio_cycle(symbols: List[str]) -> Dict[str, Any]:
+    """Función de conveniencia para ejecutar ciclo de portfolio multi-símbolo"""
+    return await trading_executor.execute_portfolio_cycle(symbols)
+
 async def start_trading():
     """Función de conveniencia para iniciar trading"""
     await trading_executor.start_trading()
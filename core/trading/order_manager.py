@@ -23,6 +23,8 @@ import os
 from core.config.config_loader import ConfigLoader
 from core.data.database import db_manager
 from .risk_manager import RiskDecision
+from core.integration.service_registry import lazy_service
+from core.integration.latency_tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +106,7 @@ class OrderManager:
             logger.error(f"Error inicializando cliente Bitget: {e}")
             self.bitget_client = None
     
+    @traced('order_submit')
     async def execute_order(
         self,
         symbol: str,
@@ -501,4 +504,4 @@ class OrderManager:
             return None
 
 # Instancia global
-order_manager = OrderManager()
+order_manager = lazy_service('order_manager', OrderManager)
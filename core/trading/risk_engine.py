@@ -0,0 +1,353 @@
+# Ruta: core/trading/risk_engine.py
+"""
+trading/risk_engine.py
+Motor vectorizado de riesgo de portafolio (VaR/CVaR/stress)
+
+- Matriz de retornos rolling (tiempo x símbolo) en ring buffer, actualizada por barra
+- Covarianza incremental a partir de sumas y productos cruzados acumulados
+- VaR/CVaR histórico, paramétrico y Monte Carlo como operaciones matriciales
+- Stress test de múltiples escenarios en una sola multiplicación matriz-vector
+- Estado de riesgo cacheado por versión para consultas de sizing sin recomputar
+"""
+
+import logging
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioRiskEngine:
+    """Motor de riesgo sobre una ventana rolling de retornos por símbolo"""
+
+    def __init__(self, window: int = 720, mc_simulations: int = 10000, seed: Optional[int] = None):
+        """
+        Args:
+            window: Número de barras de la ventana rolling (720 = 30 días de 1h)
+            mc_simulations: Simulaciones por defecto del VaR Monte Carlo
+            seed: Semilla del generador aleatorio (reproducibilidad)
+        """
+        self.window = int(window)
+        self.mc_simulations = int(mc_simulations)
+        self._rng = np.random.default_rng(seed)
+
+        self.symbols: List[str] = []
+        self._col: Dict[str, int] = {}
+
+        # Ring buffer de retornos y timestamps (epoch s)
+        self._returns = np.zeros((self.window, 0))
+        self._timestamps = np.zeros(self.window, dtype=np.int64)
+        self._count = 0
+        self._head = 0
+        self._last_prices = np.zeros(0)
+
+        # Momentos acumulados de la ventana
+        self._sum = np.zeros(0)
+        self._sum_outer = np.zeros((0, 0))
+        self._updates_since_rebuild = 0
+
+        # Cachés invalidadas en cada actualización
+        self.version = 0
+        self._cov: Optional[np.ndarray] = None
+        self._chol: Optional[np.ndarray] = None
+        self._state_cache: Dict[float, Dict] = {}
+
+    # ----------------------------- Carga / actualización -----------------------------
+
+    @property
+    def n_observations(self) -> int:
+        return self._count
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp de la barra más reciente de la ventana (None si vacía)"""
+        if self._count == 0:
+            return None
+        return int(self._timestamps[(self._head - 1) % self.window])
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._col
+
+    def _ordered_index(self) -> np.ndarray:
+        """Índices de filas válidas en orden temporal"""
+        if self._count < self.window:
+            return np.arange(self._count)
+        return (self._head + np.arange(self.window)) % self.window
+
+    def add_symbol(self, symbol: str, timestamps: Sequence[int], closes: Sequence[float]):
+        """
+        Añade (o reemplaza) la historia de cierres de un símbolo
+
+        La primera serie cargada define el eje temporal; las siguientes se
+        alinean por timestamp y las barras sin dato cuentan como retorno 0.
+
+        Args:
+            symbol: Símbolo a añadir
+            timestamps: Timestamps epoch ordenados ascendentemente
+            closes: Precios de cierre
+        """
+        ts = np.asarray(timestamps, dtype=np.int64)
+        px = np.asarray(closes, dtype=float)
+        if len(ts) < 2 or len(ts) != len(px):
+            logger.warning(f"[RISK] Historia insuficiente para {symbol}")
+            return
+
+        order = np.argsort(ts, kind="stable")
+        ts, px = ts[order], px[order]
+        valid = px > 0
+        ts, px = ts[valid], px[valid]
+        if len(ts) < 2:
+            return
+        rets = px[1:] / px[:-1] - 1.0
+        ret_ts = ts[1:]
+
+        if symbol not in self._col:
+            self._col[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self._returns = np.hstack([self._returns, np.zeros((self.window, 1))])
+            self._last_prices = np.append(self._last_prices, 0.0)
+        col = self._col[symbol]
+
+        if self._count == 0:
+            # Primer símbolo: define las filas de la ventana
+            n = min(len(rets), self.window)
+            self._returns[:n, col] = rets[-n:]
+            self._timestamps[:n] = ret_ts[-n:]
+            self._count = n
+            self._head = n % self.window
+        else:
+            idx = self._ordered_index()
+            row_ts = self._timestamps[idx]
+            pos = np.clip(np.searchsorted(ret_ts, row_ts), 0, len(ret_ts) - 1)
+            match = ret_ts[pos] == row_ts
+            column = np.zeros(self.window)
+            column[idx[match]] = rets[pos[match]]
+            self._returns[:, col] = column
+
+        self._last_prices[col] = px[-1]
+        self._rebuild_moments()
+
+    def update_bar(self, timestamp: int, prices: Dict[str, float]):
+        """
+        Incorpora una nueva barra de precios (O(n²) en símbolos, O(1) en ventana)
+
+        Args:
+            timestamp: Timestamp epoch de la barra
+            prices: Último precio por símbolo; los ausentes cuentan como retorno 0
+        """
+        if not self.symbols:
+            return
+
+        new_prices = self._last_prices.copy()
+        for symbol, price in prices.items():
+            col = self._col.get(symbol)
+            if col is not None and price and price > 0:
+                new_prices[col] = float(price)
+
+        prev = self._last_prices
+        valid = prev > 0
+        row = np.where(valid, new_prices / np.where(valid, prev, 1.0) - 1.0, 0.0)
+
+        if self._count == self.window:
+            evicted = self._returns[self._head]
+            self._sum -= evicted
+            self._sum_outer -= np.outer(evicted, evicted)
+        else:
+            self._count += 1
+
+        self._returns[self._head] = row
+        self._timestamps[self._head] = int(timestamp)
+        self._sum += row
+        self._sum_outer += np.outer(row, row)
+        self._head = (self._head + 1) % self.window
+        self._last_prices = new_prices
+
+        # Recalcular desde cero periódicamente para acotar el error de redondeo
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= self.window:
+            self._rebuild_moments()
+        else:
+            self._invalidate()
+
+    def _rebuild_moments(self):
+        rows = self._returns[:self._count]
+        self._sum = rows.sum(axis=0)
+        self._sum_outer = rows.T @ rows
+        self._updates_since_rebuild = 0
+        self._invalidate()
+
+    def _invalidate(self):
+        self.version += 1
+        self._cov = None
+        self._chol = None
+        self._state_cache.clear()
+
+    # ----------------------------- Estadísticos -----------------------------
+
+    def mean_returns(self) -> np.ndarray:
+        if self._count == 0:
+            return np.zeros(len(self.symbols))
+        return self._sum / self._count
+
+    def covariance(self) -> np.ndarray:
+        """Matriz de covarianza de la ventana (cacheada por versión)"""
+        if self._cov is None:
+            m = self._count
+            n = len(self.symbols)
+            if m < 2:
+                self._cov = np.zeros((n, n))
+            else:
+                mean = self._sum / m
+                self._cov = (self._sum_outer - m * np.outer(mean, mean)) / (m - 1)
+        return self._cov
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        denom = np.outer(std, std)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.where(denom > 0, cov / denom, 0.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def _cholesky(self) -> np.ndarray:
+        if self._chol is None:
+            cov = self.covariance()
+            jitter = 1e-12 * max(float(np.trace(cov)), 1.0)
+            eye = np.eye(len(cov))
+            for _ in range(6):
+                try:
+                    self._chol = np.linalg.cholesky(cov + jitter * eye)
+                    break
+                except np.linalg.LinAlgError:
+                    jitter *= 100
+            else:
+                # Fallback: descomposición espectral con autovalores recortados
+                vals, vecs = np.linalg.eigh(cov)
+                self._chol = vecs * np.sqrt(np.clip(vals, 0.0, None))
+        return self._chol
+
+    def weights_vector(self, exposures: Dict[str, float]) -> np.ndarray:
+        """
+        Convierte exposiciones con signo (notional, short negativo) en pesos
+        sobre la exposición bruta, en el orden de columnas del motor
+        """
+        w = np.zeros(len(self.symbols))
+        for symbol, value in exposures.items():
+            col = self._col.get(symbol)
+            if col is not None:
+                w[col] += float(value)
+        gross = np.abs(w).sum()
+        return w / gross if gross > 0 else w
+
+    # ----------------------------- VaR / CVaR -----------------------------
+
+    def historical_var(self, weights: np.ndarray, confidence_level: float = 0.95) -> Tuple[float, float]:
+        """VaR y CVaR históricos del portafolio (retornos negativos)"""
+        if self._count == 0:
+            return 0.0, 0.0
+        portfolio_returns = self._returns[:self._count] @ weights
+        var = float(np.percentile(portfolio_returns, (1 - confidence_level) * 100))
+        tail = portfolio_returns[portfolio_returns <= var]
+        cvar = float(tail.mean()) if len(tail) else var
+        return var, cvar
+
+    def parametric_var(self, weights: np.ndarray, confidence_level: float = 0.95) -> Tuple[float, float]:
+        """VaR y CVaR paramétricos (normal) a partir de la covarianza"""
+        mu = float(self.mean_returns() @ weights)
+        sigma = float(np.sqrt(max(weights @ self.covariance() @ weights, 0.0)))
+        alpha = 1 - confidence_level
+        z = NormalDist().inv_cdf(alpha)
+        var = mu + z * sigma
+        cvar = mu - sigma * NormalDist().pdf(z) / alpha
+        return var, cvar
+
+    def monte_carlo_var(
+        self,
+        weights: np.ndarray,
+        confidence_level: float = 0.95,
+        n_simulations: Optional[int] = None
+    ) -> Tuple[float, float]:
+        """VaR y CVaR Monte Carlo con retornos normales correlacionados"""
+        if not self.symbols:
+            return 0.0, 0.0
+        n_sims = int(n_simulations or self.mc_simulations)
+        # Z @ L.T @ w == Z @ (L.T @ w): se proyecta antes de simular
+        loading = self._cholesky().T @ weights
+        draws = self._rng.standard_normal((n_sims, len(self.symbols))) @ loading
+        simulated = float(self.mean_returns() @ weights) + draws
+        var = float(np.percentile(simulated, (1 - confidence_level) * 100))
+        tail = simulated[simulated <= var]
+        cvar = float(tail.mean()) if len(tail) else var
+        return var, cvar
+
+    def individual_var(self, confidence_level: float = 0.95) -> Dict[str, float]:
+        """VaR histórico por símbolo (una sola pasada sobre la matriz)"""
+        return dict(self.risk_state(confidence_level)["individual_var"])
+
+    # ----------------------------- Stress test -----------------------------
+
+    def stress_test(self, exposures: Dict[str, float], scenarios: Iterable) -> np.ndarray:
+        """
+        PnL del portafolio para un conjunto de escenarios
+
+        Args:
+            exposures: Exposición con signo por símbolo
+            scenarios: Shocks uniformes (floats) o dicts {symbol: shock}
+
+        Returns:
+            Vector de PnL por escenario (negativo = pérdida)
+        """
+        symbols = sorted(exposures)
+        position = {symbol: i for i, symbol in enumerate(symbols)}
+        e = np.array([float(exposures[symbol]) for symbol in symbols])
+
+        scenarios = list(scenarios)
+        shocks = np.zeros((len(scenarios), len(symbols)))
+        for i, scenario in enumerate(scenarios):
+            if isinstance(scenario, dict):
+                for symbol, shock in scenario.items():
+                    if symbol in position:
+                        shocks[i, position[symbol]] = float(shock)
+            else:
+                shocks[i, :] = float(scenario)
+        return shocks @ e
+
+    # ----------------------------- Estado cacheado -----------------------------
+
+    def risk_state(self, confidence_level: float = 0.95) -> Dict:
+        """
+        Snapshot de riesgo por símbolo, recalculado solo cuando cambia la ventana
+
+        Pensado para consultas de sizing: tras el primer cálculo por versión
+        la respuesta es una lectura de diccionario.
+        """
+        state = self._state_cache.get(confidence_level)
+        if state is not None:
+            return state
+
+        if self._count == 0:
+            individual = np.zeros(len(self.symbols))
+            individual_cvar = np.zeros(len(self.symbols))
+        else:
+            rows = self._returns[:self._count]
+            individual = np.percentile(rows, (1 - confidence_level) * 100, axis=0)
+            tail = rows <= individual
+            individual_cvar = np.where(tail, rows, 0.0).sum(axis=0) / np.maximum(tail.sum(axis=0), 1)
+        volatility = np.sqrt(np.clip(np.diag(self.covariance()), 0.0, None))
+
+        state = {
+            "version": self.version,
+            "observations": self._count,
+            "individual_var": {s: float(individual[i]) for s, i in self._col.items()},
+            "individual_cvar": {s: float(individual_cvar[i]) for s, i in self._col.items()},
+            "volatility": {s: float(volatility[i]) for s, i in self._col.items()},
+        }
+        self._state_cache[confidence_level] = state
+        return state
+
+    def get_symbol_var(self, symbol: str, confidence_level: float = 0.95) -> Optional[float]:
+        """VaR histórico cacheado de un símbolo"""
+        return self.risk_state(confidence_level)["individual_var"].get(symbol)
@@ -9,6 +9,7 @@ Mejoras:
 - Leverage derivado de config y límites de exposición/margen
 - Buffer por comisiones ida+vuelta
 - Límite diario y drawdown con peak_equity in-memory (y BD si está disponible)
+- VaR/CVaR/stress de portafolio vectorizados sobre PortfolioRiskEngine
 """
 
 import logging
@@ -22,10 +23,15 @@ from scipy import stats
 
 from core.config.config_loader import ConfigLoader
 from core.data.database import db_manager
+from core.trading.risk_engine import PortfolioRiskEngine
+from core.integration.service_registry import lazy_service
+from core.integration.latency_tracing import traced
 
 logger = logging.getLogger(__name__)
 getcontext().prec = 28  # evitar problemas de precisión en Decimal
 
+RISK_BAR_SECONDS = 3600  # barras 1h del motor de riesgo
+
 
 @dataclass
 class RiskDecision:
@@ -89,6 +95,20 @@ class RiskManager:
         # Estado para DD
         self.peak_equity: Optional[float] = None
 
+        # Motor de riesgo de portafolio (ventana rolling de retornos 1h)
+        self.var_window_hours = int(self.risk_config.get("var_window_hours", 30 * 24))
+        self.var_min_observations = int(self.risk_config.get("var_min_observations", 24))
+        self.risk_engine = PortfolioRiskEngine(
+            window=self.var_window_hours,
+            mc_simulations=int(self.risk_config.get("var_mc_simulations", 10000)),
+        )
+        # Sizing: pérdida de cola (CVaR de 1 barra) máxima por trade, fracción del balance
+        self.var_confidence = float(self.risk_config.get("var_confidence", 0.95))
+        self.max_tail_loss_per_trade = float(
+            self.risk_config.get("max_tail_loss_per_trade", self.max_risk_per_trade)
+        )
+        self._risk_load_attempted: set = set()
+
         # Trailing desde config (si existe)
         trailing_cfg = self.risk_config.get("trailing", {})
         self.trailing_defaults = {
@@ -132,6 +152,7 @@ class RiskManager:
             return False
         return True
 
+    @traced('risk_check')
     def calculate_position_size(
         self,
         current_price: float,
@@ -139,12 +160,15 @@ class RiskManager:
         balance: float,
         side: str,
         stop_loss_pct: Optional[float] = None,
-        confidence: float = 1.0
+        confidence: float = 1.0,
+        symbol: Optional[str] = None
     ) -> RiskDecision:
         """
         Calcula tamaño, SL, TP y leverage en base a riesgo.
         - Soporta LONG (BUY) y SHORT (SELL)
         - Cumple minNotional/lotStep/tickSize
+        - Limita el notional por el VaR/CVaR cacheado del motor de riesgo
+          (lectura de diccionario, sin recálculo)
         """
         try:
             # Validación de inputs
@@ -210,6 +234,12 @@ class RiskManager:
 
             qty_capped = min(qty_raw, qty_cap_by_exposure)
 
+            # Límite por riesgo de cola: notional * |CVaR| <= balance * max_tail_loss_per_trade
+            qty_cap_by_tail = self._tail_risk_qty_cap(symbol or self.symbol, balance, current_price)
+            if qty_cap_by_tail is not None:
+                qty_capped = min(qty_capped, qty_cap_by_tail)
+                qty_cap_by_exposure = min(qty_cap_by_exposure, qty_cap_by_tail)
+
             # Redondeos por símbolo
             qty_rounded = self._round_down_to_step(qty_capped, self.lot_step)
 
@@ -267,6 +297,18 @@ class RiskManager:
             logger.exception(f"[RISK] Error calculando posición: {e}")
             return self._reject(f"Error en cálculo: {e}")
 
+    def _tail_risk_qty_cap(self, symbol: str, balance: float, current_price: float) -> Optional[float]:
+        """Cantidad máxima según el CVaR (o VaR) cacheado del símbolo; None sin historia suficiente"""
+        if self.max_tail_loss_per_trade <= 0 or not self.risk_engine.has_symbol(symbol):
+            return None
+        state = self.get_risk_state(self.var_confidence)
+        if state["observations"] < self.var_min_observations:
+            return None
+        tail = state["individual_cvar"].get(symbol) or state["individual_var"].get(symbol)
+        if not tail or tail >= 0:
+            return None
+        return balance * self.max_tail_loss_per_trade / (abs(tail) * current_price)
+
     def get_risk_summary(self) -> Dict:
         return {
             "symbol": self.symbol,
@@ -408,141 +450,224 @@ class RiskManager:
             logger.error(f"Error calculando CVaR: {e}")
             return -0.08
 
+    # ----------------------------- Riesgo de portafolio -----------------------------
+
+    def _ensure_risk_history(self, symbols: List[str]):
+        """
+        Mantiene al día la historia 1h del motor de riesgo
+
+        Los símbolos nuevos se cargan completos; si la barra más reciente del
+        motor tiene más de una barra de antigüedad, se incorporan solo las
+        barras posteriores de todos los símbolos (o se recarga la ventana si
+        el hueco es mayor que ella).
+        """
+        end_date = datetime.now()
+        self._refresh_risk_history(end_date)
+
+        start_date = end_date - timedelta(hours=self.var_window_hours + 1)
+        for symbol in symbols:
+            if self.risk_engine.has_symbol(symbol):
+                continue
+            self._load_risk_symbol(symbol, start_date, end_date)
+
+    def _load_risk_symbol(self, symbol: str, start_date: datetime, end_date: datetime):
+        try:
+            historical_data = db_manager.get_historical_data(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe='1h'
+            )
+            if historical_data and len(historical_data) > self.var_min_observations:
+                self.risk_engine.add_symbol(
+                    symbol,
+                    [row['timestamp'] for row in historical_data],
+                    [row['close'] for row in historical_data],
+                )
+        except Exception as e:
+            logger.warning(f"Error obteniendo datos para {symbol}: {e}")
+
+    def _refresh_risk_history(self, end_date: datetime):
+        """Incorpora al motor las barras 1h posteriores a su última barra"""
+        engine = self.risk_engine
+        last_ts = engine.last_timestamp
+        if last_ts is None:
+            return
+        end_ts = int(end_date.timestamp())
+        if end_ts - last_ts <= RISK_BAR_SECONDS:
+            return
+
+        symbols = list(engine.symbols)
+        if end_ts - last_ts > self.var_window_hours * RISK_BAR_SECONDS:
+            # Hueco mayor que la ventana: recargar desde cero
+            self.risk_engine = PortfolioRiskEngine(
+                window=engine.window, mc_simulations=engine.mc_simulations
+            )
+            start_date = end_date - timedelta(hours=self.var_window_hours + 1)
+            for symbol in symbols:
+                self._load_risk_symbol(symbol, start_date, end_date)
+            return
+
+        bars: Dict[int, Dict[str, float]] = {}
+        start_date = datetime.fromtimestamp(last_ts + 1)
+        for symbol in symbols:
+            try:
+                rows = db_manager.get_historical_data(
+                    symbol=symbol,
+                    start_date=start_date,
+                    end_date=end_date,
+                    timeframe='1h'
+                )
+            except Exception as e:
+                logger.warning(f"Error actualizando datos de {symbol}: {e}")
+                continue
+            for row in rows or []:
+                ts = int(row['timestamp'])
+                if ts > last_ts:
+                    bars.setdefault(ts, {})[symbol] = row['close']
+
+        for ts in sorted(bars):
+            engine.update_bar(ts, bars[ts])
+
+    def update_market_prices(self, prices: Dict[str, float], timestamp: Optional[int] = None):
+        """
+        Incorpora los últimos precios al motor de riesgo (actualización incremental)
+
+        El motor trabaja con barras 1h: se añade una barra nueva solo cuando
+        ha pasado una barra completa desde la última; los precios intermedios
+        se ignoran. Los símbolos sin historia se cargan una vez desde la BD.
+
+        Args:
+            prices: Último precio por símbolo
+            timestamp: Timestamp epoch del precio (por defecto, ahora)
+        """
+        try:
+            unknown = [
+                symbol for symbol in prices
+                if not self.risk_engine.has_symbol(symbol) and symbol not in self._risk_load_attempted
+            ]
+            if unknown:
+                self._risk_load_attempted.update(unknown)
+                self._ensure_risk_history(unknown)
+
+            ts = int(timestamp if timestamp is not None else datetime.now().timestamp())
+            bar_ts = ts - ts % RISK_BAR_SECONDS
+            last_ts = self.risk_engine.last_timestamp
+            if last_ts is not None and bar_ts - last_ts >= RISK_BAR_SECONDS:
+                self.risk_engine.update_bar(bar_ts, prices)
+        except Exception as e:
+            logger.error(f"Error actualizando motor de riesgo: {e}")
+
+    def get_risk_state(self, confidence_level: float = 0.95) -> Dict:
+        """Estado de riesgo cacheado (VaR, CVaR y volatilidad por símbolo) para sizing"""
+        return self.risk_engine.risk_state(confidence_level)
+
+    @staticmethod
+    def _signed_exposures(positions: Dict[str, Dict]) -> Dict[str, float]:
+        exposures = {}
+        for symbol, pos in positions.items():
+            value = pos['size'] * pos['price']
+            if str(pos.get('side', 'LONG')).upper() in ['SELL', 'SHORT']:
+                value = -value
+            exposures[symbol] = exposures.get(symbol, 0.0) + value
+        return exposures
+
     def calculate_portfolio_var(self, positions: Dict[str, Dict], confidence_level: float = 0.95) -> Dict[str, float]:
         """
-        Calcula VaR del portafolio considerando correlaciones
-        
+        Calcula VaR/CVaR del portafolio considerando correlaciones
+
+        Usa la matriz de retornos del motor de riesgo: la historia de cada
+        símbolo se carga una única vez y después se incorporan solo las
+        barras nuevas.
+
         Args:
             positions: Dict con posiciones {symbol: {size, price, side}}
             confidence_level: Nivel de confianza
-            
+
         Returns:
-            Dict con VaR individual y del portafolio
+            Dict con VaR individual y del portafolio (histórico, paramétrico
+            y Monte Carlo) y el CVaR correspondiente
         """
+        empty = {"portfolio_var": 0.0, "individual_var": {}}
         try:
             if not positions:
-                return {"portfolio_var": 0.0, "individual_var": {}}
-            
-            # Obtener retornos históricos para cada símbolo
-            returns_data = {}
-            for symbol in positions.keys():
-                try:
-                    # Obtener datos históricos de los últimos 30 días
-                    end_date = datetime.now()
-                    start_date = end_date - timedelta(days=30)
-                    
-                    historical_data = db_manager.get_historical_data(
-                        symbol=symbol,
-                        start_date=start_date,
-                        end_date=end_date,
-                        timeframe='1h'
-                    )
-                    
-                    if historical_data and len(historical_data) > 24:  # Al menos 1 día de datos
-                        df = pd.DataFrame(historical_data)
-                        if 'close' in df.columns:
-                            returns = df['close'].pct_change().dropna().tolist()
-                            returns_data[symbol] = returns
-                            
-                except Exception as e:
-                    logger.warning(f"Error obteniendo datos para {symbol}: {e}")
-                    continue
-            
-            if not returns_data:
+                return empty
+
+            self._ensure_risk_history(list(positions.keys()))
+            engine = self.risk_engine
+            if engine.n_observations < self.var_min_observations:
                 logger.warning("No hay datos suficientes para calcular VaR del portafolio")
-                return {"portfolio_var": 0.0, "individual_var": {}}
-            
-            # Calcular VaR individual
-            individual_var = {}
-            for symbol, returns in returns_data.items():
-                individual_var[symbol] = self.calculate_var(returns, confidence_level)
-            
-            # Calcular VaR del portafolio usando matriz de correlación
-            if len(returns_data) > 1:
-                # Crear DataFrame con retornos de todos los símbolos
-                max_length = min(len(returns) for returns in returns_data.values())
-                aligned_returns = {}
-                for symbol, returns in returns_data.items():
-                    aligned_returns[symbol] = returns[-max_length:]
-                
-                returns_df = pd.DataFrame(aligned_returns)
-                correlation_matrix = returns_df.corr()
-                
-                # Calcular pesos del portafolio
-                total_value = sum(pos['size'] * pos['price'] for pos in positions.values())
-                weights = {}
-                for symbol, pos in positions.items():
-                    if symbol in returns_data:
-                        weights[symbol] = (pos['size'] * pos['price']) / total_value
-                
-                # Calcular VaR del portafolio
-                portfolio_variance = 0.0
-                for i, (symbol1, weight1) in enumerate(weights.items()):
-                    for j, (symbol2, weight2) in enumerate(weights.items()):
-                        if symbol1 in correlation_matrix.columns and symbol2 in correlation_matrix.columns:
-                            corr = correlation_matrix.loc[symbol1, symbol2]
-                            var1 = individual_var.get(symbol1, 0)
-                            var2 = individual_var.get(symbol2, 0)
-                            portfolio_variance += weight1 * weight2 * var1 * var2 * corr
-                
-                portfolio_var = np.sqrt(portfolio_variance)
-            else:
-                # Un solo símbolo
-                symbol = list(returns_data.keys())[0]
-                portfolio_var = individual_var.get(symbol, 0)
-            
+                return empty
+
+            exposures = {
+                symbol: value for symbol, value in self._signed_exposures(positions).items()
+                if engine.has_symbol(symbol)
+            }
+            if not exposures:
+                logger.warning("No hay datos suficientes para calcular VaR del portafolio")
+                return empty
+
+            weights = engine.weights_vector(exposures)
+            state = engine.risk_state(confidence_level)
+            individual_var = {s: state["individual_var"][s] for s in exposures}
+
+            portfolio_var, portfolio_cvar = engine.historical_var(weights, confidence_level)
+            parametric_var, parametric_cvar = engine.parametric_var(weights, confidence_level)
+            mc_var, mc_cvar = engine.monte_carlo_var(weights, confidence_level)
+
             logger.info(f"VaR del portafolio {confidence_level*100}%: {portfolio_var:.4f}")
             return {
-                "portfolio_var": float(portfolio_var),
+                "portfolio_var": portfolio_var,
+                "portfolio_cvar": portfolio_cvar,
+                "parametric_var": parametric_var,
+                "parametric_cvar": parametric_cvar,
+                "monte_carlo_var": mc_var,
+                "monte_carlo_cvar": mc_cvar,
                 "individual_var": individual_var
             }
-            
+
         except Exception as e:
             logger.error(f"Error calculando VaR del portafolio: {e}")
-            return {"portfolio_var": 0.0, "individual_var": {}}
+            return empty
 
     def calculate_stress_test(self, positions: Dict[str, Dict], stress_scenarios: List[float] = None) -> Dict[str, float]:
         """
         Realiza stress test del portafolio con diferentes escenarios de mercado
-        
+
+        Todos los escenarios se evalúan en una sola operación matricial.
+        Criterio conservador: el shock se aplica en contra de cada posición
+        (pérdida para longs y shorts).
+
         Args:
             positions: Dict con posiciones {symbol: {size, price, side}}
             stress_scenarios: Lista de shocks de mercado (por defecto: -5%, -10%, -20%)
-            
+
         Returns:
             Dict con resultados del stress test
         """
         try:
             if stress_scenarios is None:
                 stress_scenarios = [-0.05, -0.10, -0.20]  # -5%, -10%, -20%
-            
+
+            exposures = {
+                symbol: abs(value) for symbol, value in self._signed_exposures(positions).items()
+            }
+            total_portfolio_value = sum(exposures.values())
+            shocks = [-abs(scenario) for scenario in stress_scenarios]
+            losses = -self.risk_engine.stress_test(exposures, shocks)
+
             stress_results = {}
-            total_portfolio_value = sum(pos['size'] * pos['price'] for pos in positions.values())
-            
-            for scenario in stress_scenarios:
-                scenario_loss = 0.0
-                for symbol, pos in positions.items():
-                    # Calcular pérdida para cada posición
-                    position_value = pos['size'] * pos['price']
-                    if pos['side'].upper() in ['BUY', 'LONG']:
-                        # Posición larga: pérdida si el precio baja
-                        loss = position_value * abs(scenario)
-                    else:
-                        # Posición corta: pérdida si el precio sube
-                        loss = position_value * abs(scenario)
-                    
-                    scenario_loss += loss
-                
+            for scenario, scenario_loss in zip(stress_scenarios, losses):
                 # Calcular pérdida como porcentaje del portafolio
                 loss_percentage = (scenario_loss / total_portfolio_value) * 100 if total_portfolio_value > 0 else 0
                 stress_results[f"shock_{int(scenario*100)}%"] = {
-                    "absolute_loss": scenario_loss,
-                    "percentage_loss": loss_percentage
+                    "absolute_loss": float(scenario_loss),
+                    "percentage_loss": float(loss_percentage)
                 }
-            
+
             logger.info(f"Stress test completado: {stress_results}")
             return stress_results
-            
+
         except Exception as e:
             logger.error(f"Error en stress test: {e}")
             return {}
@@ -591,4 +716,4 @@ class RiskManager:
 
 
 # Instancia global
-risk_manager = RiskManager()
+risk_manager = lazy_service('risk_manager', RiskManager)
@@ -37,9 +37,15 @@ from core.data.database import db_manager
 from core.data.preprocessor import data_preprocessor
 from core.data.symbol_database_manager import symbol_db_manager
 from core.data.historical_data_adapter import get_historical_data
-from core.ml.enterprise.prediction_engine import PredictionEngine
-from core.ml.enterprise.confidence_estimator import ConfidenceEstimator
+try:
+    from core.ml.enterprise.prediction_engine import PredictionEngine
+    from core.ml.enterprise.confidence_estimator import ConfidenceEstimator
+except ImportError:  # motor de predicción no disponible: _get_ml_prediction devuelve None
+    PredictionEngine = None
+    ConfidenceEstimator = None
 from .risk_manager import risk_manager
+from core.integration.service_registry import lazy_service
+from core.integration.latency_tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -131,8 +137,9 @@ class SignalProcessor:
 
     def __init__(self) -> None:
         self.config = ConfigLoader().get_main_config()
-        self.signal_config = self.config.get_value(["signal_processing"], {})
-        self.trading_config = self.config.get_trading_settings()
+        # get_main_config() devuelve un dict (wrapper de compatibilidad)
+        self.signal_config = self.config.get("signal_processing", {})
+        self.trading_config = self.config.get("trading", {})
 
         # Configuración de filtros
         self.min_quality_score = float(self.signal_config.get("min_quality_score", 0.70))
@@ -140,6 +147,32 @@ class SignalProcessor:
         self.volume_confirmation_required = bool(self.signal_config.get("volume_confirmation", True))
         self.trend_alignment_required = bool(self.signal_config.get("trend_alignment", True))
     
+        # Timeframes
+        self.timeframes: List[str] = ["1m", "5m", "15m", "1h", "4h"]
+        self.primary_timeframe: str = self.config.get('timeframes', {}).get('primary', '1h')
+
+        # Métricas de tracking
+        self.metrics: Dict[str, Any] = {
+            "signals_processed": 0,
+            "signals_approved": 0,
+            "signals_rejected": 0,
+            "average_quality_score": 0.0,
+            "filter_rejection_reasons": defaultdict(int),
+            "timeframe_consistency_avg": 0.0,
+            "processing_latency_ms": 0.0,
+            "signals_by_regime": defaultdict(int),
+            "accuracy_by_score_bucket": defaultdict(list),
+            "volume_confirmation_rate": 0.0,
+        }
+
+        # Cache
+        self.prediction_cache: Dict[str, Dict[str, Any]] = {}
+        self.market_context_cache: Dict[str, Dict[str, Any]] = {}
+        self.cache_timeout_sec = 300  # 5 min
+
+        logger.info(f"[SignalProcessor] Inicializado | min_quality_score={self.min_quality_score:.2f}")
+
+    @traced('data_fetch')
     async def _get_market_data_sqlite(self, symbol: str, start_time: datetime, end_time: datetime, limit: int = 100) -> Optional[pd.DataFrame]:
         """Obtiene datos de mercado usando el nuevo sistema SQLite"""
         try:
@@ -170,33 +203,9 @@ class SignalProcessor:
             logger.debug(f"Error obteniendo datos SQLite para {symbol}: {e}")
             return None
 
-        # Timeframes
-        self.timeframes: List[str] = ["1m", "5m", "15m", "1h", "4h"]
-        self.primary_timeframe: str = self.config.get('timeframes', {}).get('primary', '1h')
-
-        # Métricas de tracking
-        self.metrics: Dict[str, Any] = {
-            "signals_processed": 0,
-            "signals_approved": 0,
-            "signals_rejected": 0,
-            "average_quality_score": 0.0,
-            "filter_rejection_reasons": defaultdict(int),
-            "timeframe_consistency_avg": 0.0,
-            "processing_latency_ms": 0.0,
-            "signals_by_regime": defaultdict(int),
-            "accuracy_by_score_bucket": defaultdict(list),
-            "volume_confirmation_rate": 0.0,
-        }
-
-        # Cache
-        self.prediction_cache: Dict[str, Dict[str, Any]] = {}
-        self.market_context_cache: Dict[str, Dict[str, Any]] = {}
-        self.cache_timeout_sec = 300  # 5 min
-
-        logger.info(f"[SignalProcessor] Inicializado | min_quality_score={self.min_quality_score:.2f}")
-
     # ----------------------------- Pipeline principal -----------------------------
 
+    @traced('signal_processing', root=True)
     async def process_signal(self, symbol: str, timeframe: str = "1h") -> SignalQuality:
         """
         Procesa una señal completa con todos los filtros y devuelve un SignalQuality.
@@ -283,6 +292,7 @@ class SignalProcessor:
 
     # ----------------------------- Multi-timeframe -----------------------------
 
+    @traced('signal_filtering')
     async def analyze_multi_timeframe(self, symbol: str) -> Dict[str, Any]:
         """
         Analiza señales en múltiples timeframes y mide su consistencia.
@@ -380,6 +390,7 @@ class SignalProcessor:
 
     # ----------------------------- Filtros de calidad -----------------------------
 
+    @traced('signal_filtering')
     async def apply_quality_filters(self, raw_signal: Dict, symbol: str) -> Dict[str, Any]:
         """
         Aplica batería de filtros de calidad y devuelve dict con resultados.
@@ -633,6 +644,7 @@ class SignalProcessor:
 
     # ----------------------------- Contexto de mercado -----------------------------
 
+    @traced('signal_filtering')
     async def detect_market_context(self, symbol: str) -> Dict[str, Any]:
         """
         Detecta régimen, volatilidad, momentum y sesión con caché corta.
@@ -689,6 +701,7 @@ class SignalProcessor:
             logger.exception(f"[SignalProcessor] Error detectando contexto: {e}")
             return self._default_market_context()
 
+    @traced('signal_filtering')
     async def calculate_timing_score(self, symbol: str, signal: str) -> float:
         """
         Optimiza el timing combinando niveles, sesión, volatilidad, momentum y confluencias.
@@ -825,6 +838,7 @@ class SignalProcessor:
 
     # ----------------------------- Auxiliares ML / caché -----------------------------
 
+    @traced('inference')
     async def _get_ml_prediction(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
         """
         Devuelve {'action','confidence','expected_return','probabilities','features_importance',...}
@@ -841,7 +855,7 @@ class SignalProcessor:
             if df.empty:
                 return None
             features = data_preprocessor.prepare_prediction_data(df)
-            if features is None or len(features) == 0:
+            if features is None or len(features) == 0 or PredictionEngine is None:
                 return None
 
             pred = await PredictionEngine.predict(symbol, features)
@@ -1248,4 +1262,4 @@ class SignalProcessor:
 
 
 # Instancia global
-signal_processor = SignalProcessor()
+signal_processor = lazy_service('signal_processor', SignalProcessor)
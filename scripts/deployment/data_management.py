@@ -460,7 +460,7 @@ class DataManager:
             
             # 1. Limpiar cache de features
             logger.info("🗂️ Limpiando cache de features...")
-            data_preprocessor.feature_cache.clear_expired()
+            data_preprocessor.feature_store.prune()
             maintenance_results['operations'].append('clear_feature_cache')
             
             # 2. Optimizar base de datos
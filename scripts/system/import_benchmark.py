@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de arranque: tiempo de import y memoria residente
+===========================================================
+
+Importa cada objetivo en un proceso Python limpio (arranque en frío) y mide:
+- Tiempo total del import
+- RSS antes/después del import
+- Módulos más costosos según ``-X importtime`` (acumulado)
+- Servicios del registro perezoso construidos durante el import
+
+Uso:
+    python scripts/system/import_benchmark.py
+    python scripts/system/import_benchmark.py core.data core.trading.executor
+    python scripts/system/import_benchmark.py --save-baseline logs/import_baseline.json
+    python scripts/system/import_benchmark.py --baseline logs/import_baseline.json --threshold 0.2
+
+Con ``--baseline`` el script termina con código 1 si algún objetivo empeora
+más que el umbral en tiempo o memoria.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+DEFAULT_TARGETS = ['core.data', 'core.trading', 'core.trading.executor', 'bot_enhanced']
+
+# Código ejecutado en el proceso hijo
+_CHILD_CODE = r'''
+import importlib, json, sys, time
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+target = sys.argv[1]
+rss_before = rss_mb()
+sys.stderr.write('@@import-start\n'); sys.stderr.flush()
+modules_before = len(sys.modules)
+start = time.perf_counter()
+error = None
+try:
+    importlib.import_module(target)
+except BaseException as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed_ms = (time.perf_counter() - start) * 1000
+sys.stderr.write('@@import-end\n'); sys.stderr.flush()
+
+services = []
+registry_module = sys.modules.get('core.integration.service_registry')
+if registry_module is not None:
+    services = registry_module.service_registry.initialized()
+
+print(json.dumps({
+    'import_ms': elapsed_ms,
+    'rss_before_mb': rss_before,
+    'rss_after_mb': rss_mb(),
+    'modules_loaded': len(sys.modules) - modules_before,
+    'services_initialized': services,
+    'error': error,
+}))
+'''
+
+
+def _parse_importtime(stderr: str, top: int) -> List[Dict[str, Any]]:
+    """Extrae los módulos con mayor tiempo acumulado de la salida de -X importtime"""
+    entries = []
+    inside = False
+    for line in stderr.splitlines():
+        # Solo cuenta los imports del objetivo, no los del propio harness
+        if line == '@@import-start':
+            inside = True
+            continue
+        if line == '@@import-end':
+            break
+        if not inside or not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue  # cabecera
+        entries.append({
+            'module': parts[2].strip(),
+            'self_ms': self_us / 1000,
+            'cumulative_ms': cumulative_us / 1000
+        })
+    entries.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    return entries[:top]
+
+
+def measure_target(target: str, top: int = 10) -> Dict[str, Any]:
+    """Mide el import en frío de un objetivo en un proceso nuevo"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get('PYTHONPATH')]))
+
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD_CODE, target],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+
+    result: Dict[str, Any] = {'target': target}
+    stdout_lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if stdout_lines:
+        result.update(json.loads(stdout_lines[-1]))
+    else:
+        result['error'] = f"Proceso terminó con código {proc.returncode}"
+
+    result['rss_delta_mb'] = result.get('rss_after_mb', 0.0) - result.get('rss_before_mb', 0.0)
+    result['slowest_modules'] = _parse_importtime(proc.stderr, top)
+    return result
+
+
+def compare_with_baseline(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: float
+) -> List[str]:
+    """Devuelve las regresiones respecto a la línea base"""
+    regressions = []
+    for result in results:
+        base = baseline.get(result['target'])
+        if not base or result.get('error'):
+            continue
+        for metric in ('import_ms', 'rss_delta_mb'):
+            old, new = base.get(metric, 0.0), result.get(metric, 0.0)
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append(
+                    f"{result['target']}: {metric} {old:.1f} -> {new:.1f} (+{(new / old - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print("=" * 78)
+    print(f"{'Objetivo':<28}{'Import (ms)':>12}{'RSS Δ (MB)':>12}{'Módulos':>10}{'Servicios':>12}")
+    print("-" * 78)
+    for result in results:
+        if result.get('error') and 'import_ms' not in result:
+            print(f"{result['target']:<28}  ❌ {result['error']}")
+            continue
+        print(
+            f"{result['target']:<28}{result['import_ms']:>12.1f}{result['rss_delta_mb']:>12.1f}"
+            f"{result['modules_loaded']:>10}{len(result['services_initialized']):>12}"
+        )
+        if result.get('error'):
+            print(f"{'':<4}⚠️ {result['error']}")
+    print("=" * 78)
+
+    for result in results:
+        if not result['slowest_modules']:
+            continue
+        print(f"\n📦 {result['target']} - módulos más costosos (acumulado):")
+        for entry in result['slowest_modules']:
+            print(f"   {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+        if result.get('services_initialized'):
+            print(f"   Servicios construidos en import: {', '.join(result['services_initialized'])}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de import y RSS")
+    parser.add_argument('targets', nargs='*', default=DEFAULT_TARGETS, help="Módulos a importar")
+    parser.add_argument('--top', type=int, default=10, help="Módulos más lentos a mostrar")
+    parser.add_argument('--json', dest='json_path', help="Guardar resultados en JSON")
+    parser.add_argument('--save-baseline', help="Guardar resultados como línea base")
+    parser.add_argument('--baseline', help="Comparar contra una línea base")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Regresión tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = [measure_target(target, args.top) for target in args.targets]
+    print_report(results)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        baseline = {
+            result['target']: {
+                'import_ms': result.get('import_ms', 0.0),
+                'rss_delta_mb': result.get('rss_delta_mb', 0.0)
+            }
+            for result in results if not result.get('error')
+        }
+        Path(args.save_baseline).write_text(json.dumps(baseline, indent=2))
+        print(f"\n💾 Línea base guardada en {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print("\n❌ Regresiones detectadas:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print("\n✅ Sin regresiones respecto a la línea base")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
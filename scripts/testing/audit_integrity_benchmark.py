@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de verificación de integridad del log de auditoría
+============================================================
+
+Compara la verificación evento a evento (ruta de
+``AuditLogger.verify_integrity``: una consulta por id, json.loads y
+checksum) con la verificación por rangos de AuditIntegrityVerifier:
+
+- ``roots``: solo la cadena de raíces de los segmentos
+- ``full``: recorrido secuencial por seq recalculando checksums, hojas y
+  raíces Merkle, con 1..N procesos
+
+La tabla de auditoría se construye en SQLite (tests/unit/audit_sinks, sustituto
+local de PostgreSQL) a través de AuditBatchWriter.write_batch con la
+IntegrityChain activa. La ruta evento a evento se mide sobre una muestra
+(``--legacy-sample``) y se extrapola al total. Al final se altera un
+evento y se comprueba que la verificación lo detecta.
+
+Uso:
+    python scripts/testing/audit_integrity_benchmark.py [--events 10000000] [--workers 1 4] [--legacy-sample 100000]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.compliance.enterprise.audit_integrity import (
+    AuditIntegrityVerifier, IntegrityChain, IntegritySource
+)
+from core.compliance.enterprise.audit_writer import AuditBatchWriter, AuditRecord
+from tests.unit.audit_sinks import SQLiteAuditSink
+
+START = datetime(2024, 1, 1)
+EVENT_TYPES = ['trade_opened', 'trade_closed', 'order_placed', 'position_opened', 'risk_limit_breach']
+
+
+def make_records(first: int, count: int, step_s: float, rng: random.Random) -> List[AuditRecord]:
+    """Eventos con la forma de log_event (payload canónico + checksum)"""
+    records = []
+    for i in range(first, first + count):
+        payload = json.dumps({
+            'symbol': f"SYM{i % 50:02d}USDT", 'side': 'buy' if i % 2 else 'sell',
+            'size': round(rng.uniform(0.01, 5.0), 4), 'price': round(rng.uniform(10, 70000), 2),
+            'strategy': 'trend'
+        }, sort_keys=True, separators=(',', ':'))
+        timestamp = START + timedelta(seconds=i * step_s)
+        records.append(AuditRecord(
+            event_id=hashlib.sha256(f"evt-{i}".encode()).hexdigest(),
+            timestamp=timestamp,
+            event_type=EVENT_TYPES[i % len(EVENT_TYPES)],
+            severity='info',
+            user_id='system',
+            session_id='bench',
+            checksum=hashlib.sha256(payload.encode('utf-8')).hexdigest(),
+            payload=payload,
+            retention_until=timestamp + timedelta(days=365 * 7)
+        ))
+    return records
+
+
+def build(path: Path, events: int, batch_size: int, segment_size: int, integrity: bool) -> float:
+    """Escribe ``events`` eventos por lotes; devuelve µs por evento"""
+    sink = SQLiteAuditSink(str(path))
+    sink.connection.execute("PRAGMA journal_mode=WAL")
+    writer = AuditBatchWriter(
+        db_sink=sink, integrity=IntegrityChain(segment_size=segment_size) if integrity else None
+    )
+    rng = random.Random(42)
+    step_s = 365 * 86400 / events
+    elapsed = 0.0
+    for first in range(0, events, batch_size):
+        batch = make_records(first, min(batch_size, events - first), step_s, rng)
+        start = time.perf_counter()
+        writer.write_batch(batch)
+        elapsed += time.perf_counter() - start
+    start = time.perf_counter()
+    writer.seal_segment()
+    elapsed += time.perf_counter() - start
+    sink.close()
+    return elapsed / events * 1e6
+
+
+def verify_per_event(path: Path, sample: int, events: int) -> float:
+    """Ruta de verify_integrity sobre una muestra de ids; devuelve µs por evento"""
+    rng = random.Random(7)
+    ids = [hashlib.sha256(f"evt-{rng.randrange(events)}".encode()).hexdigest() for _ in range(sample)]
+    conn = sqlite3.connect(str(path))
+    start = time.perf_counter()
+    for event_id in ids:
+        cursor = conn.cursor()
+        cursor.execute("SELECT data, checksum FROM audit_events WHERE id = ?", (event_id,))
+        stored_data, stored_checksum = cursor.fetchone()
+        cursor.close()
+        data = json.loads(stored_data)
+        calculated = hashlib.sha256(
+            json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()
+        assert calculated == stored_checksum
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed / sample * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de verificación de integridad de auditoría")
+    parser.add_argument('--events', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--legacy-sample', type=int, default=100_000)
+    parser.add_argument('--write-sample', type=int, default=200_000)
+    parser.add_argument('--segment-size', type=int, default=4096)
+    parser.add_argument('--batch-size', type=int, default=512)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='audit_integrity_bench_'))
+    try:
+        # Coste de escritura con y sin cadena sobre una muestra
+        plain_us = build(workdir / 'plain.db', args.write_sample, args.batch_size, args.segment_size, False)
+        chained_us = build(workdir / 'chained.db', args.write_sample, args.batch_size, args.segment_size, True)
+
+        audit_path = workdir / 'audit.db'
+        start = time.perf_counter()
+        build(audit_path, args.events, args.batch_size, args.segment_size, True)
+        build_s = time.perf_counter() - start
+
+        legacy_us = verify_per_event(audit_path, min(args.legacy_sample, args.events), args.events)
+        source = IntegritySource('sqlite', str(audit_path))
+
+        rows, ok = [], True
+        rows.append(('Evento a evento (extrapolado)', 1, legacy_us * args.events / 1e6, args.events, True))
+        roots = AuditIntegrityVerifier(source, workers=1).verify(mode='roots')
+        ok &= roots.ok
+        rows.append(('Cadena de raíces', 1, roots.elapsed_s, roots.events_checked, roots.ok))
+        for workers in args.workers:
+            report = AuditIntegrityVerifier(source, workers=workers).verify(mode='full')
+            ok &= report.ok and report.events_checked == args.events
+            rows.append(('Completa (Merkle)', workers, report.elapsed_s, report.events_checked, report.ok))
+        day = START + timedelta(days=180)
+        ranged = AuditIntegrityVerifier(source, workers=1).verify(day, day + timedelta(days=1), mode='full')
+        ok &= ranged.ok
+        rows.append(('Completa, 1 día', 1, ranged.elapsed_s, ranged.events_checked, ranged.ok))
+
+        # Alteración de un evento: la verificación completa debe detectarla
+        tampered_seq = args.events // 2
+        with sqlite3.connect(str(audit_path)) as conn:
+            conn.execute("UPDATE audit_events SET data = replace(data, 'trend', 'Trend') WHERE seq = ?", (tampered_seq,))
+        tampered = AuditIntegrityVerifier(source, workers=max(args.workers)).verify(mode='full')
+        expected_segment = (tampered_seq - 1) // args.segment_size + 1
+        detected = [failure['segment_id'] for failure in tampered.failures] == [expected_segment]
+        ok &= detected
+
+        print("=" * 88)
+        print(f"Integridad de auditoría | {args.events:,} eventos | segmentos de {args.segment_size:,} | "
+              f"{roots.segments_checked:,} segmentos | {os.cpu_count()} CPU")
+        print(f"Construcción (write_batch + cadena): {build_s:.1f} s | escritura por evento: "
+              f"{plain_us:.1f} µs sin cadena, {chained_us:.1f} µs con cadena "
+              f"(+{chained_us - plain_us:.1f} µs)")
+        print(f"{'Verificación':<32}{'Procesos':>10}{'Tiempo (s)':>12}{'Eventos':>14}{'µs/evento':>11}{'OK':>6}")
+        print("-" * 88)
+        for label, workers, seconds, checked, passed in rows:
+            per_event = seconds / checked * 1e6 if checked else 0.0
+            print(f"{label:<32}{workers:>10}{seconds:>12.2f}{checked:>14,}{per_event:>11.2f}{'sí' if passed else 'NO':>6}")
+        print("-" * 88)
+        print(f"Alteración del seq {tampered_seq:,}: {'detectada' if detected else 'NO detectada'} "
+              f"en el segmento {expected_segment} ({tampered.elapsed_s:.1f} s)")
+        print("=" * 88)
+        return 0 if ok else 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
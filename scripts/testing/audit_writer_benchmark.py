@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del escritor de auditoría
+===================================
+
+Compara, con SQLite + archivo local como sustituto de PostgreSQL:
+- legacy: INSERT + COMMIT y open/append/close del JSONL por evento
+- writer (event/batch/none): AuditBatchWriter con cada modo de durabilidad
+
+Mide la latencia de log_event vista por el productor (p50/p99), el
+throughput total hasta que todo está persistido y el tamaño medio de lote.
+
+Uso:
+    python scripts/testing/audit_writer_benchmark.py [--events 20000] [--burst 500]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.compliance.enterprise.audit_writer import (
+    AuditBatchWriter, AuditRecord, JsonlSegmentWriter,
+    DurabilityMode, BackpressurePolicy
+)
+from tests.unit.audit_sinks import SQLiteAuditSink
+
+
+def make_record(i: int) -> AuditRecord:
+    data = {
+        'symbol': 'BTCUSDT', 'side': 'buy' if i % 2 else 'sell', 'size': 0.01 * (i % 7 + 1),
+        'price': 50000 + i % 100, 'leverage': 5, 'strategy': 'ml', 'action': 'order_placed'
+    }
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    now = datetime.now()
+    return AuditRecord(
+        event_id=hashlib.sha256(f"{i}_{now.isoformat()}".encode()).hexdigest(),
+        timestamp=now,
+        event_type='order_placed',
+        severity='info',
+        user_id='system',
+        session_id='benchmark',
+        checksum=hashlib.sha256(payload.encode()).hexdigest(),
+        payload=payload,
+        retention_until=now + timedelta(days=365 * 7)
+    )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_legacy(workdir: Path, events: int, burst: int) -> Dict[str, float]:
+    """Escritura síncrona por evento, como el AuditLogger original"""
+    sink = SQLiteAuditSink(str(workdir / 'legacy.db'))
+    audit_file = workdir / 'legacy.jsonl'
+    latencies = []
+    start = time.perf_counter()
+    for i in range(events):
+        record = make_record(i)
+        t0 = time.perf_counter()
+        sink.write_batch([record], DurabilityMode.EVENT)
+        with open(audit_file, 'a', encoding='utf-8') as f:
+            f.write(record.to_json_line())
+        latencies.append(time.perf_counter() - t0)
+        if i % burst == burst - 1:
+            await asyncio.sleep(0)
+    total = time.perf_counter() - start
+    sink.close()
+    return {'total_s': total, 'latencies': latencies, 'avg_batch': 1.0}
+
+
+async def run_writer(workdir: Path, events: int, burst: int, durability: DurabilityMode) -> Dict[str, float]:
+    sink = SQLiteAuditSink(str(workdir / f'writer_{durability.value}.db'))
+    writer = AuditBatchWriter(
+        db_sink=sink,
+        file_writer=JsonlSegmentWriter(directory=str(workdir / durability.value)),
+        durability=durability,
+        backpressure=BackpressurePolicy.BLOCK,
+        queue_size=max(burst * 4, 1000),
+        enqueue_timeout_s=30.0
+    )
+    latencies = []
+    start = time.perf_counter()
+    for i in range(events):
+        record = make_record(i)
+        t0 = time.perf_counter()
+        await writer.submit(record)
+        latencies.append(time.perf_counter() - t0)
+        if i % burst == burst - 1:
+            await asyncio.sleep(0)
+    await writer.flush()
+    total = time.perf_counter() - start
+    await writer.stop()
+
+    assert sink.count() == events, f"{sink.count()} != {events}"
+    sink.close()
+    stats = writer.get_stats()
+    return {'total_s': total, 'latencies': latencies, 'avg_batch': stats['avg_batch_size']}
+
+
+async def main_async(events: int, burst: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        results = {'legacy': await run_legacy(workdir, events, burst)}
+        for mode in (DurabilityMode.EVENT, DurabilityMode.BATCH, DurabilityMode.NONE):
+            results[f'writer/{mode.value}'] = await run_writer(workdir, events, burst, mode)
+
+    print("=" * 82)
+    print(f"Eventos: {events} | ráfagas de {burst}")
+    print(f"{'Modo':<16}{'p50 (µs)':>12}{'p99 (µs)':>12}{'Total (s)':>12}{'Eventos/s':>14}{'Lote medio':>14}")
+    print("-" * 82)
+    for name, result in results.items():
+        lat = result['latencies']
+        print(
+            f"{name:<16}{statistics.median(lat) * 1e6:>12.1f}{percentile(lat, 0.99) * 1e6:>12.1f}"
+            f"{result['total_s']:>12.2f}{events / result['total_s']:>14.0f}{result['avg_batch']:>14.1f}"
+        )
+    print("=" * 82)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del escritor de auditoría por lotes")
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--burst', type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.events, args.burst))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
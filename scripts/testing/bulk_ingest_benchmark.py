@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la ingesta masiva por COPY
+=======================================
+
+Compara la ruta INSERT (execute_values, páginas de 1000) con BulkCopyWriter
+para distintos tamaños de lote y número de writers por tabla.
+
+- Con ``--dsn`` usa un PostgreSQL/TimescaleDB local: crea una tabla de
+  pruebas con la forma de market_ticks, mide filas/s y verifica que los
+  duplicados quedan fusionados.
+- Sin ``--dsn`` usa un sustituto en proceso que registra el stream COPY
+  (bytes CSV) y aplica el upsert en memoria; ``--latency-ms`` modela el
+  round-trip por sentencia para ver el efecto de lotes y writers.
+
+Uso:
+    python scripts/testing/bulk_ingest_benchmark.py [--rows 500000] [--symbols 20] [--dup-ratio 0.05]
+    python scripts/testing/bulk_ingest_benchmark.py --dsn "dbname=trading_data user=postgres"
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.data.enterprise.bulk_ingest import (
+    BulkCopyWriter, CopyTableSpec, PsycopgCopyBackend, encode_csv
+)
+
+BENCH_TABLE = 'bench_market_ticks'
+
+SPEC = CopyTableSpec(
+    table=BENCH_TABLE,
+    columns=('time', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'source'),
+    conflict_columns=('symbol', 'time'),
+    use_on_conflict=False,
+    partition_column='symbol'
+)
+
+
+def make_rows(count: int, symbols: int, dup_ratio: float) -> List[Tuple]:
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < dup_ratio:
+            # Reenvío de una fila anterior (mismo símbolo y timestamp)
+            previous = rows[rng.randrange(len(rows))]
+            rows.append(previous[:5] + (previous[5] * 1.0001,) + previous[6:])
+            continue
+        price = 100 + rng.random()
+        rows.append((
+            start + timedelta(seconds=i // symbols), f"SYM{i % symbols}USDT",
+            price, price * 1.001, price * 0.999, price, rng.expovariate(0.1), 'benchmark'
+        ))
+    return rows
+
+
+class RecordingCopyBackend:
+    """Sustituto de PostgreSQL: registra el stream COPY y aplica el anti-join"""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.table: Dict[Tuple[str, str], Tuple] = {}
+        self.stream_bytes = 0
+        self.statements = 0
+
+    def copy_batch(self, spec: CopyTableSpec, rows) -> int:
+        payload = encode_csv(rows)
+        self.stream_bytes += len(payload)
+        # CREATE TEMP + COPY + INSERT ... SELECT: tres round-trips por lote
+        self.statements += 2 + len(spec.merge_sql())
+        time.sleep(self.latency_s * (2 + len(spec.merge_sql())))
+        latest = {}
+        for record in csv.reader(io.StringIO(payload)):
+            latest[(record[1], record[0])] = record
+        for key, record in latest.items():
+            self.table.setdefault(key, record)
+        return len(payload)
+
+    def insert_pages(self, rows, page_size: int = 1000):
+        """Modelo de execute_values: una sentencia con literales por página"""
+        for i in range(0, len(rows), page_size):
+            page = rows[i:i + page_size]
+            sql = "INSERT INTO t VALUES " + ",".join(
+                "(" + ",".join(repr(str(value)) for value in row) + ")" for row in page
+            )
+            self.stream_bytes += len(sql)
+            self.statements += 1
+            time.sleep(self.latency_s)
+            for row in page:
+                self.table.setdefault((row[1], row[0].isoformat()), row)
+
+
+def run_standin(rows: List[Tuple], args) -> List[Tuple[str, float, int, int]]:
+    results = []
+    latency = args.latency_ms / 1000
+
+    backend = RecordingCopyBackend(latency)
+    start = time.perf_counter()
+    backend.insert_pages(rows)
+    results.append(('INSERT (1000/página)', time.perf_counter() - start, backend.statements, backend.stream_bytes))
+
+    for batch_size in args.batch_sizes:
+        for writers in args.writers:
+            backend = RecordingCopyBackend(latency)
+            with ThreadPoolExecutor(max_workers=writers) as executor:
+                writer = BulkCopyWriter(backend, batch_size=batch_size, writers_per_table=writers, executor=executor)
+                start = time.perf_counter()
+                asyncio.run(writer.ingest(SPEC, rows))
+                elapsed = time.perf_counter() - start
+            results.append((f"COPY lote={batch_size} w={writers}", elapsed, backend.statements, backend.stream_bytes))
+    return results
+
+
+def run_postgres(rows: List[Tuple], args) -> List[Tuple[str, float, int, int]]:
+    import psycopg2
+    import psycopg2.extras
+
+    def reset_table():
+        with psycopg2.connect(args.dsn) as conn, conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+            cur.execute(f"""
+                CREATE TABLE {BENCH_TABLE} (
+                    time TIMESTAMPTZ NOT NULL, symbol VARCHAR(20) NOT NULL,
+                    open DECIMAL(20,8) NOT NULL, high DECIMAL(20,8) NOT NULL,
+                    low DECIMAL(20,8) NOT NULL, close DECIMAL(20,8) NOT NULL,
+                    volume DECIMAL(20,8) NOT NULL, source VARCHAR(50),
+                    created_at TIMESTAMPTZ DEFAULT NOW()
+                )""")
+            cur.execute(f"CREATE INDEX ON {BENCH_TABLE} (symbol, time DESC)")
+
+    def count_rows() -> int:
+        with psycopg2.connect(args.dsn) as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM {BENCH_TABLE}")
+            return cur.fetchone()[0]
+
+    results = []
+    reset_table()
+    start = time.perf_counter()
+    with psycopg2.connect(args.dsn) as conn, conn.cursor() as cur:
+        psycopg2.extras.execute_values(
+            cur, f"INSERT INTO {BENCH_TABLE} ({', '.join(SPEC.columns)}) VALUES %s", rows, page_size=1000
+        )
+    results.append(('INSERT (1000/página)', time.perf_counter() - start, count_rows(), 0))
+
+    for batch_size in args.batch_sizes:
+        for writers in args.writers:
+            reset_table()
+            with ThreadPoolExecutor(max_workers=writers) as executor:
+                backend = PsycopgCopyBackend(lambda: psycopg2.connect(args.dsn))
+                writer = BulkCopyWriter(backend, batch_size=batch_size, writers_per_table=writers, executor=executor)
+                start = time.perf_counter()
+                asyncio.run(writer.ingest(SPEC, rows))
+                elapsed = time.perf_counter() - start
+            results.append((f"COPY lote={batch_size} w={writers}", elapsed, count_rows(), writer.stats['bytes_copied']))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de ingesta COPY vs INSERT")
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--dup-ratio', type=float, default=0.05)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10_000, 50_000])
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--latency-ms', type=float, default=1.0, help="round-trip modelado (solo sustituto)")
+    parser.add_argument('--dsn', type=str, default=None)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.symbols, args.dup_ratio)
+    unique = len({(row[1], row[0]) for row in rows})
+
+    if args.dsn:
+        results = run_postgres(rows, args)
+        third = 'Filas tabla'
+    else:
+        results = run_standin(rows, args)
+        third = 'Sentencias'
+
+    print("=" * 84)
+    print(f"{'PostgreSQL' if args.dsn else 'Sustituto en proceso'}: {args.rows:,} filas, "
+          f"{unique:,} claves únicas, {args.symbols} símbolos")
+    print(f"{'Modo':<28}{'Tiempo (s)':>12}{'Filas/s':>14}{third:>14}{'Bytes (MB)':>14}")
+    print("-" * 84)
+    for name, elapsed, third_value, stream_bytes in results:
+        print(f"{name:<28}{elapsed:>12.2f}{args.rows / elapsed:>14,.0f}{third_value:>14,}{stream_bytes / 1e6:>14.1f}")
+    print("=" * 84)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del coste de los callbacks de telemetría
+==================================================
+
+Mide el tiempo por paso de entrenamiento (forward + backward + optimizer)
+del TransformerModel con:
+- sin callbacks
+- legacy: norma por parámetro con ``.item()`` y un log por capa (ruta anterior)
+- fusionado: GradientNormCallback (reducción multi-tensor, acumulación en
+  dispositivo y volcado cada N pasos)
+
+y el coste por lote de validación de TradingMetricsCallback frente a la
+acumulación de todas las predicciones de la época. Se comprueba que las
+métricas de trading de ambas rutas coinciden.
+
+Uso:
+    python scripts/testing/callback_overhead_benchmark.py [--steps 200] [--log-every 10] [--device cuda] [--per-layer]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import torch
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ml.enterprise.callbacks import GradientNormCallback, TradingMetricsCallback
+from core.ml.enterprise.model_architecture import TransformerModel
+
+
+class BenchTransformer(TransformerModel):
+    """TransformerModel cuyo log se registra en memoria (sin Trainer)"""
+
+    def log(self, name, value, **kwargs):
+        self.logged[name] = value
+
+
+class LegacyGradientNormCallback:
+    """Reproduce el on_before_optimizer_step original"""
+
+    def __init__(self, log_every_n_steps: int):
+        self.log_every_n_steps = log_every_n_steps
+
+    def on_before_optimizer_step(self, trainer, pl_module, optimizer, optimizer_idx=None):
+        if trainer.global_step % self.log_every_n_steps == 0:
+            total_norm = 0
+            for name, param in pl_module.named_parameters():
+                if param.grad is not None:
+                    param_norm = param.grad.data.norm(2)
+                    total_norm += param_norm.item() ** 2
+                    pl_module.log(f"grad_norm/{name}", param_norm.item(), on_step=True)
+            pl_module.log("grad_norm/total", total_norm ** 0.5, on_step=True)
+
+
+def legacy_trading_metrics(batches) -> Dict[str, float]:
+    """Acumulación de la época completa y cálculo al final (ruta anterior)"""
+    preds = torch.cat([logits.detach().cpu() for logits, _ in batches])
+    targets = torch.cat([t.detach().cpu() for _, t in batches])
+    pred_classes = torch.argmax(preds, dim=1)
+    probs = torch.softmax(preds, dim=1)
+    metrics = {}
+    for class_id, name in enumerate(['sell', 'hold', 'buy']):
+        mask = targets == class_id
+        if mask.sum() > 0:
+            metrics[f'accuracy_{name}'] = (pred_classes[mask] == class_id).float().mean().item()
+        metrics[f'pred_distribution_{name}'] = (pred_classes == class_id).float().mean().item()
+    metrics['average_confidence'] = probs.max(dim=1)[0].mean().item()
+    metrics['average_entropy'] = (-(probs * torch.log(probs + 1e-8)).sum(dim=1)).mean().item()
+    return metrics
+
+
+def step_times(model, callback, batches, warmup: int) -> List[float]:
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-4)
+    if hasattr(callback, 'on_fit_start'):
+        callback.on_fit_start(None, model)
+    times = []
+    for step, (x, y) in enumerate(batches):
+        start = time.perf_counter()
+        optimizer.zero_grad(set_to_none=True)
+        loss = model.criterion(model(x), y)
+        loss.backward()
+        if callback is not None:
+            callback.on_before_optimizer_step(SimpleNamespace(global_step=step), model, optimizer)
+        optimizer.step()
+        if x.is_cuda:
+            torch.cuda.synchronize()
+        if step >= warmup:
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del coste de los callbacks de telemetría")
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--seq-len', type=int, default=60)
+    parser.add_argument('--log-every', type=int, default=10)
+    parser.add_argument('--val-batches', type=int, default=500)
+    parser.add_argument('--per-layer', action='store_true')
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu')
+    args = parser.parse_args()
+
+    torch.manual_seed(42)
+    device = torch.device(args.device)
+    batches = [(torch.randn(args.batch_size, args.seq_len, 50, device=device),
+                torch.randint(0, 3, (args.batch_size,), device=device))
+               for _ in range(min(args.steps, 20))]
+    batches = [batches[i % len(batches)] for i in range(args.steps)]
+
+    results = {}
+    variants = (
+        ('Sin callbacks', lambda: None),
+        ('Legacy (.item() por capa)', lambda: LegacyGradientNormCallback(args.log_every)),
+        ('Fusionado', lambda: GradientNormCallback(log_every_n_steps=args.log_every, per_layer=args.per_layer)),
+    )
+    for label, factory in variants:
+        torch.manual_seed(0)
+        model = BenchTransformer(d_model=128, nhead=8, num_encoder_layers=4, dim_feedforward=512).to(device)
+        model.logged = {}
+        model.train()
+        times = step_times(model, factory(), batches, args.warmup)
+        results[label] = (statistics.median(times), sorted(times)[int(len(times) * 0.99) - 1])
+
+    # Validación: métricas de trading por lote
+    val = [(torch.randn(256, 3, device=device), torch.randint(0, 3, (256,), device=device))
+           for _ in range(args.val_batches)]
+    start = time.perf_counter()
+    legacy = legacy_trading_metrics(val)
+    legacy_s = time.perf_counter() - start
+
+    holder = SimpleNamespace(logged={})
+    holder.log = lambda name, value, **kwargs: holder.logged.__setitem__(name, value)
+    callback = TradingMetricsCallback()
+    start = time.perf_counter()
+    callback.on_validation_epoch_start(None, holder)
+    for idx, (logits, targets) in enumerate(val):
+        callback.on_validation_batch_end(None, holder, logits, (None, targets), idx)
+    callback.on_validation_epoch_end(None, holder)
+    fused_s = time.perf_counter() - start
+    match = all(abs(holder.logged[f'trading/{k}'] - v) < 1e-4 for k, v in legacy.items())
+
+    baseline = results['Sin callbacks'][0]
+    print("=" * 76)
+    print(f"Callbacks de telemetría | TransformerModel | {args.device} | batch {args.batch_size} | "
+          f"log cada {args.log_every} pasos")
+    print(f"{'Variante':<30}{'p50 (ms)':>12}{'p99 (ms)':>12}{'Sobrecoste':>14}")
+    print("-" * 76)
+    for label, (p50, p99) in results.items():
+        print(f"{label:<30}{p50 * 1e3:>12.2f}{p99 * 1e3:>12.2f}{(p50 / baseline - 1) * 100:>13.1f}%")
+    print("-" * 76)
+    print(f"Métricas de trading ({args.val_batches} lotes): acumulación completa {legacy_s * 1e3:.1f} ms, "
+          f"contadores {fused_s * 1e3:.1f} ms, coinciden: {'sí' if match else 'NO'}")
+    print("=" * 76)
+    return 0 if match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
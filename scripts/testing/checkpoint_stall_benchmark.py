@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la espera del bucle de entrenamiento por checkpoints
+=================================================================
+
+Simula N épocas de validación con un val_loss ruidoso y mide cuánto tiempo
+bloquea ``on_validation_epoch_end`` al hilo de entrenamiento:
+
+- legacy: torch.save síncrono de modelo + optimizador en cada época y borrado
+  posterior del peor checkpoint (ruta anterior)
+- asíncrono: ModelCheckpointCallback sobre CheckpointManager (decisión top-k
+  antes de escribir, snapshot a CPU y escritura en segundo plano), con
+  "last" solo pesos en delta
+
+para LSTMAttentionModel y TransformerModel con estado de AdamW poblado.
+
+Uso:
+    python scripts/testing/checkpoint_stall_benchmark.py [--epochs 30] [--top-k 3] [--device cuda]
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+import torch
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ml.enterprise.callbacks import ModelCheckpointCallback
+from core.ml.enterprise.model_architecture import LSTMAttentionModel, TransformerModel
+
+
+class LegacyCheckpointCallback:
+    """Reproduce el on_validation_epoch_end original"""
+
+    def __init__(self, save_dir: Path, save_top_k: int):
+        self.save_dir = save_dir
+        self.save_top_k = save_top_k
+        self.checkpoints = []
+
+    def on_validation_epoch_end(self, trainer, pl_module):
+        val_loss = trainer.callback_metrics['val_loss']
+        path = self.save_dir / f"checkpoint_epoch_{trainer.current_epoch:03d}.pth"
+        torch.save({
+            'model_state_dict': pl_module.state_dict(),
+            'optimizer_state_dict': trainer.optimizers[0].state_dict(),
+            'epoch': trainer.current_epoch,
+            'metrics': {'val_loss': val_loss}
+        }, path)
+        self.checkpoints.append((path, val_loss))
+        self.checkpoints.sort(key=lambda x: x[1])
+        if len(self.checkpoints) > self.save_top_k:
+            self.checkpoints.pop()[0].unlink()
+
+    def teardown(self, trainer, pl_module, stage):
+        pass
+
+
+def build_model(name: str, device: torch.device):
+    if name == 'LSTM-Attention':
+        model, x = LSTMAttentionModel(), torch.randn(32, 60, 50)
+    else:
+        model, x = TransformerModel(), torch.randn(32, 60, 50)
+    model = model.to(device)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-4)
+    output = model(x.to(device))
+    logits = output[0] if isinstance(output, tuple) else output
+    logits.sum().backward()
+    optimizer.step()
+    return model, optimizer
+
+
+def run(callback, model, optimizer, losses: List[float]) -> Dict[str, float]:
+    stalls = []
+    for epoch, loss in enumerate(losses):
+        trainer = SimpleNamespace(
+            callback_metrics={'val_loss': torch.tensor(loss)}, current_epoch=epoch,
+            global_step=epoch * 100, optimizers=[optimizer], sanity_checking=False
+        )
+        start = time.perf_counter()
+        callback.on_validation_epoch_end(trainer, model)
+        stalls.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    callback.teardown(None, model, 'fit')
+    drain = time.perf_counter() - start
+    return {'p50': statistics.median(stalls), 'max': max(stalls), 'total': sum(stalls), 'drain': drain}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la espera por checkpoints")
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu')
+    args = parser.parse_args()
+
+    torch.manual_seed(42)
+    device = torch.device(args.device)
+    # val_loss decreciente con ruido: la mayoría de épocas no entran en el top-k
+    losses = [1.0 / (1 + 0.05 * e) + 0.05 * float(torch.rand(1)) for e in range(args.epochs)]
+
+    rows, ok = [], True
+    workdir = Path(tempfile.mkdtemp(prefix='checkpoint_bench_'))
+    try:
+        for name in ('LSTM-Attention', 'Transformer'):
+            model, optimizer = build_model(name, device)
+            size_mb = sum(t.numel() * t.element_size() for t in model.state_dict().values()) / 1e6
+            for label, factory in (
+                ('legacy', lambda d: LegacyCheckpointCallback(d, args.top_k)),
+                ('asíncrono', lambda d: ModelCheckpointCallback(str(d), args.top_k, save_last=True, last_delta=True)),
+            ):
+                target = workdir / f"{name}_{label}"
+                target.mkdir()
+                result = run(factory(target), model, optimizer, losses)
+                kept = sorted(p.name for p in target.glob("checkpoint_epoch_*.pth"))
+                rows.append((name, label, size_mb, result, len(kept)))
+                ok &= len(kept) == args.top_k
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("=" * 92)
+    print(f"Espera por checkpoints | {args.epochs} épocas | top-{args.top_k} | {args.device}")
+    print(f"{'Modelo':<16}{'Ruta':<12}{'Pesos (MB)':>11}{'p50 (ms)':>11}{'Máx (ms)':>11}"
+          f"{'Total (s)':>11}{'Vaciado (s)':>13}{'Top-k':>7}")
+    print("-" * 92)
+    for name, label, size_mb, result, kept in rows:
+        print(f"{name:<16}{label:<12}{size_mb:>11.1f}{result['p50'] * 1e3:>11.2f}{result['max'] * 1e3:>11.2f}"
+              f"{result['total']:>11.2f}{result['drain']:>13.2f}{kept:>7}")
+    print("=" * 92)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark de consultas de configuración
+============================================
+
+Compara el coste por consulta de:
+- Recorrido anidado (split('.') + walk por fuente, implementación anterior)
+- Índice plano precompilado (FlatConfigIndex.get)
+- Atributo de un snapshot tipado (ConfigSnapshot)
+
+Usa los YAML reales de config/ (user_settings.yaml y config/core/*.yaml)
+como fuentes, en el mismo orden de prioridad que el gestor unificado.
+
+Uso:
+    python scripts/testing/config_lookup_benchmark.py [--iterations 200000]
+"""
+
+import argparse
+import sys
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.config.config_index import FlatConfigIndex, ConfigSnapshot, config_field
+
+# Claves representativas de los caminos calientes (filtros de señal, riesgo, entrenamiento)
+REPRESENTATIVE_KEYS = [
+    'trading_settings.mode',
+    'risk_management.max_risk_per_trade',
+    'risk_management.max_daily_loss_pct',
+    'financial_targets.balance.initial',
+    'signal_processing.min_confidence',
+    'ml_settings.training.batch_size',
+    'does.not.exist',
+]
+
+
+@dataclass(frozen=True)
+class HotLoopSnapshot(ConfigSnapshot):
+    max_risk_per_trade: float = config_field('risk_management.max_risk_per_trade', 0.02)
+    max_daily_loss_pct: float = config_field('risk_management.max_daily_loss_pct', 5.0)
+    min_confidence: float = config_field('signal_processing.min_confidence', 0.6)
+
+
+def load_sources() -> List[Tuple[str, Dict[str, Any]]]:
+    sources = []
+    user_file = PROJECT_ROOT / 'config' / 'user_settings.yaml'
+    if user_file.exists():
+        sources.append(('user', yaml.safe_load(user_file.read_text(encoding='utf-8')) or {}))
+    for yaml_file in sorted((PROJECT_ROOT / 'config' / 'core').glob('*.yaml')):
+        sources.append((f'core/{yaml_file.name}', yaml.safe_load(yaml_file.read_text(encoding='utf-8')) or {}))
+    return sources
+
+
+def nested_get(sources: List[Tuple[str, Dict[str, Any]]], key_path: str, default: Any = None) -> Any:
+    """Implementación anterior: split + recorrido por cada fuente"""
+    for _, config in sources:
+        current = config
+        found = True
+        for key in key_path.split('.'):
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            else:
+                found = False
+                break
+        if found and current is not None:
+            return current
+    return default
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark de lookups de configuración")
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    sources = load_sources()
+    index = FlatConfigIndex()
+    compile_time = timeit.timeit(lambda: index.compile(sources), number=10) / 10 * 1000
+    snapshot = index.snapshot(HotLoopSnapshot)
+
+    print(f"📂 Fuentes: {len(sources)} | rutas indexadas: {len(index)} | compilación: {compile_time:.2f} ms")
+    print("=" * 78)
+    print(f"{'Clave':<42}{'Anidado (ns)':>12}{'Índice (ns)':>12}{'Speedup':>10}")
+    print("-" * 78)
+
+    n = args.iterations
+    for key in REPRESENTATIVE_KEYS:
+        assert nested_get(sources, key) == index.get(key), key
+        nested_ns = timeit.timeit(lambda: nested_get(sources, key), number=n) / n * 1e9
+        index_ns = timeit.timeit(lambda: index.get(key), number=n) / n * 1e9
+        print(f"{key:<42}{nested_ns:>12.0f}{index_ns:>12.0f}{nested_ns / index_ns:>9.1f}x")
+
+    snapshot_ns = timeit.timeit(lambda: snapshot.max_risk_per_trade, number=n) / n * 1e9
+    print("-" * 78)
+    print(f"{'snapshot.max_risk_per_trade':<42}{'':>12}{snapshot_ns:>12.0f}")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
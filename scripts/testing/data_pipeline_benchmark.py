@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del EnterpriseDataPipeline
+====================================
+
+Mide el tiempo de extremo a extremo de process_trading_data sobre un
+dataset OHLCV sintético en Parquet (varios GB con los valores por defecto)
+en un LocalCluster de dask:
+
+- Secuencial: la ruta anterior. Un compute por cada comprobación de
+  validación, un compute para el cache JSON, otro para el Parquet y otro
+  para contar registros (el DataFrame completo se materializa en el
+  cliente). Se mide con ``--legacy-rows`` filas, porque necesita que el
+  dataset quepa en la memoria del proceso cliente.
+- Fusionado: validación en una pasada con persist (o checkpoint Parquet
+  con ``--checkpoint``), transformaciones y destinos en un único compute.
+
+Sin ``--redis-url`` no se escribe el cache; el coste de serialización del
+cache (JSON frente a Arrow IPC) se mide aparte sobre una partición.
+
+Uso:
+    python scripts/testing/data_pipeline_benchmark.py [--rows 80000000] [--legacy-rows 10000000] [--workers 4] [--memory-limit 4GB] [--checkpoint]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import dask.dataframe as dd
+import numpy as np
+import pandas as pd
+from dask.distributed import Client, LocalCluster
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ml.enterprise.data_pipeline import (
+    DataPipelineConfig, DataValidator, EnterpriseDataPipeline, to_arrow_ipc
+)
+
+TRANSFORM_CONFIG = {
+    "steps": [
+        {
+            "type": "feature_engineering",
+            "features": [
+                {"type": "sma", "column": "close", "window": 20},
+                {"type": "rsi", "column": "close", "window": 14},
+                {"type": "volatility", "column": "close", "window": 20},
+                {"type": "bollinger", "column": "close", "window": 20}
+            ]
+        },
+        {"type": "normalize", "method": "zscore", "columns": ["close", "volume", "sma_20"]}
+    ]
+}
+
+
+def build_dataset(path: Path, rows: int, rows_per_file: int, seed: int = 42) -> float:
+    """Escribe el dataset OHLCV por ficheros; devuelve su tamaño en memoria (GB)"""
+    path.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    last_close, nbytes = 30000.0, 0
+    for index, first in enumerate(range(0, rows, rows_per_file)):
+        count = min(rows_per_file, rows - first)
+        close = last_close + rng.standard_normal(count).cumsum()
+        last_close = close[-1]
+        spread = rng.uniform(0.5, 5.0, count)
+        frame = pd.DataFrame({
+            'timestamp': 1_500_000_000 + 60 * np.arange(first, first + count, dtype=np.int64),
+            'open': close + rng.standard_normal(count),
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'volume': rng.lognormal(2.0, 1.0, count)
+        })
+        # Algunos registros inválidos para la validación
+        frame.loc[frame.index[::100_003], 'volume'] = 0.0
+        nbytes += frame.memory_usage(index=False).sum()
+        frame.to_parquet(path / f"part_{index:05d}.parquet", index=False)
+    return nbytes / 1e9
+
+
+async def run_sequential(source: Path, workdir: Path) -> Dict[str, Any]:
+    """Ruta anterior de process_trading_data (sin MLflow)"""
+    data = dd.read_parquet(str(source))
+    report = {}
+    checked = data
+    rules = DataValidator().rules
+    for col in rules["positive_columns"]:
+        report[f"invalid_{col}"] = int(len(checked[checked[col] <= 0][col].compute()))
+        checked = checked[checked[col] > 0]
+    checked['timestamp'] = dd.to_datetime(checked['timestamp'], unit='s')
+    report['gaps'] = int((checked['timestamp'].diff().dt.total_seconds() / 60 > rules["max_gap_minutes"]).sum().compute())
+    for col in ['close', 'volume']:
+        z_scores = (checked[col] - checked[col].mean()) / checked[col].std()
+        report[f"outliers_{col}"] = int((z_scores.abs() > rules["outlier_threshold"]).sum().compute())
+        checked = checked[z_scores.abs() <= rules["outlier_threshold"]]
+
+    pipeline = EnterpriseDataPipeline(DataPipelineConfig(redis_url=None, log_file=str(workdir / 'pipeline.log')))
+    data = pipeline._apply_transformations(data, TRANSFORM_CONFIG, 'BENCH', '1m')
+    data.compute().to_json()
+    data.compute().to_parquet(workdir / 'sequential.parquet')
+    records = len(data)
+    return {'report': report, 'records': records}
+
+
+async def run_fused(source: Path, workdir: Path, checkpoint: bool, redis_url: Optional[str]) -> Dict[str, Any]:
+    config = DataPipelineConfig(
+        redis_url=redis_url,
+        log_file=str(workdir / 'pipeline.log'),
+        checkpoint_dir=str(workdir / 'checkpoints') if checkpoint else None
+    )
+    pipeline = EnterpriseDataPipeline(config)
+    data = await pipeline.process_trading_data(
+        {'type': 'historical', 'symbol': 'BENCH', 'timeframe': '1m', 'parquet_path': str(source)},
+        TRANSFORM_CONFIG
+    )
+    return {'partitions': data.npartitions}
+
+
+def validation_report(source: Path) -> Dict[str, int]:
+    return DataValidator().validate(dd.read_parquet(str(source)))[1]
+
+
+def timed(func, *args) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = asyncio.run(func(*args))
+    return {'seconds': time.perf_counter() - start, 'result': result}
+
+
+def cache_encoding(source: Path) -> Dict[str, float]:
+    """Coste de serializar una partición para el cache: JSON frente a Arrow IPC"""
+    frame = pd.read_parquet(next(iter(sorted(source.glob('*.parquet')))))
+    start = time.perf_counter()
+    json_size = len(frame.to_json())
+    json_s = time.perf_counter() - start
+    start = time.perf_counter()
+    arrow_size = len(to_arrow_ipc(frame))
+    arrow_s = time.perf_counter() - start
+    return {'rows': len(frame), 'json_s': json_s, 'json_mb': json_size / 1e6,
+            'arrow_s': arrow_s, 'arrow_mb': arrow_size / 1e6}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de datos enterprise")
+    parser.add_argument('--rows', type=int, default=80_000_000)
+    parser.add_argument('--legacy-rows', type=int, default=10_000_000)
+    parser.add_argument('--rows-per-file', type=int, default=2_000_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads-per-worker', type=int, default=2)
+    parser.add_argument('--memory-limit', default='4GB')
+    parser.add_argument('--checkpoint', action='store_true', help="checkpoint Parquet en lugar de persist")
+    parser.add_argument('--redis-url', default=None)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='data_pipeline_bench_'))
+    cwd = os.getcwd()
+    cluster = client = None
+    try:
+        # data/processed y mlruns se crean en el directorio de trabajo
+        os.chdir(workdir)
+        large, small = workdir / 'large', workdir / 'small'
+        large_gb = build_dataset(large, args.rows, args.rows_per_file)
+        small_gb = build_dataset(small, args.legacy_rows, args.rows_per_file)
+
+        cluster = LocalCluster(n_workers=args.workers, threads_per_worker=args.threads_per_worker,
+                               memory_limit=args.memory_limit)
+        client = Client(cluster)
+
+        sequential = timed(run_sequential, small, workdir)
+        fused_small = timed(run_fused, small, workdir, args.checkpoint, args.redis_url)
+        fused_large = timed(run_fused, large, workdir, args.checkpoint, args.redis_url)
+        match = validation_report(small) == sequential['result']['report']
+        encoding = cache_encoding(large)
+
+        mode = 'checkpoint Parquet' if args.checkpoint else 'persist'
+        print("=" * 84)
+        print(f"Pipeline de datos | LocalCluster {args.workers}x{args.threads_per_worker} hilos, "
+              f"{args.memory_limit} por worker | fusionado con {mode}")
+        print(f"{'Ruta':<28}{'Filas':>14}{'Datos (GB)':>12}{'Tiempo (s)':>12}{'Filas/s':>14}")
+        print("-" * 84)
+        for label, rows, gb, outcome in (
+            ('Secuencial (4+ computes)', args.legacy_rows, small_gb, sequential),
+            ('Fusionado', args.legacy_rows, small_gb, fused_small),
+            ('Fusionado', args.rows, large_gb, fused_large),
+        ):
+            print(f"{label:<28}{rows:>14,}{gb:>12.2f}{outcome['seconds']:>12.1f}{rows / outcome['seconds']:>14,.0f}")
+        print("-" * 84)
+        print(f"Reporte de validación coincide con la ruta secuencial: {'sí' if match else 'NO'}")
+        print(f"Cache de {encoding['rows']:,} filas: JSON {encoding['json_s']:.2f} s / {encoding['json_mb']:.0f} MB, "
+              f"Arrow IPC {encoding['arrow_s']:.2f} s / {encoding['arrow_mb']:.0f} MB")
+        print("=" * 84)
+        return 0 if match else 1
+    finally:
+        os.chdir(cwd)
+        if client is not None:
+            client.close()
+        if cluster is not None:
+            cluster.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
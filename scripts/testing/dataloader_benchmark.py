@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del DataLoader de TradingDataset
+==========================================
+
+Compara, sobre datos sintéticos del tamaño indicado:
+- legacy: array en memoria del proceso principal y torch.tensor (copia) por muestra
+- memmap: .npy mapeado con mmap_mode='c' y ventanas torch.from_numpy
+
+Para cada num_workers (por defecto 0, 4 y 8) mide muestras/segundo y la
+memoria de cada worker (RSS y PSS; PSS reparte las páginas compartidas, por
+lo que refleja mejor la duplicación real).
+
+Uso:
+    python scripts/testing/dataloader_benchmark.py [--rows 500000] [--features 13] [--batches 400]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import psutil
+import torch
+from torch.utils.data import DataLoader
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ml.enterprise.data_module import TradingDataset
+
+
+class LegacyTradingDataset(TradingDataset):
+    """Reproduce el __getitem__ original (copia por muestra)"""
+
+    def __getitem__(self, idx: int):
+        start_idx = self.start + idx
+        end_idx = start_idx + self.sequence_length
+        target_idx = end_idx + self.prediction_horizon - 1
+        return torch.tensor(self.X[start_idx:end_idx]), torch.tensor(self.y[target_idx])
+
+
+def build_arrays(workdir: Path, rows: int, n_features: int) -> Dict[str, str]:
+    rng = np.random.default_rng(42)
+    X = rng.standard_normal((rows, n_features), dtype=np.float32)
+    y = rng.integers(0, 3, rows, dtype=np.int64)
+    paths = {'features': str(workdir / 'features.npy'), 'target': str(workdir / 'target.npy')}
+    np.save(paths['features'], X)
+    np.save(paths['target'], y)
+    return paths
+
+
+def worker_memory_mb() -> List[Dict[str, float]]:
+    """RSS/PSS de los procesos hijo (workers del DataLoader)"""
+    result = []
+    for child in psutil.Process().children(recursive=True):
+        try:
+            info = child.memory_full_info()
+            result.append({
+                'rss': info.rss / 1e6,
+                'pss': getattr(info, 'pss', info.rss) / 1e6
+            })
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return result
+
+
+def run(dataset: TradingDataset, num_workers: int, batch_size: int, batches: int) -> Dict[str, float]:
+    loader = DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=True,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0
+    )
+    iterator = iter(loader)
+    next(iterator)  # Arranque de workers fuera de la medición
+
+    samples = 0
+    start = time.perf_counter()
+    for _ in range(batches):
+        try:
+            X, _ = next(iterator)
+        except StopIteration:
+            iterator = iter(loader)
+            X, _ = next(iterator)
+        samples += X.shape[0]
+    elapsed = time.perf_counter() - start
+
+    workers = worker_memory_mb()
+    del iterator, loader
+
+    return {
+        'samples_per_s': samples / elapsed,
+        'workers': len(workers),
+        'worker_rss_mb': float(np.mean([w['rss'] for w in workers])) if workers else 0.0,
+        'worker_pss_mb': float(np.mean([w['pss'] for w in workers])) if workers else 0.0,
+        'main_rss_mb': psutil.Process().memory_info().rss / 1e6
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del DataLoader de TradingDataset")
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--features', type=int, default=13)
+    parser.add_argument('--sequence-length', type=int, default=60)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batches', type=int, default=400)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 4, 8])
+    args = parser.parse_args()
+
+    feature_names = [f"f{i}" for i in range(args.features)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_arrays(Path(tmp), args.rows, args.features)
+        print(f"Datos: {args.rows} filas x {args.features} features "
+              f"({Path(paths['features']).stat().st_size / 1e6:.1f} MB)")
+
+        def make(mode: str) -> TradingDataset:
+            if mode == 'legacy':
+                X = np.array(np.load(paths['features']))
+                y = np.array(np.load(paths['target']))
+                return LegacyTradingDataset.from_arrays(
+                    X, y, feature_names, sequence_length=args.sequence_length
+                )
+            return TradingDataset.from_arrays(
+                np.load(paths['features'], mmap_mode='c'),
+                np.load(paths['target'], mmap_mode='c'),
+                feature_names,
+                sequence_length=args.sequence_length,
+                array_paths=(paths['features'], paths['target'])
+            )
+
+        print("=" * 86)
+        print(f"{'Modo':<10}{'Workers':>9}{'Muestras/s':>14}{'RSS/worker MB':>16}"
+              f"{'PSS/worker MB':>16}{'RSS main MB':>14}")
+        print("-" * 86)
+        for mode in ('legacy', 'memmap'):
+            for num_workers in args.workers:
+                result = run(make(mode), num_workers, args.batch_size, args.batches)
+                print(
+                    f"{mode:<10}{num_workers:>9}{result['samples_per_s']:>14.0f}"
+                    f"{result['worker_rss_mb']:>16.1f}{result['worker_pss_mb']:>16.1f}"
+                    f"{result['main_rss_mb']:>14.1f}"
+                )
+        print("=" * 86)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de latencia de inferencia del EnsembleModel
+=====================================================
+
+Mide p50/p99 por llamada en CPU para los tamaños de batch indicados con:
+- secuencial: forward eager con los modelos base uno detrás de otro (ruta anterior)
+- hilos: forward eager con configure_parallel_inference (modelos base
+  concurrentes y reparto de hilos intra-op)
+- TorchScript: export_torchscript (grafo único, forks en el pool inter-op)
+- ONNX Runtime: export_onnx, si onnxruntime está instalado
+
+y comprueba que todas las rutas dan el mismo resultado.
+
+Uso:
+    python scripts/testing/ensemble_latency_benchmark.py [--batch-sizes 1 16 128] [--iterations 200] [--aggregation weighted_average]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import torch
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.ml.enterprise.model_architecture import EnsembleModel
+
+BASE_MODELS = ["lstm_attention", "transformer", "cnn_lstm", "gru_simple"]
+
+
+def latency(func: Callable, x: torch.Tensor, iterations: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        func(x)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(x)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {'p50': statistics.median(samples), 'p99': samples[max(0, int(len(samples) * 0.99) - 1)]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de latencia del EnsembleModel")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 128])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seq-len', type=int, default=60)
+    parser.add_argument('--aggregation', default='weighted_average',
+                        choices=['weighted_average', 'voting', 'stacking'])
+    args = parser.parse_args()
+
+    torch.manual_seed(42)
+    threads = torch.get_num_threads()
+    torch.set_num_interop_threads(len(BASE_MODELS))
+    model = EnsembleModel(BASE_MODELS, [0.3, 0.3, 0.2, 0.2], aggregation_method=args.aggregation).eval()
+    example = torch.randn(2, args.seq_len, 50)
+
+    def sequential(x):
+        torch.set_num_threads(threads)
+        return model(x)
+
+    def threaded(x):
+        return model(x)
+
+    scripted = model.export_torchscript(example)
+
+    paths = {'Secuencial': sequential, 'Hilos': threaded, 'TorchScript': scripted}
+    workdir = tempfile.mkdtemp(prefix='ensemble_bench_')
+    try:
+        import onnxruntime as ort
+        onnx_path = os.path.join(workdir, 'ensemble.onnx')
+        model.export_onnx(example, onnx_path)
+        options = ort.SessionOptions()
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        paths['ONNX Runtime'] = lambda x: torch.from_numpy(session.run(None, {'features': x.numpy()})[0])
+    except ImportError:
+        pass
+
+    rows, ok = [], True
+    with torch.no_grad():
+        for batch in args.batch_sizes:
+            x = torch.randn(batch, args.seq_len, 50)
+            reference = sequential(x)
+            for label, func in paths.items():
+                if label == 'Hilos':
+                    model.configure_parallel_inference()
+                ok &= torch.allclose(func(x), reference, atol=1e-3)
+                rows.append((batch, label, latency(func, x, args.iterations, args.warmup)))
+                if label == 'Hilos':
+                    model.configure_parallel_inference(enabled=False)
+                    torch.set_num_threads(threads)
+
+    print("=" * 72)
+    print(f"Latencia del ensemble | {', '.join(BASE_MODELS)} | {args.aggregation} | {os.cpu_count()} CPU")
+    print(f"{'Batch':>6}  {'Ruta':<16}{'p50 (ms)':>12}{'p99 (ms)':>12}{'Speedup p50':>14}")
+    print("-" * 72)
+    baseline = {}
+    for batch, label, result in rows:
+        baseline.setdefault(batch, result['p50'])
+        print(f"{batch:>6}  {label:<16}{result['p50'] * 1e3:>12.2f}{result['p99'] * 1e3:>12.2f}"
+              f"{baseline[batch] / result['p50']:>13.2f}x")
+    print("-" * 72)
+    print(f"Resultados coinciden con la ruta secuencial: {'sí' if ok else 'NO'}")
+    print("=" * 72)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
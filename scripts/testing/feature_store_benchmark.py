@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del feature store
+===========================
+
+Con datos sintéticos de 1m para varios símbolos (por defecto 3 símbolos x 365
+días) y los grupos reales de DataPreprocessorAdvanced, mide por símbolo:
+- cold: almacén vacío, cálculo completo + escritura Parquet
+- warm: mismas filas, todo leído del almacén
+- warm (N cols): lectura de solo N columnas
+- append 1d: un día más de datos (cálculo incremental de la cola)
+- pickle: carga del DataFrame completo como hacía el FeatureCache anterior
+
+Uso:
+    python scripts/testing/feature_store_benchmark.py [--symbols 3] [--days 365] [--columns 10]
+"""
+
+import argparse
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.data.feature_store import FeatureStore
+from core.data.preprocessor import DataPreprocessorAdvanced
+
+
+def synthetic_ohlcv(symbol: str, minutes: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2023-01-01', periods=minutes, freq='1min')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, minutes)))
+    spread = np.abs(rng.normal(0, 0.0008, minutes)) * close
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        'symbol': symbol,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.exponential(50, minutes),
+    }, index=index)
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del feature store")
+    parser.add_argument('--symbols', type=int, default=3)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    groups = DataPreprocessorAdvanced.get_indicator_groups()
+    minutes = args.days * 1440
+    extra = 1440
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(root=Path(tmp) / 'store')
+        for i in range(args.symbols):
+            symbol = f"SYM{i}USDT"
+            full = synthetic_ohlcv(symbol, minutes + extra, seed=i)
+            df = full.iloc[:minutes]
+
+            row: Dict[str, float] = {}
+            row['cold'] = timed(lambda: store.materialize(df, groups, max_workers=args.workers))
+
+            combined = None
+
+            def warm():
+                nonlocal combined
+                combined = store.materialize(df, groups, max_workers=args.workers)
+
+            row['warm'] = timed(warm)
+            subset = [c for c in combined.columns if c not in df.columns][:args.columns]
+            row['warm_cols'] = timed(
+                lambda: store.materialize(df, groups, columns=subset, max_workers=args.workers)
+            )
+            row['append_1d'] = timed(lambda: store.materialize(full, groups, max_workers=args.workers))
+
+            pickle_path = Path(tmp) / f"{symbol}.pkl"
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(combined, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            def load_pickle():
+                with open(pickle_path, 'rb') as f:
+                    pickle.load(f)
+
+            row['pickle_load'] = timed(load_pickle)
+            row['features'] = len(combined.columns) - len(df.columns)
+            results[symbol] = row
+
+        stats = store.get_stats()
+
+    print("=" * 92)
+    print(f"{args.symbols} símbolos x {args.days} días de 1m ({minutes:,} filas/símbolo)")
+    print(f"{'Símbolo':<12}{'Features':>10}{'Cold (s)':>11}{'Warm (s)':>11}"
+          f"{f'{args.columns} cols (s)':>13}{'Append 1d (s)':>15}{'Pickle (s)':>12}")
+    print("-" * 92)
+    for symbol, row in results.items():
+        print(
+            f"{symbol:<12}{row['features']:>10}{row['cold']:>11.2f}{row['warm']:>11.2f}"
+            f"{row['warm_cols']:>13.2f}{row['append_1d']:>15.2f}{row['pickle_load']:>12.2f}"
+        )
+    print("-" * 92)
+    print(f"Almacén: {stats['parts']} partes, {stats['total_size_mb']} MB | "
+          f"hits {stats['group_hits']}, appends {stats['group_appends']}, "
+          f"completos {stats['group_full_computes']}")
+    print("=" * 92)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
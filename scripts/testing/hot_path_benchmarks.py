@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks de rutas calientes
+======================================
+
+Mide las rutas calientes del pipeline de datos y de trading sobre OHLCV
+sintético, sin red ni bases de datos externas (SQLite y cachés en un
+directorio temporal):
+
+- preprocessor.indicators_cold / _warm: add_all_technical_indicators_parallel
+  con el feature store vacío y con todos los grupos ya materializados
+- preprocessor.create_sequences: create_sequences_optimized
+- alignment.align_symbol_data: TemporalAlignment.align_symbol_data
+- symbol_db.insert / symbol_db.get_data: SymbolDatabaseManager
+- cache.put / cache.get: IntelligentCacheManager (aciertos en memoria)
+- signal_processor.process_signal: pipeline completo de filtros con los datos
+  de mercado y la predicción ML sustituidos por datos sintéticos
+- train_hist.cycle: un ciclo de TrainHistParallel (datos del ciclo,
+  indicadores y simulación de trades) para varios símbolos
+
+Cada benchmark se ejecuta ``--warmup`` veces sin medir y ``--repeat`` veces
+medidas; se reportan mediana, p95 y mínimo en ms. Los casos cuyas
+dependencias no están instaladas se marcan como omitidos.
+
+Uso:
+    python scripts/testing/hot_path_benchmarks.py --save-baseline logs/hot_paths_baseline.json
+    python scripts/testing/hot_path_benchmarks.py --baseline logs/hot_paths_baseline.json --threshold 0.2
+    python scripts/testing/hot_path_benchmarks.py --only preprocessor cache --repeat 10
+
+Con ``--baseline`` el script termina con código 1 si la mediana de algún
+benchmark empeora más del umbral o si un benchmark con línea base falla.
+Las líneas base solo son comparables en la misma máquina y con el mismo
+``--scale``.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ADAUSDT', 'XRPUSDT']
+
+
+@dataclass
+class BenchContext:
+    """Recursos compartidos por los benchmarks de una ejecución"""
+    workdir: Path
+    scale: float = 1.0
+    cleanups: List[Callable[[], Any]] = field(default_factory=list)
+
+    def rows(self, base: int) -> int:
+        return max(100, int(base * self.scale))
+
+    def path(self, name: str) -> Path:
+        path = self.workdir / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+# Registro: nombre -> setup(ctx) que prepara los datos y devuelve la función medida
+BENCHMARKS: Dict[str, Callable[[BenchContext], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[BenchContext], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def synthetic_ohlcv(rows: int, seed: int = 0, freq: str = '1h', start: str = '2024-01-01') -> pd.DataFrame:
+    """Paseo aleatorio log-normal con OHLC coherente y volumen exponencial"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=rows, freq=freq)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, rows)))
+    spread = np.abs(rng.normal(0, 0.003, rows)) * close
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.exponential(500, rows),
+    }, index=index)
+
+
+def epoch(index: pd.DatetimeIndex, unit: str) -> np.ndarray:
+    """Timestamps enteros desde epoch en la unidad pedida ('s' o 'ms')"""
+    return np.asarray((index - pd.Timestamp(0)) // pd.Timedelta(1, unit=unit), dtype=np.int64)
+
+
+# ----------------------------- Preprocesador -----------------------------
+
+def _preprocessor(ctx: BenchContext):
+    from core.data.preprocessor import DataPreprocessorAdvanced
+    return DataPreprocessorAdvanced()
+
+
+@benchmark('preprocessor.indicators_cold')
+def bench_indicators_cold(ctx: BenchContext):
+    from core.data.feature_store import FeatureStore
+
+    preprocessor = _preprocessor(ctx)
+    df = synthetic_ohlcv(ctx.rows(5000), seed=1)
+    root = ctx.path('feature_store_cold')
+
+    def run():
+        # Almacén vacío en cada iteración: cálculo completo de todos los grupos
+        preprocessor.feature_store = FeatureStore(root=root / uuid.uuid4().hex)
+        return preprocessor.add_all_technical_indicators_parallel(df)
+    return run
+
+
+@benchmark('preprocessor.indicators_warm')
+def bench_indicators_warm(ctx: BenchContext):
+    from core.data.feature_store import FeatureStore
+
+    preprocessor = _preprocessor(ctx)
+    preprocessor.feature_store = FeatureStore(root=ctx.path('feature_store_warm'))
+    df = synthetic_ohlcv(ctx.rows(5000), seed=1)
+    preprocessor.add_all_technical_indicators_parallel(df)
+    return lambda: preprocessor.add_all_technical_indicators_parallel(df)
+
+
+@benchmark('preprocessor.create_sequences')
+def bench_create_sequences(ctx: BenchContext):
+    preprocessor = _preprocessor(ctx)
+    rows = ctx.rows(20000)
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.standard_normal((rows, 40)), columns=[f"f{i}" for i in range(40)])
+    y = pd.Series(rng.standard_normal(rows))
+    return lambda: preprocessor.create_sequences_optimized(X, y, lookback=60)
+
+
+# ----------------------------- Alineación temporal -----------------------------
+
+@benchmark('alignment.align_symbol_data')
+def bench_align_symbol_data(ctx: BenchContext):
+    from core.data.temporal_alignment import TemporalAlignment
+
+    alignment = TemporalAlignment()
+    rows = ctx.rows(5000)
+    symbol_data = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = synthetic_ohlcv(rows, seed=10 + i)
+        # Huecos aleatorios (~2%) para que el reindexado tenga que rellenar
+        keep = np.random.default_rng(i).random(rows) > 0.02
+        symbol_data[symbol] = df[keep]
+
+    timeline = alignment.create_master_timeline(
+        '1h', symbol_data[SYMBOLS[0]].index[0].to_pydatetime(),
+        symbol_data[SYMBOLS[0]].index[-1].to_pydatetime(), exclude_weekends=False
+    )
+    return lambda: alignment.align_symbol_data(symbol_data, timeline, '1h')
+
+
+# ----------------------------- SQLite por símbolo -----------------------------
+
+def _ohlcv_records(df: pd.DataFrame):
+    from core.data.symbol_database_manager import OHLCVData
+
+    timestamps = epoch(df.index, 's').tolist()
+    return [
+        OHLCVData(timestamp=ts, open=o, high=h, low=l, close=c, volume=v)
+        for ts, o, h, l, c, v in zip(
+            timestamps, df['open'].tolist(), df['high'].tolist(),
+            df['low'].tolist(), df['close'].tolist(), df['volume'].tolist()
+        )
+    ]
+
+
+@benchmark('symbol_db.insert')
+def bench_symbol_db_insert(ctx: BenchContext):
+    from core.data.symbol_database_manager import SymbolDatabaseManager
+
+    manager = SymbolDatabaseManager(base_path=str(ctx.path('symbol_db_insert')))
+    ctx.cleanups.append(manager.close_all_connections)
+    records = _ohlcv_records(synthetic_ohlcv(ctx.rows(10000), seed=3))
+    # INSERT OR REPLACE: tras el calentamiento cada iteración reescribe las mismas claves
+    return lambda: manager.insert_data('BTCUSDT', '1h', records)
+
+
+@benchmark('symbol_db.get_data')
+def bench_symbol_db_get_data(ctx: BenchContext):
+    from core.data.symbol_database_manager import SymbolDatabaseManager
+
+    manager = SymbolDatabaseManager(base_path=str(ctx.path('symbol_db_read')))
+    ctx.cleanups.append(manager.close_all_connections)
+    df = synthetic_ohlcv(ctx.rows(10000), seed=3)
+    manager.insert_data('BTCUSDT', '1h', _ohlcv_records(df))
+    start = df.index[len(df) // 4].to_pydatetime()
+    end = df.index[-1].to_pydatetime()
+    return lambda: manager.get_data('BTCUSDT', '1h', start_date=start, end_date=end)
+
+
+# ----------------------------- Caché inteligente -----------------------------
+
+def _cache_manager(ctx: BenchContext, name: str):
+    from core.data.intelligent_cache import CacheConfig, IntelligentCacheManager
+
+    return IntelligentCacheManager(CacheConfig(cache_dir=ctx.path(name), cleanup_interval=86400))
+
+
+def _aligned_data(ctx: BenchContext) -> Dict[str, pd.DataFrame]:
+    return {symbol: synthetic_ohlcv(ctx.rows(5000), seed=20 + i) for i, symbol in enumerate(SYMBOLS)}
+
+
+@benchmark('cache.put')
+def bench_cache_put(ctx: BenchContext):
+    cache = _cache_manager(ctx, 'cache_put')
+    data = _aligned_data(ctx)
+    return lambda: cache.set_aligned_data_cache(SYMBOLS, '1h', data, {'source': 'benchmark'})
+
+
+@benchmark('cache.get')
+def bench_cache_get(ctx: BenchContext):
+    cache = _cache_manager(ctx, 'cache_get')
+    data = _aligned_data(ctx)
+    cache.set_aligned_data_cache(SYMBOLS, '1h', data)
+    start = min(df.index.min() for df in data.values())
+    end = max(df.index.max() for df in data.values())
+
+    def run():
+        result = cache.get_aligned_data_cached(SYMBOLS, '1h', start, end)
+        if result is None:
+            raise RuntimeError("fallo de caché inesperado")
+        return result
+    return run
+
+
+# ----------------------------- Procesador de señales -----------------------------
+
+@benchmark('signal_processor.process_signal')
+def bench_process_signal(ctx: BenchContext):
+    from core.trading.signal_processor import SignalProcessor
+
+    market_data = synthetic_ohlcv(ctx.rows(500), seed=4)
+    prediction = {
+        'action': 'BUY',
+        'confidence': 0.82,
+        'expected_return': 0.012,
+        'probabilities': {'BUY': 0.82, 'HOLD': 0.12, 'SELL': 0.06},
+    }
+
+    class OfflineSignalProcessor(SignalProcessor):
+        """Datos de mercado y predicción sintéticos: se mide solo el pipeline de filtros"""
+
+        async def _get_market_data_sqlite(self, symbol, start_time, end_time, limit=100):
+            return market_data.tail(limit)
+
+        async def _get_ml_prediction(self, symbol, timeframe):
+            return dict(prediction)
+
+    processor = OfflineSignalProcessor()
+    loop = asyncio.new_event_loop()
+    ctx.cleanups.append(loop.close)
+    return lambda: loop.run_until_complete(processor.process_signal('BTCUSDT', '1h'))
+
+
+# ----------------------------- Entrenamiento histórico -----------------------------
+
+@benchmark('train_hist.cycle')
+def bench_train_hist_cycle(ctx: BenchContext):
+    from scripts.training.train_hist_parallel import TrainHistParallel, _load_training_mode_config
+
+    trainer = TrainHistParallel()
+    rows = ctx.rows(5000)
+    trainer.symbols = SYMBOLS
+    trainer.historical_data = {}
+    for i, symbol in enumerate(SYMBOLS):
+        df = synthetic_ohlcv(rows, seed=30 + i)
+        df.insert(0, 'timestamp', epoch(df.index, 'ms'))  # ms, como las DBs históricas
+        df = df.reset_index(drop=True)
+        trainer.historical_data[symbol] = {'1h': df}
+
+    index = pd.date_range('2024-01-01', periods=rows, freq='1h')
+    cycle_timestamps = list(index[-500:].to_pydatetime())
+    mode_config = _load_training_mode_config('ultra_fast')
+
+    def run():
+        # La simulación usa random para el apalancamiento: semilla fija por iteración
+        random.seed(0)
+        trades = 0
+        for symbol in trainer.symbols:
+            cycle_df = trainer._get_historical_data_for_cycle(symbol, cycle_timestamps)
+            indicators = trainer._calculate_real_technical_indicators(cycle_df)
+            trades += len(trainer._simulate_realistic_trades(symbol, cycle_df, indicators, 1000.0, mode_config))
+        return trades
+    return run
+
+
+# ----------------------------- Ejecución -----------------------------
+
+def run_benchmark(name: str, ctx: BenchContext, repeat: int, warmup: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {'name': name, 'status': 'ok'}
+    try:
+        func = BENCHMARKS[name](ctx)
+    except ImportError as e:
+        result.update(status='skipped', detail=f"dependencia no disponible: {e}")
+        return result
+    except Exception as e:
+        result.update(status='error', detail=f"setup: {type(e).__name__}: {e}")
+        return result
+
+    try:
+        for _ in range(warmup):
+            func()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+    except Exception as e:
+        result.update(status='error', detail=f"{type(e).__name__}: {e}")
+        return result
+
+    ordered = sorted(samples)
+    result.update(
+        median_ms=round(statistics.median(ordered), 3),
+        p95_ms=round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 3),
+        min_ms=round(ordered[0], 3),
+        runs=repeat,
+    )
+    return result
+
+
+def compare_with_baseline(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: float
+) -> List[str]:
+    """Devuelve las regresiones de mediana por encima del umbral"""
+    regressions = []
+    base_results = baseline.get('results', {})
+    for result in results:
+        base = base_results.get(result['name'])
+        if not base or 'median_ms' not in base:
+            continue
+        if result['status'] == 'error':
+            regressions.append(f"{result['name']}: falla ({result.get('detail', '')})")
+            continue
+        if result['status'] != 'ok':
+            continue
+        old, new = base['median_ms'], result['median_ms']
+        if old > 0 and new > old * (1 + threshold):
+            regressions.append(f"{result['name']}: {old:.2f} ms -> {new:.2f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_report(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None):
+    base_results = (baseline or {}).get('results', {})
+    print("=" * 96)
+    print(f"{'Benchmark':<36}{'Mediana (ms)':>14}{'p95 (ms)':>12}{'Mín (ms)':>12}{'Base (ms)':>12}{'Δ':>10}")
+    print("-" * 96)
+    for result in results:
+        name = result['name']
+        if result['status'] != 'ok':
+            label = 'OMITIDO' if result['status'] == 'skipped' else 'ERROR'
+            print(f"{name:<36}{label:>14}   {result.get('detail', '')[:44]}")
+            continue
+        base = base_results.get(name, {}).get('median_ms')
+        base_str = f"{base:>12.2f}" if base else f"{'-':>12}"
+        delta = f"{(result['median_ms'] / base - 1) * 100:>+9.0f}%" if base else f"{'-':>10}"
+        print(f"{name:<36}{result['median_ms']:>14.2f}{result['p95_ms']:>12.2f}{result['min_ms']:>12.2f}{base_str}{delta}")
+    print("=" * 96)
+
+
+def select_benchmarks(only: Optional[List[str]]) -> List[str]:
+    if not only:
+        return list(BENCHMARKS)
+    return [name for name in BENCHMARKS if any(name == o or name.startswith(f"{o}.") for o in only)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de rutas calientes con línea base")
+    parser.add_argument('--only', nargs='+', help="Benchmarks o prefijos (p.ej. cache, symbol_db.insert)")
+    parser.add_argument('--list', action='store_true', help="Listar benchmarks disponibles")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--scale', type=float, default=1.0, help="Factor sobre el tamaño de los datos sintéticos")
+    parser.add_argument('--output', help="Guardar resultados de esta ejecución en JSON")
+    parser.add_argument('--save-baseline', help="Guardar resultados como línea base")
+    parser.add_argument('--baseline', help="Comparar contra una línea base")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Regresión tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+
+    names = select_benchmarks(args.only)
+    if not names:
+        print(f"❌ Ningún benchmark coincide con {args.only}")
+        return 2
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    if baseline and baseline.get('scale') != args.scale:
+        print(f"⚠️ La línea base usa scale={baseline.get('scale')} y esta ejecución scale={args.scale}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='hot_paths_') as tmp:
+        ctx = BenchContext(workdir=Path(tmp), scale=args.scale)
+        try:
+            for name in names:
+                print(f"⏱️ {name}...", flush=True)
+                results.append(run_benchmark(name, ctx, args.repeat, args.warmup))
+        finally:
+            for cleanup in ctx.cleanups:
+                try:
+                    cleanup()
+                except Exception:
+                    pass
+
+    print_report(results, baseline)
+
+    document = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': args.scale,
+        'repeat': args.repeat,
+        'results': {r['name']: {k: v for k, v in r.items() if k != 'name'} for r in results},
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(document, indent=2, ensure_ascii=False))
+    if args.save_baseline:
+        print(f"\n💾 Línea base guardada en {args.save_baseline}")
+
+    if baseline:
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regresiones por encima del {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ Sin regresiones por encima del {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
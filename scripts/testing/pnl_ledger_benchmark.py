@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del ledger de PnL
+===========================
+
+Compara la latencia del resumen de PnLTracker (collect_pnl_summary +
+calculate_daily/weekly/monthly_pnl) entre:
+
+- Lista de registros: la ruta anterior, que recorre la lista con list
+  comprehensions por símbolo, por estrategia y por ventana temporal,
+  llamando a ``timestamp.date()`` en cada registro.
+- PnLLedger: agregados mantenidos en cada inserción; el resumen cuesta
+  O(grupos).
+
+Uso:
+    python scripts/testing/pnl_ledger_benchmark.py [--records 100000 1000000] [--symbols 20] [--strategies 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.monitoring.enterprise.pnl_ledger import PnLLedger
+
+
+@dataclass
+class BenchRecord:
+    """Campos de PnLRecord que usan los resúmenes"""
+    __slots__ = ('timestamp', 'symbol', 'strategy', 'pnl', 'fees', 'duration_minutes')
+    timestamp: datetime
+    symbol: str
+    strategy: str
+    pnl: float
+    fees: float
+    duration_minutes: int
+
+
+def make_records(count: int, symbols: List[str], strategies: List[str], now: datetime) -> List[BenchRecord]:
+    rng = random.Random(42)
+    span = 90 * 24 * 3600  # últimos 90 días
+    start = now - timedelta(seconds=span)
+    step = span / count
+    return [
+        BenchRecord(
+            timestamp=start + timedelta(seconds=i * step),
+            symbol=symbols[rng.randrange(len(symbols))],
+            strategy=strategies[rng.randrange(len(strategies))],
+            pnl=rng.gauss(2.0, 50.0),
+            fees=rng.random(),
+            duration_minutes=rng.randrange(1, 1440)
+        )
+        for i in range(count)
+    ]
+
+
+def list_summary(records: List[BenchRecord], symbols: List[str], today) -> Dict[str, float]:
+    """Réplica de collect_pnl_summary + calculate_*_pnl sobre la lista"""
+    total_trades = len(records)
+    winning_trades = len([r for r in records if r.pnl > 0])
+    losing_trades = len([r for r in records if r.pnl < 0])
+    wins = [r.pnl for r in records if r.pnl > 0]
+    losses = [r.pnl for r in records if r.pnl < 0]
+    summary = {
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'avg_win': np.mean(wins) if wins else 0,
+        'avg_loss': np.mean(losses) if losses else 0,
+        'largest_win': max(wins) if wins else 0,
+        'largest_loss': min(losses) if losses else 0,
+        'profit_factor': sum(wins) / abs(sum(losses)) if losses else 0,
+        'total_fees': sum(r.fees for r in records),
+    }
+    for symbol in symbols:
+        summary[f'symbol:{symbol}'] = sum(r.pnl for r in records if r.symbol == symbol)
+    for strategy in set(r.strategy for r in records):
+        summary[f'strategy:{strategy}'] = sum(r.pnl for r in records if r.strategy == strategy)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    summary['daily_pnl'] = sum(r.pnl for r in [r for r in records if r.timestamp.date() == today])
+    summary['weekly_pnl'] = sum(r.pnl for r in [r for r in records if r.timestamp.date() >= week_start])
+    summary['monthly_pnl'] = sum(r.pnl for r in [r for r in records if r.timestamp.date() >= month_start])
+    return summary
+
+
+def ledger_summary(ledger: PnLLedger, symbols: List[str], today) -> Dict[str, float]:
+    """Misma información leída de los agregados del ledger"""
+    totals = ledger.total
+    summary = {
+        'total_trades': totals.count,
+        'winning_trades': totals.wins,
+        'losing_trades': totals.losses,
+        'avg_win': totals.win_sum / totals.wins if totals.wins else 0,
+        'avg_loss': totals.loss_sum / totals.losses if totals.losses else 0,
+        'largest_win': ledger.largest_win,
+        'largest_loss': ledger.largest_loss,
+        'profit_factor': totals.win_sum / abs(totals.loss_sum) if totals.loss_sum else 0,
+        'total_fees': totals.fees_sum,
+    }
+    for symbol in symbols:
+        summary[f'symbol:{symbol}'] = ledger.symbol_pnl(symbol)
+    for strategy, pnl in ledger.strategy_pnl().items():
+        summary[f'strategy:{strategy}'] = pnl
+    summary['daily_pnl'] = ledger.pnl_on(today)
+    summary['weekly_pnl'] = ledger.pnl_since(today - timedelta(days=today.weekday()))
+    summary['monthly_pnl'] = ledger.pnl_since(today.replace(day=1))
+    return summary
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del ledger de PnL")
+    parser.add_argument('--records', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--strategies', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:02d}USDT" for i in range(args.symbols)]
+    strategies = [f"strategy_{i}" for i in range(args.strategies)]
+    now = datetime.now()
+    today = now.date()
+
+    rows = []
+    for count in args.records:
+        records = make_records(count, symbols, strategies, now)
+
+        ledger = PnLLedger(max_records=count)
+        start = time.perf_counter()
+        for record in records:
+            ledger.append(record)
+        insert_us = (time.perf_counter() - start) / count * 1e6
+
+        list_s = timed(lambda: list_summary(records, symbols, today), args.repeat)
+        ledger_s = timed(lambda: ledger_summary(ledger, symbols, today), args.repeat * 100)
+
+        expected = list_summary(records, symbols, today)
+        got = ledger_summary(ledger, symbols, today)
+        mismatches = [
+            key for key, value in expected.items()
+            if not np.isclose(value, got.get(key, 0.0), rtol=1e-9, atol=1e-6)
+        ]
+        rows.append((count, list_s, ledger_s, insert_us, mismatches))
+        del records, ledger
+
+    print("=" * 84)
+    print(f"Resumen de PnL: {args.symbols} símbolos, {args.strategies} estrategias, 90 días de registros")
+    print(f"{'Registros':>12}{'Lista (ms)':>14}{'Ledger (ms)':>14}{'Speedup':>12}{'append (µs)':>14}{'Coincide':>12}")
+    print("-" * 84)
+    for count, list_s, ledger_s, insert_us, mismatches in rows:
+        print(f"{count:>12,}{list_s * 1000:>14.1f}{ledger_s * 1000:>14.4f}"
+              f"{list_s / max(ledger_s, 1e-12):>11,.0f}x{insert_us:>14.2f}"
+              f"{'sí' if not mismatches else 'NO: ' + ','.join(mismatches[:3]):>12}")
+    print("=" * 84)
+    return 0 if all(not row[4] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
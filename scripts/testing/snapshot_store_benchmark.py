@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del almacén de snapshots de monitores
+===============================================
+
+Compara el coste de escritura por snapshot entre la ruta anterior
+(reescribir un JSON con indent=2 en cada ciclo) y SnapshotStore (append con
+lotes), y mide consultas por rango, últimos N y downsampling sobre
+``--days`` días de snapshots cada ``--interval`` segundos.
+
+Uso:
+    python scripts/testing/snapshot_store_benchmark.py [--days 7] [--interval 5] [--batch-size 100]
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.monitoring.enterprise.snapshot_store import SnapshotStore
+
+RISK_FIELDS = (
+    'portfolio_value', 'total_exposure', 'exposure_percentage', 'margin_used', 'margin_available',
+    'margin_ratio', 'current_drawdown', 'max_drawdown', 'var_95', 'var_99', 'expected_shortfall',
+    'sharpe_ratio', 'calmar_ratio', 'max_position_size', 'correlation_risk', 'concentration_risk',
+    'liquidity_risk', 'market_risk', 'operational_risk', 'risk_score'
+)
+
+
+def make_snapshot(rng: random.Random, timestamp: datetime) -> Dict[str, Any]:
+    """Snapshot con la forma de RiskMetrics"""
+    snapshot = {'timestamp': timestamp}
+    snapshot.update({name: rng.random() * 100 for name in RISK_FIELDS})
+    snapshot.update(risk_level=rng.choice(['low', 'medium', 'high']), alerts_count=rng.randrange(5),
+                    circuit_breaker_active=False)
+    return snapshot
+
+
+def json_rewrite(path: Path, snapshot: Dict[str, Any]):
+    """Ruta anterior: reescribir el archivo completo en cada ciclo"""
+    data = dict(snapshot, timestamp=snapshot['timestamp'].isoformat())
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del almacén de snapshots")
+    parser.add_argument('--days', type=float, default=7.0)
+    parser.add_argument('--interval', type=float, default=5.0, help="segundos entre snapshots")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--write-samples', type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='snapshot_bench_'))
+    rng = random.Random(42)
+    try:
+        now = datetime.now().replace(microsecond=0)
+        start_ts = now - timedelta(days=args.days)
+        total = int(args.days * 86400 / args.interval)
+        snapshots = [make_snapshot(rng, start_ts + timedelta(seconds=i * args.interval)) for i in range(total)]
+        sample = snapshots[:args.write_samples]
+
+        # --- Escritura ---
+        json_path = workdir / 'risk_metrics.json'
+        start = time.perf_counter()
+        for snapshot in sample:
+            json_rewrite(json_path, snapshot)
+        json_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+        results = {}
+        for label, batch_size in (('commit por snapshot', 1), (f'lote de {args.batch_size}', args.batch_size)):
+            store = SnapshotStore(str(workdir / f'write_{batch_size}.db'), batch_size=batch_size, flush_interval_s=3600)
+            start = time.perf_counter()
+            for snapshot in sample:
+                store.append('risk', snapshot)
+            store.flush()
+            results[label] = (time.perf_counter() - start) / len(sample) * 1e6
+            store.close()
+
+        # --- Consultas sobre el historial completo ---
+        store = SnapshotStore(str(workdir / 'history.db'), batch_size=args.batch_size, flush_interval_s=3600)
+        start = time.perf_counter()
+        for snapshot in snapshots:
+            store.append('risk', snapshot)
+        store.flush()
+        load_s = time.perf_counter() - start
+        db_mb = sum(p.stat().st_size for p in workdir.glob('history.db*')) / 1e6
+
+        last_day = now - timedelta(days=1)
+        last_hour = now - timedelta(hours=1)
+        queries = {
+            'rango 1h (todas las columnas)': lambda: store.query('risk', last_hour, now),
+            'rango 24h (3 columnas)': lambda: store.query('risk', last_day, now, ['risk_score', 'var_99', 'current_drawdown']),
+            'últimos 1000 snapshots': lambda: store.latest('risk', 1000),
+            f'downsample {args.days:g}d → 5 min (avg)': lambda: store.downsample('risk', 300, ['risk_score', 'var_99']),
+            f'downsample {args.days:g}d → 1 h (last)': lambda: store.downsample('risk', 3600, ['risk_score'], how='last'),
+        }
+        query_rows = [(name, timed(fn) * 1000, len(fn())) for name, fn in queries.items()]
+        store.close()
+
+        print("=" * 72)
+        print(f"Escritura por snapshot ({len(sample):,} snapshots de riesgo)")
+        print(f"{'Ruta':<36}{'µs/snapshot':>16}{'vs JSON':>12}")
+        print("-" * 72)
+        print(f"{'JSON indent=2 (reescritura)':<36}{json_us:>16.1f}{'1.0x':>12}")
+        for label, value in results.items():
+            print(f"{'SnapshotStore ' + label:<36}{value:>16.1f}{json_us / value:>11.1f}x")
+        print("=" * 72)
+        print(f"Historial: {total:,} snapshots ({args.days:g} días cada {args.interval:g}s), "
+              f"carga {load_s:.2f}s, {db_mb:.1f} MB")
+        print(f"{'Consulta':<40}{'ms':>12}{'Filas':>12}")
+        print("-" * 72)
+        for name, ms, rows in query_rows:
+            print(f"{name:<40}{ms:>12.2f}{rows:>12,}")
+        print("=" * 72)
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de las estadísticas de riesgo en streaming
+====================================================
+
+Compara, con un historial de ``--returns`` retornos, el coste por tick de:
+
+- Recálculo completo: la ruta anterior de PerformanceMonitor, donde cada
+  ``calculate_*`` reconstruye ``np.array(returns_history)`` y lo recorre
+  (std, percentile, cumprod/drawdown...).
+- StreamingRiskStats: un retorno nuevo por tick (O(1)) más ``snapshot()``,
+  que los tres monitores comparten.
+
+También mide la carga inicial del historial (``update_many``) y el error de
+las métricas frente al cálculo exacto.
+
+Uso:
+    python scripts/testing/streaming_stats_benchmark.py [--returns 1000000] [--ticks 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.monitoring.enterprise.streaming_stats import StreamingRiskStats
+
+RISK_FREE = 0.02
+
+
+def full_recompute(returns_history: List[float]) -> Dict[str, float]:
+    """Réplica de los calculate_* anteriores (cada uno reconstruye el array)"""
+    metrics = {}
+
+    returns = np.array(returns_history)
+    metrics['volatility'] = np.std(returns) * np.sqrt(252) * 100
+
+    returns = np.array(returns_history)
+    excess = returns - RISK_FREE / 252
+    metrics['sharpe_ratio'] = np.mean(excess) / np.std(excess) * np.sqrt(252)
+
+    returns = np.array(returns_history)
+    excess = returns - RISK_FREE / 252
+    downside = excess[excess < 0]
+    metrics['sortino_ratio'] = np.mean(excess) / np.std(downside) * np.sqrt(252)
+
+    # Calmar llamaba de nuevo a max_drawdown
+    for key in ('calmar_drawdown', 'max_drawdown'):
+        returns = np.array(returns_history)
+        cumulative = np.cumprod(1 + returns)
+        running_max = np.maximum.accumulate(cumulative)
+        metrics[key] = np.min((cumulative - running_max) / running_max) * 100
+
+    for level, key in ((0.95, 'var_95'), (0.99, 'var_99')):
+        returns = np.array(returns_history)
+        metrics[key] = np.percentile(returns, (1 - level) * 100) * 100
+
+    returns = np.array(returns_history)
+    var_95 = np.percentile(returns, 5)
+    metrics['expected_shortfall'] = np.mean(returns[returns <= var_95]) * 100
+    return metrics
+
+
+def streaming_metrics(stats: StreamingRiskStats) -> Dict[str, float]:
+    snapshot = stats.snapshot()
+    return {
+        'volatility': snapshot.volatility * 100,
+        'sharpe_ratio': snapshot.sharpe_ratio,
+        'sortino_ratio': snapshot.sortino_ratio,
+        'max_drawdown': snapshot.max_drawdown * 100,
+        'var_95': snapshot.var_95 * 100,
+        'var_99': snapshot.var_99 * 100,
+        'expected_shortfall': snapshot.expected_shortfall * 100,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de estadísticas de riesgo en streaming")
+    parser.add_argument('--returns', type=int, default=1_000_000, help="tamaño del historial")
+    parser.add_argument('--ticks', type=int, default=20, help="ticks medidos (un retorno nuevo por tick)")
+    parser.add_argument('--monitors', type=int, default=3, help="monitores que leen por tick")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    history = (rng.standard_t(4, size=args.returns) * 0.004 + 0.0002).tolist()
+    new_returns = (rng.standard_t(4, size=args.ticks) * 0.004).tolist()
+
+    # --- Recálculo completo ---
+    returns_history = list(history)
+    start = time.perf_counter()
+    for value in new_returns:
+        returns_history.append(value)
+        for _ in range(args.monitors):
+            reference = full_recompute(returns_history)
+    full_tick_ms = (time.perf_counter() - start) / args.ticks * 1000
+
+    # --- Streaming ---
+    stats = StreamingRiskStats(risk_free_rate=RISK_FREE)
+    start = time.perf_counter()
+    stats.update_many(history)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in new_returns:
+        stats.update(value)
+        for _ in range(args.monitors):
+            streamed = streaming_metrics(stats)
+    stream_tick_ms = (time.perf_counter() - start) / args.ticks * 1000
+
+    start = time.perf_counter()
+    probe = StreamingRiskStats(risk_free_rate=RISK_FREE)
+    sample = history[:100_000]
+    for value in sample:
+        probe.update(value)
+    update_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    print("=" * 72)
+    print(f"Historial: {args.returns:,} retornos, {args.ticks} ticks, {args.monitors} monitores por tick")
+    print(f"{'Ruta':<36}{'ms/tick':>14}{'Speedup':>12}")
+    print("-" * 72)
+    print(f"{'Recálculo completo (np.array + scan)':<36}{full_tick_ms:>14.2f}{'1.0x':>12}")
+    print(f"{'StreamingRiskStats':<36}{stream_tick_ms:>14.4f}{full_tick_ms / max(stream_tick_ms, 1e-9):>11,.0f}x")
+    print("-" * 72)
+    print(f"Carga del historial (update_many): {load_s:.2f}s | update(): {update_us:.2f} µs/retorno")
+    print(f"{'Métrica':<22}{'Exacto':>16}{'Streaming':>16}{'Error rel.':>14}")
+    for key, value in streamed.items():
+        exact = reference[key]
+        error = abs(value - exact) / abs(exact) if exact else 0.0
+        print(f"{key:<22}{exact:>16.6f}{value:>16.6f}{error:>13.3%}")
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del sincronizador de timestamps
+=========================================
+
+Genera bases SQLite sintéticas ``{symbol}_1h.db`` (tabla market_data) con
+huecos aleatorios y filas OHLC incoherentes, y compara:
+
+- Ruta SQL anterior: ``datetime(timestamp)`` por símbolo + intersección de
+  sets y dos consultas por símbolo y timestamp para la calidad; ventanas con
+  una consulta ``LIMIT 100`` por símbolo.
+- TimestampSynchronizer vectorizado: carga única por símbolo, intersect1d y
+  máscaras de calidad con searchsorted; ventanas desde la caché columnar.
+
+La ruta SQL anterior es O(timestamps × símbolos) consultas, así que se mide
+sobre ``--legacy-days`` y se extrapola al periodo completo.
+
+Uso:
+    python scripts/testing/timestamp_sync_benchmark.py [--symbols 20] [--years 2] [--legacy-days 3]
+"""
+
+import argparse
+import asyncio
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.sync.timestamp_synchronizer import TimestampSynchronizer
+
+START = datetime(2023, 1, 1)
+
+
+def build_databases(root: Path, symbols: List[str], hours: int, gap_ratio: float, bad_ratio: float) -> int:
+    """Crea una base por símbolo con timestamps ISO (formato de los datos históricos)"""
+    rng = np.random.default_rng(42)
+    index = pd.date_range(START, periods=hours, freq='1h')
+    total = 0
+    for i, symbol in enumerate(symbols):
+        keep = rng.random(hours) >= gap_ratio
+        close = 100 * (1 + i) * np.exp(np.cumsum(rng.normal(0, 0.005, hours)))
+        open_ = close * (1 + rng.normal(0, 0.001, hours))
+        high = np.maximum(open_, close) * 1.002
+        low = np.minimum(open_, close) * 0.998
+        bad = rng.random(hours) < bad_ratio
+        high = np.where(bad, low * 0.99, high)
+        frame = pd.DataFrame({
+            'timestamp': index.strftime('%Y-%m-%d %H:%M:%S'),
+            'open': open_, 'high': high, 'low': low, 'close': close,
+            'volume': rng.exponential(100, hours),
+        })[keep]
+        db_dir = root / symbol
+        db_dir.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(str(db_dir / f"{symbol}_1h.db")) as conn:
+            frame.to_sql('market_data', conn, index=False)
+        total += len(frame)
+    return total
+
+
+class LegacySqlSync:
+    """Réplica de la ruta anterior: consultas SQL por símbolo y timestamp"""
+
+    def __init__(self, root: Path, symbols: List[str], min_quality: float = 0.8):
+        self.root = root
+        self.symbols = symbols
+        self.min_quality = min_quality
+
+    def _db(self, symbol: str, timeframe: str = '1h') -> Path:
+        return self.root / symbol / f"{symbol}_{timeframe}.db"
+
+    def common_timestamps(self, start: datetime, end: datetime) -> List[datetime]:
+        sets = []
+        for symbol in self.symbols:
+            with sqlite3.connect(str(self._db(symbol))) as conn:
+                rows = conn.execute(
+                    "SELECT DISTINCT datetime(timestamp) as ts FROM market_data "
+                    "WHERE datetime(timestamp) BETWEEN ? AND ? ORDER BY ts",
+                    # Separador ' ' como datetime(): con 'T' la primera barra quedaba fuera
+                    (start.isoformat(sep=' '), end.isoformat(sep=' '))
+                ).fetchall()
+            sets.append({datetime.fromisoformat(row[0]) for row in rows})
+        return sorted(set.intersection(*sets)) if sets else []
+
+    def _available(self, conn, timestamp: datetime) -> bool:
+        return conn.execute(
+            "SELECT COUNT(*) FROM market_data WHERE datetime(timestamp) = ?", (timestamp.isoformat(sep=' '),)
+        ).fetchone()[0] > 0
+
+    def _quality(self, conn, timestamp: datetime) -> float:
+        row = conn.execute(
+            "SELECT open, high, low, close, volume FROM market_data WHERE datetime(timestamp) = ?",
+            (timestamp.isoformat(sep=' '),)
+        ).fetchone()
+        if not row:
+            return 0.0
+        o, h, l, c, v = row
+        if any(x is None for x in row) or not (l <= o <= h and l <= c <= h):
+            return 0.5
+        return 0.8 if v <= 0 else 1.0
+
+    def score(self, timestamp: datetime) -> float:
+        scores = []
+        for symbol in self.symbols:
+            with sqlite3.connect(str(self._db(symbol))) as conn:
+                scores.append((self._available(conn, timestamp) + self._quality(conn, timestamp)) / 2)
+        return sum(scores) / len(scores)
+
+    def build(self, start: datetime, end: datetime) -> int:
+        common = self.common_timestamps(start, end)
+        validated = [t for t in common if self.score(t) >= self.min_quality]
+        # La ruta anterior recalculaba el score al crear cada SyncPoint
+        for t in validated:
+            self.score(t)
+        return len(validated)
+
+    def windows(self, timestamp: datetime, size: int = 100) -> int:
+        rows = 0
+        for symbol in self.symbols:
+            with sqlite3.connect(str(self._db(symbol))) as conn:
+                frame = pd.read_sql_query(
+                    f"SELECT * FROM market_data WHERE timestamp <= ? ORDER BY timestamp DESC LIMIT {size}",
+                    conn, params=(timestamp.strftime('%Y-%m-%d %H:%M:%S'),)
+                )
+            rows += len(frame)
+        return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del sincronizador de timestamps")
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--years', type=float, default=2.0)
+    parser.add_argument('--gap-ratio', type=float, default=0.002, help="fracción de barras ausentes por símbolo")
+    parser.add_argument('--bad-ratio', type=float, default=0.001, help="fracción de barras OHLC incoherentes")
+    parser.add_argument('--legacy-days', type=float, default=3.0, help="periodo medido con la ruta SQL")
+    parser.add_argument('--windows', type=int, default=500, help="timestamps para get_synchronized_data")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:02d}USDT" for i in range(args.symbols)]
+    hours = int(args.years * 365 * 24)
+    end = START + timedelta(hours=hours - 1)
+    workdir = Path(tempfile.mkdtemp(prefix='tsync_bench_'))
+
+    try:
+        start = time.perf_counter()
+        total_rows = build_databases(workdir, symbols, hours, args.gap_ratio, args.bad_ratio)
+        print(f"📦 {total_rows:,} barras en {args.symbols} bases ({time.perf_counter() - start:.1f}s)")
+
+        # --- Vectorizado ---
+        sync = TimestampSynchronizer(symbols, ['1h'], data_root=str(workdir))
+        start = time.perf_counter()
+        sync.preload()
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        points = asyncio.run(sync.build_sync_timeline(START, end))
+        timeline_s = time.perf_counter() - start
+
+        rng = np.random.default_rng(7)
+        probes = [points[i].timestamp for i in rng.integers(0, len(points), args.windows)] if points else []
+
+        async def serve_windows():
+            for timestamp in probes:
+                await sync.get_synchronized_data(timestamp, '1h')
+
+        start = time.perf_counter()
+        asyncio.run(serve_windows())
+        windows_s = time.perf_counter() - start
+
+        # --- Ruta SQL anterior (sub-periodo, extrapolada) ---
+        legacy = LegacySqlSync(workdir, symbols)
+        legacy_end = START + timedelta(days=args.legacy_days)
+        start = time.perf_counter()
+        legacy_points = legacy.build(START, legacy_end)
+        legacy_partial_s = time.perf_counter() - start
+        legacy_timeline_s = legacy_partial_s * hours / (args.legacy_days * 24)
+
+        legacy_probes = probes[:max(1, args.windows // 10)]
+        start = time.perf_counter()
+        for timestamp in legacy_probes:
+            legacy.windows(timestamp)
+        legacy_window_s = (time.perf_counter() - start) / max(len(legacy_probes), 1)
+
+        expected = sum(1 for p in points if p.timestamp <= legacy_end)
+
+        print("=" * 78)
+        print(f"Sincronización: {args.symbols} símbolos × {args.years:g} años 1h ({hours:,} barras/símbolo)")
+        print(f"{'Operación':<40}{'SQL anterior':>18}{'Vectorizado':>18}{'x':>2}")
+        print("-" * 78)
+        print(f"{'Carga columnar (una vez)':<40}{'-':>18}{load_s:>17.2f}s")
+        print(f"{'build_sync_timeline (periodo completo)':<40}{legacy_timeline_s:>17.1f}s*{timeline_s:>17.3f}s"
+              f"  {legacy_timeline_s / max(timeline_s, 1e-9):,.0f}x")
+        per_window_ms = windows_s / max(len(probes), 1) * 1000
+        print(f"{'get_synchronized_data (por timestamp)':<40}{legacy_window_s * 1000:>16.2f}ms"
+              f"{per_window_ms:>16.2f}ms  {legacy_window_s * 1000 / max(per_window_ms, 1e-9):,.0f}x")
+        print("-" * 78)
+        print(f"Puntos de sincronización: {len(points):,}  "
+              f"(primeros {args.legacy_days:g} días: SQL {legacy_points} / vectorizado {expected})")
+        print(f"* extrapolado desde {legacy_partial_s:.2f}s medidos sobre {args.legacy_days:g} días")
+        print("=" * 78)
+        return 0 if legacy_points == expected else 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
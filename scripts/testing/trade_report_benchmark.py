@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de generación de reportes de trades
+=============================================
+
+Compara tiempo y RSS pico de la generación de reportes (CSV y JSON):
+
+- En memoria: la ruta anterior de TradeReporting. Lee todos los eventos
+  TRADE_OPENED/TRADE_CLOSED de la tabla de auditoría con ``fetchall``,
+  reconstruye los ``TradeRecord`` y escribe el reporte con varias pasadas
+  sobre la lista (resumen y estadísticas por símbolo).
+- Streaming: chunks del TradeLedger materializado, escritores incrementales
+  y agregación en una sola pasada.
+
+La tabla de auditoría se replica en SQLite (mismo esquema que el
+SQLiteAuditSink de tests/unit/audit_sinks). Cada medición se ejecuta en un
+proceso hijo para aislar el RSS pico. La ruta en memoria se mide con ``--legacy-trades`` trades
+(crece linealmente); la de streaming con ``--trades``.
+
+Uso:
+    python scripts/testing/trade_report_benchmark.py [--trades 5000000] [--legacy-trades 500000] [--formats csv json]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.compliance.enterprise.audit_writer import AuditRecord
+from core.compliance.enterprise.report_writers import write_csv_report, write_json_report
+from core.compliance.enterprise.trade_ledger import TradeLedger, TradeStatistics
+
+SYMBOLS = [f"SYM{i:02d}USDT" for i in range(50)]
+START = datetime(2024, 1, 1)
+END = datetime(2024, 12, 31, 23, 59, 59)
+
+
+def synthetic_events(count: int, seed: int = 42):
+    """Aperturas y cierres con la forma de log_trade_opened/log_trade_closed"""
+    rng = random.Random(seed)
+    # Los cierres (como mucho 10 horas después) caen dentro del período
+    step = (END - START - timedelta(days=1)).total_seconds() / count
+    for i in range(count):
+        opened = START + timedelta(seconds=i * step)
+        trade_id = hashlib.sha256(str(i).encode()).hexdigest()
+        open_data = {
+            'symbol': SYMBOLS[rng.randrange(len(SYMBOLS))], 'side': rng.choice(('buy', 'sell')),
+            'size': round(rng.uniform(0.01, 5), 4), 'price': round(rng.uniform(10, 60000), 2),
+            'leverage': rng.randrange(1, 26), 'strategy': 'strategy_%d' % rng.randrange(5),
+            'action': 'trade_opened'
+        }
+        duration = rng.randrange(1, 600)
+        close_data = {
+            'trade_id': trade_id, 'symbol': open_data['symbol'], 'side': open_data['side'],
+            'size': open_data['size'], 'entry_price': open_data['price'],
+            'exit_price': round(open_data['price'] * rng.uniform(0.98, 1.02), 2),
+            'pnl': round(rng.gauss(2, 400), 2), 'duration_minutes': duration,
+            'reason': 'signal', 'action': 'trade_closed'
+        }
+        close_id = hashlib.sha256(f"close-{i}".encode()).hexdigest()
+        yield trade_id, opened, open_data, close_id, opened + timedelta(minutes=duration), close_data
+
+
+# ----------------------------- Preparación -----------------------------
+
+def build_audit_table(path: Path, count: int):
+    """Tabla audit_events con los eventos de trade (payload JSON)"""
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE audit_events (id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, event_type TEXT NOT NULL, "
+        "data TEXT NOT NULL, severity TEXT, user_id TEXT, session_id TEXT, checksum TEXT, "
+        "encrypted_data BLOB, retention_until TEXT)"
+    )
+    conn.execute("CREATE INDEX idx_audit_type_ts ON audit_events(event_type, timestamp)")
+    batch = []
+    for trade_id, opened, open_data, close_id, closed, close_data in synthetic_events(count):
+        batch.append((trade_id, opened.isoformat(sep=' '), 'trade_opened', json.dumps(open_data),
+                      'info', 'system', 'bench', '', None, None))
+        batch.append((close_id, closed.isoformat(sep=' '), 'trade_closed', json.dumps(close_data),
+                      'info', 'system', 'bench', '', None, None))
+        if len(batch) >= 20000:
+            conn.executemany("INSERT INTO audit_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO audit_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def _audit_record(event_id: str, timestamp: datetime, event_type: str, data: Dict[str, Any]) -> AuditRecord:
+    return AuditRecord(event_id, timestamp, event_type, 'info', 'system', 'bench', '', json.dumps(data))
+
+
+def build_ledger(path: Path, count: int, batch_size: int = 512) -> float:
+    """
+    Alimenta el ledger como lo hace el escritor de auditoría (apply_records
+    por lote); devuelve µs por evento, sin contar la generación de eventos
+    """
+    ledger = TradeLedger(str(path))
+    elapsed, batch = 0.0, []
+    for trade_id, opened, open_data, close_id, closed, close_data in synthetic_events(count):
+        batch.append(_audit_record(trade_id, opened, 'trade_opened', open_data))
+        batch.append(_audit_record(close_id, closed, 'trade_closed', close_data))
+        if len(batch) >= batch_size:
+            start = time.perf_counter()
+            ledger.apply_records(batch)
+            elapsed += time.perf_counter() - start
+            batch = []
+    start = time.perf_counter()
+    ledger.apply_records(batch)
+    elapsed += time.perf_counter() - start
+    ledger.close()
+    return elapsed / (2 * count) * 1e6
+
+
+# ----------------------------- Ruta en memoria -----------------------------
+
+@dataclass
+class Event:
+    id: str
+    timestamp: datetime
+    data: Dict[str, Any]
+    user_id: str
+    session_id: str
+
+
+@dataclass
+class TradeRecord:
+    trade_id: str
+    timestamp: datetime
+    symbol: str
+    side: str
+    size: float
+    price: float
+    value: float
+    leverage: float
+    fees: float
+    pnl: float
+    strategy: str
+    user_id: str
+    session_id: str
+    entry_time: Optional[datetime] = None
+    exit_time: Optional[datetime] = None
+    duration_minutes: Optional[int] = None
+    entry_price: Optional[float] = None
+    exit_price: Optional[float] = None
+
+
+def legacy_fetch(conn: sqlite3.Connection, event_type: str) -> List[Event]:
+    """Réplica de get_events_by_type: fetchall + eventos con data decodificada"""
+    rows = conn.execute(
+        "SELECT id, timestamp, event_type, data, severity, user_id, session_id, checksum, encrypted_data, "
+        "retention_until FROM audit_events WHERE event_type = ? AND timestamp >= ? AND timestamp <= ? "
+        "ORDER BY timestamp DESC",
+        (event_type, START.isoformat(sep=' '), END.isoformat(sep=' '))
+    ).fetchall()
+    return [Event(row[0], datetime.fromisoformat(row[1]), json.loads(row[3]), row[5], row[6]) for row in rows]
+
+
+def legacy_trades(audit_path: Path) -> List[TradeRecord]:
+    """Réplica de get_trades_by_period"""
+    conn = sqlite3.connect(str(audit_path))
+    trade_events = legacy_fetch(conn, 'trade_opened')
+    close_events = legacy_fetch(conn, 'trade_closed')
+    conn.close()
+    close_events_dict = {event.data.get('trade_id', event.id): event for event in close_events}
+    trades = []
+    for event in trade_events:
+        close_event = close_events_dict.get(event.id)
+        trades.append(TradeRecord(
+            trade_id=event.id, timestamp=event.timestamp, symbol=event.data.get('symbol', ''),
+            side=event.data.get('side', ''), size=event.data.get('size', 0), price=event.data.get('price', 0),
+            value=event.data.get('size', 0) * event.data.get('price', 0), leverage=event.data.get('leverage', 1),
+            fees=event.data.get('fees', 0), pnl=close_event.data.get('pnl', 0) if close_event else 0,
+            strategy=event.data.get('strategy', 'unknown'), user_id=event.user_id, session_id=event.session_id,
+            entry_time=event.timestamp, exit_time=close_event.timestamp if close_event else None,
+            duration_minutes=close_event.data.get('duration_minutes') if close_event else None,
+            entry_price=event.data.get('price', 0),
+            exit_price=close_event.data.get('exit_price', 0) if close_event else None
+        ))
+    return trades
+
+
+def legacy_summary(trades: List[TradeRecord]) -> Dict[str, Any]:
+    """Réplica de _create_summary_data + _create_symbol_statistics (varias pasadas)"""
+    total_volume = sum(trade.value for trade in trades)
+    summary = {
+        'total_trades': len(trades),
+        'total_volume': total_volume,
+        'total_pnl': sum(trade.pnl for trade in trades),
+        'winning_trades': len([t for t in trades if t.pnl > 0]),
+        'losing_trades': len([t for t in trades if t.pnl < 0]),
+    }
+    groups: Dict[str, List[TradeRecord]] = {}
+    for trade in trades:
+        groups.setdefault(trade.symbol, []).append(trade)
+    summary['symbols'] = {
+        symbol: (len(items), sum(t.value for t in items), sum(t.pnl for t in items), len([t for t in items if t.pnl > 0]))
+        for symbol, items in groups.items()
+    }
+    return summary
+
+
+def legacy_trade_dict(trade: TradeRecord, empty: Any) -> Dict[str, Any]:
+    return {
+        'trade_id': trade.trade_id, 'timestamp': trade.timestamp.isoformat(), 'symbol': trade.symbol,
+        'side': trade.side, 'size': trade.size, 'price': trade.price, 'value': trade.value,
+        'leverage': trade.leverage, 'fees': trade.fees, 'pnl': trade.pnl, 'strategy': trade.strategy,
+        'user_id': trade.user_id, 'session_id': trade.session_id,
+        'entry_time': trade.entry_time.isoformat() if trade.entry_time else empty,
+        'exit_time': trade.exit_time.isoformat() if trade.exit_time else empty,
+        'duration_minutes': trade.duration_minutes or empty, 'entry_price': trade.entry_price or empty,
+        'exit_price': trade.exit_price or empty
+    }
+
+
+def run_legacy(audit_path: Path, fmt: str, out: Path) -> Dict[str, Any]:
+    trades = legacy_trades(audit_path)
+    if fmt == 'csv':
+        with open(out, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(TradeRecord.__dataclass_fields__))
+            writer.writeheader()
+            for trade in trades:
+                writer.writerow(legacy_trade_dict(trade, ''))
+        summary = legacy_summary(trades)
+    else:
+        summary = legacy_summary(trades)
+        report = {
+            'report_info': {'generated_at': datetime.now().isoformat(), 'total_trades': len(trades), 'format': 'json'},
+            'trades': [legacy_trade_dict(trade, None) for trade in trades],
+            'summary': summary['total_trades'],
+        }
+        with open(out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+# ----------------------------- Ruta streaming -----------------------------
+
+def stats_summary(stats: TradeStatistics) -> Dict[str, Any]:
+    return {
+        'total_trades': stats.total_trades,
+        'total_volume': stats.total_volume,
+        'total_pnl': stats.total_pnl,
+        'winning_trades': stats.winning_trades,
+        'losing_trades': stats.losing_trades,
+        'symbols': {symbol: tuple(group) for symbol, group in stats.by_symbol.items()},
+    }
+
+
+def run_streaming(ledger_path: Path, fmt: str, out: Path, chunk_size: int) -> Dict[str, Any]:
+    ledger = TradeLedger(str(ledger_path))
+    chunks = ledger.iter_chunks(START, END, chunk_size=chunk_size)
+    if fmt == 'csv':
+        stats = write_csv_report(chunks, out)
+    else:
+        info = {'generated_at': datetime.now().isoformat(), 'total_trades': ledger.count(START, END), 'format': 'json'}
+        stats = write_json_report(chunks, out, info)
+    ledger.close()
+    return stats_summary(stats)
+
+
+# ----------------------------- Procesos hijos -----------------------------
+
+def _child(queue, task, *args):
+    try:
+        start = time.perf_counter()
+        result = task(*args)
+        queue.put({
+            'seconds': time.perf_counter() - start,
+            'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'result': result,
+        })
+    except BaseException as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+        raise
+
+
+def measure(task, *args) -> Dict[str, Any]:
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(queue, task) + args)
+    process.start()
+    outcome = queue.get()
+    process.join()
+    if 'error' in outcome:
+        raise RuntimeError(f"{getattr(task, '__name__', task)}: {outcome['error']}")
+    return outcome
+
+
+def summaries_match(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    def close(x, y):
+        return abs(x - y) <= 1e-6 * max(1.0, abs(x), abs(y))
+    if any(not close(a[key], b[key]) for key in ('total_trades', 'total_volume', 'total_pnl',
+                                                   'winning_trades', 'losing_trades')):
+        return False
+    return a['symbols'].keys() == b['symbols'].keys() and all(
+        all(close(x, y) for x, y in zip(a['symbols'][s], b['symbols'][s])) for s in a['symbols']
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de reportes de trades")
+    parser.add_argument('--trades', type=int, default=5_000_000)
+    parser.add_argument('--legacy-trades', type=int, default=500_000)
+    parser.add_argument('--formats', nargs='+', default=['csv', 'json'], choices=['csv', 'json'])
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='trade_report_bench_'))
+    try:
+        baseline = measure(lambda: None)['rss_mb']
+        audit_path = workdir / 'audit.db'
+        measure(build_audit_table, audit_path, args.legacy_trades)
+        small_ledger = workdir / 'ledger_small.db'
+        measure(build_ledger, small_ledger, args.legacy_trades)
+        large_ledger = workdir / 'ledger_large.db'
+        ingest = measure(build_ledger, large_ledger, args.trades)
+
+        rows, ok = [], True
+        for fmt in args.formats:
+            legacy = measure(run_legacy, audit_path, fmt, workdir / f'legacy.{fmt}')
+            small = measure(run_streaming, small_ledger, fmt, workdir / f'small.{fmt}', args.chunk_size)
+            large = measure(run_streaming, large_ledger, fmt, workdir / f'large.{fmt}', args.chunk_size)
+            match = summaries_match(legacy['result'], small['result'])
+            ok &= match and large['result']['total_trades'] == args.trades
+            rows.append((fmt, 'En memoria (fetchall)', args.legacy_trades, legacy, match))
+            rows.append((fmt, 'Streaming (ledger)', args.legacy_trades, small, match))
+            rows.append((fmt, 'Streaming (ledger)', args.trades, large, None))
+            for path in workdir.glob(f'*.{fmt}'):
+                path.unlink()
+
+        print("=" * 88)
+        print(f"Reportes de trades | chunk {args.chunk_size:,} | RSS base del proceso {baseline:.0f} MB")
+        print(f"Ledger: {ingest['result']:.2f} µs por evento en el hilo del escritor (apply_records), "
+              f"{args.trades:,} trades")
+        print(f"{'Formato':<8}{'Ruta':<26}{'Trades':>12}{'Tiempo (s)':>12}{'RSS pico (MB)':>16}{'Coincide':>12}")
+        print("-" * 88)
+        for fmt, label, count, outcome, match in rows:
+            status = '' if match is None else ('sí' if match else 'NO')
+            print(f"{fmt:<8}{label:<26}{count:>12,}{outcome['seconds']:>12.1f}{outcome['rss_mb']:>16.0f}{status:>12}")
+        print("=" * 88)
+        return 0 if ok else 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -170,6 +170,7 @@ except ImportError as e:
         return WorkingFallbackConfig()
 
 # Configurar logging
+Path('data/logs').mkdir(parents=True, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
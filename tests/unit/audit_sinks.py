@@ -0,0 +1,106 @@
+"""Sink SQLite para pruebas y benchmarks del escritor de auditoría"""
+
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+from core.compliance.enterprise.audit_integrity import EVENT_COLUMNS, SEGMENT_COLUMNS, SegmentRoot
+from core.compliance.enterprise.audit_writer import (
+    AuditRecord, DurabilityMode, _INSERT_COLUMNS, _iso, _segment_row
+)
+
+
+class SQLiteAuditSink:
+    """
+    Sink SQLite con el mismo contrato que PostgresAuditSink
+
+    Sirve como sustituto local de PostgreSQL para pruebas y benchmarks.
+    ``fail_writes`` simula una BD caída durante ese número de lotes.
+    """
+
+    def __init__(self, path: str, fail_writes: int = 0):
+        self.fail_writes = fail_writes
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS audit_events (
+                id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                data TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                encrypted_data BLOB,
+                retention_until TEXT,
+                seq INTEGER
+            )
+            """
+        )
+        self.connection.executescript(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_seq ON audit_events(seq);
+            CREATE TABLE IF NOT EXISTS audit_segments (
+                segment_id INTEGER PRIMARY KEY,
+                first_seq INTEGER NOT NULL,
+                last_seq INTEGER NOT NULL,
+                event_count INTEGER NOT NULL,
+                first_ts TEXT NOT NULL,
+                last_ts TEXT NOT NULL,
+                merkle_root TEXT NOT NULL,
+                prev_hash TEXT NOT NULL,
+                chain_hash TEXT NOT NULL,
+                retention_until TEXT,
+                pruned INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_segments_ts ON audit_segments(first_ts, last_ts);
+            """
+        )
+        self.connection.commit()
+
+    def write_batch(
+        self,
+        records: List[AuditRecord],
+        durability: DurabilityMode,
+        segments: Sequence[SegmentRoot] = ()
+    ):
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise sqlite3.OperationalError("database is unavailable")
+        sql = f"INSERT OR IGNORE INTO audit_events ({_INSERT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        rows = [
+            (r.event_id, r.timestamp.isoformat(), r.event_type, r.payload, r.severity, r.user_id,
+             r.session_id, r.checksum, r.encrypted_data,
+             r.retention_until.isoformat() if r.retention_until else None, r.seq)
+            for r in records
+        ]
+        if durability == DurabilityMode.EVENT:
+            for row in rows:
+                self.connection.execute(sql, row)
+                self.connection.commit()
+        else:
+            self.connection.executemany(sql, rows)
+        if segments:
+            self.connection.executemany(
+                f"INSERT INTO audit_segments ({SEGMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [_segment_row(segment, _iso) for segment in segments]
+            )
+        self.connection.commit()
+
+    def load_chain_state(self) -> Tuple[Optional[Tuple], List[Tuple]]:
+        """Último segmento (id, last_seq, chain_hash) y eventos posteriores sin sellar"""
+        last_segment = self.connection.execute(
+            "SELECT segment_id, last_seq, chain_hash FROM audit_segments ORDER BY segment_id DESC LIMIT 1"
+        ).fetchone()
+        rows = self.connection.execute(
+            f"SELECT {EVENT_COLUMNS}, retention_until FROM audit_events WHERE seq > ? ORDER BY seq",
+            (last_segment[1] if last_segment else 0,)
+        ).fetchall()
+        return last_segment, rows
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
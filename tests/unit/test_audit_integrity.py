@@ -0,0 +1,77 @@
+"""Tests de la cadena de integridad del log de auditoría (raíces Merkle)"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.compliance.enterprise.audit_integrity import (
+    AuditIntegrityVerifier, IntegrityChain, IntegritySource
+)
+from core.compliance.enterprise.audit_writer import AuditBatchWriter, AuditRecord
+from tests.unit.audit_sinks import SQLiteAuditSink
+
+
+def _records(start: datetime, first: int, count: int):
+    records = []
+    for i in range(first, first + count):
+        payload = json.dumps({'i': i, 'symbol': 'BTCUSDT'}, sort_keys=True, separators=(',', ':'))
+        timestamp = start + timedelta(seconds=i, microseconds=i)
+        records.append(AuditRecord(
+            event_id=f"evt-{i}", timestamp=timestamp, event_type='trade_opened', severity='info',
+            user_id='system', session_id='s1', checksum=hashlib.sha256(payload.encode()).hexdigest(),
+            payload=payload, retention_until=timestamp + timedelta(days=1)
+        ))
+    return records
+
+
+def _build(path, start: datetime, total: int = 103, segment_size: int = 10):
+    sink = SQLiteAuditSink(str(path))
+    writer = AuditBatchWriter(db_sink=sink, integrity=IntegrityChain(segment_size=segment_size))
+    for first in range(0, total, 25):
+        writer.write_batch(_records(start, first, min(25, total - first)))
+    return sink, writer
+
+
+@pytest.mark.unit
+def test_chain_verifies_ranges_and_resumes(tmp_path):
+    start = datetime(2024, 6, 1, 9, 0)
+    sink, writer = _build(tmp_path / 'audit.db', start)
+    assert writer.stats['segments_sealed'] == 10 and writer.integrity.open_events == 3
+
+    verifier = AuditIntegrityVerifier(IntegritySource('sqlite', str(tmp_path / 'audit.db')), workers=1)
+    report = verifier.verify(mode='full')
+    assert report.ok and report.segments_checked == 10
+    assert report.events_checked == 100 and report.unsealed_events == 3
+
+    # Reinicio sin sellar: la cadena se retoma y sella los 3 eventos pendientes
+    chain, recovered = IntegrityChain.resume(*sink.load_chain_state(), segment_size=10)
+    assert recovered.first_seq == 101 and recovered.event_count == 3 and chain.next_seq == 104
+    sink.write_batch([], writer.durability, [recovered])
+
+    partial = verifier.verify(start + timedelta(seconds=40), start + timedelta(seconds=55), mode='roots')
+    assert partial.ok and partial.segments_checked == 2
+    assert verifier.verify(mode='full').events_checked == 103
+    sink.close()
+
+
+@pytest.mark.unit
+def test_verifier_detects_tampering(tmp_path):
+    start = datetime(2024, 6, 1, 9, 0)
+    sink, _ = _build(tmp_path / 'audit.db', start, total=50)
+    sink.close()
+    verifier = AuditIntegrityVerifier(IntegritySource('sqlite', str(tmp_path / 'audit.db')), workers=1)
+
+    with sqlite3.connect(tmp_path / 'audit.db') as conn:
+        conn.execute("UPDATE audit_events SET data = ? WHERE seq = 17", ('{"i":999,"symbol":"BTCUSDT"}',))
+        conn.execute("UPDATE audit_events SET severity = 'warning' WHERE seq = 33")
+        conn.execute("DELETE FROM audit_events WHERE seq = 45")
+    report = verifier.verify(mode='full')
+    assert [failure['segment_id'] for failure in report.failures] == [2, 4, 5]
+    assert verifier.verify(mode='roots').ok
+
+    with sqlite3.connect(tmp_path / 'audit.db') as conn:
+        conn.execute("UPDATE audit_segments SET merkle_root = ? WHERE segment_id = 3", ('0' * 64,))
+    assert [failure['reason'] for failure in verifier.verify(mode='roots').failures] == ['chain_hash']
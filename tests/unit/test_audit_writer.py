@@ -0,0 +1,126 @@
+"""Tests del escritor de auditoría por lotes"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from core.compliance.enterprise.audit_writer import (
+    AuditBatchWriter, AuditRecord, AuditBackpressureError, JsonlSegmentWriter,
+    DurabilityMode, BackpressurePolicy
+)
+from tests.unit.audit_sinks import SQLiteAuditSink
+
+
+def _record(i: int) -> AuditRecord:
+    return AuditRecord(
+        event_id=f"evt-{i}",
+        timestamp=datetime(2024, 1, 1, 12, 0, 0),
+        event_type='order_placed',
+        severity='info',
+        user_id='system',
+        session_id='test',
+        checksum='x',
+        payload=json.dumps({'i': i})
+    )
+
+
+@pytest.mark.unit
+def test_batches_are_persisted_to_db_and_segments(tmp_path):
+    sink = SQLiteAuditSink(str(tmp_path / 'audit.db'))
+    writer = AuditBatchWriter(
+        db_sink=sink,
+        file_writer=JsonlSegmentWriter(directory=str(tmp_path), max_segment_bytes=2048),
+        durability=DurabilityMode.BATCH
+    )
+
+    async def run():
+        for i in range(100):
+            await writer.submit(_record(i))
+        await writer.stop()
+
+    asyncio.run(run())
+
+    assert sink.count() == 100
+    lines = [
+        json.loads(line)
+        for path in sorted(tmp_path.glob('audit_20240101*.jsonl'))
+        for line in path.read_text().splitlines()
+    ]
+    assert [line['data']['i'] for line in lines] == list(range(100))
+    assert len(list(tmp_path.glob('audit_20240101*.jsonl'))) > 1
+    assert writer.get_stats()['batches_written'] < 100
+
+
+@pytest.mark.unit
+def test_reject_policy_raises_when_queue_full(tmp_path):
+    writer = AuditBatchWriter(
+        file_writer=JsonlSegmentWriter(directory=str(tmp_path)),
+        backpressure=BackpressurePolicy.REJECT,
+        queue_size=2
+    )
+
+    async def run():
+        # Sin ceder el control, la tarea de fondo no drena la cola
+        await writer.submit(_record(0))
+        await writer.submit(_record(1))
+        with pytest.raises(AuditBackpressureError):
+            await writer.submit(_record(2))
+        await writer.stop()
+
+    asyncio.run(run())
+    assert writer.get_stats()['events_rejected'] == 1
+
+
+@pytest.mark.unit
+def test_failed_batches_are_retried_then_spilled_and_replayed(tmp_path):
+    # Un fallo: el primer lote se recupera con un reintento
+    sink = SQLiteAuditSink(str(tmp_path / 'audit.db'), fail_writes=1)
+    writer = AuditBatchWriter(
+        db_sink=sink,
+        file_writer=JsonlSegmentWriter(directory=str(tmp_path)),
+        db_retries=1,
+        retry_backoff_s=0.0
+    )
+    writer.write_batch([_record(0)])
+    assert sink.count() == 1
+    assert writer.stats['db_retries'] == 1
+
+    # BD caída más allá de los reintentos: el lote se vuelca a disco
+    sink.fail_writes = 2
+    writer.write_batch([_record(1), _record(2)])
+    assert sink.count() == 1
+    assert writer.stats['events_spilled'] == 2
+    spill_files = list(tmp_path.glob('audit_spill_*.jsonl'))
+    assert len(spill_files) == 1
+    assert [json.loads(line)['id'] for line in spill_files[0].read_text().splitlines()] == ['evt-1', 'evt-2']
+
+    # El siguiente lote que entra en la BD reenvía los desbordados
+    writer.write_batch([_record(3)])
+    assert sink.count() == 4
+    assert writer.stats['events_replayed'] == 2
+    assert not list(tmp_path.glob('audit_spill_*.jsonl'))
+    sink.close()
+
+
+@pytest.mark.unit
+def test_event_durability_waits_for_persistence(tmp_path):
+    sink = SQLiteAuditSink(str(tmp_path / 'audit.db'))
+    writer = AuditBatchWriter(db_sink=sink, durability=DurabilityMode.EVENT)
+
+    async def run():
+        await writer.submit(_record(0))
+        # Sin esperar a flush(): el evento ya está en la BD al volver submit
+        assert sink.count() == 1
+        await writer.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_segment_size_counts_encoded_bytes(tmp_path):
+    writer = JsonlSegmentWriter(directory=str(tmp_path))
+    writer.write('{"símbolo": "€"}\n', '20240101')
+    writer.close()
+    assert writer._segment_bytes == (tmp_path / 'audit_20240101.jsonl').stat().st_size
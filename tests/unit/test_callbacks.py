@@ -0,0 +1,80 @@
+"""Tests de los callbacks de telemetría de entrenamiento"""
+
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("pytorch_lightning")
+pytest.importorskip("matplotlib")
+
+from torch import nn
+
+from core.ml.enterprise.callbacks import GradientNormCallback, TradingMetricsCallback
+
+
+class _Module(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.encoder = nn.Linear(4, 8)
+        self.head = nn.Linear(8, 3)
+        self.logged = {}
+
+    def forward(self, x):
+        return self.head(torch.relu(self.encoder(x)))
+
+    def log(self, name, value, **kwargs):
+        self.logged[name] = value
+
+
+@pytest.mark.unit
+def test_gradient_norms_are_aggregated_and_flushed_on_cadence():
+    torch.manual_seed(0)
+    module = _Module()
+    callback = GradientNormCallback(log_every_n_steps=4, per_layer=True)
+    callback.on_fit_start(None, module)
+
+    totals = []
+    for step in range(1, 5):
+        module.zero_grad()
+        module(torch.randn(16, 4)).pow(2).mean().backward()
+        totals.append(sum(p.grad.norm() ** 2 for p in module.parameters()).sqrt().item())
+        callback.on_before_optimizer_step(SimpleNamespace(global_step=step), module, None)
+        if step < 4:
+            assert not module.logged
+
+    assert module.logged["grad_norm/total"] == pytest.approx(sum(totals) / 4, rel=1e-5)
+    assert module.logged["grad_norm/total_max"] == pytest.approx(max(totals), rel=1e-5)
+    assert module.logged["grad_norm/explosive"] == 0.0
+    assert {"grad_norm/group/encoder", "grad_norm/group/head", "grad_norm/encoder.weight"} <= set(module.logged)
+    assert callback.gradient_norms == [pytest.approx(sum(totals) / 4, rel=1e-5)]
+
+
+@pytest.mark.unit
+def test_trading_metrics_from_running_confusion_counts():
+    torch.manual_seed(0)
+    module = _Module()
+    callback = TradingMetricsCallback()
+    callback.on_validation_epoch_start(None, module)
+
+    batches = [(torch.randn(32, 3), torch.randint(0, 3, (32,))) for _ in range(5)]
+    for idx, (logits, targets) in enumerate(batches):
+        callback.on_validation_batch_end(None, module, logits, (None, targets), idx)
+    # Las validaciones que devuelven la loss escalar se ignoran
+    callback.on_validation_batch_end(None, module, torch.tensor(0.5), (None, targets), 5)
+    callback.on_validation_epoch_end(None, module)
+
+    preds = torch.cat([logits for logits, _ in batches])
+    targets = torch.cat([t for _, t in batches])
+    pred_classes = preds.argmax(dim=1)
+    probs = torch.softmax(preds, dim=1)
+    sell = targets == 0
+    assert module.logged["trading/accuracy_sell"] == pytest.approx(
+        (pred_classes[sell] == 0).float().mean().item(), rel=1e-6)
+    assert module.logged["trading/pred_distribution_buy"] == pytest.approx(
+        (pred_classes == 2).float().mean().item(), rel=1e-6)
+    assert module.logged["trading/average_confidence"] == pytest.approx(
+        probs.max(dim=1)[0].mean().item(), rel=1e-5)
+    assert module.logged["trading/average_entropy"] == pytest.approx(
+        (-(probs * torch.log(probs + 1e-8)).sum(dim=1)).mean().item(), rel=1e-5)
+    assert callback.confusion is None
@@ -0,0 +1,123 @@
+"""Tests del gestor de checkpoints top-k asíncrono"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("pytorch_lightning")
+pytest.importorskip("matplotlib")
+
+from torch import nn
+
+from core.ml.enterprise.checkpoint_manager import CheckpointManager, load_checkpoint
+
+
+@pytest.mark.unit
+def test_only_top_k_epochs_are_snapshotted_and_written(tmp_path):
+    model = nn.Linear(4, 2)
+    manager = CheckpointManager(save_dir=str(tmp_path), save_top_k=2)
+    calls = []
+
+    def state_fn():
+        calls.append(1)
+        return {'model_state_dict': model.state_dict()}
+
+    for epoch, loss in enumerate([0.9, 0.8, 1.5, 0.5, float('nan'), 0.7]):
+        manager.save(epoch, loss, state_fn, info={'val_loss': loss})
+    manager.close()
+
+    # Las épocas 2 (1.5) y 4 (NaN) no entran en el top-2: no se construye su estado
+    assert len(calls) == 4 and manager.stats['skipped'] == 2
+    assert [p.name for p, _ in manager.top_k()] == ["checkpoint_epoch_003.pth", "checkpoint_epoch_005.pth"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["checkpoint_epoch_003.pth", "checkpoint_epoch_005.pth"]
+    assert load_checkpoint(str(tmp_path / "checkpoint_epoch_003.pth"))['metrics']['val_loss'] == 0.5
+
+
+@pytest.mark.unit
+def test_snapshot_is_isolated_and_last_delta_roundtrips(tmp_path):
+    model = nn.Sequential(nn.Linear(4, 4), nn.Linear(4, 2))
+    model[0].weight.requires_grad_(False)
+    manager = CheckpointManager(save_dir=str(tmp_path), save_top_k=1, save_last=True,
+                                last_delta=True, last_base_every=3)
+
+    expected = None
+    for epoch in range(5):
+        manager.save(epoch, 1.0 - epoch * 0.1, lambda: {'model_state_dict': model.state_dict()},
+                     model_state_fn=model.state_dict)
+        expected = {k: v.clone() for k, v in model.state_dict().items()}
+        with torch.no_grad():
+            # Se modifica el modelo tras encolar: el snapshot no debe verse afectado
+            model[1].weight.add_(1.0)
+    manager.close()
+
+    last = load_checkpoint(str(tmp_path / "last.pth"))
+    assert last['epoch'] == 4
+    assert all(torch.equal(last['model_state_dict'][k], v) for k, v in expected.items())
+    delta = torch.load(tmp_path / "last.pth")
+    assert "0.weight" not in delta['model_state_dict'] and "1.weight" in delta['model_state_dict']
+    assert sorted(p.name for p in tmp_path.glob("last_base_*")) == ["last_base_epoch_003.pth"]
+    best = load_checkpoint(str(tmp_path / "checkpoint_epoch_004.pth"))
+    assert torch.equal(best['model_state_dict']['1.weight'], expected['1.weight'])
+
+
+@pytest.mark.unit
+def test_failed_write_keeps_evicted_checkpoints(tmp_path, monkeypatch):
+    from core.ml.enterprise import checkpoint_manager
+
+    model = nn.Linear(4, 2)
+    manager = CheckpointManager(save_dir=str(tmp_path), save_top_k=2)
+    state_fn = lambda: {'model_state_dict': model.state_dict()}
+    manager.save(0, 0.9, state_fn)
+    manager.save(1, 0.8, state_fn)
+    manager.wait()
+
+    real_save = checkpoint_manager.atomic_save
+
+    def failing_save(payload, path):
+        if path.name == "checkpoint_epoch_002.pth":
+            raise OSError("disco lleno")
+        real_save(payload, path)
+
+    monkeypatch.setattr(checkpoint_manager, "atomic_save", failing_save)
+    manager.save(2, 0.5, state_fn)
+    manager.close()
+
+    # La época 2 no llegó a disco: la 0 sigue en el top-2 y su fichero no se borra
+    assert manager.stats['errors'] == 1 and manager.stats['deleted'] == 0
+    assert [p.name for p, _ in manager.top_k()] == ["checkpoint_epoch_001.pth", "checkpoint_epoch_000.pth"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["checkpoint_epoch_000.pth", "checkpoint_epoch_001.pth"]
+
+
+@pytest.mark.unit
+def test_failed_write_behind_newer_save_keeps_top_k_consistent(tmp_path, monkeypatch):
+    import threading
+
+    from core.ml.enterprise import checkpoint_manager
+
+    model = nn.Linear(4, 2)
+    manager = CheckpointManager(save_dir=str(tmp_path), save_top_k=2, max_pending=4)
+    state_fn = lambda: {'model_state_dict': model.state_dict()}
+    manager.save(0, 0.9, state_fn)
+    manager.save(1, 0.8, state_fn)
+    manager.wait()
+
+    real_save = checkpoint_manager.atomic_save
+    release = threading.Event()
+
+    def failing_save(payload, path):
+        if path.name == "checkpoint_epoch_002.pth":
+            release.wait(5)
+            raise OSError("disco lleno")
+        real_save(payload, path)
+
+    monkeypatch.setattr(checkpoint_manager, "atomic_save", failing_save)
+    # Mientras la escritura de la 2 sigue en curso, las épocas 3 y 4 la desplazan
+    manager.save(2, 0.5, state_fn)
+    manager.save(3, 0.4, state_fn)
+    manager.save(4, 0.3, state_fn)
+    release.set()
+    manager.close()
+
+    # Al fallar la 2, la 0 que desplazaba no cabe en el top-2: se recorta y se borra
+    listed = [p.name for p, _ in manager.top_k()]
+    assert listed == ["checkpoint_epoch_004.pth", "checkpoint_epoch_003.pth"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(listed)
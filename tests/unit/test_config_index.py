@@ -0,0 +1,55 @@
+"""Tests del índice plano de configuración"""
+
+from dataclasses import dataclass
+
+import pytest
+
+from core.config.config_index import FlatConfigIndex, ConfigSnapshot, config_field
+
+
+@dataclass(frozen=True)
+class _RiskSnapshot(ConfigSnapshot):
+    max_risk: float = config_field('risk.max_risk', 0.02)
+    symbols: tuple = config_field('trading.symbols', ())
+
+
+@pytest.mark.unit
+def test_priority_and_none_fallthrough():
+    index = FlatConfigIndex()
+    index.compile([
+        ('env', {'risk': {'max_risk': None}, 'a': {'b': 1}}),
+        ('core', {'risk': {'max_risk': 0.05}, 'a': {'b': 2, 'c': 3}}),
+    ])
+
+    assert index.get('risk.max_risk') == 0.05
+    assert index.get('a.b') == 1
+    assert index.get('a') == {'b': 1}
+    assert index.get('a.c') == 3
+    assert index.get('missing.key', 'default') == 'default'
+
+
+@pytest.mark.unit
+def test_priority_by_root():
+    index = FlatConfigIndex()
+    index.compile(
+        [('general.yaml', {'trading': {'mode': 'paper'}}), ('trading.yaml', {'trading': {'mode': 'live'}})],
+        priority=lambda root: ['trading.yaml'] if root == 'trading' else []
+    )
+    assert index.get('trading.mode') == 'live'
+
+
+@pytest.mark.unit
+def test_snapshot_is_typed_frozen_and_invalidated():
+    index = FlatConfigIndex()
+    index.compile([('core', {'risk': {'max_risk': '0.03'}, 'trading': {'symbols': ['BTCUSDT']}})])
+
+    snapshot = index.snapshot(_RiskSnapshot)
+    assert snapshot.max_risk == 0.03
+    assert snapshot.symbols == ('BTCUSDT',)
+    assert index.snapshot(_RiskSnapshot) is snapshot
+    with pytest.raises(Exception):
+        snapshot.max_risk = 1.0
+
+    index.compile([('core', {'risk': {'max_risk': 0.01}})])
+    assert not index.is_current(snapshot)
+    assert index.snapshot(_RiskSnapshot).max_risk == 0.01
@@ -0,0 +1,70 @@
+"""Tests de la validación fusionada y el cache columnar del pipeline de datos"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+dd = pytest.importorskip("dask.dataframe")
+pytest.importorskip("pyarrow")
+pytest.importorskip("mlflow")
+pytest.importorskip("redis")
+pytest.importorskip("kafka")
+
+from core.ml.enterprise.data_pipeline import (
+    DataPipelineConfig, DataValidator, EnterpriseDataPipeline, from_arrow_ipc, to_arrow_ipc
+)
+
+
+def _ohlcv(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(rows).cumsum()
+    frame = pd.DataFrame({
+        'timestamp': 1_700_000_000 + 60 * np.arange(rows),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': rng.uniform(1, 10, rows)
+    })
+    frame.loc[[10, 20], 'volume'] = -1.0
+    frame.loc[300:, 'timestamp'] += 7200
+    frame.loc[50, 'close'] = 10_000.0
+    return frame
+
+
+def _sequential_report(frame, threshold=3.0):
+    """Referencia en pandas con el orden de comprobaciones del validador"""
+    report = {}
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        report[f"invalid_{col}"] = int((frame[col] <= 0).sum())
+        frame = frame[frame[col] > 0]
+    timestamps = pd.to_datetime(frame['timestamp'], unit='s')
+    report['gaps'] = int((timestamps.diff().dt.total_seconds() / 60 > 60).sum())
+    for col in ['close', 'volume']:
+        z_scores = (frame[col] - frame[col].mean()) / frame[col].std()
+        report[f"outliers_{col}"] = int((z_scores.abs() > threshold).sum())
+        frame = frame[z_scores.abs() <= threshold]
+    return report, len(frame)
+
+
+@pytest.mark.unit
+def test_fused_validation_matches_sequential_checks(tmp_path):
+    frame = _ohlcv()
+    expected, expected_rows = _sequential_report(frame)
+    data = dd.from_pandas(frame, npartitions=4)
+
+    valid, report = DataValidator().validate(data)
+    assert valid and report == expected
+
+    for checkpoint_dir in (None, str(tmp_path / 'checkpoints')):
+        config = DataPipelineConfig(redis_url=None, checkpoint_dir=checkpoint_dir, log_file=str(tmp_path / 'pipeline.log'))
+        pipeline = EnterpriseDataPipeline(config)
+        validated, lazy_report = DataValidator().build(data)
+        materialized, report = pipeline._materialize(validated, lazy_report, 'BTCUSDT_1m')
+        assert report == expected
+        assert len(materialized.compute()) == expected_rows
+
+
+@pytest.mark.unit
+def test_arrow_ipc_cache_roundtrip():
+    frame = _ohlcv(100).set_index('timestamp')
+    frame['symbol'] = 'BTCUSDT'
+    restored = from_arrow_ipc(to_arrow_ipc(frame))
+    pd.testing.assert_frame_equal(restored, frame)
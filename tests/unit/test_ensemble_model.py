@@ -0,0 +1,69 @@
+"""Tests de la inferencia en una pasada del EnsembleModel"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("pytorch_lightning")
+pytest.importorskip("matplotlib")
+
+from core.ml.enterprise.model_architecture import EnsembleModel, aggregate_predictions
+
+BASE_MODELS = ["gru_simple", "cnn_lstm", "lstm_attention"]
+
+
+def _ensemble(method):
+    torch.manual_seed(0)
+    return EnsembleModel(BASE_MODELS, [0.5, 0.3, 0.2], aggregation_method=method).eval()
+
+
+@pytest.mark.unit
+def test_tensor_voting_matches_per_class_loop():
+    stacked = torch.randn(4, 32, 3)
+    pred_classes = stacked.argmax(dim=-1).T
+    expected = torch.zeros(32, 3)
+    for i in range(3):
+        expected[:, i] = (pred_classes == i).sum(dim=1).float() / 4
+    assert torch.equal(aggregate_predictions(stacked, "voting", torch.ones(4), 3), expected)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method", ["weighted_average", "voting", "stacking"])
+def test_parallel_and_torchscript_match_sequential(method):
+    model = _ensemble(method)
+    x = torch.randn(8, 60, 50)
+    with torch.no_grad():
+        expected = model(x)
+        model.configure_parallel_inference(intra_op_threads=torch.get_num_threads())
+        concurrent = model(x)
+        model.configure_parallel_inference(enabled=False)
+        scripted = model.export_torchscript(torch.randn(2, 60, 50))(x)
+
+    assert torch.allclose(concurrent, expected, atol=1e-5)
+    assert torch.allclose(scripted, expected, atol=1e-4)
+
+
+@pytest.mark.unit
+def test_parallel_inference_keeps_caller_context_and_is_serializable():
+    import copy
+    import io
+
+    model = _ensemble("weighted_average")
+    x = torch.randn(4, 60, 50)
+    threads = torch.get_num_threads()
+    model.configure_parallel_inference(intra_op_threads=1)
+    try:
+        assert torch.get_num_threads() == 1
+        with torch.no_grad():
+            assert not model(x).requires_grad
+        with torch.inference_mode():
+            assert model(x).is_inference()
+        assert model(x).requires_grad
+
+        # El pool de hilos no viaja en la copia; se recrea al primer forward
+        clone = copy.deepcopy(model)
+        torch.save(model, io.BytesIO())
+        with torch.no_grad():
+            assert torch.allclose(clone(x), model(x))
+    finally:
+        model.configure_parallel_inference(enabled=False)
+    assert torch.get_num_threads() == threads
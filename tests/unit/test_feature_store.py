@@ -0,0 +1,92 @@
+"""Tests del feature store columnar"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from core.data.feature_store import FeatureStore
+
+
+def _rolling(df):
+    out = df.copy()
+    out['sma_5'] = out['close'].rolling(5).mean()
+    out['ema_10'] = out['close'].ewm(span=10, adjust=False).mean()
+    return out
+
+
+def _cumulative(df):
+    out = df.copy()
+    out['obv_like'] = out['volume'].cumsum()
+    return out
+
+
+GROUPS = {'rolling': _rolling, 'cumulative': _cumulative}
+
+
+def _ohlcv(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=rows, freq='1min')
+    close = 100 + rng.standard_normal(rows).cumsum()
+    return pd.DataFrame({'close': close, 'volume': rng.exponential(10, rows)}, index=index)
+
+
+def _expected(df):
+    return pd.concat([df, _rolling(df)[['sma_5', 'ema_10']], _cumulative(df)[['obv_like']]], axis=1)
+
+
+@pytest.mark.unit
+def test_warm_hit_and_column_projection(tmp_path):
+    store = FeatureStore(root=tmp_path)
+    df = _ohlcv(500)
+
+    cold = store.materialize(df, GROUPS, series_key='TEST')
+    warm = store.materialize(df, GROUPS, series_key='TEST')
+    projected = store.materialize(df, GROUPS, series_key='TEST', columns=['sma_5'])
+
+    pd.testing.assert_frame_equal(cold, _expected(df))
+    pd.testing.assert_frame_equal(warm, cold)
+    assert list(projected.columns) == ['close', 'volume', 'sma_5']
+    assert store.stats['group_full_computes'] == 2
+    assert store.stats['group_hits'] == 4
+
+
+@pytest.mark.unit
+def test_incremental_append_matches_full_recompute(tmp_path):
+    store = FeatureStore(root=tmp_path, warmup_rows=200, max_parts=3)
+    full = _ohlcv(2000)
+
+    store.materialize(full.iloc[:1000], GROUPS, series_key='TEST')
+    for stop in (1300, 1600, 2000):
+        result = store.materialize(full.iloc[:stop], GROUPS, series_key='TEST')
+
+    pd.testing.assert_frame_equal(result, _expected(full), check_exact=False, rtol=1e-6)
+    # Las ventanas móviles se añaden por cola; el acumulado no reproduce el solape
+    assert store.stats['group_appends'] == 3
+    assert store.stats['base_appends'] == 3
+
+    # Una fila cambiada trunca la serie en ese punto en lugar de reiniciarla
+    changed = full.copy()
+    changed.iloc[10, 0] += 1.0
+    result = store.materialize(changed, GROUPS, series_key='TEST')
+    pd.testing.assert_frame_equal(result, _expected(changed), check_exact=False, rtol=1e-6)
+    assert store.stats['base_truncations'] == 1
+    assert store.stats['base_resets'] == 0
+
+
+@pytest.mark.unit
+def test_revised_last_bar_only_recomputes_the_tail(tmp_path):
+    store = FeatureStore(root=tmp_path, warmup_rows=200)
+    full = _ohlcv(600)
+    store.materialize(full.iloc[:400], GROUPS, series_key='TEST')
+
+    # La última vela guardada se cerró con otro precio y llegan velas nuevas
+    revised = full.copy()
+    revised.iloc[399, 0] += 0.5
+    result = store.materialize(revised, GROUPS, series_key='TEST')
+
+    pd.testing.assert_frame_equal(result, _expected(revised), check_exact=False, rtol=1e-6)
+    assert store.stats['base_truncations'] == 1
+    assert store.stats['group_appends'] == 1
+    assert store.load('TEST', ['close'])['close'].iloc[399] == revised['close'].iloc[399]
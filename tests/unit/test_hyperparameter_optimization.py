@@ -0,0 +1,89 @@
+"""Tests de la búsqueda de hiperparámetros por procesos con pruning"""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+optuna = pytest.importorskip("optuna")
+pytest.importorskip("mlflow")
+pytest.importorskip("plotly")
+pytest.importorskip("matplotlib")
+pytest.importorskip("redis")
+
+from optuna.trial import TrialState
+
+from core.ml.enterprise.hyperparameter_optimization import (
+    DEFAULT_PRUNER_WARMUP_EPOCHS, EnterpriseHyperparameterTuner, HyperparameterSpace, SharedTrialData,
+    _build_pruner
+)
+
+
+def _trial_function(params, data, report):
+    """Curva sintética: mejora por época según la distancia a learning_rate=1e-3"""
+    assert isinstance(data['X'], np.memmap)
+    quality = -abs(np.log10(params['learning_rate']) + 3) + float(data['X'][0, 0])
+    metrics = {}
+    for epoch in range(10):
+        metrics = {'val_loss': 1.0 - quality * (epoch + 1) / 10, 'val_accuracy': 0.5}
+        report(epoch, metrics)
+    return metrics
+
+
+def _tuner(tmp_path, **overrides):
+    config = {
+        'study_name': 'test_processes',
+        'storage': f"journal:///{tmp_path / 'study.log'}",
+        'n_trials': 24,
+        'timeout': 120,
+        'sampler': {'name': 'random'},
+        'pruner': {'name': 'median', 'n_startup_trials': 4, 'n_warmup_steps': 2},
+        'start_method': 'fork',
+        'mlflow_logging': False,
+        'shared_data_dir': str(tmp_path / 'shared'),
+    }
+    config.update(overrides)
+    return EnterpriseHyperparameterTuner(config)
+
+
+@pytest.mark.unit
+def test_process_search_shares_study_and_prunes(tmp_path):
+    tuner = _tuner(tmp_path)
+    arrays = {'X': np.ones((100, 4), dtype=np.float32), 'y': np.zeros(100, dtype=np.int64)}
+    result = asyncio.run(tuner.optimize_processes(_trial_function, arrays, HyperparameterSpace(), n_workers=2))
+
+    assert result['success'], result
+    trials = tuner.study.get_trials(deepcopy=False)
+    finished = [t for t in trials if t.state in (TrialState.COMPLETE, TrialState.PRUNED)]
+    assert 24 <= len(finished) <= 26
+    assert result['pruned_trials'] > 0
+    assert all(len(t.intermediate_values) == 10 for t in trials if t.state == TrialState.COMPLETE)
+
+
+@pytest.mark.unit
+def test_rerun_adds_n_trials_to_existing_study(tmp_path):
+    arrays = {'X': np.ones((100, 4), dtype=np.float32), 'y': np.zeros(100, dtype=np.int64)}
+    for _ in range(2):
+        tuner = _tuner(tmp_path, n_trials=6)
+        result = asyncio.run(tuner.optimize_processes(_trial_function, arrays, HyperparameterSpace(), n_workers=2))
+        assert result['success'], result
+
+    finished = tuner.study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED))
+    assert 12 <= len(finished) <= 14
+
+
+@pytest.mark.unit
+def test_shared_trial_data_is_memory_mapped(tmp_path):
+    shared = SharedTrialData.from_arrays({'X': np.arange(12.0).reshape(3, 4)}, str(tmp_path))
+    loaded = shared.load()
+    assert isinstance(loaded['X'], np.memmap) and not loaded['X'].flags.writeable
+    assert loaded['X'][2, 3] == 11.0
+
+
+@pytest.mark.unit
+def test_median_pruner_warmup_fits_short_runs():
+    # Por defecto unas pocas épocas; derivado de max_epochs; el configurado manda
+    assert _build_pruner({})._n_warmup_steps == DEFAULT_PRUNER_WARMUP_EPOCHS == 3
+    assert _build_pruner({'max_epochs': 50})._n_warmup_steps == 5
+    assert _build_pruner({'max_epochs': 5})._n_warmup_steps == 1
+    assert _build_pruner({'max_epochs': 50, 'pruner': {'n_warmup_steps': 8}})._n_warmup_steps == 8
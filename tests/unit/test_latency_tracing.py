@@ -0,0 +1,82 @@
+"""Tests de las trazas de latencia por etapa"""
+
+import asyncio
+import json
+
+import pytest
+
+from core.integration.latency_tracing import LatencyTracer, StageHistogram, traced
+
+
+@pytest.mark.unit
+def test_disabled_tracer_is_a_passthrough():
+    tracer = LatencyTracer(enabled=False)
+
+    @traced('risk_check', tracer=tracer)
+    def size(x):
+        return x * 2
+
+    with tracer.trace('decision') as trace_id:
+        with tracer.span('data_fetch', 'Test'):
+            assert size(21) == 42
+
+    assert trace_id is None
+    assert tracer.get_histograms() == {}
+    assert tracer.get_stats()['events_buffered'] == 0
+
+
+@pytest.mark.unit
+def test_nested_async_spans_share_trace_and_export(tmp_path):
+    tracer = LatencyTracer(enabled=True)
+
+    class Processor:
+        @traced('data_fetch', tracer=tracer)
+        async def fetch(self):
+            await asyncio.sleep(0.002)
+
+        @traced('inference', tracer=tracer)
+        def predict(self):
+            return 'BUY'
+
+        @traced('signal_processing', root=True, tracer=tracer)
+        async def process(self):
+            await asyncio.gather(self.fetch(), self.fetch())
+            return self.predict()
+
+    async def run():
+        processor = Processor()
+        first = await processor.process()
+        with tracer.trace('decision', symbol='BTCUSDT') as trace_id:
+            await processor.process()
+        return first, trace_id
+
+    action, trace_id = asyncio.run(run())
+    assert action == 'BUY'
+
+    histograms = tracer.get_histograms()
+    assert histograms['data_fetch']['Processor']['count'] == 4
+    assert histograms['data_fetch']['Processor']['p50_ms'] >= 1.0
+    assert histograms['inference']['Processor']['count'] == 2
+
+    path = tracer.export_chrome_trace(str(tmp_path / 'trace.json'))
+    events = json.loads(path.read_text())['traceEvents']
+    spans = [e for e in events if e['ph'] == 'X']
+    assert len(spans) == 9
+    # Dos decisiones, cada una en su propia pista; la segunda con el id explícito
+    assert len({e['args']['trace_id'] for e in spans}) == 2
+    nested = [e for e in spans if e['args']['trace_id'] == trace_id]
+    assert {e['name'] for e in nested} == {'decision', 'process', 'fetch', 'predict'}
+    assert len({e['tid'] for e in nested}) == 1
+
+
+@pytest.mark.unit
+def test_histogram_quantiles():
+    histogram = StageHistogram(buckets=(0.001, 0.01, 0.1))
+    for _ in range(90):
+        histogram.observe(0.0005)
+    for _ in range(10):
+        histogram.observe(0.05)
+
+    assert histogram.quantile(0.5) <= 0.001
+    assert 0.01 < histogram.quantile(0.95) <= 0.05
+    assert histogram.summary()['count'] == 100
@@ -0,0 +1,120 @@
+"""Tests de la cola de mensajes de Telegram (heap + coalescencia + token bucket)"""
+
+import asyncio
+import time
+
+import pytest
+
+from control.message_queue import TelegramMessageQueue
+
+
+class _VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class _FakeSender:
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    async def send_message(self, message, parse_mode):
+        self.sent.append((self.clock(), message))
+
+
+def _make_queue(clock, sender, **kwargs):
+    return TelegramMessageQueue(
+        sender, clock=clock, sleep=clock.sleep, **kwargs
+    )
+
+
+@pytest.mark.unit
+def test_priority_order_and_coalescing():
+    clock = _VirtualClock()
+    sender = _FakeSender(clock)
+
+    async def run():
+        queue = _make_queue(clock, sender, base_delay=1.0, burst=1)
+        await queue.add_message("low", priority=3)
+        await queue.add_message("pos BTC 1", priority=2, key=("position", "BTCUSDT"))
+        await queue.add_message("pos BTC 2", priority=2, key=("position", "BTCUSDT"))
+        await queue.add_message("alert", priority=1)
+        await queue.add_message("alert", priority=1)
+        await queue.wait_for_empty_queue(timeout=5)
+        return queue
+
+    queue = asyncio.run(run())
+    assert [message for _, message in sender.sent] == ["alert", "pos BTC 2", "low"]
+    assert queue.stats['coalesced'] == 2
+
+
+@pytest.mark.unit
+def test_full_queue_evicts_lowest_priority():
+    clock = _VirtualClock()
+    sender = _FakeSender(clock)
+
+    async def run():
+        queue = _make_queue(clock, sender, max_queue_size=2, burst=1)
+        # Sin ceder el control: la cola no se drena entre inserciones
+        await queue.add_message("baja", priority=3)
+        await queue.add_message("media", priority=2)
+        await queue.add_message("alta", priority=1)
+        assert await queue.add_message("otra baja", priority=3) is False
+        await queue.wait_for_empty_queue(timeout=5)
+
+    asyncio.run(run())
+    assert [message for _, message in sender.sent] == ["alta", "media"]
+
+
+@pytest.mark.unit
+def test_load_10k_messages_through_fake_sender():
+    clock = _VirtualClock()
+    sender = _FakeSender(clock)
+    symbols = [f"SYM{i}USDT" for i in range(50)]
+    rate, burst = 30.0, 30
+
+    async def run():
+        queue = _make_queue(
+            clock, sender, max_queue_size=5000, rate_per_second=rate, burst=burst
+        )
+        latest = {}
+        for i in range(10_000):
+            if i % 10 == 0:
+                await queue.add_message(f"alerta {i}", priority=1)
+            else:
+                symbol = symbols[i % len(symbols)]
+                latest[symbol] = f"posición {symbol} #{i}"
+                await queue.add_message(latest[symbol], priority=2, key=("position", symbol))
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+        await queue.wait_for_empty_queue(timeout=60)
+        return queue, latest
+
+    start = time.perf_counter()
+    queue, latest = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    messages = [message for _, message in sender.sent]
+    alerts = [m for m in messages if m.startswith("alerta")]
+    positions = [m for m in messages if m.startswith("posición")]
+
+    assert len(alerts) == 1000
+    # Coalescencia: como mucho una actualización pendiente por símbolo en cada momento
+    assert len(positions) < 9000
+    for symbol, message in latest.items():
+        assert [m for m in positions if m.startswith(f"posición {symbol} ")][-1] == message
+
+    # Presupuesto del token bucket respetado en tiempo virtual
+    assert sender.sent[-1][0] >= (len(messages) - burst) / rate - 1e-6
+
+    status = queue.get_queue_status()
+    assert status["queue_size"] == 0
+    assert status["stats"]["sent"] == len(messages)
+    assert elapsed < 10
@@ -0,0 +1,60 @@
+"""Tests del ledger de PnL pre-agregado"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from core.monitoring.enterprise.pnl_ledger import PnLLedger
+
+
+@dataclass
+class Record:
+    timestamp: datetime
+    symbol: str
+    strategy: str
+    pnl: float
+    fees: float
+    duration_minutes: int = 5
+
+
+@pytest.mark.unit
+def test_aggregates_follow_bounded_window():
+    rng = random.Random(3)
+    start = datetime(2024, 3, 1)
+    records = [
+        Record(start + timedelta(hours=i), rng.choice(['BTCUSDT', 'ETHUSDT']),
+               rng.choice(['trend', 'mean_rev', 'breakout']), rng.uniform(-100, 100), rng.random())
+        for i in range(2000)
+    ]
+    ledger = PnLLedger(max_records=500)
+    for record in records:
+        ledger.append(record)
+
+    window = records[-500:]
+    wins = [r.pnl for r in window if r.pnl > 0]
+    losses = [r.pnl for r in window if r.pnl < 0]
+    assert len(ledger) == 500
+    assert ledger.total.count == 500
+    assert ledger.total.wins == len(wins)
+    assert ledger.total.pnl_sum == pytest.approx(sum(r.pnl for r in window))
+    assert ledger.total.fees_sum == pytest.approx(sum(r.fees for r in window))
+    assert ledger.largest_win == max(wins)
+    assert ledger.largest_loss == min(losses)
+    assert ledger.symbol_pnl('BTCUSDT') == pytest.approx(sum(r.pnl for r in window if r.symbol == 'BTCUSDT'))
+    assert set(ledger.strategy_pnl()) == {r.strategy for r in window}
+
+    last_day = window[-1].timestamp.date()
+    assert ledger.pnl_on(last_day) == pytest.approx(sum(r.pnl for r in window if r.timestamp.date() == last_day))
+    since = last_day - timedelta(days=7)
+    assert ledger.pnl_since(since) == pytest.approx(sum(r.pnl for r in window if r.timestamp.date() >= since))
+    assert min(ledger.by_day) == window[0].timestamp.toordinal()
+
+    columns = ledger.columns()
+    assert columns['pnl'].tolist() == [r.pnl for r in window]
+    assert ledger.pnl_between(window[10].timestamp, window[20].timestamp) == pytest.approx(
+        sum(r.pnl for r in window[10:21])
+    )
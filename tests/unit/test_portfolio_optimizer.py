@@ -0,0 +1,91 @@
+"""Tests del tracker de covarianza EWMA y la cache del optimizador de portafolio"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("redis")
+pytest.importorskip("telegram")
+
+from dataclasses import asdict
+
+from core.trading.enterprise import portfolio_optimizer as module
+from core.trading.enterprise.portfolio_optimizer import (
+    EWMACovarianceTracker, OptimizationResult, PortfolioOptimizer, PortfolioWeights
+)
+
+HOUR = 3600
+
+
+@pytest.mark.unit
+def test_ewma_update_matches_recursive_reference_and_shrinkage_is_positive_definite():
+    rng = np.random.default_rng(0)
+    n, bars = 30, 21
+    prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, (bars, n)), axis=0)
+    tracker = EWMACovarianceTracker([f"S{i}" for i in range(n)], decay=0.94)
+    for t in range(bars):
+        tracker.update(t * HOUR, prices[t])
+
+    returns = prices[1:] / prices[:-1] - 1
+    mean, cov = returns[0].copy(), np.zeros((n, n))
+    for r in returns[1:]:
+        delta = r - mean
+        mean = mean + 0.06 * delta
+        cov = 0.94 * (cov + 0.06 * np.outer(delta, delta))
+    assert np.allclose(tracker.mean, mean) and np.allclose(tracker.cov, cov)
+
+    # 20 barras para 30 símbolos: la EWMA cruda tiene rango deficiente
+    assert np.linalg.matrix_rank(tracker.cov) < n
+    shrunk = tracker.shrunk_cov()
+    assert np.linalg.eigvalsh(shrunk).min() > 0
+    assert np.allclose(np.diag(shrunk), np.diag(cov) + 1e-6 * np.diag(cov).mean())
+    assert np.all(np.isfinite(np.linalg.solve(shrunk, tracker.mean)))
+
+
+@pytest.mark.unit
+def test_late_bar_is_applied_once_complete(monkeypatch):
+    optimizer = PortfolioOptimizer({'redis_url': 'redis://invalid:1'})
+    optimizer.redis_client = None
+    now = int(datetime.now().timestamp()) // HOUR * HOUR
+    closes = {"A": 100.0, "B": 50.0}
+    store = {s: [{"timestamp": now - (30 - i) * HOUR, "close": closes[s] * (1 + 0.01 * (i % 3))}
+                 for i in range(31)] for s in closes}
+    # La última barra de B llega tarde
+    late = store["B"].pop()
+
+    async def fake_history(symbols, lookback_days=30, start_date=None):
+        return {s: [row for row in rows if start_date is None or row["timestamp"] >= start_date.timestamp()]
+                for s, rows in store.items()}
+
+    monkeypatch.setattr(optimizer, "_get_historical_data", fake_history)
+    tracker = asyncio.run(optimizer._get_cov_tracker(["A", "B"], 2))
+    assert tracker.last_bar_time == now - HOUR
+
+    store["B"].append(late)
+    monkeypatch.setattr(
+        module, "datetime",
+        type("FakeDatetime", (datetime,), {"now": classmethod(lambda cls: datetime.fromtimestamp(now + HOUR))})
+    )
+    tracker = asyncio.run(optimizer._get_cov_tracker(["A", "B"], 2))
+    assert tracker.last_bar_time == now
+    last = tracker.recent_returns()[-1]
+    assert last[1] == pytest.approx(late["close"] / store["B"][-2]["close"] - 1)
+
+
+@pytest.mark.unit
+def test_cached_result_round_trips_with_native_types():
+    result = OptimizationResult(
+        method="kelly",
+        weights=[PortfolioWeights("A", np.float64(0.5), 10.0, 0.0, 0.1, 0.01, 0.2)],
+        total_value=20.0, expected_return=0.01, volatility=0.2, sharpe_ratio=1.0,
+        max_drawdown=-0.1, var_95=-0.02, cvar_95=-0.03, diversification_ratio=1.1,
+        optimization_time=0.01, convergence=np.bool_(True), message="ok"
+    )
+    payload = json.dumps(PortfolioOptimizer._to_native(asdict(result)))
+    restored = PortfolioOptimizer._result_from_dict(json.loads(payload))
+    assert restored.convergence is True
+    assert restored.weights[0] == PortfolioWeights("A", 0.5, 10.0, 0.0, 0.1, 0.01, 0.2)
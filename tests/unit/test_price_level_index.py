@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del índice de niveles de precio usado por PositionManager
+"""
+
+import pytest
+
+from core.trading.enterprise.price_level_index import PriceLevelIndex, BELOW, ABOVE
+
+
+@pytest.mark.unit
+def test_only_crossed_levels_are_popped():
+    index = PriceLevelIndex()
+    index.set_level('BTCUSDT', 'BTCUSDT', 'stop_loss', 95.0, BELOW, 'sl')
+    index.set_level('BTCUSDT', 'BTCUSDT', 'take_profit', 110.0, ABOVE, 'tp')
+    index.set_level('ETHUSDT', 'ETHUSDT', 'stop_loss', 105.0, ABOVE, 'sl_short')
+
+    assert index.pop_crossed('BTCUSDT', 100.0) == []
+    crossed = index.pop_crossed('BTCUSDT', 94.0)
+    assert [level.payload for level in crossed] == ['sl']
+    assert index.get_level('BTCUSDT', 'BTCUSDT', 'stop_loss') is None
+    assert index.get_level('BTCUSDT', 'BTCUSDT', 'take_profit') is not None
+    assert len(index) == 2
+
+
+@pytest.mark.unit
+def test_set_level_replaces_previous_level():
+    index = PriceLevelIndex()
+    index.set_level('BTCUSDT', 'BTCUSDT', 'stop_loss', 90.0, BELOW)
+    index.set_level('BTCUSDT', 'BTCUSDT', 'stop_loss', 98.0, BELOW)
+
+    assert len(index) == 1
+    assert [level.price for level in index.pop_crossed('BTCUSDT', 97.0)] == [98.0]
+
+
+@pytest.mark.unit
+def test_remove_key_clears_all_levels_of_owner():
+    index = PriceLevelIndex()
+    index.set_level('BTCUSDT', 'BTCUSDT', 'stop_loss', 90.0, BELOW)
+    index.set_level('BTCUSDT', 'BTCUSDT', 'take_profit', 120.0, ABOVE)
+
+    assert index.remove_key('BTCUSDT', 'BTCUSDT') == 2
+    assert index.pop_crossed('BTCUSDT', 50.0) == []
+    assert index.pop_crossed('BTCUSDT', 500.0) == []
@@ -0,0 +1,156 @@
+"""Tests del motor vectorizado de riesgo de portafolio"""
+
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+stats = pytest.importorskip("scipy.stats")
+
+from core.trading.risk_engine import PortfolioRiskEngine
+
+HOUR = 3600
+
+
+def _prices(rng, n, start=100.0):
+    return start * np.cumprod(1 + rng.normal(0, 0.01, n))
+
+
+@pytest.mark.unit
+def test_ring_buffer_moments_match_last_window():
+    rng = np.random.default_rng(0)
+    ts = 1_700_000_000 + HOUR * np.arange(200)
+    a, b = _prices(rng, 200), _prices(rng, 200, 50.0)
+
+    engine = PortfolioRiskEngine(window=50, seed=0)
+    engine.add_symbol("A", ts[:80], a[:80])
+    engine.add_symbol("B", ts[:80], b[:80])
+    for i in range(80, 200):
+        engine.update_bar(int(ts[i]), {"A": a[i], "B": b[i]})
+
+    returns = np.column_stack([a[1:] / a[:-1] - 1, b[1:] / b[:-1] - 1])[-50:]
+    assert engine.n_observations == 50
+    assert engine.last_timestamp == ts[-1]
+    assert np.allclose(engine.mean_returns(), returns.mean(axis=0))
+    assert np.allclose(engine.covariance(), np.cov(returns, rowvar=False), atol=1e-12)
+
+
+@pytest.mark.unit
+def test_cholesky_regularises_singular_covariance():
+    rng = np.random.default_rng(1)
+    ts = HOUR * np.arange(100)
+    a = _prices(rng, 100)
+    engine = PortfolioRiskEngine(window=100, seed=0)
+    engine.add_symbol("A", ts, a)
+    engine.add_symbol("B", ts, a * 2)  # retornos idénticos: covarianza de rango 1
+
+    cov = engine.covariance()
+    with pytest.raises(np.linalg.LinAlgError):
+        np.linalg.cholesky(cov - 1e-9 * np.eye(2))
+    chol = engine._cholesky()
+    assert np.all(np.isfinite(chol))
+    assert np.allclose(chol @ chol.T, cov, atol=1e-8 * np.trace(cov))
+
+
+@pytest.mark.unit
+def test_var_and_cvar_match_brute_force():
+    rng = np.random.default_rng(2)
+    ts = HOUR * np.arange(400)
+    a, b, c = _prices(rng, 400), _prices(rng, 400), _prices(rng, 400)
+    engine = PortfolioRiskEngine(window=400, mc_simulations=400_000, seed=0)
+    for name, px in (("A", a), ("B", b), ("C", c)):
+        engine.add_symbol(name, ts, px)
+
+    weights = engine.weights_vector({"A": 3000.0, "B": -1000.0, "C": 1000.0})
+    assert np.allclose(weights, [0.6, -0.2, 0.2])
+
+    returns = np.column_stack([px[1:] / px[:-1] - 1 for px in (a, b, c)])
+    portfolio = returns @ weights
+    var = np.percentile(portfolio, 5)
+    assert engine.historical_var(weights, 0.95) == pytest.approx((var, portfolio[portfolio <= var].mean()))
+
+    mu, sigma = portfolio.mean(), portfolio.std(ddof=1)
+    z = stats.norm.ppf(0.05)
+    expected = (mu + z * sigma, mu - sigma * stats.norm.pdf(z) / 0.05)
+    assert engine.parametric_var(weights, 0.95) == pytest.approx(expected, rel=1e-9)
+
+    mc_var, mc_cvar = engine.monte_carlo_var(weights, 0.95)
+    assert mc_var == pytest.approx(expected[0], rel=0.02)
+    assert mc_cvar == pytest.approx(expected[1], rel=0.02)
+
+
+@pytest.mark.unit
+def test_risk_manager_appends_new_bars_on_each_call(monkeypatch):
+    pytest.importorskip("pandas")
+    import core.trading.risk_manager as module
+
+    now = datetime.now()
+    last_bar = (int(now.timestamp()) // HOUR - 1) * HOUR
+    ts = last_bar - HOUR * np.arange(60)[::-1]
+    rng = np.random.default_rng(3)
+    series = {"A": _prices(rng, 63), "B": _prices(rng, 63)}
+    visible = {"bars": 60}
+
+    def get_historical_data(symbol, start_date, end_date, timeframe):
+        all_ts = np.concatenate([ts, last_bar + HOUR * np.arange(1, 4)])
+        return [
+            {"timestamp": int(t), "close": float(p)}
+            for t, p in zip(all_ts[:visible["bars"]], series[symbol][:visible["bars"]])
+            if start_date.timestamp() <= t <= end_date.timestamp()
+        ]
+
+    monkeypatch.setattr(module.db_manager, "get_historical_data", get_historical_data)
+    manager = module.RiskManager()
+    manager._ensure_risk_history(["A", "B"])
+    assert manager.risk_engine.last_timestamp == last_bar
+    first = manager.risk_engine.n_observations
+
+    # Llegan dos barras nuevas y el reloj avanza: se añaden sin recargar
+    visible["bars"] = 62
+    monkeypatch.setattr(module, "datetime", type("FakeDatetime", (datetime,), {
+        "now": classmethod(lambda cls: now.fromtimestamp(last_bar + 2 * HOUR + 60))
+    }))
+    manager._ensure_risk_history(["A", "B"])
+    assert manager.risk_engine.last_timestamp == last_bar + 2 * HOUR
+    assert manager.risk_engine.n_observations == first + 2
+
+
+@pytest.mark.unit
+def test_position_size_capped_by_cached_tail_risk(monkeypatch):
+    pytest.importorskip("pandas")
+    import core.trading.risk_manager as module
+
+    rng = np.random.default_rng(4)
+    last_bar = (int(datetime.now().timestamp()) // HOUR - 1) * HOUR
+    ts = last_bar - HOUR * np.arange(100)[::-1]
+    calm, wild = 100 * np.cumprod(1 + rng.normal(0, 0.002, 100)), 100 * np.cumprod(1 + rng.normal(0, 0.05, 100))
+    series = {"CALM": calm, "WILD": wild}
+    loads = []
+
+    def get_historical_data(symbol, start_date, end_date, timeframe):
+        loads.append(symbol)
+        return [{"timestamp": int(t), "close": float(p)} for t, p in zip(ts, series[symbol])]
+
+    monkeypatch.setattr(module.db_manager, "get_historical_data", get_historical_data)
+    manager = module.RiskManager()
+    manager.max_tail_loss_per_trade = 0.01
+    manager.min_notional = 0.0
+
+    # Primer precio de cada símbolo: carga su historia una sola vez
+    manager.update_market_prices({"CALM": calm[-1], "WILD": wild[-1]}, timestamp=last_bar + 60)
+    manager.update_market_prices({"CALM": calm[-1], "WILD": wild[-1]}, timestamp=last_bar + 120)
+    assert sorted(loads) == ["CALM", "WILD"]
+    assert manager.risk_engine.n_observations == 99
+
+    # La barra siguiente se añade al cerrar la hora
+    manager.update_market_prices({"CALM": calm[-1], "WILD": wild[-1]}, timestamp=last_bar + HOUR + 5)
+    assert manager.risk_engine.last_timestamp == last_bar + HOUR
+
+    state = manager.get_risk_state(manager.var_confidence)
+    assert state["individual_cvar"]["WILD"] <= state["individual_var"]["WILD"] < 0
+
+    balance = 10_000.0
+    wild_size = manager.calculate_position_size(100.0, 0.0, balance, "BUY", symbol="WILD").size_qty
+    calm_size = manager.calculate_position_size(100.0, 0.0, balance, "BUY", symbol="CALM").size_qty
+    assert wild_size * 100.0 * abs(state["individual_cvar"]["WILD"]) <= balance * 0.01 + 1e-6
+    assert calm_size > wild_size
@@ -0,0 +1,118 @@
+"""Tests del registro de servicios perezoso"""
+
+import pytest
+
+from core.integration.service_registry import ServiceRegistry, lazy_service
+
+
+class _Service:
+    instances = 0
+
+    def __init__(self):
+        _Service.instances += 1
+        self.value = 42
+
+
+@pytest.mark.unit
+def test_service_built_on_first_access_only():
+    _Service.instances = 0
+    registry = ServiceRegistry()
+    service = lazy_service('svc', _Service, registry)
+
+    assert not registry.is_initialized('svc')
+    assert _Service.instances == 0
+
+    assert service.value == 42
+    service.value = 7
+    assert registry.get('svc').value == 7
+    assert _Service.instances == 1
+
+
+@pytest.mark.unit
+def test_reset_rebuilds_instance():
+    _Service.instances = 0
+    registry = ServiceRegistry()
+    service = lazy_service('svc', _Service, registry)
+
+    service.value = 1
+    registry.reset('svc')
+    assert service.value == 42
+    assert _Service.instances == 2
+
+
+@pytest.mark.unit
+def test_unknown_service_raises():
+    with pytest.raises(KeyError):
+        ServiceRegistry().get('missing')
+
+
+class _Container:
+    def __init__(self):
+        self.items = []
+        self.entered = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def __enter__(self):
+        self.entered += 1
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.unit
+def test_proxy_forwards_protocols_to_instance():
+    import asyncio
+
+    registry = ServiceRegistry()
+    service = lazy_service('container', _Container, registry)
+
+    # Vacío: el proxy no es truthy por sí mismo
+    assert not service and len(service) == 0
+    service.items.extend([1, 2])
+    assert service and len(service) == 2 and list(service) == [1, 2] and 2 in service
+    assert isinstance(service, _Container)
+
+    with service as entered:
+        assert entered is registry.get('container')
+
+    async def use():
+        async with service as entered:
+            return entered
+
+    assert asyncio.run(use()) is registry.get('container')
+    assert registry.get('container').entered == 2
+
+
+@pytest.mark.unit
+def test_data_package_does_not_import_submodules_for_unknown_names():
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    # Proceso aparte: sys.modules limpio
+    code = (
+        "import sys, core.data\n"
+        "try:\n"
+        "    core.data.not_exported\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "print(sorted(m for m in sys.modules if m.startswith('core.data.')))\n"
+    )
+    root = Path(__file__).resolve().parents[2]
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,151 @@
+"""Tests del almacén append-only de snapshots"""
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict
+
+import pytest
+
+from core.monitoring.enterprise.snapshot_store import SnapshotStore
+
+
+class Level(Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+@dataclass
+class Snapshot:
+    timestamp: datetime
+    value: float
+    level: Level
+    active: bool
+    details: Dict[str, float]
+
+
+@pytest.mark.unit
+def test_round_trip_query_and_restore(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'), batch_size=7, flush_interval_s=3600)
+    start = datetime(2024, 5, 1, 12, 0, 0)
+    for i in range(50):
+        store.append('risk', Snapshot(start + timedelta(seconds=5 * i), float(i),
+                                      Level.HIGH if i % 2 else Level.LOW, i % 3 == 0, {'btc': i / 10}))
+    # Columna nueva en un snapshot posterior
+    store.append('risk', {'timestamp': start + timedelta(seconds=250), 'value': 50.0, 'level': 'low',
+                          'active': False, 'details': {}, 'extra': 1})
+
+    assert store.count('risk') == 51
+    rows = store.query('risk', start + timedelta(seconds=10), start + timedelta(seconds=20))
+    assert [row['value'] for row in rows] == [2.0, 3.0, 4.0]
+    assert rows[0]['active'] is False and rows[1]['active'] is True
+    assert rows[0]['details'] == {'btc': 0.2} and rows[0]['level'] == 'low'
+    assert rows[0]['extra'] is None
+    assert store.latest('risk', 1, ['extra'])[0]['extra'] == 1
+
+    restored = store.load_dataclasses('risk', Snapshot, 3, converters={'level': Level})
+    assert [snapshot.value for snapshot in restored] == [48.0, 49.0, 50.0]
+    assert restored[1].level is Level.HIGH and restored[0].timestamp == start + timedelta(seconds=240)
+    store.close()
+
+    reopened = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    assert reopened.count('risk') == 51
+    reopened.close()
+
+
+@pytest.mark.unit
+def test_downsample_buckets(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    start = datetime(2024, 5, 1)
+    for i in range(120):
+        store.append('trading', {'timestamp': start + timedelta(seconds=i), 'pnl': float(i)})
+
+    averaged = store.downsample('trading', 60, ['pnl'])
+    assert [row['samples'] for row in averaged] == [60, 60]
+    assert [row['pnl'] for row in averaged] == [29.5, 89.5]
+    assert [row['pnl'] for row in store.downsample('trading', 60, ['pnl'], how='last')] == [59.0, 119.0]
+    assert [row['pnl'] for row in store.downsample('trading', 60, ['pnl'], how='max')] == [59.0, 119.0]
+    with pytest.raises(ValueError):
+        store.downsample('trading', 60, ['pnl'], how='median')
+    store.close()
+
+
+class _LockedConnection:
+    """Conexión que falla como una BD bloqueada mientras ``locked`` esté activo"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.locked = False
+
+    def executemany(self, *args):
+        if self.locked:
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.mark.unit
+def test_numpy_and_unknown_values_are_encoded(tmp_path):
+    np = pytest.importorskip("numpy")
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    store.append('risk', {'timestamp': datetime(2024, 5, 1), 'count': np.int64(3), 'ratio': np.float32(0.5),
+                          'weights': {'btc': np.float64(0.25)}, 'owner': object()})
+
+    row = store.latest('risk', 1)[0]
+    assert row['count'] == 3 and row['ratio'] == 0.5 and row['weights'] == {'btc': 0.25}
+    assert row['owner'].startswith('<object object')
+    assert store.stats['flush_errors'] == 0
+    store.close()
+
+
+@pytest.mark.unit
+def test_rejected_rows_are_dead_lettered_and_schema_reloaded(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'), batch_size=1000, flush_interval_s=3600)
+    start = datetime(2024, 5, 1)
+    store.append('risk', {'timestamp': start, 'value': 1.0})
+    store.flush()
+
+    # Un stream escribe antes y abre la transacción; el ALTER TABLE de 'risk'
+    # queda dentro y el entero fuera de rango hace fallar el lote entero
+    store.append('alpha', {'timestamp': start, 'value': 1.0})
+    store.append('risk', {'timestamp': start + timedelta(seconds=1), 'value': 2.0, 'extra': 1})
+    store.append('risk', {'timestamp': start + timedelta(seconds=2), 'value': 3.0, 'bad': 2 ** 70})
+    store.flush()
+
+    # El reintento fila a fila escribe las válidas y aparta la rechazada
+    assert store.stats['flush_errors'] == 1 and store.stats['dead_lettered'] == 1
+    assert store._pending_count == 0
+    assert [(stream, row['value']) for stream, row, _ in store.dead_letters] == [('risk', 3.0)]
+    assert store.count('risk') == 2 and store.count('alpha') == 1
+    assert store.latest('risk', 1, ['extra'])[0]['extra'] == 1
+
+    # Las filas nuevas siguen escribiéndose
+    store.append('risk', {'timestamp': start + timedelta(seconds=3), 'value': 4.0})
+    assert store.count('risk') == 3
+    store.close()
+
+
+@pytest.mark.unit
+def test_transient_failure_requeues_bounded_and_backs_off(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'), batch_size=2, flush_interval_s=3600, max_pending=5)
+    store._conn = _LockedConnection(store._conn)
+    store._conn.locked = True
+    start = datetime(2024, 5, 1)
+    store.append('risk', {'timestamp': start, 'value': 0.0})
+    store.append('risk', {'timestamp': start + timedelta(seconds=1), 'value': 1.0})
+
+    # El lote vuelve a la cola y los append siguientes no reintentan hasta
+    # que pasa flush_interval_s; la cola descarta los más antiguos
+    assert store.stats['flush_errors'] == 1 and store.stats['dead_lettered'] == 0
+    for i in range(2, 8):
+        store.append('risk', {'timestamp': start + timedelta(seconds=i), 'value': float(i)})
+    assert store.stats['flush_errors'] == 1
+    assert store._pending_count == 5 and store.stats['snapshots_dropped'] == 3
+
+    store._conn.locked = False
+    store.flush()
+    assert [row['value'] for row in store.query('risk')] == [3.0, 4.0, 5.0, 6.0, 7.0]
+    store.close()
@@ -0,0 +1,61 @@
+"""Tests del motor de estadísticas de riesgo en streaming"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.monitoring.enterprise.streaming_stats import StreamingRiskStats
+
+
+def _returns(size=5000, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.standard_t(4, size=size) * 0.01
+
+
+@pytest.mark.unit
+def test_streaming_matches_full_recompute():
+    returns = _returns()
+    incremental = StreamingRiskStats(risk_free_rate=0.02)
+    for value in returns:
+        incremental.update(value)
+    batched = StreamingRiskStats(risk_free_rate=0.02)
+    batched.update_many(returns[:1234])
+    batched.update_many(returns[1234:])
+
+    excess = returns - 0.02 / 252
+    cumulative = np.cumprod(1 + returns)
+    running_max = np.maximum.accumulate(np.maximum(cumulative, 1.0))
+
+    for stats in (incremental.snapshot(), batched.snapshot()):
+        assert stats.count == len(returns)
+        assert stats.volatility == pytest.approx(np.std(returns) * np.sqrt(252))
+        assert stats.sharpe_ratio == pytest.approx(excess.mean() / excess.std() * np.sqrt(252))
+        assert stats.sortino_ratio == pytest.approx(excess.mean() / excess[excess < 0].std() * np.sqrt(252))
+        assert stats.max_drawdown == pytest.approx(np.min(cumulative / running_max - 1))
+        assert stats.current_drawdown == pytest.approx(cumulative[-1] / running_max[-1] - 1)
+        # Sketch con error relativo 0.5%
+        assert stats.var_95 == pytest.approx(np.percentile(returns, 5), rel=0.01)
+        assert stats.var_99 == pytest.approx(np.percentile(returns, 1), rel=0.01)
+
+    assert incremental.snapshot().max_drawdown_duration == batched.snapshot().max_drawdown_duration
+    assert incremental.snapshot().drawdown_duration == batched.snapshot().drawdown_duration
+
+
+@pytest.mark.unit
+def test_rolling_window_and_equity_periods():
+    returns = _returns(3000, seed=2)
+    stats = StreamingRiskStats(window=500)
+    for value in returns:
+        stats.update(value)
+    window = returns[-500:]
+    snapshot = stats.snapshot()
+    assert snapshot.count == 500
+    assert snapshot.volatility == pytest.approx(np.std(window) * np.sqrt(252))
+    assert snapshot.var_95 == pytest.approx(np.percentile(window, 5), rel=0.02)
+
+    # Varios monitores observan el mismo balance: un retorno por periodo cerrado
+    shared = StreamingRiskStats(sample_interval=60)
+    for timestamp, equity in [(0, 100.0), (10, 100.0), (30, 101.0), (59, 102.0), (61, 102.0), (70, 99.0), (125, 99.0)]:
+        shared.observe_equity(equity, timestamp)
+    assert list(shared.recent_returns) == pytest.approx([0.02, 99.0 / 102.0 - 1])
+    assert shared.returns_since(1) == pytest.approx([99.0 / 102.0 - 1])
@@ -0,0 +1,134 @@
+"""Tests de los agregados incrementales del ledger columnar de core.sync"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from core.sync.trade_ledger import TradeLedger
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _trade(trade_id, minute, pnl, pct):
+    return SimpleNamespace(
+        trade_id=trade_id,
+        timestamp=START + timedelta(minutes=minute, seconds=5),
+        pnl_usdt=pnl,
+        pnl_percentage=pct,
+        duration_hours=1.0,
+        confluence_score=0.5,
+        was_successful=pnl > 0,
+        strategy_name='trend',
+        get_quality_score=lambda: 50.0,
+        is_high_quality_trade=lambda: False,
+    )
+
+
+def _batches(rng, n_batches=5, per_agent=40, symbols=('BTCUSDT', 'ETHUSDT', 'SOLUSDT')):
+    counter = 0
+    for b in range(n_batches):
+        batch = {}
+        for symbol in symbols:
+            trades = []
+            for _ in range(per_agent):
+                minute = b * 60 + int(rng.integers(0, 60))
+                trades.append(_trade(f"t{counter}", minute, float(rng.normal(0, 5)), float(rng.normal(0, 1))))
+                counter += 1
+            batch[symbol] = trades
+        yield batch
+
+
+def _expected_correlation(all_rows, symbols, first_minute):
+    minutes = sorted({m for rows in all_rows.values() for m, _ in rows if m >= first_minute})
+    index = {m: i for i, m in enumerate(minutes)}
+    matrix = np.zeros((len(minutes), len(symbols)))
+    for j, symbol in enumerate(symbols):
+        for minute, pnl in all_rows[symbol]:
+            if minute >= first_minute:
+                matrix[index[minute], j] += pnl
+    return np.corrcoef(matrix, rowvar=False)
+
+
+@pytest.mark.unit
+def test_incremental_aggregates_match_full_recompute():
+    rng = np.random.default_rng(7)
+    ledger = TradeLedger(initial_capital=1000.0)
+    returns, equity_rows = [], []
+    all_rows = {}
+
+    for batch in _batches(rng):
+        ledger.append(batch)
+        merged = []
+        for symbol, trades in batch.items():
+            for trade in trades:
+                returns.append(trade.pnl_percentage / 100)
+                merged.append((trade.timestamp.timestamp(), trade.pnl_usdt))
+                all_rows.setdefault(symbol, []).append(
+                    (int(trade.timestamp.timestamp() // 60), trade.pnl_usdt))
+        # El ledger ordena cada lote por timestamp antes de acumular la equity
+        equity_rows.extend(sorted(merged, key=lambda r: r[0]))
+
+    returns = np.array(returns)
+    assert ledger.n_returns == len(returns)
+    assert ledger.mean_return == pytest.approx(returns.mean(), rel=1e-9)
+    assert ledger.return_std == pytest.approx(returns.std(), rel=1e-9)
+
+    curve = 1000.0 + np.cumsum([pnl for _, pnl in equity_rows])
+    peaks = np.maximum(np.maximum.accumulate(curve), 1000.0)
+    assert ledger.equity == pytest.approx(curve[-1])
+    assert ledger.max_drawdown_pct == pytest.approx(((peaks - curve) / peaks * 100).max())
+
+    symbols = list(all_rows)
+    expected = _expected_correlation(all_rows, symbols, first_minute=0)
+    corr = ledger.correlation_matrix()
+    for i, s1 in enumerate(symbols):
+        for j, s2 in enumerate(symbols):
+            assert corr[s1][s2] == pytest.approx(expected[i, j], abs=1e-9)
+
+
+@pytest.mark.unit
+def test_correlation_window_evicts_old_buckets():
+    rng = np.random.default_rng(11)
+    window = 90
+    ledger = TradeLedger(correlation_window_minutes=window)
+    all_rows = {}
+
+    for batch in _batches(rng, n_batches=6):
+        ledger.append(batch)
+        for symbol, trades in batch.items():
+            for trade in trades:
+                all_rows.setdefault(symbol, []).append(
+                    (int(trade.timestamp.timestamp() // 60), trade.pnl_usdt))
+
+    latest = max(m for rows in all_rows.values() for m, _ in rows)
+    assert min(ledger._buckets) > latest - window
+    assert len(ledger._bucket_heap) == len(ledger._buckets)
+
+    symbols = list(all_rows)
+    expected = _expected_correlation(all_rows, symbols, first_minute=latest - window + 1)
+    corr = ledger.correlation_matrix()
+    for i, s1 in enumerate(symbols):
+        for j, s2 in enumerate(symbols):
+            assert corr[s1][s2] == pytest.approx(expected[i, j], abs=1e-9)
+
+
+@pytest.mark.unit
+def test_trade_id_dedupe_is_bounded_and_reset_clears_state():
+    ledger = TradeLedger(max_seen_trade_ids=3)
+    trades = [_trade(f"t{i}", i, 1.0, 0.1) for i in range(5)]
+
+    ledger.append({'BTCUSDT': trades})
+    assert len(ledger) == 5
+    assert len(ledger._seen_trade_ids) == 3
+
+    # Los IDs recientes se siguen deduplicando; los olvidados vuelven a entrar
+    ledger.append({'BTCUSDT': [trades[4], trades[0]]})
+    assert len(ledger) == 6
+
+    ledger.reset()
+    assert len(ledger) == 0
+    assert ledger.n_returns == 0
+    assert ledger.equity == ledger.initial_capital
+    assert not ledger._buckets and not ledger._seen_trade_ids
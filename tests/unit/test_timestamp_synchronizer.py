@@ -0,0 +1,65 @@
+"""Tests del sincronizador de timestamps vectorizado"""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from core.sync.timestamp_synchronizer import TimestampSynchronizer
+
+
+def _write_db(root, symbol, timestamps, high=None):
+    count = len(timestamps)
+    frame = pd.DataFrame({
+        'timestamp': timestamps,
+        'open': np.full(count, 100.0), 'high': high if high is not None else np.full(count, 101.0),
+        'low': np.full(count, 99.0), 'close': np.full(count, 100.0),
+        'volume': np.full(count, 10.0),
+    })
+    (root / symbol).mkdir(parents=True)
+    with sqlite3.connect(str(root / symbol / f"{symbol}_1h.db")) as conn:
+        frame.to_sql('market_data', conn, index=False)
+
+
+@pytest.mark.unit
+def test_timeline_intersects_and_filters_quality(tmp_path):
+    index = pd.date_range('2024-01-01', periods=6, freq='1h')
+    # ISO en un símbolo, epoch en ms en el otro; al segundo le falta la barra 2
+    _write_db(tmp_path, 'AAAUSDT', list(index.strftime('%Y-%m-%d %H:%M:%S')))
+    epochs_ms = [int(ts.timestamp() * 1000) for i, ts in enumerate(index) if i != 2]
+    high = np.full(5, 101.0)
+    high[3] = 98.0  # OHLC incoherente en la barra 4 => score 0.875 (se mantiene con 0.8)
+    _write_db(tmp_path, 'BBBUSDT', epochs_ms, high=high)
+
+    sync = TimestampSynchronizer(['AAAUSDT', 'BBBUSDT'], ['1h'], data_root=str(tmp_path))
+    points = asyncio.run(sync.build_sync_timeline(datetime(2024, 1, 1), datetime(2024, 1, 1, 5)))
+
+    assert [p.timestamp.hour for p in points] == [0, 1, 3, 4, 5]
+    assert [p.cycle_id for p in points] == list(range(5))
+    assert points[3].data_quality_score == pytest.approx(0.875)
+    assert asyncio.run(sync._calculate_quality_score(datetime(2024, 1, 1, 2))) == pytest.approx(0.5)
+
+    sync.min_data_quality = 0.9
+    assert asyncio.run(sync._validate_data_quality([p.timestamp for p in points])) == [
+        p.timestamp for p in points if p.timestamp.hour != 4
+    ]
+
+
+@pytest.mark.unit
+def test_synchronized_windows_come_from_cache(tmp_path):
+    index = pd.date_range('2024-01-01', periods=10, freq='1h')
+    _write_db(tmp_path, 'AAAUSDT', list(index.strftime('%Y-%m-%d %H:%M:%S')))
+
+    sync = TimestampSynchronizer(['AAAUSDT', 'MISSING'], ['1h'], data_root=str(tmp_path))
+    sync.window_size = 4
+    data = asyncio.run(sync.get_synchronized_data(datetime(2024, 1, 1, 6), '1h'))
+
+    window = data['AAAUSDT']
+    assert list(window['timestamp'].dt.hour) == [3, 4, 5, 6]
+    assert window.columns.tolist() == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert data['MISSING'].empty
+    assert ('AAAUSDT', '1h') in sync.data_cache
@@ -0,0 +1,167 @@
+"""Tests del ledger de trades materializado y los reportes en streaming"""
+
+import csv
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from core.compliance.enterprise.audit_writer import AuditBatchWriter, AuditRecord
+from core.compliance.enterprise.report_writers import write_csv_report, write_json_report
+from core.compliance.enterprise.trade_ledger import TradeLedger
+
+
+def _fill(ledger: TradeLedger, start: datetime, count: int):
+    for i in range(count):
+        opened = start + timedelta(minutes=i)
+        ledger.record_event('trade_opened', f"open-{i}", opened, {
+            'symbol': 'BTCUSDT' if i % 3 else 'ETHUSDT', 'side': 'buy', 'size': 1.0,
+            'price': 100.0 + i, 'leverage': 25 if i == 4 else 5, 'fees': 0.1, 'strategy': 'trend'
+        })
+        if i % 2 == 0:
+            ledger.record_event('trade_closed', f"close-{i}", opened + timedelta(minutes=30), {
+                'trade_id': f"open-{i}", 'pnl': -1500.0 if i == 6 else 10.0 * i - 20,
+                'exit_price': 101.0 + i, 'duration_minutes': 30
+            })
+
+
+@pytest.mark.unit
+def test_ledger_materialises_and_streams_trades(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'), batch_size=7)
+    start = datetime(2024, 6, 1, 9, 0)
+    _fill(ledger, start, 20)
+    ledger.record_event('trade_closed', 'close-x', start, {'trade_id': 'unknown', 'pnl': 1.0})
+
+    assert ledger.count() == 20
+    assert ledger.count(start + timedelta(minutes=5), start + timedelta(minutes=9)) == 5
+    assert ledger.count(symbols=['ETHUSDT']) == 7
+    assert ledger.stats['trades_closed'] == 10 and ledger.stats['closes_unmatched'] == 1
+
+    chunks = list(ledger.iter_chunks(chunk_size=6))
+    assert [len(rows) for rows in chunks] == [6, 6, 6, 2]
+    first, second = chunks[0][0], chunks[0][1]
+    assert first[0] == 'open-0' and first[6] == 100.0 and first[9] == -20.0
+    assert first[13] == first[1] and first[14] == (start + timedelta(minutes=30)).isoformat()
+    assert second[9] == 0 and second[14] is None and second[16] == 101.0
+    ledger.close()
+
+
+@pytest.mark.unit
+def test_streaming_reports_aggregate_in_one_pass(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'))
+    _fill(ledger, datetime(2024, 6, 1, 9, 0), 20)
+
+    stats = write_csv_report(ledger.iter_chunks(chunk_size=4), tmp_path / 'report.csv')
+    with open(tmp_path / 'report.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 20 and rows[1]['exit_time'] == '' and rows[1]['duration_minutes'] == ''
+
+    assert stats.total_trades == 20
+    assert stats.winning_trades == 7 and stats.losing_trades == 2
+    assert stats.high_leverage_trades == 1 and stats.large_loss_trades == 1
+    assert stats.symbol_counts() == {'ETHUSDT': 7, 'BTCUSDT': 13}
+    assert stats.summary_rows()[3] == {'Metric': 'Total PnL', 'Value': '$-840.00'}
+
+    write_json_report(ledger.iter_chunks(chunk_size=3), tmp_path / 'report.json', {'total_trades': 20})
+    report = json.loads((tmp_path / 'report.json').read_text(encoding='utf-8'))
+    assert len(report['trades']) == 20 and report['trades'][1]['exit_time'] is None
+    assert report['summary'] == stats.summary_rows()
+    assert report['symbol_statistics'] == stats.symbol_rows()
+    ledger.close()
+
+
+@pytest.mark.unit
+def test_audit_writer_feeds_ledger(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'))
+    writer = AuditBatchWriter(trade_ledger=ledger)
+    opened = datetime(2024, 6, 1, 9, 0)
+    writer.write_batch([
+        AuditRecord('t1', opened, 'trade_opened', 'info', 'system', 's', '',
+                    json.dumps({'symbol': 'BTCUSDT', 'side': 'buy', 'size': 2, 'price': 50})),
+        AuditRecord('e1', opened, 'order_placed', 'info', 'system', 's', '', '{}'),
+        AuditRecord('t2', opened + timedelta(hours=1), 'trade_closed', 'info', 'system', 's', '',
+                    json.dumps({'trade_id': 't1', 'pnl': 5.5, 'exit_price': 52, 'duration_minutes': 60})),
+    ])
+
+    (row,), = list(ledger.iter_chunks())
+    assert row[0] == 't1' and row[6] == 100 and row[9] == 5.5 and row[15] == 60 and row[12] == 's'
+    ledger.close()
+
+
+class _LockedConnection:
+    """Conexión que falla como una BD bloqueada mientras ``locked`` esté activo"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.locked = False
+
+    def executemany(self, *args):
+        if self.locked:
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class _AuditSource:
+    """Eventos de auditoría de trades para rebuild_from_audit"""
+
+    def __init__(self, start: datetime, count: int):
+        self.events = {'trade_opened': [], 'trade_closed': []}
+        for i in range(count):
+            opened = start + timedelta(minutes=i)
+            self.events['trade_opened'].append(SimpleNamespace(
+                id=f"open-{i}", timestamp=opened, user_id='system', session_id='',
+                data={'symbol': 'BTCUSDT', 'side': 'buy', 'size': 1.0, 'price': 100.0}
+            ))
+
+    def iter_events_by_type(self, event_type, start_date, end_date, chunk_size):
+        events = [e for e in self.events[event_type]
+                  if (start_date is None or e.timestamp >= start_date)
+                  and (end_date is None or e.timestamp <= end_date)]
+        for i in range(0, len(events), chunk_size):
+            yield events[i:i + chunk_size]
+
+
+@pytest.mark.unit
+def test_failed_flush_requeues_trades(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'), batch_size=4, flush_interval_s=3600)
+    ledger._conn = _LockedConnection(ledger._conn)
+    ledger._conn.locked = True
+    start = datetime(2024, 6, 1, 9, 0)
+    _fill(ledger, start, 4)
+
+    # El lote fallido sigue pendiente y no se reintenta en cada evento
+    assert ledger.stats['flush_errors'] == 1
+    for i in range(4, 6):
+        ledger.record_open(f"open-{i}", start + timedelta(minutes=i), {'symbol': 'BTCUSDT', 'size': 1.0, 'price': 100.0})
+    assert ledger.stats['flush_errors'] == 1
+    assert len(ledger._pending_opens) == 6 and not ledger.needs_rebuild(None, None)
+
+    ledger._conn.locked = False
+    assert ledger.count() == 6 and ledger.stats['trades_closed'] == 2
+    ledger.close()
+
+
+@pytest.mark.unit
+def test_dropped_trades_mark_period_for_rebuild(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'), batch_size=2, flush_interval_s=3600, max_pending=3)
+    ledger._conn = _LockedConnection(ledger._conn)
+    ledger._conn.locked = True
+    start = datetime(2024, 6, 1, 9, 0)
+    for i in range(5):
+        ledger.record_open(f"open-{i}", start + timedelta(minutes=i), {'symbol': 'BTCUSDT', 'size': 1.0, 'price': 100.0})
+    ledger.flush()
+
+    # Solo caben 3 en la cola: las 2 aperturas más antiguas marcan su período
+    assert ledger.stats['events_dropped'] == 2 and len(ledger._pending_opens) == 3
+    assert ledger.needs_rebuild(start, start + timedelta(minutes=1))
+    assert not ledger.needs_rebuild(start + timedelta(minutes=2), start + timedelta(hours=1))
+
+    ledger._conn.locked = False
+    ledger.rebuild_from_audit(_AuditSource(start, 5), start, start + timedelta(hours=1))
+    assert ledger.count() == 5 and not ledger.needs_rebuild(None, None)
+    ledger.close()
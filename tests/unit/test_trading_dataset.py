@@ -0,0 +1,40 @@
+"""Tests de TradingDataset sobre arrays memmap compartidos"""
+
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("pytorch_lightning")
+
+from core.ml.enterprise.data_module import TradingDataset
+
+
+@pytest.mark.unit
+def test_memmap_windows_match_dataframe_dataset(tmp_path):
+    pd = pytest.importorskip("pandas")
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.standard_normal((200, 3)), columns=['a', 'b', 'c'])
+    frame['target'] = rng.integers(0, 3, 200)
+
+    np.save(tmp_path / 'X.npy', frame[['a', 'b', 'c']].values.astype(np.float32))
+    np.save(tmp_path / 'y.npy', frame['target'].values.astype(np.int64))
+    paths = (str(tmp_path / 'X.npy'), str(tmp_path / 'y.npy'))
+
+    legacy = TradingDataset(frame[100:], ['a', 'b', 'c'], sequence_length=10)
+    shared = TradingDataset.from_arrays(
+        np.load(paths[0], mmap_mode='c'), np.load(paths[1], mmap_mode='c'),
+        ['a', 'b', 'c'], start=100, stop=200, sequence_length=10, array_paths=paths
+    )
+
+    assert len(shared) == len(legacy)
+    for idx in (0, 17, len(shared) - 1):
+        X_a, y_a = legacy[idx]
+        X_b, y_b = shared[idx]
+        assert torch.equal(X_a, X_b) and int(y_a) == int(y_b)
+
+    # Al serializar (workers 'spawn') se reabre el archivo en lugar de copiar los datos
+    restored = pickle.loads(pickle.dumps(shared))
+    assert isinstance(restored.X, np.memmap)
+    assert torch.equal(restored[5][0], shared[5][0])
@@ -0,0 +1,155 @@
+"""Tests del ciclo de portfolio del TradingExecutor (fan-out, ranking y errores)"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+executor_module = pytest.importorskip("core.trading.executor")
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT']
+
+
+class _FakeConfig:
+    def __init__(self, values):
+        self.values = values
+
+    def get_value(self, keys, default=None):
+        return self.values.get(keys[0], default)
+
+
+class _FakeExchange:
+    async def health_check(self):
+        return {'status': 'healthy'}
+
+
+class _FakeDB:
+    def get_recent_market_data(self, symbol, timeframe="1m", limit=1):
+        return [{'close': 100.0 + SYMBOLS.index(symbol)}]
+
+
+class _FakeRisk:
+    def __init__(self):
+        self.price_updates = []
+
+    def update_market_prices(self, prices, timestamp=None):
+        self.price_updates.append(dict(prices))
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    from core.config import config_loader
+
+    config = _FakeConfig({'trading': {
+        'allowed_symbols': SYMBOLS[:-1],
+        'cycle_max_concurrency': 2
+    }})
+    monkeypatch.setattr(config_loader, 'ConfigLoader', lambda *a, **k: SimpleNamespace(get_main_config=lambda: config))
+    monkeypatch.setattr(executor_module, 'bitget_client', _FakeExchange())
+    monkeypatch.setattr(executor_module, 'db_manager', _FakeDB())
+    monkeypatch.setattr(executor_module, 'risk_manager', _FakeRisk())
+
+    instance = executor_module.TradingExecutor()
+    instance.is_running = True
+    return instance
+
+
+def _install_fakes(executor, predictions, calls):
+    in_flight = {'now': 0, 'max': 0}
+
+    async def process_ml_prediction(symbol):
+        in_flight['now'] += 1
+        in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        await asyncio.sleep(0.01)
+        in_flight['now'] -= 1
+        calls['predictions'].append(symbol)
+        return predictions[symbol]
+
+    async def evaluate_exit_signals(symbol, prediction=None, current_price=None):
+        calls['exits'].append((symbol, current_price))
+        return [{'trade_id': f"{symbol}-open", 'exit_price': current_price}]
+
+    async def evaluate_entry_signal(prediction, symbol):
+        return prediction['action'] != 'HOLD'
+
+    async def execute_trade_decision(symbol, decision, current_price=None):
+        calls['entries'].append((symbol, current_price))
+        return {'symbol': symbol, 'price': current_price}
+
+    async def update_model_feedback(trade_records):
+        calls['feedback'].append([trade.trade_id for trade in trade_records])
+
+    executor.process_ml_prediction = process_ml_prediction
+    executor.evaluate_exit_signals = evaluate_exit_signals
+    executor.evaluate_entry_signal = evaluate_entry_signal
+    executor.execute_trade_decision = execute_trade_decision
+    executor.update_model_feedback = update_model_feedback
+    return in_flight
+
+
+@pytest.mark.unit
+def test_portfolio_cycle_fans_out_ranks_entries_and_batches_feedback(executor):
+    predictions = {
+        'BTCUSDT': {'action': 'BUY', 'confidence': 0.7, 'quality_score': 0.8},
+        'ETHUSDT': {'action': 'SELL', 'confidence': 0.9, 'quality_score': 0.9},
+        'SOLUSDT': {'error': 'modelo no disponible'},
+    }
+    calls = {'predictions': [], 'exits': [], 'entries': [], 'feedback': []}
+    in_flight = _install_fakes(executor, predictions, calls)
+    executor.active_positions = {'BTCUSDT': SimpleNamespace(trade_id='BTCUSDT-open')}
+
+    result = asyncio.run(executor.execute_portfolio_cycle(SYMBOLS))
+
+    assert result['status'] == 'completed'
+    # Fan-out acotado por cycle_max_concurrency; XRPUSDT no está permitido
+    assert sorted(calls['predictions']) == ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+    assert in_flight['max'] == 2
+    assert result['results']['XRPUSDT']['status'] == 'skipped'
+    assert result['results']['SOLUSDT']['status'] == 'failed'
+    assert 'modelo no disponible' in result['results']['SOLUSDT']['errors'][0]
+
+    # Los precios del ciclo llegan al motor de riesgo en una sola actualización
+    assert executor_module.risk_manager.price_updates == [{'BTCUSDT': 100.0, 'ETHUSDT': 101.0}]
+
+    # Las salidas reutilizan el precio ya obtenido; solo hay posición en BTCUSDT
+    assert calls['exits'] == [('BTCUSDT', 100.0)]
+    assert result['results']['BTCUSDT']['exit_trades'][0]['trade_id'] == 'BTCUSDT-open'
+
+    # Entradas en orden de confianza * calidad y feedback en un único lote
+    assert calls['entries'] == [('ETHUSDT', 101.0), ('BTCUSDT', 100.0)]
+    assert calls['feedback'] == [['BTCUSDT-open']]
+
+    assert set(result['stage_timings_ms']) == {'checks', 'fetch', 'exits', 'allocation', 'feedback'}
+    assert set(result['symbol_fetch_ms']) == {'BTCUSDT', 'ETHUSDT', 'SOLUSDT'}
+    assert executor.metrics['total_cycles_executed'] == 1
+    assert executor.metrics['portfolio_cycle_latency_ms'] == result['execution_time_ms']
+
+
+@pytest.mark.unit
+def test_portfolio_cycle_reports_errors_without_raising(executor):
+    predictions = {symbol: {'action': 'BUY', 'confidence': 0.8, 'quality_score': 0.8} for symbol in SYMBOLS}
+    calls = {'predictions': [], 'exits': [], 'entries': [], 'feedback': []}
+    _install_fakes(executor, predictions, calls)
+
+    async def failing_prediction(symbol):
+        if symbol == 'ETHUSDT':
+            raise RuntimeError("timeout del modelo")
+        return predictions[symbol]
+
+    async def failing_entry(symbol, decision, current_price=None):
+        raise RuntimeError("exchange caído")
+
+    executor.process_ml_prediction = failing_prediction
+    executor.execute_trade_decision = failing_entry
+
+    result = asyncio.run(executor.execute_portfolio_cycle(SYMBOLS))
+
+    # El fallo de un símbolo en el fan-out queda aislado en su resultado...
+    assert result['results']['ETHUSDT']['status'] == 'failed'
+    assert 'timeout del modelo' in result['results']['ETHUSDT']['errors'][0]
+    # ...y un fallo en la etapa central marca el ciclo como error sin propagarse
+    assert result['status'] == 'error'
+    assert result['errors'] == ['exchange caído']
+    assert 'allocation' not in result['stage_timings_ms']
+    assert executor.metrics['total_cycles_executed'] == 0
+    assert executor.metrics['portfolio_stage_latency_ms'] == result['stage_timings_ms']